@@ -135,25 +135,19 @@ def adjudicate_rows(
     client = Mistral(api_key=api_key)
     out: list[dict[str, Any]] = []
     for row in rows:
-        raw = ""
-        for attempt in range(4):
-            try:
-                _, raw = _chat_complete(
-                    client=client,
-                    model=model,
-                    messages=[{"role": "system", "content": SYSTEM}, {"role": "user", "content": _prompt(row)}],
-                    temperature=0.0,
-                    max_tokens=1200,
-                    purpose="claim_equivalence_adjudication",
-                    api_log_hook=None,
-                )
-                break
-            except Exception as exc:
-                wait = 2 ** (attempt + 2)  # 4, 8, 16, 32s
-                if attempt < 3:
-                    time.sleep(wait)
-                else:
-                    raw = f'{{"verdict":"unclear","confidence":0.0,"rationale":"API error: {exc}"}}'
+        # Rate-limit and 5xx retries happen in the shared LLM scheduler.
+        try:
+            _, raw = _chat_complete(
+                client=client,
+                model=model,
+                messages=[{"role": "system", "content": SYSTEM}, {"role": "user", "content": _prompt(row)}],
+                temperature=0.0,
+                max_tokens=1200,
+                purpose="claim_equivalence_adjudication",
+                api_log_hook=None,
+            )
+        except Exception as exc:
+            raw = f'{{"verdict":"unclear","confidence":0.0,"rationale":"API error: {exc}"}}'
         parsed = _extract_json(raw)
         candidate = {
             "schema_version": "1.0.0",
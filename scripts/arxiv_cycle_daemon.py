@@ -474,6 +474,11 @@ def _build_parser() -> argparse.ArgumentParser:
 
 
 def main() -> None:
+    from llm_scheduler import default_lane
+
+    # Batch work yields the shared LLM quota to interactive /verify runs.
+    default_lane("background")
+
     args = _build_parser().parse_args()
 
     if not args.api_key and not args.dry_run:
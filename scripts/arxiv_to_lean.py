@@ -24,6 +24,7 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import multiprocessing as mp
 import os
@@ -33,9 +34,10 @@ import sys
 import threading
 import time
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
 
@@ -50,8 +52,10 @@ from pipeline_status import (
     save_ledger,
 )
 from pipeline_status_models import FailureKind, FailureOrigin, ProofMethod, VerificationStatus
+from theorem_dependency_graph import TheoremDependencyGraph
 from theorem_extractor import TheoremEntry, extract_from_files
 from lean_sanitize import escape_lean_comment
+from llm_scheduler import get_scheduler
 from repair_feedback_dataset import (
     DEFAULT_DATASET_PATH,
     DEFAULT_SUMMARY_PATH,
@@ -187,53 +191,61 @@ def _topological_sort_entries(entries: list) -> list:
     proof text via \\ref{} or direct mention. Falls back to document order for
     entries in cycles or with no detected dependencies.
     """
-    n = len(entries)
-    if n <= 1:
+    if len(entries) <= 1:
         return entries
+    order = TheoremDependencyGraph.from_entries(entries).topological_order()
+    return [entries[i] for i in order]
 
-    label_to_idx: dict[str, int] = {}
-    name_to_idx: dict[str, int] = {}
-    for i, e in enumerate(entries):
-        if e.label:
-            label_to_idx[e.label] = i
-        if e.name:
-            name_to_idx[e.name] = i
-
-    # deps[i] = set of indices that i depends on (must come before i)
-    deps: list[set[int]] = [set() for _ in range(n)]
-    for i, entry in enumerate(entries):
-        proof_text = entry.proof or ""
-        for ref_tuple in re.findall(r"\\(?:ref|eqref|cref)\{([^}]+)\}", proof_text):
-            for ref in ref_tuple.split(","):
-                ref = ref.strip()
-                if ref in label_to_idx and label_to_idx[ref] != i:
-                    deps[i].add(label_to_idx[ref])
-        for name, j in name_to_idx.items():
-            if j != i and len(name) >= 4 and name in proof_text:
-                deps[i].add(j)
-
-    # Kahn's topological sort — preserves document order among equal-depth nodes
-    in_degree = [len(deps[i]) for i in range(n)]
-    queue = sorted(i for i in range(n) if in_degree[i] == 0)
-    result: list[int] = []
-    visited: set[int] = set()
-    while queue:
-        node = queue.pop(0)
-        if node in visited:
-            continue
-        visited.add(node)
-        result.append(node)
-        for j in range(n):
-            if node in deps[j]:
-                deps[j].discard(node)
-                in_degree[j] -= 1
-                if in_degree[j] == 0:
-                    queue.append(j)
-        queue.sort()
 
-    # Append any remaining nodes (cycles) in document order
-    result.extend(i for i in range(n) if i not in visited)
-    return [entries[i] for i in result]
+def _run_dependency_dag(
+    graph: TheoremDependencyGraph,
+    fn: Callable[[int], Any],
+    *,
+    workers: int,
+) -> list[Any]:
+    """Run ``fn(i)`` for every node of ``graph`` on ``workers`` threads.
+
+    A node is dispatched once every node in ``graph.deps[i]`` has finished;
+    among ready nodes the one heading the longest chain of dependents goes
+    first, then document order. When only nodes on a dependency cycle remain,
+    the earliest one is released. Results come back indexed by node; the
+    first exception raised by ``fn`` propagates.
+    """
+    n = len(graph)
+    critical = graph.critical_path_lengths()
+    remaining = [set(ds) for ds in graph.deps]
+    queued = [False] * n
+    ready: list[tuple[int, int]] = []
+
+    def _push(i: int) -> None:
+        queued[i] = True
+        heapq.heappush(ready, (-critical[i], i))
+
+    for i in range(n):
+        if not remaining[i]:
+            _push(i)
+
+    results: list[Any] = [None] * n
+    finished = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running: dict[Future, int] = {}
+        while finished < n:
+            while ready and len(running) < max(1, workers):
+                _, i = heapq.heappop(ready)
+                running[executor.submit(fn, i)] = i
+            if not running:
+                _push(next(i for i in range(n) if not queued[i]))
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                results[i] = future.result()
+                finished += 1
+                for j in graph.dependents[i]:
+                    remaining[j].discard(i)
+                    if not remaining[j] and not queued[j]:
+                        _push(j)
+    return results
 
 
 # Greek letters and common short identifiers that papers use both as \newcommand
@@ -926,30 +938,6 @@ def _get_cache(project_root: Path) -> _TranslationCache:
         return _GLOBAL_CACHE
 
 
-class _RateLimiter:
-    """Token-bucket rate limiter — at most `rate` calls per second."""
-
-    def __init__(self, rate: float = 4.0) -> None:
-        self._rate = rate
-        self._tokens = rate
-        self._last = time.monotonic()
-        self._lock = threading.Lock()
-
-    def acquire(self) -> None:
-        with self._lock:
-            now = time.monotonic()
-            elapsed = now - self._last
-            self._last = now
-            self._tokens = min(self._rate, self._tokens + elapsed * self._rate)
-            if self._tokens >= 1.0:
-                self._tokens -= 1.0
-                return
-            wait = (1.0 - self._tokens) / self._rate
-        time.sleep(wait)
-        with self._lock:
-            self._tokens = max(0.0, self._tokens - 1.0)
-
-
 def _run_with_timeout(seconds: float, fn: Callable[[], Any]) -> Any:
     """Run fn with a POSIX alarm timeout.
 
@@ -1470,7 +1458,7 @@ def run_pipeline(
     strict_assumption_slot_coverage: bool = True,
     enable_schema_template_synthesis: bool = False,
     enable_schema_self_check: bool = True,
-    rate_limiter: "_RateLimiter | None" = None,
+    api_rate: float | None = None,
     local_tex_paths: list[Path] | None = None,
     source_label: str | None = None,
     progress_hook: Callable[[str], None] | None = None,
@@ -1757,8 +1745,6 @@ def run_pipeline(
             if not (_def_entry.statement or "").strip():
                 continue
             try:
-                rl_def = rate_limiter or _RateLimiter(rate=4.0)
-                rl_def.acquire()
                 _def_tr = translate_statement(
                     latex_statement=_def_entry.statement,
                     latex_proof_hint="",
@@ -1822,9 +1808,15 @@ def run_pipeline(
         print("      no theorem environments found — nothing to do")
         return []
 
-    rl = rate_limiter or _RateLimiter(rate=4.0)
+    if api_rate is not None:
+        # Every Leanstral call below is admitted by the shared scheduler.
+        get_scheduler().set_rate(api_rate)
     n = len(entries)
     _print_lock = threading.Lock()
+    # Dependency edges between (sorted, capped) entries; a theorem's context
+    # hint lists the validated Lean signatures of the results it builds on.
+    _entry_graph = TheoremDependencyGraph.from_entries(entries)
+    _validated_signatures: dict[int, str] = {}
 
     # --- Checkpoint/resume: load previously completed theorem results ---
     _checkpoint_path = work_dir / "pipeline_checkpoint.json"
@@ -1870,6 +1862,14 @@ def run_pipeline(
                 _source_text_cache[src] = ""
         return _build_context_pack(entry=entry, source_text=_source_text_cache[src], glossary=paper_glossary)
 
+    def _dependency_signatures(i: int) -> list[str]:
+        with _print_lock:
+            return [
+                _validated_signatures[d]
+                for d in sorted(_entry_graph.deps[i - 1])
+                if _validated_signatures.get(d)
+            ]
+
     def _structured_context_pack(entry: TheoremEntry, context_hint: str) -> dict[str, Any]:
         source = " ".join((context_hint or "").split())
         defs = re.findall(r"(?:Definition|Assume|Let)\b[^.]{5,220}\.", source, flags=re.IGNORECASE)
@@ -1949,7 +1949,16 @@ def run_pipeline(
     def _process_entry(i: int, entry: TheoremEntry) -> PipelineResult:
         lean_id = _lean_name(entry.name)
         context_hint = _context_hint_for_entry(entry)
+        dependency_signatures = _dependency_signatures(i)
+        if dependency_signatures:
+            context_hint = (
+                context_hint.rstrip()
+                + "\n\nAlready translated results this statement builds on:\n"
+                + "\n".join(f"- {sig}" for sig in dependency_signatures)
+            ).strip()
         context_pack = _structured_context_pack(entry, context_hint)
+        if dependency_signatures:
+            context_pack["dependency_signatures"] = dependency_signatures
         with _print_lock:
             print(f"\n[{i}/{n}] [{entry.kind}] {entry.name} → {lean_id}")
             if progress_hook:
@@ -2017,7 +2026,6 @@ def run_pipeline(
             with _print_lock:
                 print(f"         translate: cached  rounds=0")
         else:
-            rl.acquire()
             tr = translate_statement(
                 latex_statement=entry.statement,
                 latex_proof_hint=context_hint,
@@ -2172,7 +2180,6 @@ def run_pipeline(
             and not translate_only
             and "typed_statement_ir" not in [str(x) for x in (getattr(tr, "uncertainty_flags", []) or [])]
         ):
-            rl.acquire()
             retry_tr = translate_statement(
                 latex_statement=entry.statement,
                 latex_proof_hint=context_hint,
@@ -2356,8 +2363,6 @@ def run_pipeline(
                 encoding="utf-8",
             )
 
-            rl.acquire()
-
             def _run_full_draft() -> tuple[bool, list, str]:
                 return prove_with_full_draft_repair(
                     project_root=project_root,
@@ -2499,6 +2504,11 @@ def run_pipeline(
     def _process_and_checkpoint(i: int, entry: TheoremEntry) -> PipelineResult:
         result = _process_entry(i, entry)
         lean_id = _lean_name(entry.name)
+        if result.translation.validated and result.translation.lean_signature.strip():
+            with _print_lock:
+                _validated_signatures[i - 1] = re.sub(
+                    r"\s*:=\s*by\s*$", "", result.translation.lean_signature
+                ).strip()
         _save_checkpoint(lean_id, {
             "lean_signature": result.translation.lean_signature,
             "validated": result.translation.validated,
@@ -2536,16 +2546,13 @@ def run_pipeline(
             _process_and_checkpoint(i, entry) for i, entry in enumerate(entries, start=1)
         ]
     else:
-        results_map: dict[int, PipelineResult] = {}
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {
-                executor.submit(_process_and_checkpoint, i, entry): i
-                for i, entry in enumerate(entries, start=1)
-            }
-            for future in as_completed(futures):
-                idx = futures[future]
-                results_map[idx] = future.result()
-        results = [results_map[i] for i in range(1, n + 1)]
+        # Dependents wait for the results they cite; independent branches run
+        # concurrently, longest dependency chain first.
+        results = _run_dependency_dag(
+            _entry_graph,
+            lambda k: _process_and_checkpoint(k + 1, entries[k]),
+            workers=workers,
+        )
 
     # --- P6: Proof-search health report ---
     # Surface a warning when the acceptance gate blocks most translations.  A high
@@ -2969,7 +2976,10 @@ def _build_parser() -> argparse.ArgumentParser:
         "--parallel-theorems",
         type=int,
         default=4,
-        help="Number of theorems to translate/prove in parallel (default: 4)",
+        help=(
+            "Number of theorems to translate/prove in parallel (default: 4); a theorem "
+            "starts once the results its proof cites are done"
+        ),
     )
     p.add_argument(
         "--min-actionability-score",
@@ -3024,7 +3034,7 @@ def _build_parser() -> argparse.ArgumentParser:
         "--api-rate",
         type=float,
         default=4.0,
-        help="Max API calls per second across all threads (default: 4.0)",
+        help="Max Leanstral API calls per second across all threads; 0 = no fixed ceiling (default: 4.0)",
     )
     p.add_argument(
         "--write-kg",
@@ -3115,7 +3125,7 @@ def main() -> int:
                 args.enable_schema_template_synthesis and not args.disable_schema_template_synthesis
             ),
             enable_schema_self_check=not args.disable_schema_self_check,
-            rate_limiter=_RateLimiter(rate=args.api_rate),
+            api_rate=args.api_rate,
             write_kg=args.write_kg,
             kg_root=(Path(args.kg_root) if args.kg_root else None),
         )
@@ -33,11 +33,12 @@ from __future__ import annotations
 import argparse
 import json
 import re
-import subprocess
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from lean_diagnostics_store import file_diagnostics
+
 
 DEFAULT_LEDGER_DIR = Path("output/verification_ledgers")
 DEFAULT_LEAN_DIR = Path("output")
@@ -103,11 +104,6 @@ def _is_audited_core_row(entry: dict[str, Any]) -> bool:
     return False
 
 
-_LAKE_ERROR_RX = re.compile(
-    r"^output/[^:]+:(?P<line>\d+):(?P<col>\d+):\s*error", re.MULTILINE,
-)
-
-
 def collect_lake_error_lines(
     lean_path: Path, *, timeout_s: int = 180, project_root: Path | None = None,
 ) -> dict[int, str]:
@@ -119,33 +115,14 @@ def collect_lake_error_lines(
     reason ``file_body_does_not_elaborate``.
 
     Empty dict on lake timeout / missing file / project_root mismatch
-    — the audit then falls back to the legacy body-is-sorry path.
+    — the audit then falls back to the legacy body-is-sorry path. Reads
+    from the shared diagnostics store when the file is unchanged since the
+    last elaboration.
     """
     if not lean_path.exists():
         return {}
-    cwd = project_root or Path.cwd()
-    try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(lean_path)],
-            cwd=str(cwd),
-            capture_output=True,
-            text=True,
-            timeout=timeout_s,
-        )
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        return {}
-    blob = (proc.stdout or "") + "\n" + (proc.stderr or "")
-    errs: dict[int, str] = {}
-    for m in _LAKE_ERROR_RX.finditer(blob):
-        try:
-            ln = int(m.group("line"))
-        except (TypeError, ValueError):
-            continue
-        # Capture a short tail after the match for forensics.
-        tail_start = m.end()
-        tail = blob[tail_start: tail_start + 200].splitlines()[0].strip()
-        errs.setdefault(ln, tail)
-    return errs
+    diag = file_diagnostics(lean_path, project_root=project_root or Path.cwd(), timeout_s=timeout_s)
+    return diag.error_lines() if diag is not None else {}
 
 
 def _theorem_line_range_in_file(
@@ -8,14 +8,14 @@ import hashlib
 import json
 import re
 import time
-from collections import Counter
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 
 from canonicalization import canonical_record
 from source_evidence_resolver import resolve_evidence_row
 from statement_alignment import classify_row_alignment
-from theorem_extractor import extract_theorems
+from theorem_extractor import LineIndex, TheoremEntry, extract_theorems
 
 
 SCHEMA_VERSION = "corpus_row.v1"
@@ -285,28 +285,10 @@ def _proof_from_decl(decl: str) -> str:
     return proof
 
 
-def _line_col(text: str, offset: int) -> tuple[int, int]:
-    prefix = text[:offset]
-    line = prefix.count("\n") + 1
-    last_newline = prefix.rfind("\n")
-    if last_newline < 0:
-        return line, offset + 1
-    return line, offset - last_newline
-
-
-def _span_for_match(text: str, source_file: str, start: int, end: int, confidence: str) -> dict[str, Any]:
-    start_line, start_col = _line_col(text, start)
-    end_line, end_col = _line_col(text, end)
-    return {
-        "source_file": source_file,
-        "start_byte": len(text[:start].encode("utf-8")),
-        "end_byte": len(text[:end].encode("utf-8")),
-        "start_line": start_line,
-        "start_col": start_col,
-        "end_line": end_line,
-        "end_col": end_col,
-        "span_confidence": confidence,
-    }
+def _span_for_match(index: LineIndex, source_file: str, start: int, end: int, confidence: str) -> dict[str, Any]:
+    span = _source_span_to_dict(index.span(source_file, start, end))
+    span["span_confidence"] = confidence
+    return span
 
 
 def _source_span_from_evidence(row: dict[str, Any]) -> dict[str, Any]:
@@ -323,15 +305,13 @@ def _string_recovered_span_from_evidence(row: dict[str, Any]) -> dict[str, Any]:
     statement = _safe_text(row.get("statement"))
     if not source_file or not statement:
         return {}
-    path = Path(source_file)
-    try:
-        text = path.read_text(encoding="utf-8", errors="replace")
-    except OSError:
+    index = _source_line_index(source_file)
+    if index is None:
         return {}
-    idx = text.find(statement)
+    idx = index.text.find(statement)
     if idx < 0:
         return {}
-    return _span_for_match(text, source_file, idx, idx + len(statement), "string_recovered_exact")
+    return _span_for_match(index, source_file, idx, idx + len(statement), "string_recovered_exact")
 
 
 def _source_span_to_dict(span: Any) -> dict[str, Any]:
@@ -348,6 +328,43 @@ def _source_span_to_dict(span: Any) -> dict[str, Any]:
     }
 
 
+# Extraction results and line indexes per source file, keyed by path and
+# checked against (mtime_ns, size): many ledger rows of one paper re-verify
+# against the same .tex file. Both are LRU-bounded so a corpus-wide export
+# does not keep every paper's source in memory.
+_SOURCE_CACHE_MAX = 32
+_EXTRACTED: "OrderedDict[str, tuple[tuple[int, int], list[TheoremEntry]]]" = OrderedDict()
+_LINE_INDEXES: "OrderedDict[str, tuple[tuple[int, int], LineIndex]]" = OrderedDict()
+
+def _per_source_file(cache: "OrderedDict[str, tuple[tuple[int, int], Any]]", path: Path, build: Callable[[Path], Any]) -> Any:
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(path)
+    cached = cache.get(key)
+    if cached is None or cached[0] != stamp:
+        cached = cache[key] = (stamp, build(path))
+    cache.move_to_end(key)
+    while len(cache) > _SOURCE_CACHE_MAX:
+        cache.popitem(last=False)
+    return cached[1]
+
+
+def _extracted_theorems(path: Path) -> list[TheoremEntry]:
+    return _per_source_file(_EXTRACTED, path, extract_theorems)
+
+
+def _source_line_index(source_file: str) -> LineIndex | None:
+    """Line index over ``source_file``'s text (``.text``), or None if unreadable."""
+    try:
+        return _per_source_file(
+            _LINE_INDEXES,
+            Path(source_file),
+            lambda p: LineIndex(p.read_text(encoding="utf-8", errors="replace")),
+        )
+    except OSError:
+        return None
+
+
 def _reverified_extractor_span(evidence_row: dict[str, Any], source_latex: str) -> dict[str, Any]:
     source_file = _safe_text(evidence_row.get("source_file")).strip()
     if not source_file:
@@ -356,7 +373,7 @@ def _reverified_extractor_span(evidence_row: dict[str, Any], source_latex: str)
     if not path.exists():
         return {}
     try:
-        extracted = extract_theorems(path)
+        extracted = _extracted_theorems(path)
     except Exception:
         return {}
     if not extracted:
@@ -658,15 +675,11 @@ def _build_source_span(
         return span
     source_file = _safe_text(evidence_row.get("source_file")).strip()
     if source_file and source_latex:
-        path = Path(source_file)
-        try:
-            text = path.read_text(encoding="utf-8", errors="replace")
-        except OSError:
-            text = ""
-        if text:
-            idx = text.find(source_latex)
+        index = _source_line_index(source_file)
+        if index is not None and index.text:
+            idx = index.text.find(source_latex)
             if idx >= 0:
-                return _span_for_match(text, source_file, idx, idx + len(source_latex), "string_recovered_exact")
+                return _span_for_match(index, source_file, idx, idx + len(source_latex), "string_recovered_exact")
     return _missing_span(source_file)
 
 
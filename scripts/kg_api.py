@@ -643,6 +643,8 @@ if app is not None:
         proc = subprocess.Popen(
             [sys.executable, str(script), paper_id, "--project-root", str(_PROJECT_ROOT)],
             start_new_session=True,
+            # Admitted ahead of sweeps through the shared LLM admission queue.
+            env={**os.environ, "DESOL_LLM_PRIORITY": "interactive"},
         )
         _audit("verify_queued", paper_id=paper_id, pid=proc.pid, client=key, inflight=_verify_inflight)
         # Best-effort deferred release in a detached thread when process exits.
@@ -37,12 +37,12 @@ from canonicalization import build_manual_conflict_queue, canonical_record
 try:
     from statement_retrieval import (
         build_statement_index as _build_statement_index,
-        query_statement_index as _query_statement_index,
+        query_statement_index_many as _query_statement_index_many,
         statement_text_from_row as _statement_text_from_row,
     )
 except ModuleNotFoundError:
     _build_statement_index = None
-    _query_statement_index = None
+    _query_statement_index_many = None
     _statement_text_from_row = None
 
 _NEW_ARXIV_ID = re.compile(r"(?:arxiv:)?(\d{4}\.\d{4,5})(?:v\d+)?\b", re.IGNORECASE)
@@ -814,14 +814,19 @@ def _extract_semantic_similarity_edges(
     threshold: float = 0.55,
     top_k: int = 5,
 ) -> list[dict[str, Any]]:
-    """Create theorem-neighbor edges from the extracted-statement retriever."""
-    if _query_statement_index is None or not statement_index.exists():
+    """Create theorem-neighbor edges from the extracted-statement retriever.
+
+    All node queries go through one batched index lookup; if that fails, each
+    node is queried on its own so only the failing nodes lose their edges.
+    """
+    if _query_statement_index_many is None or not statement_index.exists():
         return []
 
     theorem_keys = {_node_ref(n) for n in nodes if n.get("paper_id") and n.get("theorem_name")}
     node_by_ref = {_node_ref(n): n for n in nodes if _node_ref(n) in theorem_keys}
     edge_map: dict[tuple[str, str, str], dict[str, Any]] = {}
 
+    queried: list[tuple[dict[str, Any], str, str]] = []
     for node in nodes:
         src = _node_ref(node)
         if not src or src not in theorem_keys:
@@ -832,18 +837,36 @@ def _extract_semantic_similarity_edges(
             or node.get("lean_statement")
             or ""
         ).strip()
-        if not query_text:
-            continue
-        try:
-            hits = _query_statement_index(
-                statement_index,
-                query_text,
-                top_k=max(1, top_k + 1),
-                exclude_statement_id=src,
-                overfetch=4,
-            )
-        except Exception:
-            continue
+        if query_text:
+            queried.append((node, src, query_text))
+    if not queried:
+        return []
+    try:
+        all_hits = _query_statement_index_many(
+            statement_index,
+            [text for _node, _src, text in queried],
+            top_k=max(1, top_k + 1),
+            exclude_statement_ids=[src for _node, src, _text in queried],
+            overfetch=4,
+        )
+    except Exception:
+        # One bad query must not cost every node its edges: retry per node.
+        all_hits = []
+        for _node, src, text in queried:
+            try:
+                all_hits.append(
+                    _query_statement_index_many(
+                        statement_index,
+                        [text],
+                        top_k=max(1, top_k + 1),
+                        exclude_statement_ids=[src],
+                        overfetch=4,
+                    )[0]
+                )
+            except Exception:
+                all_hits.append([])
+
+    for (node, src, _query_text), hits in zip(queried, all_hits):
         for hit in hits:
             dst = str(hit.get("statement_id", "")).strip()
             if not dst or dst == src or dst not in theorem_keys:
@@ -13,6 +13,11 @@ This module exposes :func:`validated_isolated_check` with the same
 relevant paper-theory module. After a ~5s warmup, each candidate elaborates in
 <200ms (the only cost is per-decl elaboration).
 
+The warmup itself is paid once per toolchain/manifest/paper-theory build:
+workers restore the anchor env from a pickled snapshot when one matches
+(``lean_repl_server.repl_env_snapshot_path``), so worker restarts and fresh
+daemon processes skip re-elaborating the anchor.
+
 Design — Option C, persistent REPL worker pool
 ----------------------------------------------
 We picked Option C from the design brief because:
@@ -31,9 +36,14 @@ We picked Option C from the design brief because:
   proofs.
 
 The cache is keyed on ``(project_root, paper_id)`` so each paper gets its own
-worker holding the right paper-theory env. Workers are reused across calls.
-A small pool (default 1 per paper) is enough for serial sweeps; concurrent
-sweeps just create one worker per active key.
+workers holding the right paper-theory env. Workers are reused across calls.
+Each key holds a bounded pool (``DESOL_LVC_WORKERS_PER_PAPER``, default half
+the cores, at most ``DESOL_LVC_MAX_WORKERS``) and calls are dispatched to the
+least-loaded worker, so concurrent callers on one paper spread across cores
+instead of queueing on a single REPL. Extra workers are only warmed under
+concurrent demand, so a serial sweep still runs on one REPL. A global cap
+(``DESOL_LVC_MAX_WORKERS``, default ``os.cpu_count()``) bounds the total;
+when it is hit the least-recently-used idle paper key is evicted.
 
 Public API
 ----------
@@ -41,22 +51,53 @@ Public API
 proof_body=None, timeout_s=60)`` returns ``(ok, error_tail)`` identical to
 ``_run_isolated_file_check`` (including signature-only probe semantics).
 
+``validate_candidates_batch(paper_id, [(decl, body), ...], *, project_root)``
+fans candidates out over the paper's worker pool and yields
+``(index, ok, error_tail)`` in completion order, optionally stopping at the
+first accepted candidate.
+
 ``differential_check(...)`` runs both the fast and slow validators and asserts
 agreement — used by sweep wrappers to verify standards-positivity for the
 first N candidates of a run.
 
+``check_lean_source(lean_src, *, project_root, classify, cold_check, ...)``
+is the shared engine for whole-file checks: it elaborates a complete source
+on a worker warmed with that source's import header, falls back to the
+caller's ``lake env lean`` path when no warm env is available, and re-checks
+a sampled fraction cold (``DESOL_VALIDATION_DIFFERENTIAL_RATE``, default
+0.02). ``_run_isolated_file_check``, ``independent_lean_verify`` and the
+translator's ``_run_lean`` all route through it; ``DESOL_VALIDATION_BACKEND``
+picks ``auto`` (default), ``repl`` or ``lake``.
+
+``run_lean_file(lean_file, *, project_root, focus=...)`` stands in for
+``lake env lean <lean_file>`` when a paper file is re-checked after patching
+one theorem. The file is elaborated command by command and the env after
+every declaration prefix is kept, keyed by a hash chain over the command
+texts; a re-check elaborates only the changed declarations up to ``focus``
+(new aux lemmas and the patched body) and reuses recorded diagnostics for
+the unchanged rest, so baseline-error counts and ``declaration uses
+'sorry'`` line checks read the result exactly as they read lake output.
+
 ``shutdown_all_workers()`` cleanly stops every cached worker (call at sweep
 exit or in tests).
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+import random
 import re
+import subprocess
 import sys
 import threading
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional, Sequence
 
 # Make sibling scripts importable when invoked as a module.
 _THIS_DIR = Path(__file__).resolve().parent
@@ -68,10 +109,19 @@ from lean_repl_server import LeanError, LeanREPLServer  # noqa: E402
 
 __all__ = [
     "validated_isolated_check",
+    "validate_candidates_batch",
     "differential_check",
     "shutdown_all_workers",
     "WorkerCache",
     "build_isolated_decl_text",
+    "check_lean_source",
+    "split_import_header",
+    "format_messages",
+    "validation_backend",
+    "validation_engine_stats",
+    "run_lean_file",
+    "split_declarations",
+    "DeclChunk",
 ]
 
 
@@ -112,24 +162,75 @@ def build_isolated_decl_text(
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Worker cache — one persistent REPL per (project_root, paper_id)
+# Worker cache — bounded pool of persistent REPLs per (project_root, paper_id)
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+def _env_int(name: str, default: int) -> int:
+    """Positive int from the environment, falling back to ``default``."""
+    try:
+        value = int(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
 @dataclass
 class _WorkerEntry:
     server: LeanREPLServer
     env_id: int  # warm env after paper-theory loaded
     anchor_used: str  # which anchor file was loaded
     lock: threading.Lock  # serializes _send on this server
+    inflight: int = 0  # callers holding or queued on ``lock``
+    last_used: float = 0.0  # monotonic time of the last release
+
+
+@dataclass
+class _PaperPool:
+    workers: list[_WorkerEntry] = field(default_factory=list)
+    starting: int = 0  # workers being warmed outside the cache lock
+
+    def is_idle(self) -> bool:
+        return self.starting == 0 and all(w.inflight == 0 for w in self.workers)
+
+    def last_used(self) -> float:
+        return max((w.last_used for w in self.workers), default=0.0)
 
 
 class WorkerCache:
-    """Process-wide cache of warm REPL workers, one per (project, paper_id)."""
+    """Process-wide pool of warm REPL workers keyed by (project, paper_id).
+
+    Each key owns up to ``workers_per_paper`` workers. A checkout goes to an
+    idle worker when one exists, otherwise a new worker is warmed while the
+    key is under its quota, otherwise the caller queues on the least-loaded
+    worker. ``max_total_workers`` caps workers across every key; when the cap
+    is hit the least-recently-used idle key is evicted to make room.
+
+    Defaults come from ``DESOL_LVC_WORKERS_PER_PAPER`` (half the cores,
+    capped by the global limit, so other papers keep room) and
+    ``DESOL_LVC_MAX_WORKERS`` (``os.cpu_count()``, never below an explicit
+    per-paper quota). Workers are only spawned under concurrent demand, so a
+    serial sweep still runs on one REPL.
+    """
 
-    def __init__(self) -> None:
-        self._entries: dict[tuple[str, str], _WorkerEntry] = {}
+    def __init__(
+        self,
+        workers_per_paper: Optional[int] = None,
+        max_total_workers: Optional[int] = None,
+    ) -> None:
+        cores = os.cpu_count() or 1
+        explicit_max = max_total_workers or _env_int("DESOL_LVC_MAX_WORKERS", 0)
+        default_per_paper = min(explicit_max or cores, max(1, cores // 2))
+        self.workers_per_paper = max(
+            1, workers_per_paper or _env_int("DESOL_LVC_WORKERS_PER_PAPER", default_per_paper)
+        )
+        self.max_total_workers = explicit_max or max(cores, self.workers_per_paper)
+        self._pools: dict[tuple[str, str], _PaperPool] = {}
+        # Keys whose workers load a fixed anchor instead of a paper anchor
+        # (import-header envs used by :func:`check_lean_source`).
+        self._anchor_overrides: dict[str, str] = {}
         self._cache_lock = threading.Lock()
+        self._cond = threading.Condition(self._cache_lock)
 
     def _anchor_candidates(self, project_root: Path, paper_id: str) -> list[str]:
         """Anchor files to try, in priority order.
@@ -138,6 +239,8 @@ class WorkerCache:
         module is already in the env), and fall back to the generic
         ``Desol/ReplAnchor.lean`` which only loads Mathlib.
         """
+        if paper_id in self._anchor_overrides:
+            return [self._anchor_overrides[paper_id]]
         norm = paper_id.replace(".", "_").replace("-", "_")
         candidates = []
         # Per-paper anchor (uncommon — most setups use the generic anchor)
@@ -170,7 +273,9 @@ class WorkerCache:
         last_err = ""
         for anchor in anchors:
             try:
-                resp = server._send({"path": anchor, "allTactics": False})
+                # Restores a pickled env snapshot when one matches, so a
+                # restarted worker skips re-elaborating the anchor.
+                resp = server.load_anchor(anchor)
             except Exception as exc:  # noqa: BLE001
                 last_err = f"anchor_load_exception:{exc}"
                 continue
@@ -199,36 +304,146 @@ class WorkerCache:
             pass
         raise RuntimeError(f"failed to warm REPL worker for {paper_id}: {last_err}")
 
-    def get(
+    # ── pool bookkeeping (callers hold ``_cache_lock``) ──────────────────────
+
+    def _total_workers(self) -> int:
+        return sum(len(p.workers) + p.starting for p in self._pools.values())
+
+    @staticmethod
+    def _is_dead(entry: _WorkerEntry) -> bool:
+        proc = entry.server._proc
+        return proc is not None and proc.poll() is not None
+
+    def _reap_dead(self, pool: _PaperPool, to_stop: list[_WorkerEntry]) -> None:
+        """Drop idle workers whose subprocess has exited."""
+        for entry in list(pool.workers):
+            if entry.inflight == 0 and self._is_dead(entry):
+                pool.workers.remove(entry)
+                to_stop.append(entry)
+
+    def _reserve_slot(self, key: tuple[str, str], to_stop: list[_WorkerEntry]) -> bool:
+        """Make room for one more worker under the global cap.
+
+        Evicts the least-recently-used idle key (never ``key`` itself) when
+        the cap is reached. Returns False when every other key is busy.
+        """
+        if self._total_workers() < self.max_total_workers:
+            return True
+        idle = [
+            (pool.last_used(), other)
+            for other, pool in self._pools.items()
+            if other != key and pool.workers and pool.is_idle()
+        ]
+        if not idle:
+            return False
+        _, victim = min(idle)
+        to_stop.extend(self._pools.pop(victim).workers)
+        return True
+
+    @staticmethod
+    def _stop_entries(entries: list[_WorkerEntry]) -> None:
+        for entry in entries:
+            try:
+                entry.server.stop()
+            except Exception:
+                pass
+
+    # ── checkout / release ────────────────────────────────────────────────────
+
+    def checkout(
         self,
         project_root: Path,
         paper_id: str,
         startup_timeout: float = 120.0,
     ) -> _WorkerEntry:
+        """Reserve the least-loaded worker for ``(project_root, paper_id)``.
+
+        Every successful checkout must be paired with :meth:`release`. The
+        returned entry may still be busy with another caller; take
+        ``entry.lock`` before talking to ``entry.server``.
+        """
         key = (str(project_root.resolve()), paper_id)
-        with self._cache_lock:
-            entry = self._entries.get(key)
-            if entry is not None:
-                # Health-check: if the subprocess has died, drop and restart.
-                if entry.server._proc is not None and entry.server._proc.poll() is not None:
-                    try:
-                        entry.server.stop()
-                    except Exception:
-                        pass
-                    entry = None
-            if entry is None:
-                entry = self._start_worker(project_root, paper_id, startup_timeout)
-                self._entries[key] = entry
+        deadline = time.monotonic() + startup_timeout
+        to_stop: list[_WorkerEntry] = []
+        try:
+            with self._cond:
+                while True:
+                    pool = self._pools.setdefault(key, _PaperPool())
+                    self._reap_dead(pool, to_stop)
+                    best = min(pool.workers, key=lambda e: e.inflight, default=None)
+                    if best is not None and best.inflight == 0:
+                        best.inflight += 1
+                        return best
+                    if (
+                        len(pool.workers) + pool.starting < self.workers_per_paper
+                        and self._reserve_slot(key, to_stop)
+                    ):
+                        pool.starting += 1
+                        break
+                    if best is not None:
+                        best.inflight += 1
+                        return best
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RuntimeError(
+                            f"worker_pool_exhausted:{self.max_total_workers} workers busy"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            self._stop_entries(to_stop)
+
+        # Warm the new worker outside the lock so other keys keep flowing.
+        try:
+            entry = self._start_worker(project_root, paper_id, startup_timeout)
+        except BaseException:
+            with self._cond:
+                pool.starting -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            pool.starting -= 1
+            entry.inflight += 1
+            pool.workers.append(entry)
+            self._cond.notify_all()
+        return entry
+
+    def release(self, entry: _WorkerEntry) -> None:
+        """Return a worker obtained from :meth:`checkout` to the pool."""
+        with self._cond:
+            entry.inflight = max(0, entry.inflight - 1)
+            entry.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    @contextmanager
+    def acquire(
+        self,
+        project_root: Path,
+        paper_id: str,
+        startup_timeout: float = 120.0,
+    ) -> Iterator[_WorkerEntry]:
+        """Context-manager form of :meth:`checkout` / :meth:`release`."""
+        entry = self.checkout(project_root, paper_id, startup_timeout)
+        try:
+            yield entry
+        finally:
+            self.release(entry)
+
+    def get(
+        self,
+        project_root: Path,
+        paper_id: str,
+        startup_timeout: float = 120.0,
+    ) -> _WorkerEntry:
+        """Return a warm worker for the key without keeping it reserved."""
+        with self.acquire(project_root, paper_id, startup_timeout) as entry:
             return entry
 
     def shutdown_all(self) -> None:
-        with self._cache_lock:
-            for entry in list(self._entries.values()):
-                try:
-                    entry.server.stop()
-                except Exception:
-                    pass
-            self._entries.clear()
+        with self._cond:
+            entries = [w for pool in self._pools.values() for w in pool.workers]
+            self._pools.clear()
+            self._cond.notify_all()
+        self._stop_entries(entries)
 
 
 _global_cache: Optional[WorkerCache] = None
@@ -266,9 +481,10 @@ def _classify_messages(
     Accept rules:
       - body_supplied=True : no error messages AND no `declaration uses sorry`
         warning attached to the candidate.
-      - body_supplied=False (signature-only probe): error messages that ONLY
-        mention `sorry` are tolerated (this is the expected post-state of
-        ``:= by sorry``). Any other error → reject.
+      - body_supplied=False (signature-only probe): the ``:= by sorry``
+        warning is expected and tolerated; any error-severity message →
+        reject, even one whose text mentions ``sorry`` (the cold check
+        rejects every ``error:`` too).
     """
     errs = [m for m in messages if m.get("severity") == "error"]
     warns = [m for m in messages if m.get("severity") == "warning"]
@@ -287,12 +503,43 @@ def _classify_messages(
     # Signature-only probe.
     if not errs:
         return True, ""
-    non_sorry_errs = [
-        e for e in errs if "sorry" not in (e.get("data") or "").lower()
-    ]
-    if not non_sorry_errs:
-        return True, ""
-    return False, f"file_check_fail:{str(non_sorry_errs[0].get('data',''))[-300:]}"
+    return False, f"file_check_fail:{str(errs[0].get('data', ''))[-300:]}"
+
+
+def _check_on_worker(
+    entry: _WorkerEntry,
+    decl_text: str,
+    *,
+    body_supplied: bool,
+    timeout_s: int,
+) -> tuple[bool, str]:
+    """Elaborate ``decl_text`` on a checked-out worker and classify the result."""
+    payload = {"cmd": decl_text, "env": entry.env_id}
+    with entry.lock:
+        # Per-call timeout: temporarily override the worker's default.
+        prior_timeout = entry.server.timeout
+        entry.server.timeout = max(15.0, float(timeout_s))
+        try:
+            resp = entry.server._send(payload)
+        except TimeoutError:
+            # Restart the worker so a partial response doesn't poison
+            # the next call.
+            try:
+                entry.server.restart()
+            except Exception:
+                pass
+            return False, f"file_check_timeout:{timeout_s}s"
+        except Exception as exc:  # noqa: BLE001
+            return False, f"file_check_exception:{exc}"
+        finally:
+            entry.server.timeout = prior_timeout
+
+    if isinstance(resp, LeanError):
+        return False, f"file_check_fail:{resp.error[-300:]}"
+    messages = resp.get("messages") if isinstance(resp, dict) else None
+    if not isinstance(messages, list):
+        messages = []
+    return _classify_messages(messages, body_supplied=body_supplied)
 
 
 def validated_isolated_check(
@@ -333,37 +580,92 @@ def validated_isolated_check(
         cache = _get_global_cache()
 
     try:
-        entry = cache.get(project_root, paper_id)
+        entry = cache.checkout(project_root, paper_id)
     except Exception as exc:  # noqa: BLE001
         return False, f"file_check_worker_unavailable:{exc}"
+    try:
+        return _check_on_worker(
+            entry,
+            decl_text,
+            body_supplied=proof_body is not None,
+            timeout_s=timeout_s,
+        )
+    finally:
+        cache.release(entry)
 
-    payload = {"cmd": decl_text, "env": entry.env_id}
-    # Per-call timeout: temporarily override the worker's default.
-    prior_timeout = entry.server.timeout
-    entry.server.timeout = max(15.0, float(timeout_s))
+
+def validate_candidates_batch(
+    paper_id: str,
+    candidates: Sequence[tuple[str, Optional[str]]],
+    *,
+    project_root: Path,
+    timeout_s: int = 60,
+    stop_on_first_success: bool = False,
+    max_parallel: Optional[int] = None,
+    cache: Optional[WorkerCache] = None,
+) -> Iterator[tuple[int, bool, str]]:
+    """Validate many ``(theorem_decl, proof_body)`` candidates for one paper.
+
+    Candidates are dispatched concurrently over the paper's worker pool and
+    results are yielded as ``(index, ok, error_tail)`` in completion order,
+    where ``index`` is the candidate's position in ``candidates`` and
+    ``(ok, error_tail)`` is exactly what :func:`validated_isolated_check`
+    would return for it.
+
+    Args:
+        paper_id: arxiv id shared by every candidate.
+        candidates: ``(theorem_decl, proof_body)`` pairs; ``proof_body=None``
+            is a signature-only probe.
+        project_root: BDDM project root containing ``lakefile.toml``.
+        timeout_s: per-candidate elaboration timeout in seconds.
+        stop_on_first_success: stop after the first accepted candidate.
+            Candidates not yet dispatched are dropped; ones already running
+            on a worker finish in the background but are not yielded.
+        max_parallel: in-flight candidate cap; defaults to the cache's
+            ``workers_per_paper``.
+        cache: optional explicit cache; defaults to the process-global cache.
+    """
+    items = list(candidates)
+    if not items:
+        return
+    project_root = Path(project_root).resolve()
+    if cache is None:
+        cache = _get_global_cache()
+    parallel = max(1, min(len(items), max_parallel or cache.workers_per_paper))
+
+    def _one(decl: str, body: Optional[str]) -> tuple[bool, str]:
+        return validated_isolated_check(
+            project_root=project_root,
+            paper_id=paper_id,
+            theorem_decl=decl,
+            proof_body=body,
+            timeout_s=timeout_s,
+            cache=cache,
+        )
+
+    pool = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="lvc-batch")
+    pending: dict[Future, int] = {}
+    next_idx = 0
     try:
-        with entry.lock:
-            try:
-                resp = entry.server._send(payload)
-            except TimeoutError:
-                # Restart the worker so a partial response doesn't poison
-                # the next call.
+        # Keep at most ``parallel`` candidates in flight so an early stop
+        # leaves nothing queued behind the worker locks.
+        while pending or next_idx < len(items):
+            while next_idx < len(items) and len(pending) < parallel:
+                decl, body = items[next_idx]
+                pending[pool.submit(_one, decl, body)] = next_idx
+                next_idx += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in sorted(done, key=pending.__getitem__):
+                idx = pending.pop(fut)
                 try:
-                    entry.server.restart()
-                except Exception:
-                    pass
-                return False, f"file_check_timeout:{timeout_s}s"
-            except Exception as exc:  # noqa: BLE001
-                return False, f"file_check_exception:{exc}"
+                    ok, tail = fut.result()
+                except Exception as exc:  # noqa: BLE001
+                    ok, tail = False, f"file_check_exception:{exc}"
+                yield idx, ok, tail
+                if ok and stop_on_first_success:
+                    return
     finally:
-        entry.server.timeout = prior_timeout
-
-    if isinstance(resp, LeanError):
-        return False, f"file_check_fail:{resp.error[-300:]}"
-    messages = resp.get("messages") if isinstance(resp, dict) else None
-    if not isinstance(messages, list):
-        messages = []
-    return _classify_messages(messages, body_supplied=proof_body is not None)
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 def differential_check(
@@ -421,6 +723,7 @@ def differential_check(
         theorem_decl=theorem_decl,
         proof_body=proof_body,
         timeout_s=timeout_s,
+        backend="lake",
     )
     return fast_ok, fast_tail, {
         "agreement": bool(fast_ok) == bool(slow_ok),
@@ -431,6 +734,749 @@ def differential_check(
     }
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Shared validation engine — whole Lean sources on a warm import env
+# ─────────────────────────────────────────────────────────────────────────────
+
+_VALIDATION_BACKENDS = ("auto", "repl", "lake")
+_IMPORT_LINE_RE = re.compile(r"^\s*import\s+\S")
+_ENGINE_LOCK = threading.Lock()
+_ENGINE_STATS: dict[str, int] = {
+    "warm": 0, "cold": 0, "fallback": 0, "differential": 0, "divergent": 0,
+    "checkpoint_reused": 0, "checkpoint_elaborated": 0, "checkpoint_unparsed": 0,
+    "suffix_reused": 0,
+}
+_REPL_USABLE: dict[tuple[str, str], bool] = {}
+
+
+class _WarmTimeout(Exception):
+    """The warm REPL did not answer within the caller's timeout."""
+
+
+def validation_backend(backend: Optional[str] = None) -> str:
+    """Resolve the source-validation backend.
+
+    ``backend`` overrides ``DESOL_VALIDATION_BACKEND`` (default ``auto``).
+    ``lake`` always shells out to ``lake env lean``; ``repl`` uses a warm REPL
+    whenever one can be started; ``auto`` does the same but only when the
+    REPL binary is already built, so hosts without it never pay a probe.
+    """
+    value = (backend or os.environ.get("DESOL_VALIDATION_BACKEND", "") or "auto").strip().lower()
+    return value if value in _VALIDATION_BACKENDS else "auto"
+
+
+def differential_rate() -> float:
+    """Fraction of warm checks re-run on the cold path (``DESOL_VALIDATION_DIFFERENTIAL_RATE``)."""
+    try:
+        rate = float(os.environ.get("DESOL_VALIDATION_DIFFERENTIAL_RATE", "") or 0.02)
+    except ValueError:
+        return 0.02
+    return min(1.0, max(0.0, rate))
+
+
+def validation_engine_stats() -> dict[str, int]:
+    """Counters for :func:`check_lean_source` routing in this process."""
+    with _ENGINE_LOCK:
+        return dict(_ENGINE_STATS)
+
+
+def _bump(counter: str) -> None:
+    with _ENGINE_LOCK:
+        _ENGINE_STATS[counter] += 1
+
+
+def _repl_usable(project_root: Path, backend: str) -> bool:
+    if backend == "lake":
+        return False
+    key = (str(project_root), backend)
+    if key not in _REPL_USABLE:
+        if backend == "auto":
+            binary = project_root / ".lake" / "packages" / "repl" / ".lake" / "build" / "bin" / "repl"
+            _REPL_USABLE[key] = binary.exists()
+        else:
+            from lean_repl_server import repl_server_available
+
+            _REPL_USABLE[key] = repl_server_available(project_root)
+    return _REPL_USABLE[key]
+
+
+def split_import_header(lean_src: str) -> Optional[tuple[list[str], str, int]]:
+    """Split ``lean_src`` into ``(import lines, remainder, header line count)``.
+
+    The header is the leading run of ``import`` lines, blank lines and line
+    comments. Returns None when an ``import`` appears after other commands —
+    that cannot be elaborated in a derived env, so the cold path reports it.
+    """
+    lines = lean_src.splitlines(keepends=True)
+    end = 0
+    for i, ln in enumerate(lines):
+        if _IMPORT_LINE_RE.match(ln):
+            end = i + 1
+        elif ln.strip() and not ln.strip().startswith("--"):
+            break
+    if any(_IMPORT_LINE_RE.match(ln) for ln in lines[end:]):
+        return None
+    imports = [ln.strip() for ln in lines[:end] if _IMPORT_LINE_RE.match(ln)]
+    return imports, "".join(lines[end:]), end
+
+
+def _imports_anchor(project_root: Path, imports: list[str]) -> tuple[str, str]:
+    """Return ``(pool key, anchor path)`` for an import header.
+
+    The anchor is a file holding just the header, so workers load it through
+    :meth:`LeanREPLServer.load_anchor` and share its env snapshot.
+    """
+    text = "".join(f"{ln}\n" for ln in imports)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    rel = Path(".lake") / "desol_anchors" / f"Imports_{digest}.lean"
+    path = project_root / rel
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    return f"imports:{digest}", str(rel)
+
+
+def _discard_worker(entry: _WorkerEntry) -> None:
+    """Kill a worker whose env can no longer be trusted; the pool reaps it."""
+    proc = entry.server._proc
+    if proc is None:
+        return
+    try:
+        proc.kill()
+        proc.wait(timeout=5)
+    except Exception:
+        pass
+
+
+def _checkout_for_imports(
+    project_root: Path,
+    imports: list[str],
+    cache: WorkerCache,
+) -> Optional[tuple[str, _WorkerEntry]]:
+    """Check out a worker warmed with ``imports``; None when none can start."""
+    try:
+        key, anchor = _imports_anchor(project_root, imports)
+        cache._anchor_overrides[key] = anchor
+        return key, cache.checkout(project_root, key)
+    except Exception:
+        return None
+
+
+def _send_warm(entry: _WorkerEntry, cmd: str, env: int, timeout_s: float) -> Optional[dict]:
+    """Send one command on a worker whose ``lock`` the caller holds.
+
+    Returns the REPL response, or None when the verdict is unknown (the
+    worker is discarded). Raises :class:`_WarmTimeout` on timeout.
+    """
+    prior_timeout = entry.server.timeout
+    entry.server.timeout = max(15.0, float(timeout_s))
+    try:
+        resp = entry.server._send({"cmd": cmd, "env": env})
+    except TimeoutError:
+        _discard_worker(entry)
+        raise _WarmTimeout()
+    except Exception:
+        _discard_worker(entry)
+        return None
+    finally:
+        entry.server.timeout = prior_timeout
+    if not isinstance(resp, dict) or "message" in resp:
+        # REPL-level failure (e.g. the worker restarted and lost its env);
+        # the verdict is unknown, not a rejection.
+        _discard_worker(entry)
+        return None
+    return resp
+
+
+def _shift_messages(messages: list[dict], offset: int) -> list[dict]:
+    """Copy ``messages`` with their line numbers moved down by ``offset``."""
+    shifted = []
+    for msg in messages:
+        msg = dict(msg)
+        for pos_key in ("pos", "endPos"):
+            pos = msg.get(pos_key)
+            if isinstance(pos, dict) and "line" in pos:
+                msg[pos_key] = {**pos, "line": int(pos["line"]) + offset}
+        shifted.append(msg)
+    return shifted
+
+
+def _elaborate_warm(
+    lean_src: str,
+    *,
+    project_root: Path,
+    timeout_s: int,
+    cache: WorkerCache,
+) -> Optional[list[dict]]:
+    """Elaborate ``lean_src`` on a warm env for its import header.
+
+    Returns the REPL messages with line numbers mapped back to ``lean_src``,
+    or None when no warm env is available (callers fall back to lake).
+    Raises :class:`_WarmTimeout` when elaboration itself timed out.
+    """
+    split = split_import_header(lean_src)
+    if split is None:
+        return None
+    imports, rest, offset = split
+    checked_out = _checkout_for_imports(project_root, imports, cache)
+    if checked_out is None:
+        return None
+    _, entry = checked_out
+    try:
+        with entry.lock:
+            resp = _send_warm(entry, rest, entry.env_id, timeout_s)
+    finally:
+        cache.release(entry)
+    if resp is None:
+        return None
+    return _shift_messages(resp.get("messages") or [], offset)
+
+
+def format_messages(messages: list[dict], path: str = "<repl>") -> str:
+    """Render REPL messages the way ``lake env lean`` prints diagnostics."""
+    out = []
+    for msg in messages:
+        pos = msg.get("pos") or {}
+        out.append(
+            f"{path}:{pos.get('line', 0)}:{pos.get('column', 0)}: "
+            f"{msg.get('severity', 'info')}: {msg.get('data', '')}"
+        )
+    return "\n".join(out)
+
+
+def _record_differential(
+    project_root: Path,
+    caller: str,
+    lean_src: str,
+    warm: tuple[bool, str],
+    cold: tuple[bool, str],
+) -> None:
+    agreement = bool(warm[0]) == bool(cold[0])
+    _bump("differential")
+    if not agreement:
+        _bump("divergent")
+        print(
+            f"[validation][DIVERGENCE] caller={caller} warm_ok={warm[0]} cold_ok={cold[0]} "
+            f"src={lean_src[-120:]!r}",
+            file=sys.stderr,
+            flush=True,
+        )
+    log = Path(
+        os.environ.get("DESOL_VALIDATION_DIFFERENTIAL_LOG", "")
+        or project_root / "output" / "validation_differential.jsonl"
+    )
+    row = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "caller": caller,
+        "src_sha256": hashlib.sha256(lean_src.encode("utf-8")).hexdigest(),
+        "agreement": agreement,
+        "warm_ok": bool(warm[0]),
+        "cold_ok": bool(cold[0]),
+        "warm_tail": str(warm[1])[-300:],
+        "cold_tail": str(cold[1])[-300:],
+    }
+    try:
+        log.parent.mkdir(parents=True, exist_ok=True)
+        with _ENGINE_LOCK, log.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
+
+def check_lean_source(
+    lean_src: str,
+    *,
+    project_root: Path,
+    classify: Callable[[list[dict]], tuple[bool, str]],
+    cold_check: Callable[[], tuple[bool, str]],
+    timeout_s: int = 60,
+    timeout_result: Optional[tuple[bool, str]] = None,
+    backend: Optional[str] = None,
+    caller: str = "",
+    cache: Optional[WorkerCache] = None,
+) -> tuple[bool, str]:
+    """Validate a complete Lean source, on a warm REPL when possible.
+
+    This is the one engine behind ``_run_isolated_file_check``,
+    ``independent_lean_verify`` and the translator's ``_run_lean``. Each
+    caller keeps its accept/reject rules: ``classify`` maps REPL messages to
+    ``(ok, detail)`` exactly as the caller reads ``lake env lean`` output, and
+    ``cold_check`` is the caller's original ``lake env lean`` path.
+
+    The source is split into its import header and the rest; the rest is
+    elaborated on a pooled worker whose env already holds that header, so
+    only the first check per header pays the Mathlib import. Anything the
+    warm path cannot decide (no REPL, worker start failure, REPL protocol
+    error, imports after the header) falls back to ``cold_check``. A warm
+    timeout returns ``timeout_result``.
+
+    A ``differential_rate()`` fraction of warm verdicts is re-checked cold
+    and logged to ``output/validation_differential.jsonl``; on disagreement
+    the cold verdict wins.
+    """
+    project_root = Path(project_root).resolve()
+    chosen = validation_backend(backend)
+    if not _repl_usable(project_root, chosen):
+        _bump("cold")
+        return cold_check()
+    try:
+        messages = _elaborate_warm(
+            lean_src,
+            project_root=project_root,
+            timeout_s=timeout_s,
+            cache=cache or _get_global_cache(),
+        )
+    except _WarmTimeout:
+        _bump("warm")
+        return timeout_result or (False, f"file_check_timeout:{timeout_s}s")
+    if messages is None:
+        _bump("fallback")
+        return cold_check()
+    _bump("warm")
+    warm = classify(messages)
+    if random.random() < differential_rate():
+        cold = cold_check()
+        _record_differential(project_root, caller, lean_src, warm, cold)
+        if bool(cold[0]) != bool(warm[0]):
+            return cold
+    return warm
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Declaration-prefix checkpoints — in-file candidate checks
+# ─────────────────────────────────────────────────────────────────────────────
+
+_COMMAND_START_RE = re.compile(
+    r"^(?:/-|@\[|#[a-z_]+\b|(?:(?:noncomputable|private|protected|partial|unsafe|scoped|local)\s+)*"
+    r"(?:theorem|lemma|def|abbrev|axiom|instance|structure|class|inductive|example|opaque|"
+    r"namespace|section|end|open|variable|universe|set_option|attribute|notation|infixl?|infixr|"
+    r"prefix|postfix|macro|macro_rules|syntax|elab|export|mutual|deriving)\b)"
+)
+_ATTRIBUTE_ONLY_RE = re.compile(r"^@\[[^\]]*\]\s*$")
+# `open Foo in` / `set_option x y in` scope over the command that follows.
+_IN_MODIFIER_RE = re.compile(r"^(?:open|set_option)\b.*\bin\s*$")
+_MUTUAL_END_RE = re.compile(r"^end\s*(?:--.*)?$")
+# Parser errors: the chunk is not a complete command on its own.
+_PARSE_ERROR_RE = re.compile(r"^(?:unexpected|expected)\b")
+_CHUNK_NAME_RE = re.compile(
+    r"^(?:@\[[^\]]*\]\s*)?(?:(?:noncomputable|private|protected|partial|unsafe)\s+)*"
+    r"(?:theorem|lemma|def|abbrev|axiom|instance|structure|class|inductive|opaque)\s+"
+    r"([A-Za-z_][A-Za-z0-9_'.]*)",
+    re.MULTILINE,
+)
+_CHECKPOINT_LOCK = threading.Lock()
+# (server id, pid, prefix chain hash) -> env after that prefix on that worker.
+_CHECKPOINTS: "OrderedDict[tuple[int, Optional[int], str], _Checkpoint]" = OrderedDict()
+# (import key, last chunk hash) -> recent whole-file records ending that way.
+_FILE_RECORDS: "OrderedDict[tuple[str, str], list[_FileRecord]]" = OrderedDict()
+_FILE_RECORDS_PER_KEY = 4
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_'.]*")
+
+
+@dataclass(frozen=True)
+class DeclChunk:
+    """One top-level command of a Lean file (doc comment and attributes included)."""
+
+    text: str
+    line: int  # 1-based line of the chunk's first line in the file
+    name: Optional[str]  # declared name, when the command declares one
+
+
+@dataclass
+class _Checkpoint:
+    env: int
+    messages: list[dict]  # positions relative to the chunk
+
+
+@dataclass(frozen=True)
+class _FileRecord:
+    """Per-chunk messages of one elaborated file, for suffix reuse."""
+
+    chunks: tuple[DeclChunk, ...]
+    digests: tuple[str, ...]
+    chains: tuple[str, ...]  # chains[i]: worker-independent hash of chunks[:i]
+    messages: tuple[list[dict], ...]
+
+
+def split_declarations(body: str, first_line: int = 1) -> list[DeclChunk]:
+    """Split the post-header part of a Lean file into top-level commands.
+
+    A command starts at a column-0 keyword (``theorem``, ``namespace``,
+    ``open``, ``@[...]``, a comment, ...) outside a block comment. Leading
+    doc comments, attribute lines, ``open … in`` / ``set_option … in``
+    modifiers and blank lines stay with the command that follows them, so
+    each chunk elaborates on its own. A column-0 comment only starts a
+    chunk when a command follows it (otherwise it sits inside a proof), and
+    a ``mutual … end`` block is one chunk.
+    """
+    chunks: list[DeclChunk] = []
+    cur: list[str] = []
+    cur_line = first_line
+    has_code = False
+    depth = 0
+    in_mutual = False
+    # Column-0 comment lines after code: they open the next chunk if a
+    # command follows them, else they belong to the current one.
+    pending: list[str] = []
+
+    def _flush() -> None:
+        text = "".join(cur)
+        m = _CHUNK_NAME_RE.search(text)
+        chunks.append(DeclChunk(text=text, line=cur_line, name=m.group(1) if m else None))
+
+    for i, ln in enumerate(body.splitlines(keepends=True)):
+        stripped = ln.strip()
+        opens_comment = depth == 0 and ln.startswith("/-")
+        if pending or (opens_comment and has_code and not in_mutual):
+            if depth > 0 or opens_comment or not stripped or stripped.startswith("--"):
+                pending.append(ln)
+                depth = max(0, depth + ln.count("/-") - ln.count("-/"))
+                continue
+            if _COMMAND_START_RE.match(ln):
+                _flush()
+                cur, has_code = [], False
+                cur_line = first_line + i - len(pending)
+            cur.extend(pending)
+            pending = []
+        elif depth == 0 and not in_mutual and has_code and _COMMAND_START_RE.match(ln):
+            _flush()
+            cur, has_code = [], False
+        if not cur:
+            cur_line = first_line + i
+        cur.append(ln)
+        if depth == 0 and in_mutual:
+            in_mutual = not _MUTUAL_END_RE.match(ln)
+        elif depth == 0 and re.match(r"^mutual\b", ln):
+            in_mutual = True
+        if (
+            depth == 0
+            and stripped
+            and not stripped.startswith(("--", "/-"))
+            and not _ATTRIBUTE_ONLY_RE.match(ln)
+            and not _IN_MODIFIER_RE.match(ln)
+        ):
+            has_code = True
+        depth = max(0, depth + ln.count("/-") - ln.count("-/"))
+    cur.extend(pending)
+    if cur:
+        _flush()
+    return chunks
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _checkpoint_limit() -> int:
+    return _env_int("DESOL_DECL_CHECKPOINTS_MAX", 4096)
+
+
+def _remember(store: OrderedDict, key, value) -> None:
+    """LRU insert; caller holds ``_CHECKPOINT_LOCK``."""
+    store[key] = value
+    store.move_to_end(key)
+    while len(store) > _checkpoint_limit():
+        store.popitem(last=False)
+
+
+def _prefix_chains(key: str, digests: Sequence[str]) -> list[str]:
+    """Hash chain over ``digests``: element ``i`` identifies the first ``i`` chunks."""
+    chains = [_digest(key)]
+    for d in digests:
+        chains.append(_digest(f"{chains[-1]}\0{d}"))
+    return chains
+
+
+def _theorem_header(chunk: DeclChunk) -> Optional[str]:
+    """Attributes and statement of a ``theorem``/``lemma`` chunk, proof excluded."""
+    m = _CHUNK_NAME_RE.search(chunk.text)
+    if m is None or not re.search(r"\b(?:theorem|lemma)\s", m.group(0)):
+        return None
+    head, sep, _ = chunk.text[m.start():].partition(":=")
+    return head.strip() if sep else None
+
+
+def _suffix_unaffected(old_prefix: Sequence[DeclChunk], new_prefix: Sequence[DeclChunk],
+                       suffix: Sequence[DeclChunk]) -> bool:
+    """Whether ``suffix`` elaborates the same after ``new_prefix`` as after ``old_prefix``.
+
+    Chunks present in only one of the prefixes must be proof-only edits
+    (same theorem name, attributes and statement on both sides) or plain
+    attribute-free theorems whose name the suffix neither declares nor
+    mentions. Anything else (a changed ``def``, ``open``, ``@[simp]`` lemma
+    or statement the suffix may use, or a new name that clashes with a
+    suffix declaration) needs the suffix elaborated on the new env.
+    """
+    unmatched: dict[str, list[DeclChunk]] = {}
+    for c in new_prefix:
+        unmatched.setdefault(_digest(c.text), []).append(c)
+    removed: list[DeclChunk] = []
+    for c in old_prefix:
+        same = unmatched.get(_digest(c.text))
+        if same:
+            same.pop()
+        else:
+            removed.append(c)
+    added = [c for same in unmatched.values() for c in same]
+    old_by_name = {c.name: c for c in removed if c.name}
+    changed: list[DeclChunk] = []
+    for c in added:
+        old = old_by_name.get(c.name) if c.name else None
+        header = _theorem_header(c)
+        if old is not None and header is not None and _theorem_header(old) == header:
+            removed.remove(old)  # proof-only edit
+            del old_by_name[c.name]
+            continue
+        changed.append(c)
+    changed.extend(removed)
+    if not changed:
+        return True
+    mentioned: set[str] = set()
+    for c in suffix:
+        for tok in _IDENT_RE.findall(c.text):
+            mentioned.update(tok.split("."))
+    for c in changed:
+        header = _theorem_header(c)
+        if header is None or header.startswith("@[") or not c.name:
+            return False
+        if c.name.rsplit(".", 1)[-1] in mentioned:
+            return False
+    return True
+
+
+def _recorded_suffix(key: str, chunks: Sequence[DeclChunk], digests: Sequence[str],
+                     chains: Sequence[str], focus_at: int) -> Optional[list[list[dict]]]:
+    """Messages recorded for ``chunks[focus_at + 1:]`` that still apply, or None.
+
+    A record matches when its trailing chunks equal this suffix; the chunks
+    before them are the unpatched prefix it was elaborated after. The
+    messages are reused as-is when that prefix chain equals the new one, or
+    when :func:`_suffix_unaffected` shows the edit cannot change them.
+    """
+    suffix = list(chunks[focus_at + 1:])
+    n = len(suffix)
+    with _CHECKPOINT_LOCK:
+        records = list(_FILE_RECORDS.get((key, digests[-1]), ()))
+    for record in reversed(records):
+        cut = len(record.chunks) - n
+        if cut < 0 or tuple(record.digests[cut:]) != tuple(digests[focus_at + 1:]):
+            continue
+        if record.chains[cut] == chains[focus_at + 1] or _suffix_unaffected(
+            record.chunks[:cut], chunks[: focus_at + 1], suffix,
+        ):
+            return list(record.messages[cut:])
+    return None
+
+
+def _record_file(key: str, chunks: Sequence[DeclChunk], digests: Sequence[str],
+                 chains: Sequence[str], per_chunk: Sequence[list[dict]]) -> None:
+    record = _FileRecord(tuple(chunks), tuple(digests), tuple(chains), tuple(per_chunk))
+    with _CHECKPOINT_LOCK:
+        bucket = [r for r in _FILE_RECORDS.get((key, digests[-1]), ()) if r.chains[-1] != chains[-1]]
+        bucket.append(record)
+        _remember(_FILE_RECORDS, (key, digests[-1]), bucket[-_FILE_RECORDS_PER_KEY:])
+
+
+def _worker_identity(entry: _WorkerEntry) -> tuple[int, Optional[int]]:
+    return id(entry.server), getattr(entry.server._proc, "pid", None)
+
+
+def _forget_worker(worker: tuple[int, Optional[int]]) -> None:
+    with _CHECKPOINT_LOCK:
+        for key in [k for k in _CHECKPOINTS if k[:2] == worker]:
+            del _CHECKPOINTS[key]
+
+
+def _focus_index(chunks: list[DeclChunk], focus: Optional[str]) -> int:
+    """Index of the chunk declaring ``focus`` (last chunk when absent)."""
+    if focus:
+        short = focus.rsplit(".", 1)[-1]
+        for i, chunk in enumerate(chunks):
+            if chunk.name and (chunk.name == focus or chunk.name.rsplit(".", 1)[-1] == short):
+                return i
+    return len(chunks) - 1
+
+
+def _elaborate_with_checkpoints(
+    lean_src: str,
+    *,
+    project_root: Path,
+    focus: Optional[str],
+    timeout_s: int,
+    cache: WorkerCache,
+) -> Optional[list[dict]]:
+    """Whole-file messages for ``lean_src``, elaborating only what changed.
+
+    Every prefix of the file (chunks ``0..i``) is identified by a hash chain
+    over the chunk texts, and the worker env after it is kept. Chunks up to
+    and including the ``focus`` declaration are elaborated from the longest
+    prefix already checkpointed, so a patched body or inserted aux lemma
+    costs only those declarations; an edit earlier in the file changes every
+    later chain hash and re-elaborates from there. Chunks after the focus
+    reuse the messages of an earlier file with the same trailing chunks
+    when its prefix was identical or differs only in ways the suffix cannot
+    observe (see :func:`_suffix_unaffected`); otherwise they are elaborated
+    on the new env too.
+
+    Returns None when no warm env is available or a chunk does not parse on
+    its own (the caller then runs the cold path); raises :class:`_WarmTimeout`.
+    """
+    split = split_import_header(lean_src)
+    if split is None:
+        return None
+    imports, rest, offset = split
+    chunks = split_declarations(rest, first_line=offset + 1)
+    if not chunks:
+        return []
+    focus_at = _focus_index(chunks, focus)
+    checked_out = _checkout_for_imports(project_root, imports, cache)
+    if checked_out is None:
+        return None
+    key, entry = checked_out
+    digests = [_digest(c.text) for c in chunks]
+    chains = _prefix_chains(key, digests)
+    deadline = time.monotonic() + max(1, timeout_s)
+    per_chunk: list[list[dict]] = []
+    try:
+        with entry.lock:
+            worker = _worker_identity(entry)
+            chain = _digest(f"{key}\0{entry.env_id}")
+            env = entry.env_id
+
+            def _advance(chunk: DeclChunk) -> bool:
+                nonlocal chain, env
+                chain = _digest(f"{chain}\0{chunk.text}")
+                with _CHECKPOINT_LOCK:
+                    checkpoint = _CHECKPOINTS.get((*worker, chain))
+                    if checkpoint is not None:
+                        _CHECKPOINTS.move_to_end((*worker, chain))
+                if checkpoint is not None:
+                    _bump("checkpoint_reused")
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise _WarmTimeout()
+                    try:
+                        resp = _send_warm(entry, chunk.text, env, remaining)
+                    except _WarmTimeout:
+                        _forget_worker(worker)
+                        raise
+                    if resp is None or "env" not in resp:
+                        _forget_worker(worker)
+                        return False
+                    if any(
+                        m.get("severity") == "error" and _PARSE_ERROR_RE.match(str(m.get("data", "")))
+                        for m in resp.get("messages") or []
+                    ):
+                        # The split cut a command apart (or the file does not
+                        # parse); only the whole file gives lake's answer.
+                        _bump("checkpoint_unparsed")
+                        return False
+                    _bump("checkpoint_elaborated")
+                    checkpoint = _Checkpoint(env=int(resp["env"]), messages=list(resp.get("messages") or []))
+                    with _CHECKPOINT_LOCK:
+                        _remember(_CHECKPOINTS, (*worker, chain), checkpoint)
+                env = checkpoint.env
+                per_chunk.append(checkpoint.messages)
+                return True
+
+            for chunk in chunks[: focus_at + 1]:
+                if not _advance(chunk):
+                    return None
+            recorded = None
+            if focus_at + 1 < len(chunks):
+                recorded = _recorded_suffix(key, chunks, digests, chains, focus_at)
+            if recorded is not None:
+                _bump("suffix_reused")
+                per_chunk.extend(recorded)
+            else:
+                for chunk in chunks[focus_at + 1:]:
+                    if not _advance(chunk):
+                        return None
+    finally:
+        cache.release(entry)
+    _record_file(key, chunks, digests, chains, per_chunk)
+    messages: list[dict] = []
+    for chunk, msgs in zip(chunks, per_chunk):
+        messages.extend(_shift_messages(msgs, chunk.line - 1))
+    return messages
+
+
+def run_lean_file(
+    lean_file: Path,
+    *,
+    project_root: Path,
+    focus: Optional[str] = None,
+    timeout_s: int = 60,
+    backend: Optional[str] = None,
+    caller: str = "",
+    cache: Optional[WorkerCache] = None,
+) -> subprocess.CompletedProcess:
+    """``lake env lean <lean_file>``, answered from declaration checkpoints.
+
+    Drop-in for the ``subprocess.run`` calls that re-check a whole paper file
+    after patching one theorem: the result carries lake-formatted diagnostics
+    (``<path>:<line>:<col>: <severity>: <msg>``) in ``stdout`` and
+    ``returncode`` 1 when any error was reported, so error counting and
+    ``declaration uses 'sorry'`` line checks work unchanged. ``focus`` names
+    the patched theorem; only the declarations up to it that changed since
+    the last call are elaborated. A timeout raises
+    ``subprocess.TimeoutExpired``, as ``subprocess.run`` would.
+
+    Falls back to ``lake env lean`` under the same backend rules and
+    differential sampling as :func:`check_lean_source`.
+    """
+    project_root = Path(project_root).resolve()
+    cmd = ["lake", "env", "lean", str(lean_file)]
+
+    def _cold() -> subprocess.CompletedProcess:
+        return subprocess.run(
+            cmd, cwd=str(project_root), capture_output=True, text=True, timeout=timeout_s,
+        )
+
+    if not _repl_usable(project_root, validation_backend(backend)):
+        _bump("cold")
+        return _cold()
+    try:
+        lean_src = Path(lean_file).read_text(encoding="utf-8")
+    except OSError:
+        _bump("fallback")
+        return _cold()
+    try:
+        messages = _elaborate_with_checkpoints(
+            lean_src,
+            project_root=project_root,
+            focus=focus,
+            timeout_s=timeout_s,
+            cache=cache or _get_global_cache(),
+        )
+    except _WarmTimeout:
+        _bump("warm")
+        raise subprocess.TimeoutExpired(cmd, timeout_s)
+    if messages is None:
+        _bump("fallback")
+        return _cold()
+    _bump("warm")
+    failed = any(m.get("severity") == "error" for m in messages)
+    out = format_messages(messages, str(lean_file))
+    warm = subprocess.CompletedProcess(cmd, 1 if failed else 0, stdout=out + "\n" if out else "", stderr="")
+    if random.random() < differential_rate():
+        try:
+            cold = _cold()
+        except subprocess.TimeoutExpired:
+            return warm
+        cold_out = (cold.stdout or "") + (cold.stderr or "")
+        _record_differential(
+            project_root, caller or "run_lean_file", lean_src,
+            (warm.returncode == 0, out), (cold.returncode == 0, cold_out),
+        )
+        if (cold.returncode == 0) != (warm.returncode == 0):
+            return cold
+    return warm
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CLI smoke test (manual): `python -m lake_validation_cache <paper_id> <decl>`
 # ─────────────────────────────────────────────────────────────────────────────
@@ -464,6 +1510,7 @@ def _main() -> int:
             source_file=src,
             theorem_decl=args.theorem_decl,
             proof_body=args.proof_body,
+            backend="lake",
         )
         slow_total += time.time() - t0
     slow_avg = slow_total / max(1, args.iterations)
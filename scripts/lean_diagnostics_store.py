@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""Content-addressed store of whole-file Lean diagnostics.
+
+Baseline capture in `sweep_lemma_factor_v2` (error count and error tail),
+the FP-integrity audit's `collect_lake_error_lines` and
+`ledger_from_closed_lean` all elaborate an untouched `output/<paper>.lean`.
+Across a campaign the same bytes were elaborated again for every row and
+every pass. This module runs Lean once per distinct input and keeps the
+result in SQLite (`output/lean_diagnostics.sqlite`, or
+`DESOL_LEAN_DIAGNOSTICS_DB`), keyed by
+
+  * the sha256 of the file,
+  * the sha256 of `lake-manifest.json` and the `lean-toolchain` string,
+  * the sha256 of every project module the file imports, directly or
+    through other project modules (e.g. `Desol/PaperTheory/Paper_<id>.lean`
+    and what it imports), so rebuilding a paper theory invalidates the
+    files that depend on it.
+
+Each record keeps the lake-formatted output and the parsed messages
+(severity, line, column, text and the declaration the line belongs to).
+Records are always filled from a cold `lake env lean` run (through
+`lake_validation_cache.run_lean_file` with ``backend="lake"``): the audit
+reads them as integrity verdicts, so a warm-REPL result is never stored.
+Timeouts and missing `lake` are not cached. :func:`count_errors` is the one
+error counter for lake output, shared by baseline and candidate checks.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from lake_validation_cache import run_lean_file, split_declarations  # noqa: E402
+
+
+DEFAULT_DB_NAME = Path("output") / "lean_diagnostics.sqlite"
+
+_MESSAGE_RE = re.compile(
+    r"^(?P<path>.+?):(?P<line>\d+):(?P<col>\d+):\s*(?P<severity>error|warning|info):\s?(?P<text>.*)$"
+)
+_IMPORT_RE = re.compile(r"^\s*import\s+([A-Za-z0-9_.]+)", re.MULTILINE)
+
+_STORES: dict[str, "DiagnosticsStore"] = {}
+_STORES_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0}
+
+
+@dataclass(frozen=True)
+class LeanMessage:
+    severity: str
+    line: int
+    col: int
+    text: str
+    decl: Optional[str] = None  # declaration whose source range holds `line`
+
+
+@dataclass
+class FileDiagnostics:
+    returncode: int
+    output: str  # lake-formatted stdout + stderr
+    messages: list[LeanMessage] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def errors(self) -> list[LeanMessage]:
+        return [m for m in self.messages if m.severity == "error"]
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+    def error_lines(self) -> dict[int, str]:
+        """``{line: first line of the first error reported there}``."""
+        out: dict[int, str] = {}
+        for m in self.errors:
+            out.setdefault(m.line, (m.text.splitlines() or [""])[0].strip())
+        return out
+
+
+# ── keys ─────────────────────────────────────────────────────────────────────
+
+
+def _sha256_file(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return "-"
+
+
+def _project_import_closure(lean_src: str, project_root: Path) -> list[tuple[str, str]]:
+    """``(module, source sha)`` for project modules reachable from ``lean_src``'s imports."""
+    found: dict[str, str] = {}
+    pending = list(_IMPORT_RE.findall(lean_src))
+    while pending:
+        module = pending.pop()
+        if module in found:
+            continue
+        try:
+            src = (project_root / (module.replace(".", "/") + ".lean")).read_bytes()
+        except OSError:
+            continue  # not a project module (Mathlib, Std, ...)
+        found[module] = hashlib.sha256(src).hexdigest()
+        pending.extend(_IMPORT_RE.findall(src.decode("utf-8", errors="replace")))
+    return sorted(found.items())
+
+
+def diagnostics_key(lean_src: str, project_root: Path) -> tuple[str, str, str, str]:
+    """``(file sha, manifest sha, toolchain, project-imports sha)`` for a source."""
+    project_root = Path(project_root)
+    try:
+        toolchain = (project_root / "lean-toolchain").read_text(encoding="utf-8").strip()
+    except OSError:
+        toolchain = "-"
+    deps = hashlib.sha256()
+    for module, digest in _project_import_closure(lean_src, project_root):
+        deps.update(module.encode("utf-8") + b"\0" + digest.encode("ascii"))
+    return (
+        hashlib.sha256(lean_src.encode("utf-8")).hexdigest(),
+        _sha256_file(project_root / "lake-manifest.json"),
+        toolchain,
+        deps.hexdigest(),
+    )
+
+
+# ── parsing ──────────────────────────────────────────────────────────────────
+
+
+def _declaration_ranges(lean_src: str) -> list[tuple[int, int, Optional[str]]]:
+    ranges = []
+    for chunk in split_declarations(lean_src):
+        ranges.append((chunk.line, chunk.line + len(chunk.text.splitlines()) - 1, chunk.name))
+    return ranges
+
+
+def parse_lean_output(output: str, lean_src: str = "") -> list[LeanMessage]:
+    """Parse lake-formatted diagnostics; continuation lines join their message."""
+    ranges = _declaration_ranges(lean_src) if lean_src else []
+    parsed: list[dict[str, Any]] = []
+    for raw in output.splitlines():
+        m = _MESSAGE_RE.match(raw)
+        if m:
+            parsed.append({
+                "severity": m.group("severity"),
+                "line": int(m.group("line")),
+                "col": int(m.group("col")),
+                "text": m.group("text"),
+            })
+        elif parsed and raw.strip():
+            parsed[-1]["text"] += "\n" + raw
+    messages = []
+    for p in parsed:
+        decl = next((name for lo, hi, name in ranges if lo <= p["line"] <= hi), None)
+        messages.append(LeanMessage(decl=decl, **p))
+    return messages
+
+
+def count_errors(output: str) -> int:
+    """Number of ``error:`` diagnostics in lake-formatted ``output``."""
+    return sum(1 for m in parse_lean_output(output) if m.severity == "error")
+
+
+# ── store ────────────────────────────────────────────────────────────────────
+
+
+class DiagnosticsStore:
+    """SQLite table of :class:`FileDiagnostics` by :func:`diagnostics_key`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._con: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is not None:
+            return self._con
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_diagnostics (
+                file_sha TEXT NOT NULL,
+                manifest_sha TEXT NOT NULL,
+                toolchain TEXT NOT NULL,
+                imports_sha TEXT NOT NULL,
+                path TEXT NOT NULL,
+                returncode INTEGER NOT NULL,
+                output BLOB NOT NULL,
+                messages TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (file_sha, manifest_sha, toolchain, imports_sha)
+            )
+            """
+        )
+        con.commit()
+        self._con = con
+        return con
+
+    def get(self, key: tuple[str, str, str, str], path: str) -> Optional[FileDiagnostics]:
+        if self._con is None and not self.path.exists():
+            return None
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT path, returncode, output, messages FROM file_diagnostics "
+                    "WHERE file_sha = ? AND manifest_sha = ? AND toolchain = ? AND imports_sha = ?",
+                    key,
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None:
+            return None
+        stored_path, returncode, blob, messages = row
+        try:
+            output = zlib.decompress(blob).decode("utf-8")
+            parsed = [LeanMessage(**m) for m in json.loads(messages)]
+        except (zlib.error, UnicodeDecodeError, ValueError, TypeError):
+            return None
+        if stored_path != path:
+            # Same bytes checked under another path: report the caller's.
+            output = output.replace(f"{stored_path}:", f"{path}:")
+        return FileDiagnostics(returncode=int(returncode), output=output, messages=parsed, cached=True)
+
+    def put(self, key: tuple[str, str, str, str], path: str, diag: FileDiagnostics) -> None:
+        payload = json.dumps([asdict(m) for m in diag.messages], ensure_ascii=False)
+        with self._lock:
+            try:
+                con = self._connect()
+                con.execute(
+                    "INSERT OR REPLACE INTO file_diagnostics "
+                    "(file_sha, manifest_sha, toolchain, imports_sha, path, returncode, output, messages, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, path, diag.returncode, zlib.compress(diag.output.encode("utf-8")), payload, time.time()),
+                )
+                con.commit()
+            except sqlite3.Error:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+def get_diagnostics_store(project_root: Path) -> DiagnosticsStore:
+    """The store for ``project_root`` (``DESOL_LEAN_DIAGNOSTICS_DB`` overrides the path)."""
+    path = os.environ.get("DESOL_LEAN_DIAGNOSTICS_DB", "").strip() or str(Path(project_root) / DEFAULT_DB_NAME)
+    with _STORES_LOCK:
+        if path not in _STORES:
+            _STORES[path] = DiagnosticsStore(Path(path))
+        return _STORES[path]
+
+
+def diagnostics_stats() -> dict[str, int]:
+    with _STORES_LOCK:
+        return dict(_STATS)
+
+
+def _bump(counter: str) -> None:
+    with _STORES_LOCK:
+        _STATS[counter] += 1
+
+
+# ── main entry point ─────────────────────────────────────────────────────────
+
+
+def file_diagnostics(
+    lean_file: Path,
+    *,
+    project_root: Path,
+    timeout_s: int = 180,
+    refresh: bool = False,
+) -> Optional[FileDiagnostics]:
+    """Diagnostics for ``lean_file`` as `lake env lean` reports them.
+
+    Served from the store when the file, toolchain, manifest and imported
+    project modules are unchanged; otherwise cold `lake env lean` runs once
+    and the result is recorded. Returns None on a missing file, a timeout or a
+    missing `lake` binary.
+    """
+    lean_file = Path(lean_file)
+    try:
+        lean_src = lean_file.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    key = diagnostics_key(lean_src, project_root)
+    store = get_diagnostics_store(project_root)
+    if not refresh:
+        hit = store.get(key, str(lean_file))
+        if hit is not None:
+            _bump("hits")
+            return hit
+    _bump("misses")
+    try:
+        proc = run_lean_file(
+            lean_file, project_root=project_root, timeout_s=timeout_s, backend="lake",
+            caller="lean_diagnostics_store",
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    output = (proc.stdout or "") + "\n" + (proc.stderr or "")
+    diag = FileDiagnostics(
+        returncode=int(proc.returncode),
+        output=output,
+        messages=parse_lean_output(output, lean_src),
+    )
+    store.put(key, str(lean_file), diag)
+    return diag
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("lean_file", type=Path)
+    parser.add_argument("--project-root", type=Path, default=SCRIPT_DIR.parent)
+    parser.add_argument("--timeout", type=int, default=180)
+    parser.add_argument("--refresh", action="store_true", help="Re-run Lean even on a store hit")
+    args = parser.parse_args()
+    diag = file_diagnostics(
+        args.lean_file, project_root=args.project_root, timeout_s=args.timeout, refresh=args.refresh,
+    )
+    if diag is None:
+        print(json.dumps({"lean_file": str(args.lean_file), "error": "lean_unavailable_or_timeout"}))
+        return 1
+    print(json.dumps({
+        "lean_file": str(args.lean_file),
+        "cached": diag.cached,
+        "returncode": diag.returncode,
+        "errors": diag.error_count,
+        "messages": [asdict(m) for m in diag.messages],
+    }, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""Batched Lean name resolution shared by grounding and translation.
+
+`pipeline_status.ground_assumptions` and the translator's unknown-identifier
+repair both need "does this constant resolve under these imports?". Asking
+Lean one name per `lake env lean` run costs 5–20s each (the import is
+re-elaborated every time). This module answers many names at once:
+
+  1. a persistent cache (`output/lean_name_cache.sqlite`) keyed by the
+     toolchain/Mathlib pin (`lean-toolchain` + `lake-manifest.json` + the
+     sources of project modules the header imports, transitively), the
+     import header and the name;
+  2. optionally a prebuilt declaration-name set (`DESOL_LEAN_DECL_NAMES`: a
+     text file with one name per line, or a premise index directory whose
+     `entries.jsonl` carries `name`) — positive answers need no Lean call;
+  3. one Lean elaboration for everything left: one `#check @name` per line,
+     with each error attributed back to its name by line number. One REPL
+     process per project holds a warm env per import header
+     (`DESOL_NAME_ORACLE_REPL=0` disables it), else one `lake env lean`
+     run on a scratch file.
+
+Import headers are normalized (blank lines dropped, `import` lines sorted
+and de-duplicated) so the translator's reordered headers share one oracle,
+one cache key and one REPL env. The shared REPL keeps at most
+`DESOL_NAME_ORACLE_REPL_HEADERS` (default 4) envs and is restarted to free
+them when a new header would exceed that. An oracle whose header fails to
+elaborate in the REPL, or whose REPL call raises, stops using the REPL and
+goes straight to `lake env lean` from then on.
+
+Failed or timed-out Lean runs answer False without caching, matching the
+previous per-name helpers. `get_oracle` keeps at most
+`DESOL_NAME_ORACLE_MAX` (default 8) oracles per process, closing the least
+recently used one when the cap is exceeded.
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+
+DEFAULT_CACHE_NAME = Path("output") / "lean_name_cache.sqlite"
+
+# Identifiers we are willing to splice into `#check @…`. Anything with
+# whitespace or term syntax is not a constant name and resolves to False.
+_NAME_RE = re.compile(r"^[^\s()\[\]{}:,@#\"`;]+$")
+_DIAG_RE = re.compile(r"^.+?:(\d+):\d+:\s+error:", re.MULTILINE)
+_IMPORT_RE = re.compile(r"^\s*import\s+([A-Za-z0-9_.]+)", re.MULTILINE)
+
+_ORACLES: "OrderedDict[tuple[str, str], LeanNameOracle]" = OrderedDict()
+_ORACLES_LOCK = threading.Lock()
+_MAX_ORACLES = max(1, int(os.environ.get("DESOL_NAME_ORACLE_MAX", "8")))
+_MAX_REPL_HEADERS = max(1, int(os.environ.get("DESOL_NAME_ORACLE_REPL_HEADERS", "4")))
+_REPLS: "dict[str, _SharedRepl]" = {}
+_NAME_SETS: dict[tuple[str, int], frozenset[str]] = {}
+
+
+def toolchain_pin(project_root: Path, imports: str = "") -> str:
+    """Hash of the files that decide which declarations exist.
+
+    Besides the toolchain and manifest, every project-local module reached
+    from ``imports`` (following its own imports) contributes its source, so
+    rebuilding e.g. a paper theory invalidates names resolved under it.
+    """
+    project_root = Path(project_root)
+    h = hashlib.sha256()
+    for rel in ("lean-toolchain", "lake-manifest.json"):
+        try:
+            h.update((project_root / rel).read_bytes())
+        except OSError:
+            h.update(b"-")
+    seen: set[str] = set()
+    pending = sorted(set(_IMPORT_RE.findall(imports)))
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        try:
+            src = (project_root / (module.replace(".", "/") + ".lean")).read_bytes()
+        except OSError:
+            continue  # not a project module (Mathlib, Std, ...)
+        h.update(module.encode("utf-8") + b"\0" + hashlib.sha256(src).digest())
+        pending.extend(_IMPORT_RE.findall(src.decode("utf-8", errors="replace")))
+    return h.hexdigest()[:16]
+
+
+def normalize_imports(imports: str) -> str:
+    """Canonical form of an import header: sorted, de-duplicated imports.
+
+    Headers that carry anything besides ``import`` lines keep their order
+    (only blank lines are dropped), since reordering could change meaning.
+    """
+    lines = [ln.strip() for ln in imports.splitlines() if ln.strip()]
+    if all(_IMPORT_RE.match(ln) for ln in lines):
+        lines = sorted(set(lines))
+    return "\n".join(lines)
+
+
+def load_declaration_names(path: Path) -> frozenset[str]:
+    """Load a declaration-name set from a text file or a premise index dir."""
+    path = Path(path)
+    src = path / "entries.jsonl" if path.is_dir() else path
+    try:
+        key = (str(src), src.stat().st_mtime_ns)
+    except OSError:
+        return frozenset()
+    if key not in _NAME_SETS:
+        names: set[str] = set()
+        with src.open(encoding="utf-8") as f:
+            if src.suffix == ".jsonl":
+                for line in f:
+                    try:
+                        name = json.loads(line).get("name")
+                    except Exception:
+                        continue
+                    if name:
+                        names.add(str(name))
+            else:
+                names.update(line.strip() for line in f if line.strip())
+        _NAME_SETS[key] = frozenset(names)
+    return _NAME_SETS[key]
+
+
+def _check_source(names: list[str]) -> str:
+    return "\n".join(f"#check @{n}" for n in names) + "\n"
+
+
+def _attribute_errors(names: list[str], error_lines: Iterable[int], first_line: int) -> dict[str, bool]:
+    """Map per-line errors back to names; ``first_line`` is the first #check line."""
+    bad = {ln - first_line for ln in error_lines}
+    return {n: i not in bad for i, n in enumerate(names)}
+
+
+class _SharedRepl:
+    """One REPL process per project, holding a warm env per import header."""
+
+    def __init__(self, project_root: Path, timeout: int) -> None:
+        self.project_root = project_root
+        self.timeout = timeout
+        self.server: Any = None
+        self.envs: "OrderedDict[str, int]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def env_for(self, imports: str) -> int | None:
+        """Env id with ``imports`` elaborated, or None if the header fails."""
+        env = self.envs.get(imports)
+        if env is not None:
+            self.envs.move_to_end(imports)
+            return env
+        if self.server is None:
+            from lean_repl_server import LeanREPLServer
+
+            self.server = LeanREPLServer(project_root=self.project_root, timeout=float(self.timeout))
+            self.server.start()
+        elif len(self.envs) >= _MAX_REPL_HEADERS:
+            # The REPL cannot free an env; restart to drop the old headers.
+            self.server.restart()
+            self.envs.clear()
+        resp = self.server.elaborate(imports)
+        if any(m.get("severity") == "error" for m in resp.get("messages", [])) or "env" not in resp:
+            return None
+        env = self.envs[imports] = int(resp["env"])
+        return env
+
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.stop()
+            except Exception:
+                pass
+        self.server = None
+        self.envs.clear()
+
+
+def _shared_repl(project_root: Path, timeout: int) -> _SharedRepl:
+    key = str(Path(project_root).resolve())
+    with _ORACLES_LOCK:
+        repl = _REPLS.get(key)
+        if repl is None:
+            repl = _REPLS[key] = _SharedRepl(Path(project_root), timeout)
+        return repl
+
+
+class LeanNameOracle:
+    """Resolve Lean constant names under one import header in one project."""
+
+    def __init__(
+        self,
+        project_root: Path,
+        imports: str = "import Mathlib",
+        *,
+        cache_path: Path | None = None,
+        name_set_path: Path | None = None,
+        use_repl: bool | None = None,
+        timeout: int = 120,
+    ) -> None:
+        self.project_root = Path(project_root)
+        self.imports = normalize_imports(imports)
+        self.cache_path = cache_path or (self.project_root / DEFAULT_CACHE_NAME)
+        env_names = os.environ.get("DESOL_LEAN_DECL_NAMES", "")
+        self.name_set_path = name_set_path or (Path(env_names) if env_names else None)
+        if use_repl is None:
+            use_repl = os.environ.get("DESOL_NAME_ORACLE_REPL", "1") != "0"
+        self.use_repl = use_repl
+        self.timeout = timeout
+        self._pin = toolchain_pin(self.project_root, self.imports)
+        self._imports_key = hashlib.sha256(self.imports.encode("utf-8")).hexdigest()[:16]
+        self._memo: dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self._con: sqlite3.Connection | None = None
+        self.lean_runs = 0
+
+    # ── persistent cache ──────────────────────────────────────────────────────
+
+    def _db(self) -> sqlite3.Connection | None:
+        if self._con is None:
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                con = sqlite3.connect(str(self.cache_path), timeout=30.0, check_same_thread=False)
+                con.execute("PRAGMA journal_mode=WAL;")
+                con.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS lean_names (
+                        pin TEXT NOT NULL,
+                        imports TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        resolves INTEGER NOT NULL,
+                        PRIMARY KEY (pin, imports, name)
+                    )
+                    """
+                )
+                con.commit()
+                self._con = con
+            except (sqlite3.Error, OSError):
+                return None
+        return self._con
+
+    def _cached(self, names: list[str]) -> dict[str, bool]:
+        con = self._db()
+        if con is None or not names:
+            return {}
+        out: dict[str, bool] = {}
+        try:
+            for i in range(0, len(names), 500):
+                chunk = names[i : i + 500]
+                rows = con.execute(
+                    f"SELECT name, resolves FROM lean_names WHERE pin = ? AND imports = ? "
+                    f"AND name IN ({','.join('?' * len(chunk))})",
+                    (self._pin, self._imports_key, *chunk),
+                ).fetchall()
+                out.update({str(n): bool(r) for n, r in rows})
+        except sqlite3.Error:
+            return {}
+        return out
+
+    def _store(self, answers: dict[str, bool]) -> None:
+        con = self._db()
+        if con is None or not answers:
+            return
+        try:
+            con.executemany(
+                "INSERT OR REPLACE INTO lean_names VALUES (?, ?, ?, ?)",
+                [(self._pin, self._imports_key, n, int(ok)) for n, ok in answers.items()],
+            )
+            con.commit()
+        except sqlite3.Error:
+            pass
+
+    # ── Lean backends ─────────────────────────────────────────────────────────
+
+    def _check_with_repl(self, names: list[str]) -> dict[str, bool] | None:
+        if not self.use_repl:
+            return None
+        repl = _shared_repl(self.project_root, self.timeout)
+        with repl.lock:
+            try:
+                if repl.server is None:
+                    from lean_repl_server import repl_server_available
+
+                    if not repl_server_available(self.project_root):
+                        self.use_repl = False
+                        return None
+                env = repl.env_for(self.imports)
+                if env is None:
+                    # The header does not elaborate; every later batch would
+                    # pay the import again before falling back to lake.
+                    self.use_repl = False
+                    return None
+                resp = repl.server.elaborate(_check_source(names), env=env)
+            except Exception:
+                repl.close()
+                self.use_repl = False
+                return None
+        if "messages" not in resp and "env" not in resp:
+            return None
+        error_lines = [
+            int((m.get("pos") or {}).get("line", 0))
+            for m in resp.get("messages", [])
+            if m.get("severity") == "error"
+        ]
+        return _attribute_errors(names, error_lines, first_line=1)
+
+    def _check_with_lake(self, names: list[str]) -> dict[str, bool] | None:
+        from lean_repl_dojo import _write_scratch_file
+
+        header = self.imports + "\n\n"
+        scratch = _write_scratch_file(self.project_root, Path("NameOracle.lean"), header + _check_source(names))
+        env = os.environ.copy()
+        env["PATH"] = str(Path.home() / ".elan" / "bin") + ":" + env.get("PATH", "")
+        try:
+            proc = subprocess.run(
+                ["lake", "env", "lean", str(scratch)],
+                cwd=self.project_root,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                env=env,
+            )
+        except Exception:
+            return None
+        finally:
+            scratch.unlink(missing_ok=True)
+        out = (proc.stdout or "") + "\n" + (proc.stderr or "")
+        first_line = header.count("\n") + 1
+        error_lines = [int(m.group(1)) for m in _DIAG_RE.finditer(out)]
+        if any(ln < first_line for ln in error_lines):
+            return None  # the import header itself failed; nothing is known
+        if proc.returncode != 0 and not error_lines:
+            return None
+        return _attribute_errors(names, error_lines, first_line=first_line)
+
+    # ── public API ────────────────────────────────────────────────────────────
+
+    def resolve_many(self, names: Iterable[str]) -> dict[str, bool]:
+        """Return ``{name: resolves}`` for every name, using one Lean run at most."""
+        wanted = list(dict.fromkeys(str(n).strip() for n in names))
+        with self._lock:
+            pin = toolchain_pin(self.project_root, self.imports)
+            if pin != self._pin:
+                # A project module under the header changed: forget answers
+                # and the REPL env built from the old sources.
+                self._pin = pin
+                self._memo.clear()
+                self.close_repl()
+            out: dict[str, bool] = {}
+            todo: list[str] = []
+            for name in wanted:
+                if not name or not _NAME_RE.match(name):
+                    out[name] = False
+                elif name in self._memo:
+                    out[name] = self._memo[name]
+                else:
+                    todo.append(name)
+            if todo:
+                known = self._cached(todo)
+                if self.name_set_path is not None:
+                    decls = load_declaration_names(self.name_set_path)
+                    known.update({n: True for n in todo if n in decls})
+                self._memo.update(known)
+                out.update(known)
+                todo = [n for n in todo if n not in known]
+            if todo:
+                self.lean_runs += 1
+                answers = self._check_with_repl(todo)
+                if answers is None:
+                    answers = self._check_with_lake(todo)
+                if answers is None:
+                    out.update({n: False for n in todo})
+                else:
+                    self._store(answers)
+                    self._memo.update(answers)
+                    out.update(answers)
+            return {name: out[name] for name in wanted}
+
+    def exists(self, name: str) -> bool:
+        return self.resolve_many([name])[name.strip()]
+
+    def close_repl(self) -> None:
+        """Forget this header's env in the shared REPL (rebuilt on next use)."""
+        with _ORACLES_LOCK:
+            repl = _REPLS.get(str(self.project_root.resolve()))
+        if repl is not None:
+            with repl.lock:
+                repl.envs.pop(self.imports, None)
+
+    def close(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+
+def get_oracle(project_root: Path, imports: str = "import Mathlib") -> LeanNameOracle:
+    """Process-wide oracle for ``(project_root, imports)``; keeps its REPL warm.
+
+    The header is normalized first, so reordered import lists share one
+    oracle. Oracles are kept in LRU order; past ``DESOL_NAME_ORACLE_MAX`` the
+    least recently used one is closed (the per-project REPL stays up).
+    """
+    key = (str(Path(project_root).resolve()), normalize_imports(imports))
+    evicted: list[LeanNameOracle] = []
+    with _ORACLES_LOCK:
+        oracle = _ORACLES.get(key)
+        if oracle is None:
+            oracle = _ORACLES[key] = LeanNameOracle(Path(project_root), imports)
+        _ORACLES.move_to_end(key)
+        while len(_ORACLES) > _MAX_ORACLES:
+            evicted.append(_ORACLES.popitem(last=False)[1])
+    for old in evicted:
+        with old._lock:
+            old.close()
+    return oracle
+
+
+def close_oracles() -> None:
+    """Close every process-wide oracle and shared REPL (registered with ``atexit``)."""
+    with _ORACLES_LOCK:
+        oracles = list(_ORACLES.values())
+        _ORACLES.clear()
+        repls = list(_REPLS.values())
+        _REPLS.clear()
+    for oracle in oracles:
+        with oracle._lock:
+            oracle.close()
+    for repl in repls:
+        with repl.lock:
+            repl.close()
+
+
+atexit.register(close_oracles)
+
+
+def resolve_names(names: Iterable[str], *, project_root: Path, imports: str = "import Mathlib") -> dict[str, bool]:
+    return get_oracle(project_root, imports).resolve_many(names)
+
+
+def name_exists(name: str, *, project_root: Path, imports: str = "import Mathlib") -> bool:
+    return get_oracle(project_root, imports).exists(name)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="+", help="Lean constant names to resolve")
+    parser.add_argument("--project-root", type=Path, default=Path("."))
+    parser.add_argument("--imports", default="import Mathlib", help="Import header to resolve under")
+    args = parser.parse_args()
+    oracle = LeanNameOracle(args.project_root, args.imports)
+    try:
+        print(json.dumps(oracle.resolve_many(args.names), indent=2))
+    finally:
+        oracle.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
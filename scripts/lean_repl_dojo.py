@@ -1,10 +1,11 @@
 """
 Batch-mode drop-in replacement for LeanDojo's Dojo/TacticState interface.
-Uses incremental `lake build` (~1.5s/call on a cached project).
+Uses incremental `lake build` (~1.5s/call on a cached project), or a Lean REPL
+holding real proof states when ``backend="repl"``/``"auto"`` (see REPLDojo).
 
 Protocol:
   __enter__  : synthetic initial proof state from theorem signature (no Lean call)
-  run_tac    : write modified file → lake build → parse output → restore file
+  run_tac    : write scratch copy → lake env lean → parse output → delete copy
                exit 0 + no sorry warning at decl line → ProofFinished
                exit 1 + "unsolved goals"              → TacticState
                exit 1 + other error                   → LeanError
@@ -12,13 +13,20 @@ Protocol:
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import json
+import multiprocessing as mp
 import re
 import os
+import sqlite3
 import time
 import subprocess
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import zlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional, Union
@@ -135,6 +143,19 @@ def _replace_theorem_body(src: str, theorem_name: str, tactics: list[str]) -> st
     return "".join(lines[: by_line_idx + 1] + new_body + lines[body_end:])
 
 
+def _theorem_signature(src: str, theorem_name: str) -> str:
+    """Return the declaration of theorem_name up to and including ':= by'."""
+    lines = src.splitlines()
+    theorem_start: int | None = None
+    for i, line in enumerate(lines):
+        if theorem_start is None:
+            if re.match(rf"\s*(?:lemma|theorem)\s+{re.escape(theorem_name)}\b", line):
+                theorem_start = i
+        if theorem_start is not None and re.search(r":=\s*by\s*$", line.rstrip()):
+            return "\n".join(lines[theorem_start : i + 1])
+    raise ValueError(f"Could not find ':= by' for theorem '{theorem_name}'")
+
+
 def _parse_param_groups(params_str: str) -> list[tuple[str, str]]:
     """
     Parse top-level parameter groups like '(x y : ℕ) {h : P} [inst : C]'.
@@ -348,6 +369,337 @@ def _ensure_repl_compat_dependency(project_root: Path) -> None:
         return
 
 
+# Project roots whose `lake update` already succeeded in this process. The
+# manifest does not change between tactic checks, so later builds skip it.
+_LAKE_BOOTSTRAPPED: set[str] = set()
+_LAKE_BOOTSTRAP_LOCK = threading.Lock()
+
+_DOJO_BACKENDS = ("lake", "repl", "auto")
+
+
+@contextmanager
+def _lake_update_lock(project_root: Path):
+    """Serialize `lake update` across processes sharing one project."""
+    lock_path = project_root / ".lake" / "desol_lake_update.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("w", encoding="utf-8") as lock_handle:
+        try:
+            import fcntl
+
+            fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX)
+        except Exception:
+            pass
+        yield
+
+
+def _write_scratch_file(project_root: Path, file_path: Path, text: str) -> Path:
+    """Write ``text`` to a private scratch copy of ``file_path`` and return it.
+
+    Scratch files live under ``.lake/desol_scratch`` so concurrent dojos on
+    the same source never see each other's tactics. Imports resolve through
+    LEAN_PATH, so the file's location does not change how it elaborates.
+    """
+    scratch_dir = project_root / ".lake" / "desol_scratch"
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix=f"{Path(file_path).stem}-", suffix=".lean", dir=scratch_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    return Path(name)
+
+
+def _target_prefix(src: str, decl_line: int) -> str:
+    """The part of ``src`` that comes before the declaration on ``decl_line``.
+
+    The cut is at the start of that declaration's command, so its doc comment
+    and attributes go with it. Used as the REPL env, the prefix holds neither
+    the target nor anything declared after it.
+    """
+    from lake_validation_cache import split_declarations
+
+    start = 1
+    for chunk in split_declarations(src):
+        if chunk.line > decl_line:
+            break
+        start = chunk.line
+    return "".join(src.splitlines(keepends=True)[: start - 1])
+
+
+_PREFIX_ANCHORS_MAX_DEFAULT = 64
+
+
+def _write_prefix_anchor(project_root: Path, file_path: Path, text: str) -> Path:
+    """Write ``text`` to a content-named scratch file the REPL can load.
+
+    The name depends only on the content, so re-opening the same theorem
+    reuses the file and its env snapshot. The write is atomic because
+    concurrent dojos may publish the same prefix. Reuse refreshes the file's
+    mtime, and publishing a new prefix evicts the least recently used ones
+    past ``DESOL_DOJO_PREFIX_ANCHORS_MAX`` (with their env snapshots).
+    """
+    scratch_dir = project_root / ".lake" / "desol_scratch"
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    anchor = scratch_dir / f"{Path(file_path).stem}-prefix-{digest}.lean"
+    if anchor.exists():
+        try:
+            os.utime(anchor)
+        except OSError:
+            pass
+        return anchor
+    fd, tmp = tempfile.mkstemp(prefix=f"{anchor.stem}-", suffix=".tmp", dir=scratch_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp, anchor)
+    _evict_prefix_anchors(project_root, scratch_dir, keep=anchor)
+    return anchor
+
+
+def _evict_prefix_anchors(project_root: Path, scratch_dir: Path, *, keep: Path) -> None:
+    """Drop the least recently used prefix anchors beyond the configured cap."""
+    cap = max(1, int(_env_float("DESOL_DOJO_PREFIX_ANCHORS_MAX", _PREFIX_ANCHORS_MAX_DEFAULT)))
+    anchors: list[tuple[float, Path]] = []
+    for path in scratch_dir.glob("*-prefix-*.lean"):
+        try:
+            anchors.append((path.stat().st_mtime, path))
+        except OSError:
+            continue  # evicted by a concurrent dojo
+    if len(anchors) <= cap:
+        return
+    from lean_repl_server import repl_env_snapshot_path
+
+    anchors.sort()
+    for _, path in anchors[: len(anchors) - cap]:
+        if path == keep:
+            continue
+        try:
+            # The snapshot key hashes the anchor, so resolve it before unlinking.
+            snapshot = repl_env_snapshot_path(project_root, str(path.relative_to(project_root)))
+            if snapshot is not None:
+                snapshot.unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+        except OSError:
+            continue
+
+
+def _unscratch_output(
+    result: subprocess.CompletedProcess[str],
+    scratch: Path,
+    project_root: Path,
+    file_path: Path,
+) -> subprocess.CompletedProcess[str]:
+    """Report diagnostics against ``file_path`` instead of the scratch copy."""
+    names = (str(scratch), str(scratch.relative_to(project_root)))
+
+    def _fix(text: str) -> str:
+        for name in names:
+            text = text.replace(name, str(file_path))
+        return text
+
+    return subprocess.CompletedProcess(
+        args=getattr(result, "args", []),
+        returncode=result.returncode,
+        stdout=_fix(result.stdout or ""),
+        stderr=_fix(result.stderr or ""),
+    )
+
+
+def _lake_bootstrapped(project_root: Path) -> bool:
+    with _LAKE_BOOTSTRAP_LOCK:
+        return str(Path(project_root).resolve()) in _LAKE_BOOTSTRAPPED
+
+
+def _mark_lake_bootstrapped(project_root: Path) -> None:
+    with _LAKE_BOOTSTRAP_LOCK:
+        _LAKE_BOOTSTRAPPED.add(str(Path(project_root).resolve()))
+
+
+# ── Tactic result cache ───────────────────────────────────────────────────────
+
+_CACHE_MAX_ENTRIES_DEFAULT = 200_000
+_CACHE_MAX_AGE_DAYS_DEFAULT = 30.0
+_CACHE_EVICT_EVERY = 256
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+class DojoTacticCache:
+    """On-disk store of `lake env lean` outputs keyed by ``REPLDojo._cache_key``.
+
+    Backed by SQLite in WAL mode, so many dojo processes can share one cache
+    file; stdout/stderr are stored zlib-compressed. Rows unused for
+    ``max_age_days`` are evicted, then the least recently used rows beyond
+    ``max_entries`` (defaults: ``DESOL_DOJO_CACHE_MAX_AGE_DAYS`` /
+    ``DESOL_DOJO_CACHE_MAX_ENTRIES``). A legacy ``.json`` cache next to the
+    database is imported once on first open. Storage errors degrade to cache
+    misses; they never fail a tactic check.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_entries: int | None = None,
+        max_age_days: float | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = int(
+            max_entries
+            if max_entries is not None
+            else _env_float("DESOL_DOJO_CACHE_MAX_ENTRIES", _CACHE_MAX_ENTRIES_DEFAULT)
+        )
+        self.max_age_days = float(
+            max_age_days
+            if max_age_days is not None
+            else _env_float("DESOL_DOJO_CACHE_MAX_AGE_DAYS", _CACHE_MAX_AGE_DAYS_DEFAULT)
+        )
+        self.hits = 0
+        self.misses = 0
+        self._con: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is not None:
+            return self._con
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tactic_results (
+                key TEXT PRIMARY KEY,
+                returncode INTEGER NOT NULL,
+                stdout BLOB NOT NULL,
+                stderr BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tactic_results_last_used ON tactic_results(last_used_at)"
+        )
+        con.commit()
+        self._con = con
+        self._import_legacy_json(con)
+        self._evict(con)
+        return con
+
+    def _import_legacy_json(self, con: sqlite3.Connection) -> None:
+        legacy = self.path.with_suffix(".json")
+        if legacy == self.path or not legacy.exists():
+            return
+        try:
+            rows = json.loads(legacy.read_text(encoding="utf-8"))
+        except Exception:
+            rows = None
+        if isinstance(rows, dict):
+            now = time.time()
+            con.executemany(
+                "INSERT OR IGNORE INTO tactic_results VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                [
+                    (key, *self._encode(row.get("returncode", 1), row.get("stdout", ""), row.get("stderr", "")), now, now)
+                    for key, row in rows.items()
+                    if isinstance(row, dict)
+                ],
+            )
+            con.commit()
+        legacy.rename(legacy.with_suffix(".json.migrated"))
+
+    @staticmethod
+    def _encode(returncode: Any, stdout: Any, stderr: Any) -> tuple[int, bytes, bytes, int]:
+        out = zlib.compress(str(stdout or "").encode("utf-8"))
+        err = zlib.compress(str(stderr or "").encode("utf-8"))
+        return int(returncode), out, err, len(out) + len(err)
+
+    def _evict(self, con: sqlite3.Connection) -> None:
+        if self.max_age_days > 0:
+            cutoff = time.time() - self.max_age_days * 86400.0
+            con.execute("DELETE FROM tactic_results WHERE last_used_at < ?", (cutoff,))
+        if self.max_entries > 0:
+            con.execute(
+                """
+                DELETE FROM tactic_results WHERE key IN (
+                    SELECT key FROM tactic_results
+                    ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+        con.commit()
+
+    def get(self, key: str) -> tuple[int, str, str] | None:
+        """Return ``(returncode, stdout, stderr)`` for ``key``, or None on a miss."""
+        with self._lock:
+            try:
+                con = self._connect()
+                row = con.execute(
+                    "SELECT returncode, stdout, stderr FROM tactic_results WHERE key = ?", (key,)
+                ).fetchone()
+                result = None
+                if row is not None:
+                    # A corrupt blob counts as a miss rather than failing the lookup.
+                    result = (
+                        int(row[0]),
+                        zlib.decompress(row[1]).decode("utf-8"),
+                        zlib.decompress(row[2]).decode("utf-8"),
+                    )
+                    con.execute(
+                        "UPDATE tactic_results SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                        (time.time(), key),
+                    )
+                    con.commit()
+            except (sqlite3.Error, OSError, zlib.error, UnicodeDecodeError, TypeError, ValueError):
+                result = None
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return result
+
+    def put(self, key: str, returncode: int, stdout: str, stderr: str) -> None:
+        with self._lock:
+            try:
+                con = self._connect()
+                now = time.time()
+                con.execute(
+                    "INSERT OR REPLACE INTO tactic_results VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (key, *self._encode(returncode, stdout, stderr), now, now),
+                )
+                con.commit()
+                self._puts += 1
+                if self._puts % _CACHE_EVICT_EVERY == 0:
+                    self._evict(con)
+            except (sqlite3.Error, OSError):
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """Session hit/miss counters plus the store's current size."""
+        entries = nbytes = 0
+        with self._lock:
+            try:
+                entries, nbytes = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM tactic_results"
+                ).fetchone()
+            except (sqlite3.Error, OSError):
+                pass
+        return {"hits": self.hits, "misses": self.misses, "entries": int(entries), "bytes": int(nbytes)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
 # ── Main class ────────────────────────────────────────────────────────────────
 
 class REPLDojo:
@@ -357,6 +709,20 @@ class REPLDojo:
     Usage::
         with REPLDojo(project_root, file_path, theorem_name, timeout=300) as (dojo, state):
             result = dojo.run_tac(state, "omega")
+
+    ``backend`` picks how tactics are checked (default: ``DESOL_DOJO_BACKEND``,
+    else ``"lake"``):
+
+    - ``"lake"``: re-elaborate the whole file with the tactic prefix per call.
+    - ``"repl"``: keep a Lean REPL open on the file's env and apply only the
+      new tactic to the stored proof state. Results, state ids and step
+      traces follow the same contract as the lake path.
+    - ``"auto"``: ``"repl"`` when a REPL binary is available and
+      ``DESOL_FORCE_REPL_DOJO`` is unset, falling back to ``"lake"`` if the
+      REPL cannot open the theorem.
+
+    ``repl_server`` lets callers share one started ``LeanREPLServer``; the
+    dojo then leaves its lifecycle to the caller.
     """
 
     def __init__(
@@ -366,19 +732,34 @@ class REPLDojo:
         theorem_name: str,
         timeout: int = 300,
         cache_path: Path | None = None,
+        backend: str | None = None,
+        repl_server: Any = None,
     ) -> None:
         self.project_root = project_root
         self.file_path = file_path
         self.theorem_name = theorem_name
         self.timeout = timeout
+        backend = (backend or os.environ.get("DESOL_DOJO_BACKEND", "") or "lake").strip().lower()
+        if backend not in _DOJO_BACKENDS:
+            raise ValueError(f"Unknown dojo backend {backend!r}; expected one of {_DOJO_BACKENDS}")
+        self.backend = backend
+        self._repl_server = repl_server
+        # Set while the REPL backend is active: the server, and the REPL
+        # proof-state id behind each TacticState id handed out.
+        self._repl: Any = None
+        self._repl_owned = False
+        self._repl_states: dict[int, int] = {}
+        self._next_state_id = 1
         self._target = _lean_target(file_path)
         self._full_path = project_root / file_path
         self._original: str = ""
         self._decl_line: int = 0
         self._tactics: list[str] = []
         self._traces: list[StepTrace] = []
-        self._cache_path = cache_path or (project_root / "output" / "dojo_tactic_cache.json")
-        self._cache: dict[str, dict[str, Any]] = {}
+        self._cache_path = cache_path or (project_root / "output" / "dojo_tactic_cache.sqlite")
+        if self._cache_path.suffix == ".json":
+            self._cache_path = self._cache_path.with_suffix(".sqlite")
+        self._cache = DojoTacticCache(self._cache_path)
 
     def _cache_key(self, tactics: list[str]) -> str:
         base = {
@@ -390,44 +771,24 @@ class REPLDojo:
         raw = json.dumps(base, sort_keys=True, ensure_ascii=False)
         return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    def _load_cache(self) -> None:
-        if self._cache:
-            return
-        try:
-            if self._cache_path.exists():
-                self._cache = json.loads(self._cache_path.read_text(encoding="utf-8"))
-                if not isinstance(self._cache, dict):
-                    self._cache = {}
-        except Exception:
-            self._cache = {}
-
-    def _save_cache(self) -> None:
-        try:
-            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
-            self._cache_path.write_text(json.dumps(self._cache, ensure_ascii=False), encoding="utf-8")
-        except Exception:
-            pass
-
     def _result_from_cache(self, key: str) -> subprocess.CompletedProcess[str] | None:
-        self._load_cache()
         row = self._cache.get(key)
-        if not isinstance(row, dict):
+        if row is None:
             return None
+        returncode, stdout, stderr = row
         return subprocess.CompletedProcess(
             args=["lake", "build", self._target],
-            returncode=int(row.get("returncode", 1)),
-            stdout=str(row.get("stdout", "")),
-            stderr=str(row.get("stderr", "")),
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
         )
 
     def _write_cache(self, key: str, result: subprocess.CompletedProcess[str]) -> None:
-        self._load_cache()
-        self._cache[key] = {
-            "returncode": int(result.returncode),
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-        }
-        self._save_cache()
+        self._cache.put(key, int(result.returncode), result.stdout, result.stderr)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Hit/miss counters and size of the tactic result cache."""
+        return self._cache.stats()
 
     def _build(self, tactics: list[str]) -> subprocess.CompletedProcess:
         key = self._cache_key(tactics)
@@ -435,37 +796,44 @@ class REPLDojo:
         if cached is not None:
             return cached
         modified = _replace_theorem_body(self._original, self.theorem_name, tactics)
-        self._full_path.write_text(modified)
+        scratch = _write_scratch_file(self.project_root, self.file_path, modified)
         try:
             _env = os.environ.copy()
             _elan = str(Path.home() / ".elan" / "bin")
             _env["PATH"] = _elan + ":" + _env.get("PATH", "")
             # Bootstrap project dependencies first, then compile the concrete file.
             # We use `lake update` (not `lake build`) so temp projects that don't
-            # include the package's executable targets still work.
-            bootstrap = subprocess.run(
-                ["lake", "update"],
+            # include the package's executable targets still work. It only
+            # needs to succeed once per project per process.
+            bootstrap = None
+            if not _lake_bootstrapped(self.project_root):
+                with _lake_update_lock(self.project_root):
+                    bootstrap = subprocess.run(
+                        ["lake", "update"],
+                        cwd=self.project_root,
+                        capture_output=True,
+                        text=True,
+                        timeout=self.timeout,
+                        env=_env,
+                    )
+                if bootstrap.returncode == 0:
+                    _mark_lake_bootstrapped(self.project_root)
+            if bootstrap is not None and bootstrap.returncode != 0:
+                # A failed bootstrap says nothing about the tactics; don't cache it.
+                return bootstrap
+            result = subprocess.run(
+                ["lake", "env", "lean", str(scratch.relative_to(self.project_root))],
                 cwd=self.project_root,
                 capture_output=True,
                 text=True,
                 timeout=self.timeout,
                 env=_env,
             )
-            if bootstrap.returncode != 0:
-                result = bootstrap
-            else:
-                result = subprocess.run(
-                    ["lake", "env", "lean", str(self.file_path)],
-                    cwd=self.project_root,
-                    capture_output=True,
-                    text=True,
-                    timeout=self.timeout,
-                    env=_env,
-                )
+            result = _unscratch_output(result, scratch, self.project_root, self.file_path)
             self._write_cache(key, result)
             return result
         finally:
-            self._full_path.write_text(self._original)
+            scratch.unlink(missing_ok=True)
 
     def __enter__(self) -> tuple["REPLDojo", TacticState]:
         _ensure_repl_compat_dependency(self.project_root)
@@ -473,12 +841,124 @@ class REPLDojo:
         self._tactics = []
         self._traces = []
         self._decl_line = _find_decl_line(self._original, self.theorem_name)
+        if self.backend != "lake":
+            state = self._open_repl_state()
+            if state is not None:
+                return self, state
         pp = _synthetic_initial_state(self._original, self.theorem_name)
         return self, TacticState(pp=pp, id=0)
 
+    # ── REPL backend ──────────────────────────────────────────────────────────
+
+    def _open_repl_state(self) -> TacticState | None:
+        """Open the theorem in a Lean REPL and return its real initial state.
+
+        Loads the file prefix that ends before the theorem as the REPL env
+        (restoring an env snapshot when one exists) and elaborates a sorry
+        stub of the theorem on top of it. The env never contains the theorem
+        itself or a later (possibly sorry-bodied) declaration, so neither can
+        be used to close the goal. Returns
+        None when ``backend="auto"`` and the REPL is unavailable or cannot
+        open the theorem; ``backend="repl"`` raises instead.
+        """
+        from lean_repl_server import (
+            LeanREPLServer,
+            _proof_state_from_stub,
+            _sorry_stub_statement,
+            repl_server_available,
+        )
+
+        server = self._repl_server
+        owned = server is None
+        try:
+            if owned:
+                if self.backend == "auto" and (
+                    os.environ.get("DESOL_FORCE_REPL_DOJO", "0") == "1"
+                    or not repl_server_available(self.project_root)
+                ):
+                    return None
+                server = LeanREPLServer(project_root=self.project_root, timeout=float(self.timeout))
+                server.start()
+            anchor = _write_prefix_anchor(
+                self.project_root,
+                self.file_path,
+                _target_prefix(self._original, self._decl_line),
+            )
+            loaded = server.load_anchor(str(anchor.relative_to(self.project_root)))
+            env = loaded.get("env")
+            if env is None:
+                raise RuntimeError(f"REPL could not load {self.file_path}: {str(loaded)[:300]}")
+            stub = _sorry_stub_statement(_theorem_signature(self._original, self.theorem_name))
+            resp = server.elaborate(stub, env=int(env))
+            ps = _proof_state_from_stub(resp)
+            if not isinstance(ps, int):
+                raise RuntimeError(f"REPL could not open {self.theorem_name}: {ps.error}")
+        except Exception:
+            if owned and server is not None:
+                server.stop()
+            if self.backend == "repl":
+                raise
+            return None
+
+        goal = str(resp["sorries"][0].get("goal", "")) or _synthetic_initial_state(
+            self._original, self.theorem_name
+        )
+        self._repl = server
+        self._repl_owned = owned
+        self._repl_states = {0: ps}
+        self._next_state_id = 1
+        return TacticState(pp=goal, id=0)
+
+    def _run_repl_tac(
+        self, state: TacticState, tactic: str
+    ) -> Union[TacticState, ProofFinished, LeanError]:
+        from lean_repl_server import LeanError as ReplLeanError
+        from lean_repl_server import ProofFinished as ReplProofFinished
+
+        t0 = time.monotonic()
+        ps = self._repl_states.get(state.id)
+        if ps is None:
+            result: Union[TacticState, ProofFinished, LeanError] = LeanError(
+                error=f"Unknown tactic state id {state.id}"
+            )
+        elif re.search(r"\b(?:sorry|admit)\b", tactic):
+            # The REPL closes goals with sorry silently; keep the lake contract.
+            result = LeanError(error="Tactic completed but theorem still uses sorry")
+        else:
+            out = self._repl.run_tac(ps, tactic)
+            if isinstance(out, ReplLeanError):
+                result = LeanError(error=out.error)
+            elif isinstance(out, ReplProofFinished):
+                result = ProofFinished(tactic_state_id=state.id)
+            else:
+                goals = "\n\n".join(out.goals)
+                if goals.strip() == state.pp.strip():
+                    result = LeanError(error="Tactic produced no progress (goal state unchanged)")
+                else:
+                    new_id = self._next_state_id
+                    self._next_state_id += 1
+                    self._repl_states[new_id] = out.proof_state_id
+                    result = TacticState(pp=goals, id=new_id)
+
+        elapsed_ms = int((time.monotonic() - t0) * 1000)
+        if isinstance(result, ProofFinished):
+            trace = StepTrace(state.id, tactic, "proof_finished", elapsed_ms, before_pp=state.pp)
+        elif isinstance(result, TacticState):
+            trace = StepTrace(
+                state.id, tactic, "state_advanced", elapsed_ms, before_pp=state.pp, after_pp=result.pp
+            )
+        else:
+            trace = StepTrace(
+                state.id, tactic, "lean_error", elapsed_ms, before_pp=state.pp, error=result.error
+            )
+        self._traces.append(trace)
+        return result
+
     def run_tac(
         self, state: TacticState, tactic: str
     ) -> Union[TacticState, ProofFinished, LeanError, ProofGivenUp]:
+        if self._repl is not None:
+            return self._run_repl_tac(state, tactic)
         t0 = time.monotonic()
         tactics = self._tactics[: state.id] + [tactic]
         result = self._build(tactics)
@@ -582,8 +1062,13 @@ class REPLDojo:
         return list(self._traces)
 
     def __exit__(self, *args: object) -> None:
-        if self._original:
-            self._full_path.write_text(self._original)
+        # Neither backend writes to the source file, so there is nothing to restore.
+        self._cache.close()
+        if self._repl is not None:
+            if self._repl_owned:
+                self._repl.stop()
+            self._repl = None
+            self._repl_states = {}
 
 
 def replay_step_traces(initial_state: str, traces: list[StepTrace]) -> dict[str, Any]:
@@ -637,6 +1122,20 @@ def load_tree_checkpoint(path: Path) -> SearchTreeCheckpoint | None:
     )
 
 
+def _batch_payload(
+    cur: Union[TacticState, ProofFinished, LeanError, ProofGivenUp],
+    traces: list[StepTrace],
+) -> dict[str, Any]:
+    kind = type(cur).__name__
+    payload: dict[str, Any] = {"result_kind": kind, "traces": [t.__dict__ for t in traces]}
+    if isinstance(cur, TacticState):
+        payload["state_pp"] = cur.pp
+        payload["state_id"] = cur.id
+    elif isinstance(cur, LeanError):
+        payload["error"] = cur.error
+    return payload
+
+
 def _run_batch_request(req: BatchExpansionRequest) -> dict[str, Any]:
     project_root = Path(req.project_root)
     file_path = Path(req.file_path)
@@ -651,41 +1150,347 @@ def _run_batch_request(req: BatchExpansionRequest) -> dict[str, Any]:
             if not isinstance(cur, TacticState):
                 break
             cur = dojo.run_tac(cur, tac)
-        kind = type(cur).__name__
-        payload: dict[str, Any] = {"result_kind": kind, "traces": [t.__dict__ for t in dojo.get_step_traces()]}
-        if isinstance(cur, TacticState):
-            payload["state_pp"] = cur.pp
-            payload["state_id"] = cur.id
-        elif isinstance(cur, LeanError):
-            payload["error"] = cur.error
-        return payload
+        return _batch_payload(cur, dojo.get_step_traces())
+
+
+# ── Persistent worker pool ────────────────────────────────────────────────────
+
+_WORKER_MAX_OPEN_DOJOS = 8
+# Proof states kept per open dojo; least recently used prefixes go first.
+_WORKER_MAX_PREFIXES = int(os.environ.get("DESOL_DOJO_WORKER_MAX_PREFIXES", "256") or 256)
+
+
+@dataclass
+class _OpenDojo:
+    dojo: REPLDojo
+    source: str
+    # Tactic prefix → (state reached, traces along that prefix). Only REPL
+    # dojos reuse these; lake dojos replay prefixes through the result cache.
+    prefixes: dict[tuple[str, ...], tuple[TacticState, list[StepTrace]]]
+
+
+def _trim_prefixes(prefixes: dict[tuple[str, ...], Any]) -> None:
+    """Drop least recently used prefixes past the cap; the root state stays."""
+    while len(prefixes) > max(1, _WORKER_MAX_PREFIXES):
+        oldest = next(k for k in prefixes if k)
+        del prefixes[oldest]
+
+
+class _WorkerState:
+    """Per-process dojo state: one warm REPL per project, open dojos per theorem."""
+
+    def __init__(self, backend: str | None) -> None:
+        self.backend = backend
+        self._servers: dict[str, Any] = {}
+        self._dojos: dict[tuple[str, str, str], _OpenDojo] = {}
+
+    def _server(self, project_root: Path) -> Any:
+        backend = (self.backend or os.environ.get("DESOL_DOJO_BACKEND", "") or "lake").strip().lower()
+        if backend == "lake":
+            return None
+        root = str(project_root)
+        if root not in self._servers:
+            from lean_repl_server import LeanREPLServer, repl_server_available
+
+            server = None
+            if backend == "repl" or (
+                os.environ.get("DESOL_FORCE_REPL_DOJO", "0") != "1"
+                and repl_server_available(project_root)
+            ):
+                server = LeanREPLServer(project_root=project_root)
+                try:
+                    server.start()
+                except Exception:
+                    if backend == "repl":
+                        raise
+                    server = None
+            self._servers[root] = server
+        return self._servers[root]
+
+    def _drop(self, key: tuple[str, str, str]) -> None:
+        entry = self._dojos.pop(key, None)
+        if entry is not None:
+            entry.dojo.__exit__(None, None, None)
+
+    def _open(self, req: BatchExpansionRequest) -> _OpenDojo:
+        key = (req.project_root, req.file_path, req.theorem_name)
+        project_root = Path(req.project_root)
+        source = (project_root / req.file_path).read_text()
+        entry = self._dojos.get(key)
+        if entry is not None and entry.source != source:
+            self._drop(key)
+            entry = None
+        if entry is None:
+            dojo = REPLDojo(
+                project_root=project_root,
+                file_path=Path(req.file_path),
+                theorem_name=req.theorem_name,
+                timeout=int(req.timeout),
+                backend=self.backend,
+                repl_server=self._server(project_root),
+            )
+            _, state = dojo.__enter__()
+            entry = _OpenDojo(dojo=dojo, source=source, prefixes={(): (state, [])})
+            while len(self._dojos) >= _WORKER_MAX_OPEN_DOJOS:
+                self._drop(next(iter(self._dojos)))
+        else:
+            del self._dojos[key]
+        self._dojos[key] = entry
+        return entry
+
+    def run(self, req: BatchExpansionRequest) -> dict[str, Any]:
+        try:
+            entry = self._open(req)
+            dojo = entry.dojo
+            tactics = tuple(req.tactics)
+            start = 0
+            if dojo._repl is not None:
+                start = next(i for i in range(len(tactics), -1, -1) if tactics[:i] in entry.prefixes)
+            if start:
+                entry.prefixes[tactics[:start]] = entry.prefixes.pop(tactics[:start])
+            state, traces = entry.prefixes[tactics[:start]]
+            cur: Union[TacticState, ProofFinished, LeanError, ProofGivenUp] = state
+            traces = list(traces)
+            for i in range(start, len(tactics)):
+                if not isinstance(cur, TacticState):
+                    break
+                seen = len(dojo._traces)
+                cur = dojo.run_tac(cur, tactics[i])
+                traces.extend(dojo._traces[seen:])
+                if isinstance(cur, TacticState) and dojo._repl is not None:
+                    entry.prefixes[tactics[: i + 1]] = (cur, list(traces))
+                    _trim_prefixes(entry.prefixes)
+            return _batch_payload(cur, traces)
+        except Exception:
+            # A dojo (or its REPL) in an unknown state is not worth keeping
+            # warm; start the project over on the next request.
+            self._reset_project(req.project_root)
+            raise
+
+    def _reset_project(self, project_root: str) -> None:
+        for key in [k for k in self._dojos if k[0] == project_root]:
+            try:
+                self._drop(key)
+            except Exception:
+                self._dojos.pop(key, None)
+        server = self._servers.pop(str(Path(project_root)), None)
+        if server is not None:
+            server.stop()
+
+    def close(self) -> None:
+        for key in list(self._dojos):
+            try:
+                self._drop(key)
+            except Exception:
+                pass
+        for server in self._servers.values():
+            if server is not None:
+                server.stop()
+        self._servers.clear()
+
+
+def _worker_main(conn: Any, backend: str | None) -> None:
+    """Serve ``("run", request)`` / ``("ping", None)`` messages until stopped."""
+    state = _WorkerState(backend)
+    try:
+        while True:
+            try:
+                op, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            if op == "stop":
+                break
+            if op == "ping":
+                conn.send(("pong", os.getpid()))
+                continue
+            try:
+                out = state.run(payload)
+            except Exception as exc:
+                out = {"result_kind": "LeanError", "error": str(exc), "traces": []}
+            conn.send(("result", out))
+    finally:
+        state.close()
+
+
+class _DojoWorker:
+    """One long-lived worker process and the parent's end of its pipe."""
+
+    def __init__(self, backend: str | None, ctx: Any) -> None:
+        self.backend = backend
+        self.ctx = ctx
+        self.process: Any = None
+        self.conn: Any = None
+        self.restarts = 0
+
+    def start(self) -> None:
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main, args=(child_conn, self.backend), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self, *, kill: bool = False) -> None:
+        if self.process is None:
+            return
+        try:
+            if not kill and self.process.is_alive():
+                self.conn.send(("stop", None))
+                self.process.join(timeout=5)
+        except (OSError, ValueError):
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def restart(self) -> None:
+        self.stop(kill=True)
+        self.restarts += 1
+        self.start()
+
+    def call(self, op: str, payload: Any, timeout: float) -> Any:
+        """Send one message and wait for its reply; raise on crash or timeout."""
+        if not self.alive():
+            self.restart()
+        self.conn.send((op, payload))
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"dojo worker did not answer within {timeout:.0f}s")
+        return self.conn.recv()[1]
 
 
 class REPLDojoWorkerPool:
-    """Process-isolated worker pool for batched tactic expansions."""
+    """Long-lived worker processes for batched tactic expansions.
+
+    Each worker keeps its dojos (and, for the REPL backends, one warm Lean
+    REPL per project) open across batches. Requests are routed by
+    ``(file_path, theorem_name)`` so a theorem always lands on the worker
+    that already holds its proof states; a REPL worker resumes from the
+    deepest tactic prefix it has already applied. Workers that crash, hang
+    past a request's timeout or fail :meth:`health_check` are restarted.
 
-    def __init__(self, max_workers: int = 2) -> None:
+    Workers are spawned (not forked) by default: restarts happen from the
+    pool's dispatch threads, where forking is unsafe.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        *,
+        backend: str | None = None,
+        mp_context: str = "spawn",
+    ) -> None:
         self.max_workers = max(1, int(max_workers))
+        self.backend = backend
+        self._ctx = mp.get_context(mp_context)
+        self._workers: list[_DojoWorker] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if not self._workers:
+            self._workers = [_DojoWorker(self.backend, self._ctx) for _ in range(self.max_workers)]
+            for worker in self._workers:
+                worker.start()
+
+    def _worker_index(self, req: BatchExpansionRequest) -> int:
+        raw = f"{Path(req.project_root).resolve()}\0{req.file_path}\0{req.theorem_name}"
+        return zlib.crc32(raw.encode("utf-8")) % self.max_workers
 
     def run_batch(self, requests: list[BatchExpansionRequest]) -> list[dict[str, Any]]:
         if not requests:
             return []
         out: list[dict[str, Any]] = [dict() for _ in requests]
-        with ProcessPoolExecutor(max_workers=self.max_workers) as ex:
-            fut_map = {ex.submit(_run_batch_request, req): i for i, req in enumerate(requests)}
-            for fut in as_completed(fut_map):
-                idx = fut_map[fut]
-                try:
-                    out[idx] = fut.result(timeout=max(1, requests[idx].timeout + 5))
-                except Exception as exc:
-                    out[idx] = {"result_kind": "LeanError", "error": str(exc), "traces": []}
+        queues: dict[int, list[int]] = {}
+        for idx, req in enumerate(requests):
+            queues.setdefault(self._worker_index(req), []).append(idx)
+        with self._lock:
+            self._ensure_started()
+            # Workers run their queues concurrently; each queue is served in order.
+            with ThreadPoolExecutor(max_workers=len(queues)) as ex:
+                futs = [
+                    ex.submit(self._drain, self._workers[w], [requests[i] for i in idxs])
+                    for w, idxs in queues.items()
+                ]
+                for idxs, fut in zip(queues.values(), futs):
+                    for i, payload in zip(idxs, fut.result()):
+                        out[i] = payload
         return out
 
+    @staticmethod
+    def _drain(worker: _DojoWorker, reqs: list[BatchExpansionRequest]) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        for req in reqs:
+            try:
+                results.append(worker.call("run", req, timeout=max(1, req.timeout + 5)))
+            except Exception as exc:
+                worker.restart()
+                results.append({"result_kind": "LeanError", "error": str(exc), "traces": []})
+        return results
+
+    def health_check(self, timeout: float = 10.0) -> list[bool]:
+        """Ping every worker, restarting the ones that do not answer."""
+        healthy: list[bool] = []
+        with self._lock:
+            self._ensure_started()
+            for worker in self._workers:
+                try:
+                    worker.call("ping", None, timeout=timeout)
+                    healthy.append(True)
+                except Exception:
+                    worker.restart()
+                    healthy.append(False)
+        return healthy
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+
+    def __enter__(self) -> "REPLDojoWorkerPool":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+_SHARED_POOLS: dict[tuple[int, str | None], REPLDojoWorkerPool] = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def close_shared_pools() -> None:
+    """Stop every pool started by :func:`expand_tactics_batch` (also run at exit)."""
+    with _SHARED_POOLS_LOCK:
+        pools = list(_SHARED_POOLS.values())
+        _SHARED_POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_shared_pools)
+
 
 def expand_tactics_batch(
     requests: list[BatchExpansionRequest],
     *,
     max_workers: int = 2,
+    backend: str | None = None,
 ) -> list[dict[str, Any]]:
-    pool = REPLDojoWorkerPool(max_workers=max_workers)
+    """Run requests on a process-wide pool that stays warm between calls.
+
+    REPL workers open proof states on the file prefix before the theorem
+    (see :meth:`REPLDojo._open_repl_state`). Pools live until
+    :func:`close_shared_pools` or interpreter exit.
+    """
+    key = (max(1, int(max_workers)), backend)
+    with _SHARED_POOLS_LOCK:
+        pool = _SHARED_POOLS.get(key)
+        if pool is None:
+            pool = _SHARED_POOLS[key] = REPLDojoWorkerPool(max_workers=max_workers, backend=backend)
     return pool.run_batch(requests)
@@ -22,10 +22,18 @@ Usage:
             print("remaining goals:", result.goals)
         elif isinstance(result, LeanError):
             print("error:", result.error)
+
+AsyncLeanREPLServer offers the same API as coroutines over asyncio
+subprocess streams, with pipelined commands so one event loop can keep
+many REPL processes busy at once. It has no production caller yet: proof
+search still drives the threaded :class:`LeanREPLServer`.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import itertools
 import json
 import os
 import re
@@ -33,6 +41,7 @@ import select
 import subprocess
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, Union
@@ -63,6 +72,9 @@ class ProofFinished:
 @dataclass(frozen=True)
 class LeanError:
     error: str
+    # True when the REPL, not Lean, failed (timeout, restart, lost proof
+    # state): the same tactic may well succeed on a healthy process.
+    transient: bool = False
 
 
 TacticResult = Union[TacticState, ProofFinished, LeanError]
@@ -100,6 +112,260 @@ def _extract_json_message(buffer: str) -> tuple[dict | None, str]:
     return None, buffer[-4096:]
 
 
+class _JSONFramer:
+    """Incremental splitter for the REPL's stream of JSON objects.
+
+    ``feed`` scans each character of new input once, tracking brace depth
+    and string/escape state across chunks, and returns every object whose
+    closing brace has arrived. Text outside an object (lake build chatter,
+    blank separator lines) is discarded. This replaces re-running
+    ``raw_decode`` over an ever-growing buffer on every chunk.
+
+    A stray ``{`` in non-JSON chatter would leave the depth counter stuck, so
+    a blank line inside an open object (which valid REPL output never
+    contains) hands that segment to :func:`_extract_json_message` to salvage
+    any real object and resets the scanner.
+    """
+
+    def __init__(self) -> None:
+        self._buf: list[str] = []  # pieces of the object currently open
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+        self._prev_nl = False
+
+    def _reset(self) -> None:
+        self._buf.clear()
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        out: list[dict] = []
+        start = 0 if self._depth else -1
+        for i, ch in enumerate(chunk):
+            blank_line = ch == "\n" and self._prev_nl
+            if ch != "\r":
+                self._prev_nl = ch == "\n"
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    start = i
+                continue
+            if blank_line:
+                salvage = "".join(self._buf) + chunk[start:i]
+                self._reset()
+                start = -1
+                while True:
+                    obj, salvage = _extract_json_message(salvage)
+                    if obj is None:
+                        break
+                    if isinstance(obj, dict):
+                        out.append(obj)
+                continue
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buf.append(chunk[start:i + 1])
+                    text = "".join(self._buf)
+                    self._reset()
+                    start = -1
+                    try:
+                        obj = json.loads(text)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(obj, dict):
+                        out.append(obj)
+        if self._depth and start >= 0:
+            self._buf.append(chunk[start:])
+        return out
+
+
+_TMP_NAME_SEQ = itertools.count()
+
+
+def _sorry_stub_statement(theorem_statement: str) -> str:
+    """Rewrite a theorem statement into a uniquely-named ``:= by sorry`` stub."""
+    stmt = theorem_statement.rstrip()
+    # Strip any existing body (handles `:= by ...`, `:= sorry`, `:=`) and add sorry stub
+    stmt = re.sub(r":=\s*by\b.*$", "", stmt, flags=re.DOTALL).strip()
+    stmt = re.sub(r":=\s*sorry\s*$", "", stmt, flags=re.DOTALL).strip()
+    stmt = re.sub(r":=\s*$", "", stmt).strip()
+    # Avoid redeclaration collisions when the theorem already exists in loaded env.
+    tmp_name = f"__desol_tmp_{int(time.time() * 1000)}_{next(_TMP_NAME_SEQ)}"
+    stmt = re.sub(
+        r"^\s*(theorem|lemma)\s+([^\s(:=]+)",
+        lambda m: f"{m.group(1)} {tmp_name}",
+        stmt,
+        count=1,
+        flags=re.MULTILINE,
+    )
+    return stmt + " := by\n  sorry"
+
+
+def _proof_state_from_stub(resp: dict) -> Union[int, LeanError]:
+    """Pull the initial proof state out of a sorry-stub elaboration response."""
+    msgs = resp.get("messages", [])
+    # Check for errors unrelated to sorry
+    real_errors = [
+        m for m in msgs
+        if m.get("severity") == "error"
+        and "declaration uses 'sorry'" not in m.get("data", "")
+    ]
+    if real_errors:
+        return LeanError(real_errors[0].get("data", str(real_errors[0])))
+
+    sorries = resp.get("sorries", [])
+    if not sorries:
+        # Proof might be trivially closed by sorry (no goals)
+        return LeanError("No proof state returned — statement may be ill-typed")
+    return sorries[0]["proofState"]
+
+
+def _tactic_result(resp: dict) -> TacticResult:
+    """Map a ``{"tactic": ..., "proofState": N}`` response to a TacticResult."""
+    # Error: no proofState in response, or explicit message
+    if "proofState" not in resp:
+        msg = resp.get("message", str(resp))
+        # Ids from before a REPL restart no longer exist in the new process.
+        return LeanError(msg, transient=str(msg).lower().startswith("unknown proof state"))
+
+    # Check messages for tactic errors
+    msgs = resp.get("messages", [])
+    errors = [m for m in msgs if m.get("severity") == "error"]
+    if errors:
+        return LeanError(errors[0].get("data", str(errors[0])))
+
+    new_ps_id = resp["proofState"]
+    goals: list[str] = resp.get("goals", [])
+
+    if not goals:
+        return ProofFinished(proof_state_id=new_ps_id)
+    return TacticState(goals=goals, proof_state_id=new_ps_id)
+
+
+def _repl_command(project_root: Path) -> list[str]:
+    """Resolve the repl executable — direct path only, no probe calls."""
+    # Direct binary inside .lake/packages (built by `lake build repl`)
+    direct = project_root / ".lake" / "packages" / "repl" / ".lake" / "build" / "bin" / "repl"
+    if direct.exists():
+        return ["lake", "env", str(direct)]
+    # Fallback: lake exe repl (slower but more portable)
+    return ["lake", "exe", "repl"]
+
+
+def _repl_proc_env(extra: Optional[dict[str, str]]) -> dict:
+    proc_env = os.environ.copy()
+    proc_env["PATH"] = str(Path.home() / ".elan" / "bin") + ":" + proc_env.get("PATH", "")
+    if extra:
+        proc_env.update(extra)
+    proc_env.pop("DESOL_FORCE_REPL_DOJO", None)
+    return proc_env
+
+
+# ── env snapshots ────────────────────────────────────────────────────────────
+#
+# Loading an anchor file (``import Mathlib`` + paper-theory modules) costs ~5s
+# per REPL process. The REPL can pickle an env to an .olean and unpickle it
+# in a fresh process, so after the first cold load we save the anchor env
+# and later processes restore it instead of re-elaborating the anchor.
+# Snapshots are keyed on everything that can change the env: the lake
+# manifest (Mathlib pin), the toolchain, the anchor text and the built
+# oleans of every project module the anchor imports.
+
+_UPSTREAM_MODULE_ROOTS = frozenset({
+    "Aesop", "Batteries", "ImportGraph", "Init", "Lean", "LeanSearchClient",
+    "Mathlib", "Plausible", "ProofWidgets", "Qq", "Std",
+})
+
+
+def _module_fingerprint(project_root: Path, module: str) -> bytes:
+    rel = Path(*module.split("."))
+    for base in (".lake/build/lib/lean", ".lake/build/lib"):
+        olean = project_root / base / rel.with_suffix(".olean")
+        if olean.exists():
+            return hashlib.sha256(olean.read_bytes()).digest()
+    src = project_root / rel.with_suffix(".lean")
+    if src.exists():
+        return hashlib.sha256(src.read_bytes()).digest()
+    return b"missing"
+
+
+def repl_env_snapshot_key(project_root: Path, anchor_file: str) -> Optional[str]:
+    """Content key for the env produced by loading ``anchor_file``.
+
+    Returns None when the anchor does not exist.
+    """
+    project_root = Path(project_root)
+    anchor = project_root / anchor_file
+    if not anchor.exists():
+        return None
+    h = hashlib.sha256()
+    for name in ("lake-manifest.json", "lean-toolchain"):
+        path = project_root / name
+        h.update(name.encode("utf-8"))
+        h.update(path.read_bytes() if path.exists() else b"")
+    text = anchor.read_text(encoding="utf-8", errors="replace")
+    h.update(text.encode("utf-8"))
+    for module in re.findall(r"^\s*import\s+([\w.]+)", text, flags=re.MULTILINE):
+        if module.split(".")[0] in _UPSTREAM_MODULE_ROOTS:
+            continue
+        h.update(module.encode("utf-8"))
+        h.update(_module_fingerprint(project_root, module))
+    return h.hexdigest()
+
+
+def repl_env_snapshot_path(project_root: Path, anchor_file: str) -> Optional[Path]:
+    """Where the env snapshot for ``anchor_file`` lives, or None when disabled.
+
+    Set ``DESOL_REPL_ENV_SNAPSHOTS=0`` to disable snapshots and
+    ``DESOL_REPL_ENV_SNAPSHOT_DIR`` to move them out of ``.lake/``.
+    """
+    if os.environ.get("DESOL_REPL_ENV_SNAPSHOTS", "1").strip() == "0":
+        return None
+    key = repl_env_snapshot_key(project_root, anchor_file)
+    if key is None:
+        return None
+    override = os.environ.get("DESOL_REPL_ENV_SNAPSHOT_DIR", "").strip()
+    root = Path(override) if override else Path(project_root) / ".lake" / "desol_repl_env"
+    if not root.is_absolute():
+        root = Path(project_root) / root
+    return root / f"{Path(anchor_file).stem}-{key[:20]}.olean"
+
+
+def _repl_ok(resp: dict) -> bool:
+    return isinstance(resp, dict) and "message" not in resp and not any(
+        m.get("severity") == "error" for m in resp.get("messages", [])
+    )
+
+
+def _snapshot_restored(resp: dict) -> bool:
+    return _repl_ok(resp) and "env" in resp
+
+
+def _snapshot_tmp_path(snapshot: Path) -> Path:
+    return snapshot.with_name(f"{snapshot.name}.{os.getpid()}.{next(_TMP_NAME_SEQ)}.tmp")
+
+
+def _commit_snapshot(tmp: Path, snapshot: Path, resp: dict) -> None:
+    """Atomically publish a freshly pickled env; drop it on any failure."""
+    if _repl_ok(resp) and tmp.exists():
+        os.replace(tmp, snapshot)
+    else:
+        tmp.unlink(missing_ok=True)
+
+
 # ── REPL server ───────────────────────────────────────────────────────────────
 
 class LeanREPLServer:
@@ -118,6 +384,7 @@ class LeanREPLServer:
         self._seq = 0          # monotone counter for matching responses
         self._env_id = 0       # current Lean environment index
         self._lock = threading.Lock()
+        self.restarts = 0      # proof-state ids from before a restart are gone
 
     # ── lifecycle ─────────────────────────────────────────────────────────────
 
@@ -129,21 +396,10 @@ class LeanREPLServer:
         self.stop()
 
     def _repl_binary(self) -> list[str]:
-        """Resolve the repl executable — direct path only, no probe calls."""
-        # Direct binary inside .lake/packages (built by `lake build repl`)
-        direct = self.project_root / ".lake" / "packages" / "repl" / ".lake" / "build" / "bin" / "repl"
-        if direct.exists():
-            return ["lake", "env", str(direct)]
-        # Fallback: lake exe repl (slower but more portable)
-        return ["lake", "exe", "repl"]
+        return _repl_command(self.project_root)
 
     def _proc_env(self) -> dict:
-        proc_env = os.environ.copy()
-        proc_env["PATH"] = str(Path.home() / ".elan" / "bin") + ":" + proc_env.get("PATH", "")
-        if self._env:
-            proc_env.update(self._env)
-        proc_env.pop("DESOL_FORCE_REPL_DOJO", None)
-        return proc_env
+        return _repl_proc_env(self._env)
 
     def start(self) -> None:
         if self._proc is not None:
@@ -189,6 +445,7 @@ class LeanREPLServer:
     def restart(self) -> None:
         self.stop()
         self.start()
+        self.restarts += 1
 
     # ── low-level send/recv ───────────────────────────────────────────────────
 
@@ -211,6 +468,7 @@ class LeanREPLServer:
                     continue
                 raise TimeoutError(f"REPL write failed: {last_err}")
 
+            framer = _JSONFramer()
             out_buf = ""
             err_buf = ""
             while time.monotonic() < deadline:
@@ -234,9 +492,9 @@ class LeanREPLServer:
                         except BlockingIOError:
                             raw = b""
                         if raw:
-                            out_buf += raw.decode("utf-8", errors="replace")
-                            obj, out_buf = _extract_json_message(out_buf)
-                            if obj is not None:
+                            text = raw.decode("utf-8", errors="replace")
+                            out_buf = (out_buf + text)[-4096:]
+                            for obj in framer.feed(text):
                                 return obj
                     elif stream is self._proc.stderr and self._proc.stderr is not None:
                         try:
@@ -247,9 +505,6 @@ class LeanREPLServer:
                             err_buf += raw.decode("utf-8", errors="replace")
 
             if out_buf.strip():
-                obj, _ = _extract_json_message(out_buf)
-                if obj is not None:
-                    return obj
                 last_err = f"invalid/non-json payload from REPL stdout: {out_buf.strip()[-220:]}"
             else:
                 last_err = "empty response from REPL"
@@ -294,6 +549,34 @@ class LeanREPLServer:
             self._env_id = resp["env"]
         return resp
 
+    def load_anchor(self, anchor_file: str = "Desol/ReplAnchor.lean") -> dict:
+        """Load ``anchor_file`` and return the REPL response carrying its env.
+
+        Restores a matching env snapshot (see :func:`repl_env_snapshot_path`)
+        instead of elaborating the anchor when one exists, and writes one
+        after a clean cold load. The returned dict has the same shape as the
+        response to ``{"path": anchor_file}``.
+        """
+        snapshot = repl_env_snapshot_path(self.project_root, anchor_file)
+        if snapshot is not None and snapshot.exists():
+            try:
+                resp = self._send({"unpickleEnvFrom": str(snapshot)})
+            except TimeoutError:
+                resp = {}
+            if _snapshot_restored(resp):
+                return resp
+            snapshot.unlink(missing_ok=True)
+        resp = self._send({"path": anchor_file, "allTactics": False})
+        if snapshot is not None and _snapshot_restored(resp):
+            tmp = _snapshot_tmp_path(snapshot)
+            try:
+                snapshot.parent.mkdir(parents=True, exist_ok=True)
+                pickled = self._send({"pickleTo": str(tmp), "env": resp["env"]})
+                _commit_snapshot(tmp, snapshot, pickled)
+            except Exception:
+                tmp.unlink(missing_ok=True)
+        return resp
+
     def ensure_mathlib_imported(self, anchor_file: str = "Desol/ReplAnchor.lean") -> Union[int, LeanError]:
         """Load a project file to get an env with Mathlib already elaborated.
 
@@ -303,7 +586,7 @@ class LeanREPLServer:
         """
         if self._env_id > 0:
             return self._env_id
-        resp = self._send({"path": anchor_file, "allTactics": False})
+        resp = self.load_anchor(anchor_file)
         msgs = resp.get("messages", [])
         errors = [m for m in msgs if m.get("severity") == "error" and "sorry" not in m.get("data", "")]
         if errors:
@@ -322,21 +605,7 @@ class LeanREPLServer:
         if isinstance(env_or_err, LeanError):
             return env_or_err
 
-        stmt = theorem_statement.rstrip()
-        # Strip any existing body (handles `:= by ...`, `:= sorry`, `:=`) and add sorry stub
-        stmt = re.sub(r":=\s*by\b.*$", "", stmt, flags=re.DOTALL).strip()
-        stmt = re.sub(r":=\s*sorry\s*$", "", stmt, flags=re.DOTALL).strip()
-        stmt = re.sub(r":=\s*$", "", stmt).strip()
-        # Avoid redeclaration collisions when the theorem already exists in loaded env.
-        tmp_name = f"__desol_tmp_{int(time.time() * 1000)}"
-        stmt = re.sub(
-            r"^\s*(theorem|lemma)\s+([^\s(:=]+)",
-            lambda m: f"{m.group(1)} {tmp_name}",
-            stmt,
-            count=1,
-            flags=re.MULTILINE,
-        )
-        stmt_with_sorry = stmt + " := by\n  sorry"
+        stmt_with_sorry = _sorry_stub_statement(theorem_statement)
 
         try:
             resp = self.elaborate(stmt_with_sorry, env=self._env_id)
@@ -351,21 +620,7 @@ class LeanREPLServer:
                 resp = self.elaborate(stmt_with_sorry, env=self._env_id)
             except TimeoutError:
                 return LeanError(str(exc))
-        msgs = resp.get("messages", [])
-        # Check for errors unrelated to sorry
-        real_errors = [
-            m for m in msgs
-            if m.get("severity") == "error"
-            and "declaration uses 'sorry'" not in m.get("data", "")
-        ]
-        if real_errors:
-            return LeanError(real_errors[0].get("data", str(real_errors[0])))
-
-        sorries = resp.get("sorries", [])
-        if not sorries:
-            # Proof might be trivially closed by sorry (no goals)
-            return LeanError("No proof state returned — statement may be ill-typed")
-        return sorries[0]["proofState"]
+        return _proof_state_from_stub(resp)
 
     def run_tac(self, proof_state_id: int, tactic: str) -> TacticResult:
         """Apply a tactic to proof_state_id.  Returns TacticState, ProofFinished, or LeanError.
@@ -379,25 +634,9 @@ class LeanREPLServer:
         try:
             resp = self._send({"tactic": tactic, "proofState": proof_state_id})
         except TimeoutError as exc:
-            return LeanError(str(exc))
-
-        # Error: no proofState in response, or explicit message
-        if "proofState" not in resp:
-            msg = resp.get("message", str(resp))
-            return LeanError(msg)
+            return LeanError(str(exc), transient=True)
 
-        # Check messages for tactic errors
-        msgs = resp.get("messages", [])
-        errors = [m for m in msgs if m.get("severity") == "error"]
-        if errors:
-            return LeanError(errors[0].get("data", str(errors[0])))
-
-        new_ps_id = resp["proofState"]
-        goals: list[str] = resp.get("goals", [])
-
-        if not goals:
-            return ProofFinished(proof_state_id=new_ps_id)
-        return TacticState(goals=goals, proof_state_id=new_ps_id)
+        return _tactic_result(resp)
 
     def run_tac_sequence(self, proof_state_id: int, tactics: list[str]) -> TacticResult:
         """Apply a sequence of tactics, stopping at the first error or ProofFinished."""
@@ -470,6 +709,332 @@ class _DojoAdapter:
         return self._server.run_tac(state.proof_state_id, tactic)
 
 
+# ── asyncio REPL server ───────────────────────────────────────────────────────
+
+class AsyncLeanREPLServer:
+    """Persistent Lean REPL process driven by asyncio subprocess streams.
+
+    Same protocol and high-level API as :class:`LeanREPLServer`, but every
+    call is a coroutine and commands are pipelined: :meth:`send` writes the
+    request immediately and awaits a future, while one reader task frames
+    stdout with :class:`_JSONFramer` and resolves futures in FIFO order (the
+    REPL answers commands in the order it reads them). Many coroutines can
+    therefore share one process, and one event loop can drive many
+    processes without a thread each::
+
+        async with AsyncLeanREPLServer(project_root=root) as server:
+            ps = await server.start_proof("theorem foo (n : Nat) : n + 0 = n")
+            results = await asyncio.gather(
+                *(server.run_tac(ps, t) for t in ("omega", "simp", "rfl"))
+            )
+
+    A command that exceeds ``timeout`` wedges the queue behind it, so the
+    process is restarted and every in-flight command fails with
+    ``TimeoutError``; env and proof-state ids from before the restart are
+    no longer valid.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        timeout: float = 120.0,
+        env: Optional[dict[str, str]] = None,
+    ):
+        self.project_root = Path(project_root)
+        self.timeout = timeout
+        self._env = env
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._env_id = 0
+        self._pending: deque[asyncio.Future] = deque()
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._lifecycle_lock: Optional[asyncio.Lock] = None
+        self._import_lock: Optional[asyncio.Lock] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._stderr_reader: Optional[asyncio.Task] = None
+        self._stderr_tail = ""
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+
+    async def __aenter__(self) -> "AsyncLeanREPLServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    def _repl_binary(self) -> list[str]:
+        return _repl_command(self.project_root)
+
+    def _proc_env(self) -> dict:
+        return _repl_proc_env(self._env)
+
+    def _locks(self) -> tuple[asyncio.Lock, asyncio.Lock]:
+        # Created lazily so the server can be constructed outside a loop.
+        if self._write_lock is None or self._lifecycle_lock is None or self._import_lock is None:
+            self._write_lock = asyncio.Lock()
+            self._lifecycle_lock = asyncio.Lock()
+            self._import_lock = asyncio.Lock()
+        return self._write_lock, self._lifecycle_lock
+
+    @property
+    def pending(self) -> int:
+        """Number of commands written but not yet answered."""
+        return len(self._pending)
+
+    async def start(self) -> None:
+        _, lifecycle = self._locks()
+        async with lifecycle:
+            await self._start_locked()
+
+    async def _start_locked(self) -> None:
+        if self._proc is not None:
+            return
+        cmd = self._repl_binary()
+        self._stderr_tail = ""
+        self._proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(self.project_root),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._proc_env(),
+        )
+        self._reader = asyncio.create_task(self._read_stdout(self._proc))
+        self._stderr_reader = asyncio.create_task(self._read_stderr(self._proc))
+        # The repl prints nothing on startup — just wait briefly
+        await asyncio.sleep(0.3)
+        if self._proc.returncode is not None:
+            stderr = self._stderr_tail
+            await self._stop_locked()
+            raise RuntimeError(f"REPL process died on startup: {stderr[:400]}")
+
+    async def stop(self) -> None:
+        _, lifecycle = self._locks()
+        async with lifecycle:
+            await self._stop_locked()
+
+    async def _stop_locked(
+        self, reason: Optional[BaseException] = None, *, kill: bool = False
+    ) -> None:
+        proc, self._proc = self._proc, None
+        self._env_id = 0
+        self._fail_pending(reason or ConnectionResetError("REPL stopped"))
+        if proc is None:
+            return
+        if kill and proc.returncode is None:
+            # A wedged elaboration ignores stdin EOF; don't wait it out.
+            proc.kill()
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+        for task in (self._reader, self._stderr_reader):
+            if task is not None and not task.done():
+                task.cancel()
+        self._reader = self._stderr_reader = None
+
+    async def restart(self) -> None:
+        _, lifecycle = self._locks()
+        async with lifecycle:
+            await self._stop_locked()
+            await self._start_locked()
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        while self._pending:
+            fut = self._pending.popleft()
+            if not fut.done():
+                fut.set_exception(exc)
+
+    # ── stream readers ────────────────────────────────────────────────────────
+
+    async def _read_stdout(self, proc: asyncio.subprocess.Process) -> None:
+        assert proc.stdout is not None
+        framer = _JSONFramer()
+        while True:
+            raw = await proc.stdout.read(65536)
+            if not raw:
+                break
+            for obj in framer.feed(raw.decode("utf-8", errors="replace")):
+                while self._pending:
+                    fut = self._pending.popleft()
+                    if not fut.done():
+                        fut.set_result(obj)
+                        break
+        if proc is self._proc:
+            tail = self._stderr_tail.strip()[-220:]
+            self._fail_pending(ConnectionResetError(
+                f"REPL exited with pending commands{f'; stderr: {tail}' if tail else ''}"
+            ))
+
+    async def _read_stderr(self, proc: asyncio.subprocess.Process) -> None:
+        assert proc.stderr is not None
+        while True:
+            raw = await proc.stderr.read(65536)
+            if not raw:
+                return
+            text = raw.decode("utf-8", errors="replace")
+            self._stderr_tail = (self._stderr_tail + text)[-4096:]
+
+    # ── low-level send/recv ───────────────────────────────────────────────────
+
+    async def send(self, payload: dict) -> dict:
+        """Send one JSON command and await its response.
+
+        Safe to call concurrently; commands are queued on the REPL's stdin in
+        call order and each caller receives its own response.
+        """
+        write_lock, _ = self._locks()
+        await self._ensure_running()
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        async with write_lock:
+            proc = self._proc
+            if proc is None or proc.stdin is None:
+                raise ConnectionResetError("REPL is not running")
+            # Enqueue before writing so the reader can never see a response
+            # without a waiting future.
+            self._pending.append(fut)
+            try:
+                proc.stdin.write((json.dumps(payload) + "\n\n").encode("utf-8"))
+                await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as exc:
+                await self._restart_if_current(proc, exc)
+                raise TimeoutError(f"REPL write failed: {exc}") from exc
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # FIFO matching means the late response would be handed to the
+            # next caller — restart to resynchronise.
+            await self._restart_if_current(
+                proc, TimeoutError(f"REPL restarted after a {self.timeout}s timeout")
+            )
+            raise TimeoutError(f"REPL did not respond within {self.timeout}s") from None
+
+    async def _ensure_running(self) -> None:
+        _, lifecycle = self._locks()
+        async with lifecycle:
+            if self._proc is not None and self._proc.returncode is not None:
+                await self._stop_locked()
+            await self._start_locked()
+
+    async def _restart_if_current(
+        self, proc: asyncio.subprocess.Process, reason: BaseException
+    ) -> None:
+        """Restart unless another caller already replaced ``proc``."""
+        _, lifecycle = self._locks()
+        async with lifecycle:
+            if self._proc is proc:
+                await self._stop_locked(reason, kill=True)
+                await self._start_locked()
+
+    # ── high-level API ────────────────────────────────────────────────────────
+
+    async def elaborate(self, cmd: str, env: Optional[int] = None) -> dict:
+        """Elaborate a Lean command (see :meth:`LeanREPLServer.elaborate`)."""
+        payload: dict = {"cmd": cmd}
+        if env is not None:
+            payload["env"] = env
+        elif not cmd.strip().startswith("import") and self._env_id > 0:
+            payload["env"] = self._env_id
+
+        resp = await self.send(payload)
+        msgs = resp.get("messages", [])
+        errors = [m for m in msgs if m.get("severity") == "error"]
+        if not errors and "env" in resp:
+            self._env_id = resp["env"]
+        return resp
+
+    async def load_anchor(self, anchor_file: str = "Desol/ReplAnchor.lean") -> dict:
+        """Load ``anchor_file``, reusing an env snapshot (see :meth:`LeanREPLServer.load_anchor`)."""
+        snapshot = repl_env_snapshot_path(self.project_root, anchor_file)
+        if snapshot is not None and snapshot.exists():
+            try:
+                resp = await self.send({"unpickleEnvFrom": str(snapshot)})
+            except (TimeoutError, ConnectionResetError):
+                resp = {}
+            if _snapshot_restored(resp):
+                return resp
+            snapshot.unlink(missing_ok=True)
+        resp = await self.send({"path": anchor_file, "allTactics": False})
+        if snapshot is not None and _snapshot_restored(resp):
+            tmp = _snapshot_tmp_path(snapshot)
+            try:
+                snapshot.parent.mkdir(parents=True, exist_ok=True)
+                pickled = await self.send({"pickleTo": str(tmp), "env": resp["env"]})
+                _commit_snapshot(tmp, snapshot, pickled)
+            except Exception:
+                tmp.unlink(missing_ok=True)
+        return resp
+
+    async def ensure_mathlib_imported(
+        self, anchor_file: str = "Desol/ReplAnchor.lean"
+    ) -> Union[int, LeanError]:
+        """Load a project file to get an env with Mathlib already elaborated.
+
+        Concurrent callers wait for the first load instead of each sending
+        their own.
+        """
+        if self._env_id > 0:
+            return self._env_id
+        self._locks()
+        assert self._import_lock is not None
+        async with self._import_lock:
+            if self._env_id > 0:
+                return self._env_id
+            resp = await self.load_anchor(anchor_file)
+            msgs = resp.get("messages", [])
+            errors = [m for m in msgs if m.get("severity") == "error" and "sorry" not in m.get("data", "")]
+            if errors:
+                return LeanError(errors[0].get("data", str(errors[0])))
+            self._env_id = resp.get("env", 1)
+            return self._env_id
+
+    async def start_proof(self, theorem_statement: str) -> Union[int, LeanError]:
+        """Open a proof using a sorry-stub and return the initial proof state ID."""
+        env_or_err = await self.ensure_mathlib_imported()
+        if isinstance(env_or_err, LeanError):
+            return env_or_err
+        try:
+            resp = await self.send(
+                {"cmd": _sorry_stub_statement(theorem_statement), "env": env_or_err}
+            )
+        except (TimeoutError, ConnectionResetError) as exc:
+            return LeanError(str(exc))
+        return _proof_state_from_stub(resp)
+
+    async def run_tac(self, proof_state_id: int, tactic: str) -> TacticResult:
+        """Apply a tactic to ``proof_state_id``."""
+        try:
+            resp = await self.send({"tactic": tactic.strip(), "proofState": proof_state_id})
+        except (TimeoutError, ConnectionResetError) as exc:
+            return LeanError(str(exc), transient=True)
+        return _tactic_result(resp)
+
+    async def run_tac_sequence(self, proof_state_id: int, tactics: list[str]) -> TacticResult:
+        """Apply a sequence of tactics, stopping at the first error or ProofFinished."""
+        state = proof_state_id
+        result: TacticResult = TacticState(goals=["<unknown>"], proof_state_id=state)
+        for tactic in tactics:
+            result = await self.run_tac(state, tactic)
+            if isinstance(result, (ProofFinished, LeanError)):
+                return result
+            state = result.proof_state_id
+        return result
+
+    async def check_proof(self, theorem_statement: str, tactics: list[str]) -> TacticResult:
+        """Convenience: open proof and apply all tactics."""
+        ps = await self.start_proof(theorem_statement)
+        if isinstance(ps, LeanError):
+            return ps
+        return await self.run_tac_sequence(ps, tactics)
+
+
 # ── Availability check ────────────────────────────────────────────────────────
 
 def repl_server_available(project_root: Path) -> bool:
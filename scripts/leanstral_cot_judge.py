@@ -37,6 +37,7 @@ from dataclasses import dataclass, field
 from typing import Any, Optional
 
 from leanstral_judge import JudgeResult
+from llm_response_cache import LLMCacheMiss
 
 
 _SYSTEM = (
@@ -375,6 +376,9 @@ def _call(*, client: Any, model: str, user: str, api_log_hook: Optional[Any]) ->
             api_log_hook=api_log_hook,
         )
         return (text or "").strip()
+    except LLMCacheMiss:
+        # Offline replay: a miss must not fall through to the live API.
+        raise
     except Exception:
         # Direct fallback (used by tests and when ponder_loop is unavailable).
         response = client.chat.complete(
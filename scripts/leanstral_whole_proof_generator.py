@@ -42,6 +42,8 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+from llm_response_cache import LLMCacheMiss  # noqa: E402
+
 
 DEFAULT_MODEL = os.getenv("MISTRAL_MODEL", "labs-leanstral-2603")
 DEFAULT_MAX_TOKENS = 2400
@@ -409,6 +411,9 @@ def _call(
             api_log_hook=api_log_hook,
         )
         return (text or "").strip()
+    except LLMCacheMiss:
+        # Offline replay: a miss must not fall through to the live API.
+        raise
     except Exception:
         response = client.chat.complete(
             model=model,
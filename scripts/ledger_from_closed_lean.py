@@ -21,11 +21,12 @@ from __future__ import annotations
 import argparse
 import json
 import re
-import subprocess
 import time
 from pathlib import Path
 from typing import Any
 
+from lean_diagnostics_store import file_diagnostics
+
 
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
@@ -55,21 +56,16 @@ def _extract_theorems(lean_text: str) -> list[dict[str, str]]:
 
 
 def _elaboration_check_file(lean_path: Path, project_root: Path) -> tuple[bool, str]:
-    """Run `lake env lean` on the .lean file. Return (ok, detail)."""
+    """Run `lake env lean` on the .lean file (served from the shared
+    diagnostics store when the file is unchanged). Return (ok, detail)."""
     try:
-        res = subprocess.run(
-            ["lake", "env", "lean", str(lean_path)],
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=180,
-        )
-        ok = res.returncode == 0 and "error" not in (res.stdout + res.stderr).lower()
-        return ok, (res.stdout + res.stderr)[-500:]
-    except subprocess.TimeoutExpired:
-        return False, "timeout"
+        diag = file_diagnostics(lean_path, project_root=project_root, timeout_s=180)
     except Exception as exc:
         return False, str(exc)
+    if diag is None:
+        return False, "timeout"
+    ok = diag.returncode == 0 and "error" not in diag.output.lower()
+    return ok, diag.output[-500:]
 
 
 def populate_ledger(
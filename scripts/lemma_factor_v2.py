@@ -45,6 +45,7 @@ if str(SCRIPT_DIR) not in sys.path:
 
 # Reuse v1 helpers where possible.
 import lemma_factor_assistant as _lfa_v1  # noqa: E402
+from llm_response_cache import LLMCacheMiss  # noqa: E402
 
 
 DEFAULT_MODEL = os.getenv("MISTRAL_MODEL", "labs-leanstral-2603")
@@ -1359,6 +1360,9 @@ def _call(
             api_log_hook=api_log_hook,
         )
         return (text or "").strip()
+    except LLMCacheMiss:
+        # Offline replay: a miss must not fall through to the live API.
+        raise
     except Exception:
         response = client.chat.complete(
             model=model,
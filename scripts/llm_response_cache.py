@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Content-addressed cache for Mistral chat completions.
+
+Sits in front of ``client.chat.complete`` inside ``ponder_loop._chat_complete``,
+the call path shared by the ponder loop, the translator, the CoT judge and
+the whole-proof generators. Responses are keyed by
+``sha256(model, messages, temperature, max_tokens, seed)`` and stored in
+SQLite (WAL, shared across processes, zlib-compressed text).
+
+Modes (``DESOL_LLM_CACHE``):
+
+  off      every call goes to the API (default).
+  on       temperature-0 calls are served from / recorded to the cache;
+           sampled calls (temperature > 0) still go to the API.
+  replay   every call is cached. Sampled calls are additionally keyed by
+           their occurrence number in this process, so the n-th identical
+           request replays the n-th recorded sample and a re-run sees the
+           same sequence of samples.
+  offline  like replay, but a miss raises ``LLMCacheMiss`` instead of
+           calling the API — reproducibility runs never touch the network.
+
+``DESOL_LLM_SEED`` is part of the key and is forwarded to the API as
+``random_seed``. ``DESOL_LLM_CACHE_PATH`` (default
+``output/llm_response_cache.sqlite``) and ``DESOL_LLM_CACHE_MAX_MB`` (512)
+place and bound the store; least recently used rows are evicted past the
+size cap. Hit/miss counts are attached to every ``api_log_hook`` record
+under ``"cache"``.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+
+CACHE_MODES = ("off", "on", "replay", "offline")
+DEFAULT_CACHE_PATH = Path("output") / "llm_response_cache.sqlite"
+_MAX_MB_DEFAULT = 512.0
+_EVICT_EVERY = 64
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in offline mode when a request has no recorded response."""
+
+
+# ── cached response shape (mirrors the SDK fields callers read) ──────────────
+
+
+@dataclass
+class CachedMessage:
+    content: str
+    role: str = "assistant"
+
+
+@dataclass
+class CachedChoice:
+    message: CachedMessage
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass
+class CachedChatResponse:
+    model: str
+    choices: list[CachedChoice] = field(default_factory=list)
+    cached: bool = True
+
+
+def cached_response(model: str, text: str) -> CachedChatResponse:
+    return CachedChatResponse(model=model, choices=[CachedChoice(message=CachedMessage(content=text))])
+
+
+def request_key(
+    *,
+    model: str,
+    messages: list[dict[str, Any]],
+    temperature: float,
+    max_tokens: int,
+    seed: Optional[int] = None,
+    occurrence: Optional[int] = None,
+) -> str:
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": round(float(temperature), 6),
+        "max_tokens": int(max_tokens),
+        "seed": seed,
+        "occurrence": occurrence,
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response store with LRU eviction by total size.
+
+    Storage errors degrade to misses; they never fail an LLM call (except
+    the deliberate ``LLMCacheMiss`` in offline mode).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        mode: str = "on",
+        max_bytes: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if mode not in CACHE_MODES or mode == "off":
+            raise ValueError(f"unsupported cache mode: {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.max_bytes = int(max_bytes if max_bytes is not None else _MAX_MB_DEFAULT * 1024 * 1024)
+        self.seed = seed
+        self.hits = 0
+        self.misses = 0
+        self._occurrences: dict[str, int] = {}
+        self._con: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "offline"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._con is not None:
+            return self._con
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                purpose TEXT NOT NULL,
+                text BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used_at)"
+        )
+        con.commit()
+        self._con = con
+        return con
+
+    # ── keys ──────────────────────────────────────────────────────────────────
+
+    def key_for(
+        self,
+        *,
+        model: str,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Optional[str]:
+        """Cache key for one request, or None when this mode does not cache it.
+
+        In replay/offline mode each call for a sampled request advances its
+        occurrence counter, so call this exactly once per request.
+        """
+        sampled = float(temperature) > 0.0
+        if sampled and self.mode == "on":
+            return None
+        occurrence = None
+        if sampled:
+            base = request_key(
+                model=model, messages=messages, temperature=temperature,
+                max_tokens=max_tokens, seed=self.seed,
+            )
+            with self._lock:
+                occurrence = self._occurrences.get(base, 0)
+                self._occurrences[base] = occurrence + 1
+        return request_key(
+            model=model, messages=messages, temperature=temperature,
+            max_tokens=max_tokens, seed=self.seed, occurrence=occurrence,
+        )
+
+    def request_kwargs(self) -> dict[str, Any]:
+        """Extra ``chat.complete`` kwargs implied by the cache configuration."""
+        return {"random_seed": self.seed} if self.seed is not None else {}
+
+    # ── get / put ─────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[str]:
+        text: Optional[str] = None
+        with self._lock:
+            try:
+                con = self._connect()
+                row = con.execute("SELECT text FROM llm_responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    text = zlib.decompress(row[0]).decode("utf-8")
+                    con.execute(
+                        "UPDATE llm_responses SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                        (time.time(), key),
+                    )
+                    con.commit()
+            except (sqlite3.Error, zlib.error, UnicodeDecodeError):
+                text = None
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def put(self, key: str, *, model: str, purpose: str, text: str) -> None:
+        blob = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            try:
+                con = self._connect()
+                con.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, model, purpose, text, nbytes, created_at, last_used_at, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (key, model, purpose, blob, len(blob), now, now),
+                )
+                con.commit()
+                self._puts += 1
+                if self._puts % _EVICT_EVERY == 0:
+                    self._evict(con)
+            except sqlite3.Error:
+                pass
+
+    def _evict(self, con: sqlite3.Connection) -> int:
+        """Drop least recently used rows until the store is under 90% of the cap."""
+        total = con.execute("SELECT COALESCE(SUM(nbytes), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        target = total - int(self.max_bytes * 0.9)
+        victims: list[str] = []
+        freed = 0
+        for key, nbytes in con.execute("SELECT key, nbytes FROM llm_responses ORDER BY last_used_at ASC"):
+            victims.append(key)
+            freed += nbytes
+            if freed >= target:
+                break
+        con.executemany("DELETE FROM llm_responses WHERE key = ?", [(k,) for k in victims])
+        con.commit()
+        return len(victims)
+
+    def evict(self) -> int:
+        with self._lock:
+            try:
+                return self._evict(self._connect())
+            except sqlite3.Error:
+                return 0
+
+    # ── reporting ─────────────────────────────────────────────────────────────
+
+    def hit_stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        out = self.hit_stats()
+        with self._lock:
+            try:
+                entries, nbytes = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM llm_responses"
+                ).fetchone()
+            except sqlite3.Error:
+                entries, nbytes = 0, 0
+        out.update({"path": str(self.path), "entries": int(entries), "bytes": int(nbytes), "max_bytes": self.max_bytes})
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+# ── process-wide cache selection ─────────────────────────────────────────────
+
+_ACTIVE: Optional[LLMResponseCache] = None
+_ACTIVE_SPEC: Optional[tuple] = None
+_EXPLICIT = False
+_ACTIVE_LOCK = threading.Lock()
+
+
+def _env_spec() -> tuple[str, str, int, Optional[int]]:
+    mode = os.environ.get("DESOL_LLM_CACHE", "off").strip().lower() or "off"
+    if mode not in CACHE_MODES:
+        mode = "off"
+    path = os.environ.get("DESOL_LLM_CACHE_PATH", "").strip() or str(DEFAULT_CACHE_PATH)
+    try:
+        max_mb = float(os.environ.get("DESOL_LLM_CACHE_MAX_MB", "") or _MAX_MB_DEFAULT)
+    except ValueError:
+        max_mb = _MAX_MB_DEFAULT
+    seed_raw = os.environ.get("DESOL_LLM_SEED", "").strip()
+    try:
+        seed = int(seed_raw) if seed_raw else None
+    except ValueError:
+        seed = None
+    return mode, path, int(max_mb * 1024 * 1024), seed
+
+
+def set_response_cache(cache: Optional[LLMResponseCache]) -> None:
+    """Install ``cache`` for this process (None restores env-driven selection)."""
+    global _ACTIVE, _ACTIVE_SPEC, _EXPLICIT
+    with _ACTIVE_LOCK:
+        _ACTIVE = cache
+        _ACTIVE_SPEC = None
+        _EXPLICIT = cache is not None
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """The cache ``_chat_complete`` should use, or None when caching is off."""
+    global _ACTIVE, _ACTIVE_SPEC
+    with _ACTIVE_LOCK:
+        if _EXPLICIT:
+            return _ACTIVE
+        spec = _env_spec()
+        if spec[0] == "off":
+            return None
+        if spec != _ACTIVE_SPEC:
+            if _ACTIVE is not None:
+                _ACTIVE.close()
+            mode, path, max_bytes, seed = spec
+            _ACTIVE = LLMResponseCache(Path(path), mode=mode, max_bytes=max_bytes, seed=seed)
+            _ACTIVE_SPEC = spec
+        return _ACTIVE
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, default=None, help="Cache database (default: DESOL_LLM_CACHE_PATH)")
+    parser.add_argument("--evict", action="store_true", help="Apply the size cap now")
+    args = parser.parse_args()
+    _, env_path, max_bytes, _ = _env_spec()
+    cache = LLMResponseCache(args.path or Path(env_path), max_bytes=max_bytes)
+    try:
+        if args.evict:
+            print(f"evicted {cache.evict()} rows")
+        print(json.dumps(cache.stats(), indent=2))
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
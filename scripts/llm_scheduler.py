@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""Process-wide scheduler for Leanstral/Mistral requests.
+
+Every chat call made through ``ponder_loop._chat_complete`` (translator,
+judges, proof generators) and the MCTS value/transition calls is admitted
+here, so parallel translation threads and MCTS workers share one quota:
+
+  * a global concurrency window with AIMD control — each success widens it
+    by ``1/window`` up to ``DESOL_LLM_MAX_CONCURRENCY`` (default 8); a 429 or
+    5xx halves it and pauses admissions for a jittered exponential backoff
+    (or the server's ``Retry-After``), after which the request is retried up
+    to ``DESOL_LLM_MAX_RETRIES`` (default 4) times;
+  * an optional request-rate ceiling (``DESOL_LLM_RATE`` calls/s, 0 = none;
+    ``arxiv_to_lean --api-rate`` sets it);
+  * priority lanes — ``interactive`` requests (the pipeline that
+    ``kg_api``'s ``/verify`` starts) are admitted ahead of ``default`` and
+    ``background`` ones (the sweep entrypoints). The lane comes from the
+    :func:`priority` context manager, else ``DESOL_LLM_PRIORITY``, which
+    :func:`default_lane` sets for a process and its children;
+  * coalescing — callers passing the same ``key`` while a request is in
+    flight share its result instead of sending a duplicate.
+
+Waiting callers block on a condition variable, never while holding a lock,
+and only the head of the priority queue may be admitted, so a burst of
+background work cannot starve an interactive request. :meth:`acall` offers
+the same admission to asyncio code.
+
+The window, rate bucket, cooldown and lane queue live in a SQLite file
+(:class:`SharedAdmission`, ``DESOL_LLM_ADMISSION_DB``, default
+``<tmpdir>/desol_llm_admission.sqlite``; ``off`` keeps admission in-process),
+so MCTS pool workers, the ``/verify`` pipeline and concurrent sweeps share
+one quota and one priority order. Rows left by dead processes are reaped.
+
+Only 429/5xx responses, read from the exception's status attribute, are
+retried here; callers should not wrap :meth:`LLMRequestScheduler.call` in
+their own retry loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+LANES = {"interactive": 0, "default": 1, "background": 2}
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+_lane: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("desol_llm_lane", default=None)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+@contextmanager
+def priority(lane: str) -> Iterator[None]:
+    """Run LLM calls made inside the block in ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"unknown lane {lane!r}; expected one of {sorted(LANES)}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def default_lane(lane: str) -> None:
+    """Make ``lane`` the default for this process and the processes it starts,
+    unless ``DESOL_LLM_PRIORITY`` already names one."""
+    if lane not in LANES:
+        raise ValueError(f"unknown lane {lane!r}; expected one of {sorted(LANES)}")
+    if os.environ.get("DESOL_LLM_PRIORITY", "").strip().lower() not in LANES:
+        os.environ["DESOL_LLM_PRIORITY"] = lane
+
+
+def current_lane() -> str:
+    lane = _lane.get() or os.environ.get("DESOL_LLM_PRIORITY", "").strip().lower()
+    return lane if lane in LANES else "default"
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by an SDK/HTTP exception (or its ``response``)."""
+    for obj in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "status", "http_status"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate-limit and transient server errors."""
+    return status_code(exc) in RETRYABLE_STATUS
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        value = headers.get("retry-after") if headers is not None else None
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class SharedAdmission:
+    """Cross-process admission state in one SQLite file.
+
+    One row holds the AIMD window, the rate bucket and the cooldown; one
+    row per waiting or running request records its process and lane. A
+    request runs when it heads the waiting queue (lane, then arrival) and
+    the window, cooldown and bucket allow it. Waiters poll; every pass
+    drops rows whose process has exited.
+    """
+
+    def __init__(self, path: Path, *, poll: float = 0.05) -> None:
+        self.path = Path(path)
+        self.poll = poll
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._con = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._con.execute("PRAGMA journal_mode=WAL;")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS admission ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1), window REAL NOT NULL, tokens REAL NOT NULL,"
+            " refilled REAL NOT NULL, cooldown_until REAL NOT NULL)"
+        )
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS tickets ("
+            " ticket TEXT PRIMARY KEY, pid INTEGER NOT NULL, lane INTEGER NOT NULL,"
+            " arrived REAL NOT NULL, running INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._con.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._con
+            except BaseException:
+                self._con.execute("ROLLBACK")
+                raise
+            self._con.execute("COMMIT")
+
+    def _state(self, con: sqlite3.Connection, max_concurrency: int, rate: float) -> tuple[float, float, float, float]:
+        row = con.execute("SELECT window, tokens, refilled, cooldown_until FROM admission WHERE id = 1").fetchone()
+        if row is None:
+            row = (float(max_concurrency), max(1.0, rate), time.time(), 0.0)
+            con.execute("INSERT INTO admission VALUES (1, ?, ?, ?, ?)", row)
+        return row
+
+    @staticmethod
+    def _reap(con: sqlite3.Connection) -> None:
+        for (pid,) in con.execute("SELECT DISTINCT pid FROM tickets").fetchall():
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                con.execute("DELETE FROM tickets WHERE pid = ?", (pid,))
+            except OSError:
+                pass  # alive under another user
+
+    def acquire(self, lane: str, *, max_concurrency: int, rate: float) -> str:
+        """Block until this process may send one request; return its ticket."""
+        ticket = uuid.uuid4().hex
+        with self._tx() as con:
+            con.execute(
+                "INSERT INTO tickets (ticket, pid, lane, arrived) VALUES (?, ?, ?, ?)",
+                (ticket, os.getpid(), LANES[lane], time.time()),
+            )
+        try:
+            while True:
+                wait = self.poll
+                with self._tx() as con:
+                    self._reap(con)
+                    window, tokens, refilled, cooldown = self._state(con, max_concurrency, rate)
+                    head = con.execute(
+                        "SELECT ticket FROM tickets WHERE running = 0 ORDER BY lane, arrived, ticket LIMIT 1"
+                    ).fetchone()
+                    (running,) = con.execute("SELECT COUNT(*) FROM tickets WHERE running = 1").fetchone()
+                    now = time.time()
+                    if head is not None and head[0] == ticket and running < min(max_concurrency, max(1, int(window))):
+                        if cooldown > now:
+                            wait = cooldown - now
+                        else:
+                            if rate > 0:
+                                tokens = min(max(1.0, rate), tokens + (now - refilled) * rate)
+                                refilled = now
+                            if rate <= 0 or tokens >= 1.0:
+                                con.execute("UPDATE tickets SET running = 1 WHERE ticket = ?", (ticket,))
+                                con.execute(
+                                    "UPDATE admission SET tokens = ?, refilled = ? WHERE id = 1",
+                                    (tokens - 1.0 if rate > 0 else tokens, refilled),
+                                )
+                                return ticket
+                            wait = (1.0 - tokens) / rate
+                time.sleep(min(max(wait, 0.0), 0.25) or self.poll)
+        except BaseException:
+            self.release(ticket)
+            raise
+
+    def release(self, ticket: str, *, throttled: Optional[bool] = None, delay: float = 0.0,
+                max_concurrency: int = 1) -> None:
+        """Free ``ticket``; ``throttled`` feeds the shared AIMD window (None: abandoned)."""
+        with self._tx() as con:
+            con.execute("DELETE FROM tickets WHERE ticket = ?", (ticket,))
+            if throttled is None:
+                return
+            window, _, _, cooldown = self._state(con, max_concurrency, 0.0)
+            if throttled:
+                window = max(1.0, window / 2.0)
+                cooldown = max(cooldown, time.time() + delay)
+            else:
+                window = min(float(max_concurrency), window + 1.0 / window)
+            con.execute("UPDATE admission SET window = ?, cooldown_until = ? WHERE id = 1", (window, cooldown))
+
+    def window(self) -> Optional[float]:
+        with self._lock:
+            row = self._con.execute("SELECT window FROM admission WHERE id = 1").fetchone()
+        return float(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+def _admission_path() -> Optional[Path]:
+    value = os.environ.get("DESOL_LLM_ADMISSION_DB", "").strip()
+    if value.lower() in ("off", "0", "none"):
+        return None
+    return Path(value) if value else Path(tempfile.gettempdir()) / "desol_llm_admission.sqlite"
+
+
+class LLMRequestScheduler:
+    """Admission control for LLM requests; see the module docstring."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        *,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        shared: Optional[SharedAdmission] = None,
+    ) -> None:
+        self.shared = shared
+        self.max_concurrency = max(
+            1, int(max_concurrency or _env_float("DESOL_LLM_MAX_CONCURRENCY", 8))
+        )
+        self.rate = max(0.0, float(rate if rate is not None else _env_float("DESOL_LLM_RATE", 0.0)))
+        self.max_retries = max(
+            0, int(max_retries if max_retries is not None else _env_float("DESOL_LLM_MAX_RETRIES", 4))
+        )
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.window = float(self.max_concurrency)
+        self._inflight = 0
+        self._waiting: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._tokens = max(1.0, self.rate)
+        self._refilled = time.monotonic()
+        self._cooldown_until = 0.0
+        self._pending: dict[str, Future] = {}
+        self._cond = threading.Condition()
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0,
+            "retries": 0, "throttled": 0, "coalesced": 0,
+        }
+
+    # ── configuration / reporting ─────────────────────────────────────────────
+
+    def set_rate(self, rate: float) -> None:
+        with self._cond:
+            self.rate = max(0.0, float(rate))
+            self._tokens = min(self._tokens, max(1.0, self.rate))
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        shared_window = self.shared.window() if self.shared is not None else None
+        with self._cond:
+            return {
+                **self._stats,
+                "window": round(self.window if shared_window is None else shared_window, 3),
+                "inflight": self._inflight,
+                "waiting": len(self._waiting),
+                "rate": self.rate,
+            }
+
+    # ── admission ─────────────────────────────────────────────────────────────
+
+    def _take_token(self, now: float) -> float:
+        """Consume a rate token; return 0 on success or seconds to wait."""
+        if self.rate <= 0:
+            return 0.0
+        self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def _admit(self, lane: str) -> Optional[str]:
+        """Admit one request; returns its :class:`SharedAdmission` ticket, if any.
+
+        With shared admission the window, cooldown and rate are enforced
+        across processes, so locally only the lane order and the
+        concurrency cap apply.
+        """
+        ticket = (LANES[lane], next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    timeout: Optional[float] = None
+                    if self.shared is not None:
+                        if self._waiting[0] == ticket and self._inflight < self.max_concurrency:
+                            break
+                    elif self._waiting[0] == ticket and self._inflight < max(1, int(self.window)):
+                        now = time.monotonic()
+                        timeout = self._cooldown_until - now
+                        if timeout <= 0:
+                            timeout = self._take_token(now)
+                            if timeout <= 0:
+                                break
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self._inflight += 1
+            self._cond.notify_all()
+            rate = self.rate
+        if self.shared is None:
+            return None
+        try:
+            return self.shared.acquire(lane, max_concurrency=self.max_concurrency, rate=rate)
+        except BaseException:
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+            raise
+
+    def _release(self, shared_ticket: Optional[str], *, throttled: bool, delay: float = 0.0) -> None:
+        if shared_ticket is not None and self.shared is not None:
+            self.shared.release(
+                shared_ticket, throttled=throttled, delay=delay, max_concurrency=self.max_concurrency,
+            )
+        with self._cond:
+            self._inflight -= 1
+            if throttled:
+                self._stats["throttled"] += 1
+                self.window = max(1.0, self.window / 2.0)
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            else:
+                self.window = min(float(self.max_concurrency), self.window + 1.0 / self.window)
+            self._cond.notify_all()
+
+    def _backoff(self, exc: BaseException, attempt: int) -> float:
+        hinted = retry_after(exc)
+        if hinted is not None:
+            return min(self.backoff_max, hinted)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2.0)
+
+    def _run(self, fn: Callable[[], T], lane: str) -> T:
+        attempt = 0
+        while True:
+            shared_ticket = self._admit(lane)
+            try:
+                result = fn()
+            except Exception as exc:
+                throttled = is_retryable(exc)
+                self._release(
+                    shared_ticket, throttled=throttled, delay=self._backoff(exc, attempt) if throttled else 0.0,
+                )
+                if not throttled or attempt >= self.max_retries:
+                    with self._cond:
+                        self._stats["failed"] += 1
+                    raise
+                attempt += 1
+                with self._cond:
+                    self._stats["retries"] += 1
+                continue
+            self._release(shared_ticket, throttled=False)
+            with self._cond:
+                self._stats["completed"] += 1
+            return result
+
+    # ── public API ────────────────────────────────────────────────────────────
+
+    def call(self, fn: Callable[[], T], *, key: Optional[str] = None, lane: Optional[str] = None) -> T:
+        """Run ``fn`` (one API request) under the scheduler and return its result.
+
+        ``key`` identifies requests that are safe to share (deterministic,
+        identical payloads); a caller arriving while the same key is in
+        flight waits for that result instead of sending another request.
+        """
+        lane = lane if lane in LANES else current_lane()
+        with self._cond:
+            self._stats["submitted"] += 1
+            leader = True
+            if key is not None:
+                fut = self._pending.get(key)
+                if fut is None:
+                    fut = self._pending[key] = Future()
+                else:
+                    leader = False
+                    self._stats["coalesced"] += 1
+        if key is None:
+            return self._run(fn, lane)
+        if not leader:
+            return fut.result()
+        try:
+            result = self._run(fn, lane)
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._cond:
+                self._pending.pop(key, None)
+
+    async def acall(self, fn: Callable[[], T], *, key: Optional[str] = None, lane: Optional[str] = None) -> T:
+        """Awaitable :meth:`call`; the request runs on the default executor."""
+        lane = lane if lane in LANES else current_lane()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.call, fn, key=key, lane=lane))
+
+
+_SCHEDULER: Optional[LLMRequestScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> LLMRequestScheduler:
+    """The process-wide scheduler (configured from ``DESOL_LLM_*`` on first use).
+
+    It admits through the shared SQLite state unless that is switched off or
+    cannot be opened, in which case admission stays in-process.
+    """
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            shared = None
+            path = _admission_path()
+            if path is not None:
+                try:
+                    shared = SharedAdmission(path)
+                except (sqlite3.Error, OSError):
+                    shared = None
+            _SCHEDULER = LLMRequestScheduler(shared=shared)
+        return _SCHEDULER
+
+
+def set_scheduler(scheduler: Optional[LLMRequestScheduler]) -> None:
+    """Replace the process-wide scheduler (None rebuilds it from the env)."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        _SCHEDULER = scheduler
@@ -34,6 +34,8 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+from llm_response_cache import LLMCacheMiss  # noqa: E402
+
 try:
     from translator._translate import _is_trivialized_signature  # type: ignore[import-not-found]
 except Exception:  # pragma: no cover - fallback for unusual import topologies
@@ -579,6 +581,9 @@ def _call(
             api_log_hook=api_log_hook,
         )
         return (text or "").strip()
+    except LLMCacheMiss:
+        # Offline replay: a miss must not fall through to the live API.
+        raise
     except Exception:
         response = client.chat.complete(
             model=model,
@@ -50,6 +50,7 @@ except Exception as exc:
     _REPLDOJO_IMPORT_ERROR = str(exc)
 else:
     _REPLDOJO_IMPORT_ERROR = ""
+from llm_scheduler import get_scheduler
 from proof_backend import (
     BackendHealthReport,
     build_backend_startup_summary,
@@ -762,14 +763,16 @@ def evaluate_state_value(
     Returns:
         (calibrated_value_score, tactics_remaining_estimate)
     """
-    response = client.chat.complete(
-        model=model,
-        messages=[
-            {"role": "system", "content": EVAL_SYSTEM_PROMPT},
-            {"role": "user", "content": EVAL_USER_PROMPT.format(state=state_text)},
-        ],
-        temperature=0.0,
-        max_tokens=128,
+    response = get_scheduler().call(
+        lambda: client.chat.complete(
+            model=model,
+            messages=[
+                {"role": "system", "content": EVAL_SYSTEM_PROMPT},
+                {"role": "user", "content": EVAL_USER_PROMPT.format(state=state_text)},
+            ],
+            temperature=0.0,
+            max_tokens=128,
+        )
     )
 
     raw = _response_to_text(response)
@@ -857,17 +860,19 @@ def normalize_value_with_tactics(
 
 
 def predict_next_state_text(*, state_text: str, tactic: str, client: Mistral, model: str) -> str:
-    response = client.chat.complete(
-        model=model,
-        messages=[
-            {"role": "system", "content": TRANSITION_SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": TRANSITION_USER_PROMPT.format(state=state_text, tactic=tactic),
-            },
-        ],
-        temperature=0.0,
-        max_tokens=500,
+    response = get_scheduler().call(
+        lambda: client.chat.complete(
+            model=model,
+            messages=[
+                {"role": "system", "content": TRANSITION_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": TRANSITION_USER_PROMPT.format(state=state_text, tactic=tactic),
+                },
+            ],
+            temperature=0.0,
+            max_tokens=500,
+        )
     )
     raw = _response_to_text(response)
     parsed = parse_state_text(raw)
@@ -2050,24 +2055,6 @@ def _load_proven_stubs_as_context(project_root: Path, paper_id: str) -> str:
     return header + "\n".join(lines) + "\n\n"
 
 
-def _isolate_project_for_worker(project_root: Path, worker_id: int) -> Path:
-    """Copy project tree (excluding .lake/) into a temp dir for process isolation.
-
-    Each parallel worker needs its own copy so concurrent Lake builds don't
-    corrupt the shared .lake/ cache.  The caller is responsible for cleanup.
-    """
-    import shutil
-    import tempfile
-
-    tmp = Path(tempfile.mkdtemp(prefix=f"desol_worker{worker_id}_"))
-
-    def _ignore(src: str, names: list[str]) -> set[str]:
-        return {".lake"} & set(names)
-
-    shutil.copytree(project_root, tmp / "project", ignore=_ignore, symlinks=True)
-    return tmp / "project"
-
-
 def _run_draft_mcts_worker(
     worker_id: int,
     project_root: Path,
@@ -2087,27 +2074,18 @@ def _run_draft_mcts_worker(
     informal_proof_hint: str,
     paper_id: str = "",
 ) -> DraftMCTSParallelResult:
-    import shutil as _shutil
-
-    iso_root: Path | None = None
     try:
         random.seed(time.time() + (worker_id * 7919))
-        iso_root = _isolate_project_for_worker(project_root, worker_id)
-        # Remap file_path into isolated copy if it was inside project_root.
-        try:
-            rel = file_path.resolve().relative_to(project_root.resolve())
-            iso_file = iso_root / rel
-        except ValueError:
-            iso_file = file_path  # outside project — use as-is
-
+        # Workers share project_root: REPLDojo elaborates private scratch
+        # copies of the file, so the source is never mutated under a peer.
         # Prepend already-proven theorems from this paper so the LLM can reuse them.
         stub_context = _load_proven_stubs_as_context(project_root, paper_id)
         augmented_context = (stub_context + premise_context).strip()
 
         client = Mistral(api_key=api_key)
         ok, records, summary = run_draft_mcts(
-            project_root=iso_root,
-            file_path=iso_file,
+            project_root=project_root,
+            file_path=file_path,
             theorem_name=theorem_name,
             client=client,
             model=model,
@@ -2144,12 +2122,6 @@ def _run_draft_mcts_worker(
             best_value=0.0,
             error=str(exc),
         )
-    finally:
-        if iso_root is not None:
-            try:
-                _shutil.rmtree(iso_root.parent, ignore_errors=True)
-            except Exception:
-                pass
 
 
 def run_draft_mcts_parallel(
@@ -2262,20 +2234,11 @@ def run_mcts_worker(
     dojo_timeout: int,
 ) -> MCTSParallelResult:
     """Worker function for parallel MCTS search (runs in separate process)."""
-    import shutil as _shutil
-
-    iso_root: Path | None = None
     try:
-        iso_root = _isolate_project_for_worker(project_root, worker_id)
-        try:
-            rel = file_path.resolve().relative_to(project_root.resolve())
-            iso_file = iso_root / rel
-        except ValueError:
-            iso_file = file_path
         client = Mistral(api_key=api_key)
         root, stats = run_mcts(
-            project_root=iso_root,
-            file_path=iso_file,
+            project_root=project_root,
+            file_path=file_path,
             theorem_name=theorem_name,
             client=client,
             model=model,
@@ -2305,12 +2268,6 @@ def run_mcts_worker(
             success=False,
             error=str(exc),
         )
-    finally:
-        if iso_root is not None:
-            try:
-                _shutil.rmtree(iso_root.parent, ignore_errors=True)
-            except Exception:
-                pass
 
 
 def run_mcts_parallel(
@@ -2649,6 +2606,18 @@ Examples:
         default=12,
         help="Maximum depth of state-MCTS tree (default: 12)",
     )
+    parser.add_argument(
+        "--state-mcts-parallel",
+        type=int,
+        default=1,
+        help="Leaves expanded concurrently per state-MCTS round, using virtual loss (default: 1 = serial)",
+    )
+    parser.add_argument(
+        "--state-mcts-repls",
+        type=int,
+        default=1,
+        help="REPL processes sharing the root proof state for parallel state-MCTS (default: 1)",
+    )
     parser.add_argument(
         "--repl-timeout",
         type=float,
@@ -2797,6 +2766,8 @@ def main() -> int:
                     premise_context=premise_context,
                     retrieval_index_path=args.retrieval_index,
                     retrieval_top_k=args.retrieval_top_k,
+                    parallel_leaves=max(1, args.state_mcts_parallel),
+                    repl_workers=max(1, args.state_mcts_repls),
                 )
                 print(f"\n[{'ok' if proved else 'fail'}] state-MCTS: proved={proved}")
                 print(f"[info] {summary}")
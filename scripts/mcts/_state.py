@@ -4,12 +4,16 @@ Split from mcts_search.py (lines 2759-EOF).
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import math
 import re
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
@@ -50,6 +54,10 @@ class StateMCTSNode:
     is_terminal: bool = False
     terminal_reason: str = ""                 # "proof-finished" | "lean-error" | "depth-limit"
     depth: int = 0
+    tt_entry: "StateTranspositionEntry | None" = None  # shared by every node with these goals
+    virtual_loss: int = 0                     # pending parallel expansions below this node
+    repl_slot: int = 0                        # REPL (in the pool) that owns proof_state_id
+    replica_state_ids: dict[int, int] = field(default_factory=dict)  # slot → same state elsewhere
 
     @property
     def mean_value(self) -> float:
@@ -104,6 +112,168 @@ def _normalized_state_tokens(text: str) -> set[str]:
     return toks
 
 
+# ── Proof-state transposition table ──────────────────────────────────────────
+#
+# The same goal state is often reached by different tactic paths, and sibling
+# theorems of one paper share intermediate goals. Nodes whose goals normalize
+# to the same text (in the same REPL env) share one entry, so the tree
+# behaves like a DAG: LLM tactic candidates, failing tactics, backed-up values
+# and solved/failed status are computed once and reused across iterations
+# and across every run_state_mcts call that shares the table.
+
+_GOAL_WS_RE = re.compile(r"[ \t]+")
+
+
+def normalize_goal_text(goals: list[str]) -> str:
+    """Whitespace-insensitive canonical text for a list of goals."""
+    blocks: list[str] = []
+    for goal in goals:
+        lines = [_GOAL_WS_RE.sub(" ", ln).strip() for ln in goal.splitlines()]
+        blocks.append("\n".join(ln for ln in lines if ln))
+    return "\n\n".join(blocks)
+
+
+@dataclass
+class StateTranspositionEntry:
+    """Everything learned about one (env, goals) state."""
+
+    tactics: list[str] = field(default_factory=list)        # reranked LLM candidates
+    failed_tactics: set[str] = field(default_factory=set)    # tactics Lean rejected here
+    visits: int = 0
+    value_sum: float = 0.0
+    status: str = "open"                                     # "open" | "solved" | "failed"
+    solution: list[str] = field(default_factory=list)        # tactics closing the goals
+
+    @property
+    def mean_value(self) -> float:
+        return self.value_sum / self.visits if self.visits else 0.0
+
+
+class StateTranspositionTable:
+    """Goal-state cache shared across state-MCTS iterations and theorems.
+
+    Keys are ``(env_fingerprint, normalize_goal_text(goals))``; pass one
+    table to several :func:`run_state_mcts` calls to share results across a
+    batch of theorems from the same paper.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, str], StateTranspositionEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, env_fingerprint: str, goals: list[str]) -> StateTranspositionEntry | None:
+        return self._entries.get((env_fingerprint, normalize_goal_text(goals)))
+
+    def entry(self, env_fingerprint: str, goals: list[str]) -> StateTranspositionEntry:
+        key = (env_fingerprint, normalize_goal_text(goals))
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None:
+                self.hits += 1
+                return found
+            self.misses += 1
+            created = StateTranspositionEntry()
+            self._entries[key] = created
+            return created
+
+
+def state_env_fingerprint(
+    project_root: Path,
+    anchor_file: str | None,
+    open_commands: list[str],
+) -> str:
+    """Fingerprint of the REPL env a proof is opened in.
+
+    Combines the anchor's env snapshot key (lake manifest, toolchain,
+    paper-theory oleans) with the ``open`` commands replayed on top of it.
+    """
+    anchor_key = ""
+    if anchor_file:
+        try:
+            from lean_repl_server import repl_env_snapshot_key
+
+            anchor_key = repl_env_snapshot_key(project_root, anchor_file) or ""
+        except Exception:
+            anchor_key = ""
+    h = hashlib.sha256()
+    h.update((anchor_key or str(anchor_file or "")).encode("utf-8"))
+    for cmd in open_commands:
+        h.update(b"\x00" + cmd.encode("utf-8"))
+    return h.hexdigest()[:24]
+
+
+def _record_state_solution(solved_node: StateMCTSNode) -> None:
+    """Mark every state on the winning path as solved with its suffix proof."""
+    suffix: list[str] = []
+    node: StateMCTSNode | None = solved_node
+    while node is not None:
+        if node.tt_entry is not None and node.goals:
+            node.tt_entry.status = "solved"
+            node.tt_entry.solution = list(suffix)
+        if node.tactic_from_parent is not None:
+            suffix.insert(0, node.tactic_from_parent)
+        node = node.parent
+
+
+def _replay_state_solution(
+    node: StateMCTSNode,
+    server,
+    entry: StateTranspositionEntry,
+    *,
+    state_id: int | None = None,
+    repl_slot: int = 0,
+) -> StateMCTSNode | None:
+    """Re-apply a known solution from ``node``; return the proof-finished leaf.
+
+    Every step runs through the REPL so the reused proof is checked in this
+    theorem's context. On any mismatch the entry is reopened and None is
+    returned; nodes added along the way stay as ordinary children.
+    """
+    from lean_repl_server import ProofFinished as REPLProofFinished, TacticState as REPLTacticState
+
+    current = node
+    current_id = node.proof_state_id if state_id is None else state_id
+    for tactic in entry.solution:
+        try:
+            result = server.run_tac(current_id, tactic)
+        except Exception:
+            result = None
+        if isinstance(result, REPLProofFinished):
+            child = StateMCTSNode(
+                proof_state_id=result.proof_state_id,
+                goals=[],
+                tactic_from_parent=tactic,
+                parent=current,
+                is_terminal=True,
+                terminal_reason="proof-finished",
+                depth=current.depth + 1,
+                repl_slot=repl_slot,
+            )
+            current.children.append(child)
+            return child
+        if not isinstance(result, REPLTacticState):
+            break
+        child = StateMCTSNode(
+            proof_state_id=result.proof_state_id,
+            goals=result.goals,
+            tactic_from_parent=tactic,
+            parent=current,
+            depth=current.depth + 1,
+            repl_slot=repl_slot,
+        )
+        current.children.append(child)
+        current = child
+        current_id = child.proof_state_id
+    entry.status = "open"
+    entry.solution = []
+    return None
+
+
 def extract_theorem_statement_from_file(
     *,
     project_root: Path,
@@ -304,20 +474,32 @@ def _retrieve_compounding_context(
 
 
 def _state_uct(node: StateMCTSNode, parent_visits: int, c: float) -> float:
-    if node.visits == 0:
+    # Pending expansions count as visits that returned 0 (virtual loss), which
+    # steers concurrent selections in one parallel round onto different leaves.
+    visits = node.visits + node.virtual_loss
+    if visits == 0:
         return float("inf")
-    return node.mean_value + c * math.sqrt(math.log(parent_visits + 1) / node.visits)
+    return node.value_sum / visits + c * math.sqrt(math.log(parent_visits + 1) / visits)
 
 
-def _select_state_leaf(root: StateMCTSNode, c: float) -> list[StateMCTSNode]:
+def _select_state_leaf(root: StateMCTSNode, c: float, *, virtual_loss: int = 0) -> list[StateMCTSNode]:
     path: list[StateMCTSNode] = [root]
     node = root
     while node.children and not node.is_terminal:
-        node = max(node.children, key=lambda ch: _state_uct(ch, node.visits, c))
+        parent_visits = node.visits + node.virtual_loss
+        node = max(node.children, key=lambda ch: _state_uct(ch, parent_visits, c))
         path.append(node)
+    if virtual_loss:
+        for n in path:
+            n.virtual_loss += virtual_loss
     return path
 
 
+def _release_virtual_loss(path: list[StateMCTSNode], virtual_loss: int) -> None:
+    for n in path:
+        n.virtual_loss -= virtual_loss
+
+
 def _goal_value(goals: list[str], *, depth: int, max_depth: int) -> float:
     """Compatibility wrapper for grounded value function."""
     return grounded_goal_value(goals, depth=depth, max_depth=max_depth)
@@ -336,8 +518,23 @@ def _expand_state_node(
     temperature: float,
     compounding_retriever: Any | None = None,
     compounding_top_k: int = 4,
+    transposition_table: StateTranspositionTable | None = None,
+    env_fingerprint: str = "",
+    candidates: list[str] | None = None,
+    state_id: int | None = None,
+    repl_slot: int = 0,
 ) -> list[tuple["StateMCTSNode", float]]:
-    """Generate n_tactics candidates and apply each via the REPL."""
+    """Generate n_tactics candidates and apply each via the REPL.
+
+    With a transposition table, states already seen (in this tree or an
+    earlier run) reuse their candidate tactics, skip tactics Lean already
+    rejected, replay a known solution, or terminate immediately when every
+    candidate is known to fail.
+
+    Parallel rounds pass pre-generated ``candidates`` and expand on a pool
+    REPL: ``state_id`` is the node's proof state in that REPL and children
+    are tagged with ``repl_slot``.
+    """
     from lean_repl_server import LeanError as REPLLeanError, ProofFinished as REPLProofFinished, TacticState as REPLTacticState
     from ponder_loop import generate_tactic_options
 
@@ -346,53 +543,80 @@ def _expand_state_node(
         node.terminal_reason = "depth-limit"
         return []
 
-    dynamic_compound_ctx = _retrieve_compounding_context(
-        retriever=compounding_retriever,
-        lean_state=node.pp,
-        top_k=compounding_top_k,
-    )
-    effective_premise_context = premise_context
-    if dynamic_compound_ctx:
-        effective_premise_context = (
-            f"{premise_context}\n\n{dynamic_compound_ctx}".strip()
-            if premise_context
-            else dynamic_compound_ctx
+    sid = node.proof_state_id if state_id is None else state_id
+    entry: StateTranspositionEntry | None = None
+    if transposition_table is not None:
+        entry = node.tt_entry or transposition_table.entry(env_fingerprint, node.goals)
+        node.tt_entry = entry
+        if entry.status == "failed":
+            node.is_terminal = True
+            node.terminal_reason = "transposition-failed"
+            return []
+        if entry.status == "solved":
+            leaf = _replay_state_solution(node, server, entry, state_id=sid, repl_slot=repl_slot)
+            if leaf is not None:
+                logger.info("[state-mcts] transposition hit: replayed %d-step solution", len(entry.solution))
+                return [(leaf, 1.0)]
+
+    if candidates is not None:
+        if entry is not None and not entry.tactics:
+            entry.tactics = list(candidates)
+    elif entry is not None and entry.tactics:
+        candidates = list(entry.tactics)
+    else:
+        candidates = _generate_state_candidates(
+            node,
+            client=client,
+            model=model,
+            premise_context=premise_context,
+            retrieval_index_path=retrieval_index_path,
+            retrieval_top_k=retrieval_top_k,
+            n_tactics=n_tactics,
+            temperature=temperature,
+            compounding_retriever=compounding_retriever,
+            compounding_top_k=compounding_top_k,
+            generate_tactic_options=generate_tactic_options,
         )
-
-    candidates = generate_tactic_options(
-        lean_state=node.pp,
-        client=client,
-        model=model,
-        num_options=n_tactics,
-        temperature=temperature,
-        premise_context=effective_premise_context,
-        retrieval_index_path=retrieval_index_path,
-        retrieval_top_k=retrieval_top_k,
-    )
-    candidates = _TACTIC_POLICY.rerank(node.pp, candidates)
+        if entry is not None:
+            entry.tactics = list(candidates)
 
     new_children: list[tuple[StateMCTSNode, float]] = []
     seen_states: set[str] = {ch.pp for ch in node.children}
+    restarts = getattr(server, "restarts", 0)
 
     for tactic in candidates:
         tactic = tactic.strip()
         if not tactic:
             continue
+        if entry is not None and tactic in entry.failed_tactics:
+            continue
         try:
-            result = server.run_tac(node.proof_state_id, tactic)
+            result = server.run_tac(sid, tactic)
         except Exception as exc:
             logger.debug("REPL error on tactic %r: %s", tactic, exc)
             continue
+        if getattr(server, "restarts", 0) != restarts:
+            # The REPL restarted: ``sid`` is gone and this result says
+            # nothing about the tactic. Leave the state unexplored.
+            logger.debug("REPL restarted while expanding state %s", sid)
+            break
 
         if isinstance(result, REPLLeanError):
+            if result.transient:
+                # A timeout or lost proof state, not a Lean verdict.
+                logger.debug("transient REPL failure on tactic %r: %s", tactic, result.error)
+                continue
+            if entry is not None:
+                entry.failed_tactics.add(tactic)
             child = StateMCTSNode(
-                proof_state_id=node.proof_state_id,
+                proof_state_id=sid,
                 goals=node.goals,
                 tactic_from_parent=tactic,
                 parent=node,
                 is_terminal=True,
                 terminal_reason="lean-error",
                 depth=node.depth + 1,
+                repl_slot=repl_slot,
             )
             node.children.append(child)
             new_children.append((child, 0.0))
@@ -407,6 +631,7 @@ def _expand_state_node(
                 is_terminal=True,
                 terminal_reason="proof-finished",
                 depth=node.depth + 1,
+                repl_slot=repl_slot,
             )
             node.children.append(child)
             new_children.append((child, 1.0))
@@ -426,17 +651,316 @@ def _expand_state_node(
             tactic_from_parent=tactic,
             parent=node,
             depth=node.depth + 1,
+            repl_slot=repl_slot,
         )
+        if transposition_table is not None:
+            child.tt_entry = transposition_table.entry(env_fingerprint, goals)
+            if child.tt_entry.visits:
+                value = child.tt_entry.mean_value
         node.children.append(child)
         new_children.append((child, value))
 
+    if entry is not None:
+        tactics = {t.strip() for t in candidates if t.strip()}
+        if tactics and tactics <= entry.failed_tactics:
+            # Every candidate is a known Lean failure: nothing left to try here.
+            entry.status = "failed"
+            if not new_children:
+                node.is_terminal = True
+                node.terminal_reason = "transposition-failed"
+
     return new_children
 
 
+def _generate_state_candidates(
+    node: StateMCTSNode,
+    *,
+    client,
+    model: str,
+    premise_context: str,
+    retrieval_index_path: str,
+    retrieval_top_k: int,
+    n_tactics: int,
+    temperature: float,
+    compounding_retriever: Any | None,
+    compounding_top_k: int,
+    generate_tactic_options,
+) -> list[str]:
+    """Ask the policy model for tactic candidates at ``node`` and rerank them."""
+    dynamic_compound_ctx = _retrieve_compounding_context(
+        retriever=compounding_retriever,
+        lean_state=node.pp,
+        top_k=compounding_top_k,
+    )
+    effective_premise_context = premise_context
+    if dynamic_compound_ctx:
+        effective_premise_context = (
+            f"{premise_context}\n\n{dynamic_compound_ctx}".strip()
+            if premise_context
+            else dynamic_compound_ctx
+        )
+
+    candidates = generate_tactic_options(
+        lean_state=node.pp,
+        client=client,
+        model=model,
+        num_options=n_tactics,
+        temperature=temperature,
+        premise_context=effective_premise_context,
+        retrieval_index_path=retrieval_index_path,
+        retrieval_top_k=retrieval_top_k,
+    )
+    return _TACTIC_POLICY.rerank(node.pp, candidates)
+
+
 def _backpropagate_state(path: list[StateMCTSNode], value: float) -> None:
     for node in reversed(path):
         node.visits += 1
         node.value_sum += value
+        if node.tt_entry is not None:
+            node.tt_entry.visits += 1
+            node.tt_entry.value_sum += value
+
+
+# ── Parallel leaf expansion ──────────────────────────────────────────────────
+#
+# One parallel round selects up to K leaves (virtual loss keeps the
+# selections apart), generates their tactic candidates concurrently, then
+# applies tactics on a small pool of REPLs that each opened the same root
+# proof state. A node's proof state lives in the REPL that produced it; other
+# pool REPLs reach it by replaying the tactic path from the root once, and the
+# replica ids are cached on the nodes along that path.
+
+def _apply_state_expansion(
+    path: list[StateMCTSNode],
+    new_children: list[tuple[StateMCTSNode, float]],
+) -> StateMCTSNode | None:
+    """Backpropagate one expansion; return the proof-finished child if any."""
+    leaf = path[-1]
+    if not new_children:
+        leaf.is_terminal = True
+        leaf.terminal_reason = "no-valid-tactics"
+        _backpropagate_state(path, 0.0)
+        return None
+    for child, _ in new_children:
+        if child.terminal_reason == "proof-finished":
+            _backpropagate_state(path + [child], 1.0)
+            return child
+    # Pick best child for rollout value, backpropagate
+    _backpropagate_state(path, max(v for _, v in new_children))
+    return None
+
+
+def _state_id_on_slot(node: StateMCTSNode, slot: int, servers: list) -> int:
+    """Proof-state id of ``node`` in pool REPL ``slot``, replaying tactics if needed."""
+    from lean_repl_server import TacticState as REPLTacticState
+
+    if node.repl_slot == slot:
+        return node.proof_state_id
+    known = node.replica_state_ids.get(slot)
+    if known is not None:
+        return known
+    if node.parent is None or node.tactic_from_parent is None:
+        raise RuntimeError(f"root proof state is not open on REPL slot {slot}")
+    parent_id = _state_id_on_slot(node.parent, slot, servers)
+    result = servers[slot].run_tac(parent_id, node.tactic_from_parent)
+    if not isinstance(result, REPLTacticState) or (
+        normalize_goal_text(result.goals) != normalize_goal_text(node.goals)
+    ):
+        raise RuntimeError(f"replaying {node.tactic_from_parent!r} diverged on REPL slot {slot}")
+    node.replica_state_ids[slot] = result.proof_state_id
+    return result.proof_state_id
+
+
+def _assign_state_slots(leaves: list[StateMCTSNode], n_slots: int) -> list[int]:
+    """Spread leaves over pool REPLs, preferring ones that already hold the state."""
+    load = [0] * n_slots
+    slots: list[int] = []
+    for leaf in leaves:
+        slot = min(
+            range(n_slots),
+            key=lambda j: (load[j], 0 if (leaf.repl_slot == j or j in leaf.replica_state_ids) else 1, j),
+        )
+        load[slot] += 1
+        slots.append(slot)
+    return slots
+
+
+def _open_state_replica(
+    stack: ExitStack,
+    *,
+    project_root: Path,
+    repl_timeout: float,
+    anchor_file: str | None,
+    open_commands: list[str],
+    theorem_statement: str,
+    root_tactics: list[str],
+    root_goals: list[str],
+):
+    """Start one more REPL positioned at the search root; (server, ps_id) or None."""
+    from lean_repl_server import LeanError as REPLLeanError, TacticState as REPLTacticState
+
+    replica = stack.enter_context(LeanREPLServer(project_root=project_root, timeout=repl_timeout))
+    if anchor_file:
+        env_or_err = replica.ensure_mathlib_imported(anchor_file=anchor_file)
+    else:
+        env_or_err = replica.ensure_mathlib_imported()
+    if isinstance(env_or_err, REPLLeanError):
+        return None
+    for cmd in open_commands:
+        try:
+            replica.elaborate(cmd, env=replica._env_id)
+        except Exception:
+            pass
+    ps = replica.start_proof(theorem_statement)
+    if isinstance(ps, REPLLeanError):
+        return None
+    for tactic in root_tactics:
+        result = replica.run_tac(ps, tactic)
+        if not isinstance(result, REPLTacticState):
+            return None
+        if normalize_goal_text(result.goals) != normalize_goal_text(root_goals):
+            return None
+        ps = result.proof_state_id
+    return replica, ps
+
+
+def _run_parallel_state_rounds(
+    root: StateMCTSNode,
+    *,
+    server,
+    stats: SearchStats,
+    iterations: int,
+    parallel_leaves: int,
+    repl_workers: int,
+    exploration_c: float,
+    expand_kwargs: dict[str, Any],
+    replica_kwargs: dict[str, Any] | None = None,
+) -> StateMCTSNode | None:
+    """Run state-MCTS in rounds of ``parallel_leaves`` concurrent expansions.
+
+    Each selected leaf still counts as one iteration. Returns the
+    proof-finished node, or None once the iteration budget is spent.
+    """
+    table: StateTranspositionTable | None = expand_kwargs.get("transposition_table")
+    env_fingerprint: str = expand_kwargs.get("env_fingerprint", "")
+
+    def _prefetch(leaf: StateMCTSNode) -> list[str] | None:
+        from ponder_loop import generate_tactic_options
+
+        if leaf.depth >= expand_kwargs["max_depth"]:
+            return None
+        if table is not None:
+            entry = leaf.tt_entry or table.entry(env_fingerprint, leaf.goals)
+            leaf.tt_entry = entry
+            if entry.status != "open" or entry.tactics:
+                return None
+        return _generate_state_candidates(
+            leaf,
+            client=expand_kwargs["client"],
+            model=expand_kwargs["model"],
+            premise_context=expand_kwargs["premise_context"],
+            retrieval_index_path=expand_kwargs["retrieval_index_path"],
+            retrieval_top_k=expand_kwargs["retrieval_top_k"],
+            n_tactics=expand_kwargs["n_tactics"],
+            temperature=expand_kwargs["temperature"],
+            compounding_retriever=expand_kwargs.get("compounding_retriever"),
+            compounding_top_k=expand_kwargs.get("compounding_top_k", 4),
+            generate_tactic_options=generate_tactic_options,
+        )
+
+    def _expand_on_slot(
+        slot: int,
+        jobs: list[tuple[StateMCTSNode, Future]],
+    ) -> list[tuple[StateMCTSNode, list[tuple[StateMCTSNode, float]]]]:
+        out = []
+        for leaf, candidates_future in jobs:
+            candidates = candidates_future.result()
+            try:
+                sid, use_slot = _state_id_on_slot(leaf, slot, servers), slot
+            except Exception as exc:
+                logger.debug("[state-mcts] %s; expanding on owner REPL", exc)
+                sid, use_slot = leaf.proof_state_id, leaf.repl_slot
+            children = _expand_state_node(
+                node=leaf,
+                server=servers[use_slot],
+                candidates=candidates,
+                state_id=sid,
+                repl_slot=use_slot,
+                **expand_kwargs,
+            )
+            out.append((leaf, children))
+        return out
+
+    with ExitStack() as stack:
+        gen_pool = stack.enter_context(
+            ThreadPoolExecutor(max_workers=parallel_leaves, thread_name_prefix="state-mcts-gen")
+        )
+        servers: list = [server]
+        if repl_workers > 1 and replica_kwargs is not None:
+            opened = [
+                gen_pool.submit(_open_state_replica, stack, **replica_kwargs)
+                for _ in range(repl_workers - 1)
+            ]
+            for fut in opened:
+                try:
+                    replica = fut.result()
+                except Exception as exc:
+                    logger.warning("[state-mcts] could not start pool REPL: %s", exc)
+                    continue
+                if replica is None:
+                    continue
+                replica_server, replica_ps = replica
+                root.replica_state_ids[len(servers)] = replica_ps
+                servers.append(replica_server)
+            logger.info("[state-mcts] parallel rounds: %d leaves/round over %d REPLs",
+                        parallel_leaves, len(servers))
+        repl_pool = stack.enter_context(
+            ThreadPoolExecutor(max_workers=len(servers), thread_name_prefix="state-mcts-repl")
+        )
+
+        while stats.iterations < iterations:
+            paths: list[list[StateMCTSNode]] = []
+            while len(paths) < parallel_leaves and stats.iterations + len(paths) < iterations:
+                path = _select_state_leaf(root, exploration_c, virtual_loss=1)
+                leaf = path[-1]
+                if any(leaf is p[-1] for p in paths):
+                    _release_virtual_loss(path, 1)
+                    break
+                if leaf.is_terminal:
+                    _release_virtual_loss(path, 1)
+                    stats.iterations += 1
+                    value = 1.0 if leaf.terminal_reason == "proof-finished" else 0.0
+                    _backpropagate_state(path, value)
+                    if leaf.terminal_reason == "proof-finished":
+                        for pending in paths:
+                            _release_virtual_loss(pending, 1)
+                        return leaf
+                    continue
+                paths.append(path)
+            if not paths:
+                continue
+
+            stats.iterations += len(paths)
+            leaves = [p[-1] for p in paths]
+            jobs: dict[int, list[tuple[StateMCTSNode, Future]]] = {}
+            for leaf, slot in zip(leaves, _assign_state_slots(leaves, len(servers))):
+                jobs.setdefault(slot, []).append((leaf, gen_pool.submit(_prefetch, leaf)))
+            expanded: dict[int, list[tuple[StateMCTSNode, float]]] = {}
+            for fut in [repl_pool.submit(_expand_on_slot, slot, job) for slot, job in jobs.items()]:
+                for leaf, children in fut.result():
+                    expanded[id(leaf)] = children
+
+            solved: StateMCTSNode | None = None
+            for path in paths:
+                _release_virtual_loss(path, 1)
+                stats.expanded_nodes += 1
+                found = _apply_state_expansion(path, expanded[id(path[-1])])
+                if found is not None and solved is None:
+                    solved = found
+            if solved is not None:
+                return solved
+    return None
 
 
 def _best_proof_path(root: StateMCTSNode) -> list[str] | None:
@@ -499,12 +1023,19 @@ def run_state_mcts(
     theorem_name: str = "",
     self_compounding_top_k: int = 4,
     self_compounding_max_entries: int = 400,
+    transposition_table: StateTranspositionTable | None = None,
+    parallel_leaves: int = 1,
+    repl_workers: int = 1,
 ) -> tuple[bool, list[str], str]:
     """State-level MCTS using leanprover-community/repl.
 
     Returns (success, tactic_list, summary_string).
     success=True means a complete proof path was found.
     tactic_list is the winning tactic sequence (empty on failure).
+    Pass the same ``transposition_table`` to several calls to share goal-state
+    results across a batch of theorems; a fresh table is used otherwise.
+    ``parallel_leaves`` > 1 expands that many leaves per round (virtual loss,
+    concurrent LLM calls) over ``repl_workers`` REPLs; 1 keeps the serial loop.
     """
     from lean_repl_server import LeanError as REPLLeanError
 
@@ -636,9 +1167,9 @@ def run_state_mcts(
             # anchor is PaperImportsAnchor.lean we additionally synthesise `open Paper_*`
             # lines for every paper-theory module imported there, since the anchor file
             # itself contains no `open` directives.
+            _open_lines: list[str] = []
             try:
                 import re as _re_open
-                _open_lines: list[str] = []
                 if file_path is not None:
                     try:
                         _file_text = Path(str(file_path)).read_text(encoding="utf-8", errors="replace")
@@ -676,13 +1207,16 @@ def run_state_mcts(
             # We use the sorry-stub proof state id directly; goals come from the sorry.
             # "skip" is a no-op tactic that reveals goals — use it to get the initial state.
             initial_goals_result = server.run_tac(ps, "skip")
+            root_tactics = ["skip"]
             if isinstance(initial_goals_result, REPLLeanError):
                 # skip not valid here; try getting goals via intro
                 initial_goals_result = server.run_tac(ps, "all_goals intro")
+                root_tactics = ["all_goals intro"]
             if isinstance(initial_goals_result, REPLLeanError):
                 # Last resort: use the proof state directly with placeholder goal string
                 initial_goals = ["<goal>"]
                 initial_ps_id = ps
+                root_tactics = []
             else:
                 from lean_repl_server import TacticState as RSTS, ProofFinished as RSPF
                 if isinstance(initial_goals_result, RSPF):
@@ -691,6 +1225,12 @@ def run_state_mcts(
                 initial_goals = getattr(initial_goals_result, "goals", ["<goal>"])
                 initial_ps_id = getattr(initial_goals_result, "proof_state_id", ps)
 
+            if transposition_table is None:
+                transposition_table = StateTranspositionTable()
+            open_commands = list(dict.fromkeys(_open_lines))
+            env_fingerprint = state_env_fingerprint(project_root, chosen_anchor, open_commands)
+            tt_hits_before = transposition_table.hits
+
             root = StateMCTSNode(
                 proof_state_id=initial_ps_id,
                 goals=initial_goals,
@@ -700,62 +1240,78 @@ def run_state_mcts(
 
             stats = SearchStats(start_time=time.time())
             solved_node: StateMCTSNode | None = None
+            expand_kwargs: dict[str, Any] = dict(
+                client=client,
+                model=model,
+                premise_context=premise_context,
+                retrieval_index_path=retrieval_index_path,
+                retrieval_top_k=retrieval_top_k,
+                max_depth=max_depth,
+                n_tactics=n_tactics,
+                temperature=temperature,
+                compounding_retriever=compounding_retriever,
+                compounding_top_k=self_compounding_top_k,
+                transposition_table=transposition_table,
+                env_fingerprint=env_fingerprint,
+            )
 
-            for i in range(iterations):
-                stats.iterations += 1
-                path = _select_state_leaf(root, exploration_c)
-                leaf = path[-1]
-
-                if leaf.is_terminal:
-                    value = 1.0 if leaf.terminal_reason == "proof-finished" else 0.0
-                    _backpropagate_state(path, value)
-                    if leaf.terminal_reason == "proof-finished" and solved_node is None:
-                        solved_node = leaf
-                        stats.proofs_found += 1
-                        logger.info("Proof found at iteration %d, depth %d", i + 1, leaf.depth)
-                        break
-                    continue
-
-                new_children = _expand_state_node(
-                    node=leaf,
+            if parallel_leaves > 1:
+                solved_node = _run_parallel_state_rounds(
+                    root,
                     server=server,
-                    client=client,
-                    model=model,
-                    premise_context=premise_context,
-                    retrieval_index_path=retrieval_index_path,
-                    retrieval_top_k=retrieval_top_k,
-                    max_depth=max_depth,
-                    n_tactics=n_tactics,
-                    temperature=temperature,
-                    compounding_retriever=compounding_retriever,
-                    compounding_top_k=self_compounding_top_k,
+                    stats=stats,
+                    iterations=iterations,
+                    parallel_leaves=parallel_leaves,
+                    repl_workers=repl_workers,
+                    exploration_c=exploration_c,
+                    expand_kwargs=expand_kwargs,
+                    replica_kwargs=dict(
+                        project_root=project_root,
+                        repl_timeout=repl_timeout,
+                        anchor_file=chosen_anchor,
+                        open_commands=open_commands,
+                        theorem_statement=theorem_statement,
+                        root_tactics=root_tactics,
+                        root_goals=initial_goals,
+                    ),
                 )
-                stats.expanded_nodes += 1
+                if solved_node is not None:
+                    stats.proofs_found += 1
+                    logger.info("Proof found at iteration %d, depth %d", stats.iterations, solved_node.depth)
+            else:
+                for i in range(iterations):
+                    stats.iterations += 1
+                    path = _select_state_leaf(root, exploration_c)
+                    leaf = path[-1]
+
+                    if leaf.is_terminal:
+                        value = 1.0 if leaf.terminal_reason == "proof-finished" else 0.0
+                        _backpropagate_state(path, value)
+                        if leaf.terminal_reason == "proof-finished" and solved_node is None:
+                            solved_node = leaf
+                            stats.proofs_found += 1
+                            logger.info("Proof found at iteration %d, depth %d", i + 1, leaf.depth)
+                            break
+                        continue
 
-                if not new_children:
-                    leaf.is_terminal = True
-                    leaf.terminal_reason = "no-valid-tactics"
-                    _backpropagate_state(path, 0.0)
-                    continue
+                    new_children = _expand_state_node(node=leaf, server=server, **expand_kwargs)
+                    stats.expanded_nodes += 1
 
-                # Check for immediate proof
-                for child, value in new_children:
-                    if child.terminal_reason == "proof-finished":
-                        solved_node = child
+                    solved_node = _apply_state_expansion(path, new_children)
+                    if solved_node is not None:
                         stats.proofs_found += 1
-                        logger.info("Proof found at iteration %d, depth %d", i + 1, child.depth)
+                        logger.info("Proof found at iteration %d, depth %d", i + 1, solved_node.depth)
                         break
-                if solved_node:
-                    _backpropagate_state(path + [solved_node], 1.0)
-                    break
-
-                # Pick best child for rollout value, backpropagate
-                best_value = max(v for _, v in new_children)
-                _backpropagate_state(path, best_value)
 
             stats.end_time = time.time()
+            logger.info(
+                "[state-mcts] transposition table: %d states, %d hits this run",
+                len(transposition_table),
+                transposition_table.hits - tt_hits_before,
+            )
 
             if solved_node:
+                _record_state_solution(solved_node)
                 # Collect tactic sequence from root to solved_node
                 tactics: list[str] = []
                 node: StateMCTSNode | None = solved_node
@@ -805,6 +1361,9 @@ def run_hierarchical_state_mcts(
     retrieval_top_k: int = 12,
     max_subgoals: int = 5,
     informal_proof_hint: str = "",
+    transposition_table: StateTranspositionTable | None = None,
+    parallel_leaves: int = 1,
+    repl_workers: int = 1,
 ) -> tuple[bool, list[str], str]:
     """Hierarchical state-level MCTS: sketch with sorry → prove each subgoal with state-MCTS.
 
@@ -815,13 +1374,17 @@ def run_hierarchical_state_mcts(
     4. Assemble surviving tactics into the sketch.
     5. Run a final `run_state_mcts` on the full theorem to close any remaining goals.
 
-    Falls back to flat `run_state_mcts` if no subgoals are found.
+    Falls back to flat `run_state_mcts` if no subgoals are found. All passes
+    share one transposition table, so goal states reached while proving a
+    subgoal are reused by the final pass.
 
     Returns (success, tactic_list, summary_string).
     """
     loaded_premise_context = premise_context or load_premise_context(
         retrieval_index_path=retrieval_index_path,
     )
+    if transposition_table is None:
+        transposition_table = StateTranspositionTable()
 
     # Step 1: generate a sorry sketch
     sketch = sketch_proof_with_sorry(
@@ -849,6 +1412,9 @@ def run_hierarchical_state_mcts(
             premise_context=loaded_premise_context,
             retrieval_index_path=retrieval_index_path,
             retrieval_top_k=retrieval_top_k,
+            transposition_table=transposition_table,
+            parallel_leaves=parallel_leaves,
+            repl_workers=repl_workers,
         )
 
     logger.info("[hierarchical-state] Sketch has %d subgoals: %s",
@@ -875,6 +1441,9 @@ def run_hierarchical_state_mcts(
             premise_context=loaded_premise_context,
             retrieval_index_path=retrieval_index_path,
             retrieval_top_k=retrieval_top_k,
+            transposition_table=transposition_table,
+            parallel_leaves=parallel_leaves,
+            repl_workers=repl_workers,
         )
         if sub_ok and sub_tactics:
             closed_proofs[name] = sub_tactics
@@ -915,6 +1484,9 @@ def run_hierarchical_state_mcts(
         premise_context=final_premise_context,
         retrieval_index_path=retrieval_index_path,
         retrieval_top_k=retrieval_top_k,
+        transposition_table=transposition_table,
+        parallel_leaves=parallel_leaves,
+        repl_workers=repl_workers,
     )
 
     summary = (
@@ -43,7 +43,6 @@ from mcts._classic import (  # noqa: F401  (private symbols used in tests/script
     _evaluate_draft_result,
     _draft_path,
     _expand_draft_node,
-    _isolate_project_for_worker,
     _run_draft_mcts_worker,
     _collect_proof_trace,
     _extract_draft_best_value,
@@ -65,10 +64,16 @@ from mcts._state import (    # noqa: F401  (private symbols)
     _normalized_state_tokens,
     _state_uct,
     _select_state_leaf,
+    _release_virtual_loss,
     _goal_value,
     _expand_state_node,
     _backpropagate_state,
+    _apply_state_expansion,
+    _state_id_on_slot,
+    _run_parallel_state_rounds,
     _best_proof_path,
+    _record_state_solution,
+    _replay_state_solution,
     _kg_record_proof,
     _build_compounding_retriever,
     _retrieve_compounding_context,
@@ -26,12 +26,15 @@ Each file is a schema-versioned JSON document with an `entries` array
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import re
 import subprocess
+import threading
 import time
 import hashlib
+from contextlib import contextmanager
 from dataclasses import asdict
 from pathlib import Path
 from typing import Any
@@ -65,6 +68,8 @@ from pipeline_status_models import (
     trust_for_grounding as _trust_for_grounding,
 )
 from statement_alignment import classify_statement_alignment, normalize_latex_statement
+from lean_name_oracle import resolve_names
+from lake_validation_cache import check_lean_source, format_messages
 
 try:
     from bridge_proofs import suggest_bridge_candidates
@@ -156,6 +161,8 @@ def independent_lean_verify(
 
     This is separate from the 'proved' flag produced during proof search — it provides
     an independent check that the proof is reproducible without the search-time cache.
+    Routed through `lake_validation_cache.check_lean_source`, so a warm REPL env is
+    used when available and `lake env lean` otherwise, with the same verdict rule.
 
     Returns (success, detail).
     """
@@ -176,36 +183,49 @@ def independent_lean_verify(
     for line in proof_text.strip().splitlines():
         lean_src += "  " + line + "\n"
 
-    tmp_dir = project_root / "Desol"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        prefix="_tmp_verify_",
-        suffix=".lean",
-        dir=tmp_dir,
-        delete=False,
-    ) as _tf:
-        verify_lean = Path(_tf.name)
-        _tf.write(lean_src.encode())
-    try:
-        pass  # file written above
-
-        result = subprocess.run(
-            ["lake", "env", "lean", str(verify_lean)],
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            env=_elan_env(),
-        )
-        success = result.returncode == 0 and "sorry" not in lean_src
-        detail = (result.stdout + result.stderr).strip()[:300]
-        return success, detail
-    except subprocess.TimeoutExpired:
-        return False, f"timeout after {timeout}s"
-    except Exception as exc:
-        return False, str(exc)
-    finally:
-        verify_lean.unlink(missing_ok=True)
+    def _cold_check() -> tuple[bool, str]:
+        tmp_dir = project_root / "Desol"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            prefix="_tmp_verify_",
+            suffix=".lean",
+            dir=tmp_dir,
+            delete=False,
+        ) as _tf:
+            verify_lean = Path(_tf.name)
+            _tf.write(lean_src.encode())
+        try:
+            result = subprocess.run(
+                ["lake", "env", "lean", str(verify_lean)],
+                cwd=project_root,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env=_elan_env(),
+            )
+            success = result.returncode == 0 and "sorry" not in lean_src
+            detail = (result.stdout + result.stderr).strip()[:300]
+            return success, detail
+        except subprocess.TimeoutExpired:
+            return False, f"timeout after {timeout}s"
+        except Exception as exc:
+            return False, str(exc)
+        finally:
+            verify_lean.unlink(missing_ok=True)
+
+    def _classify(messages: list[dict]) -> tuple[bool, str]:
+        success = not any(m.get("severity") == "error" for m in messages) and "sorry" not in lean_src
+        return success, format_messages(messages, "Desol/_tmp_verify.lean")[:300]
+
+    return check_lean_source(
+        lean_src,
+        project_root=project_root,
+        classify=_classify,
+        cold_check=_cold_check,
+        timeout_s=timeout,
+        timeout_result=(False, f"timeout after {timeout}s"),
+        caller="independent_lean_verify",
+    )
 
 
 def evaluate_promotion_gates(
@@ -995,31 +1015,20 @@ _LEDGER_DIR = Path("output/verification_ledgers")
 _INTERNAL_THEOREM_CACHE: dict[str, set[str]] = {}
 
 
+_GROUNDING_IMPORTS = "import Desol.SDE.Basic"
+
+
 def _mathlib_name_exists(name: str, project_root: Path) -> bool:
     """Check if a Lean constant/typeclass name resolves with project imports."""
-    safe = re.sub(r"[^A-Za-z0-9_.'\[\]{}: ]", "", name).strip()
-    if not safe:
-        return False
-    tmp = project_root / "Desol" / f"_tmp_grounding_{int(time.time() * 1000)}.lean"
-    src = (
-        "import Desol.SDE.Basic\n\n"
-        f"#check {safe}\n"
-    )
+    return _mathlib_names_exist([name], project_root).get(name.strip(), False)
+
+
+def _mathlib_names_exist(names: list[str], project_root: Path) -> dict[str, bool]:
+    """Resolve many names with one Lean run (cached across runs per toolchain pin)."""
     try:
-        tmp.write_text(src, encoding="utf-8")
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(tmp)],
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=20,
-        )
-        out = (proc.stdout or "") + "\n" + (proc.stderr or "")
-        return proc.returncode == 0 and "error:" not in out.lower()
+        return resolve_names(names, project_root=project_root, imports=_GROUNDING_IMPORTS)
     except Exception:
-        return False
-    finally:
-        tmp.unlink(missing_ok=True)
+        return {n.strip(): False for n in names}
 
 
 def _extract_assumption_type_expr(lean_expr: str) -> str:
@@ -1077,6 +1086,17 @@ def ground_assumptions(
     cited_refs = cited_refs or []
     cited_norm = {_norm_ref_token(r) for r in cited_refs if r}
 
+    # Resolve every simple assumption name in one Lean run up front.
+    resolved: dict[str, bool] = {}
+    if project_root is not None:
+        simple_names = [
+            t
+            for t in (_extract_assumption_type_expr(a.lean_expr) for a in assumptions)
+            if t and re.fullmatch(r"[A-Za-z_][A-Za-z0-9_.'-]*", t)
+        ]
+        if simple_names:
+            resolved = _mathlib_names_exist(simple_names, project_root)
+
     grounded_out: list[Assumption] = []
     for a in assumptions:
         if a.grounding in {
@@ -1106,7 +1126,7 @@ def ground_assumptions(
         if project_root is not None and expr_type:
             # For simple named assumptions, directly test symbol availability.
             simple = bool(re.fullmatch(r"[A-Za-z_][A-Za-z0-9_.'-]*", expr_type))
-            if simple and _mathlib_name_exists(expr_type, project_root):
+            if simple and resolved.get(expr_type, False):
                 grounded_out.append(
                     Assumption(
                         label=a.label,
@@ -1344,18 +1364,107 @@ def _ledger_path(paper_id: str, output_root: Path | None = None) -> Path:
     return base / f"{safe}.json"
 
 
+# ── Batched ledger writes ─────────────────────────────────────────────────────
+#
+# Inside `ledger_batch()`, `load_ledger` / `save_ledger` / `upsert_ledger_entry`
+# work on an in-memory copy of each ledger they touch; dirty ledgers are
+# written (temp file + rename) when the outermost batch exits or on
+# `flush_ledgers()`. With journaling on (`journal=True` or
+# DESOL_LEDGER_JOURNAL=1) every upsert is also appended to
+# `<ledger>.journal.jsonl`, and `load_ledger` replays a leftover journal, so
+# a crash between checkpoints loses nothing.
+
+_LEDGER_BATCH_DEPTH = 0
+_LEDGER_BATCH_JOURNAL = False
+_LEDGER_BUFFER: dict[Path, list[dict[str, Any]]] = {}
+_LEDGER_BUFFER_META: dict[Path, dict[str, Any] | None] = {}
+_LEDGER_DIRTY: dict[Path, tuple[str, Path | None]] = {}
+_LEDGER_LOCK = threading.RLock()
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_name(path.name[: -len(".json")] + ".journal.jsonl")
+
+
+def _read_ledger_file(path: Path) -> list[dict[str, Any]]:
+    entries: list[dict[str, Any]] = []
+    if path.exists():
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(doc, list):
+            entries = doc
+        elif isinstance(doc, dict) and isinstance(doc.get("entries"), list):
+            entries = [r for r in doc["entries"] if isinstance(r, dict)]
+    journal = _journal_path(path)
+    if journal.exists():
+        for line in journal.read_text(encoding="utf-8").splitlines():
+            try:
+                delta = json.loads(line)
+            except Exception:
+                continue  # torn final line from a crash mid-append
+            if isinstance(delta, dict):
+                _merge_ledger_entry(entries, delta)
+    return entries
+
+
 def load_ledger(paper_id: str, output_root: Path | None = None) -> list[dict[str, Any]]:
     path = _ledger_path(paper_id, output_root=output_root)
-    if not path.exists():
-        return []
-    doc = json.loads(path.read_text(encoding="utf-8"))
-    if isinstance(doc, list):
-        return doc
-    if isinstance(doc, dict) and isinstance(doc.get("entries"), list):
-        return [r for r in doc["entries"] if isinstance(r, dict)]
-    return []
+    with _LEDGER_LOCK:
+        if path in _LEDGER_BUFFER:
+            return [dict(r) for r in _LEDGER_BUFFER[path]]
+        entries = _read_ledger_file(path)
+        if _LEDGER_BATCH_DEPTH:
+            _LEDGER_BUFFER[path] = entries
+            return [dict(r) for r in entries]
+        return entries
+
+
+@contextmanager
+def ledger_batch(*, journal: bool | None = None):
+    """Coalesce ledger writes until the outermost batch exits.
+
+    Re-entrant: nested batches join the outer one. Use `flush_ledgers()`
+    for intermediate checkpoints.
+    """
+    global _LEDGER_BATCH_DEPTH, _LEDGER_BATCH_JOURNAL
+    with _LEDGER_LOCK:
+        if _LEDGER_BATCH_DEPTH == 0:
+            _LEDGER_BATCH_JOURNAL = (
+                journal
+                if journal is not None
+                else os.environ.get("DESOL_LEDGER_JOURNAL", "0") in {"1", "true", "yes"}
+            )
+        _LEDGER_BATCH_DEPTH += 1
+    try:
+        yield
+    finally:
+        with _LEDGER_LOCK:
+            _LEDGER_BATCH_DEPTH -= 1
+            if _LEDGER_BATCH_DEPTH == 0:
+                try:
+                    flush_ledgers()
+                finally:
+                    _LEDGER_BUFFER.clear()
+                    _LEDGER_BUFFER_META.clear()
+                    _LEDGER_DIRTY.clear()
+
+
+def flush_ledgers() -> list[Path]:
+    """Write every ledger changed inside the current batch; return their paths."""
+    written: list[Path] = []
+    with _LEDGER_LOCK:
+        for path, (paper_id, output_root) in list(_LEDGER_DIRTY.items()):
+            _write_ledger(
+                paper_id,
+                _LEDGER_BUFFER[path],
+                output_root=output_root,
+                metadata=_LEDGER_BUFFER_META.get(path),
+            )
+            del _LEDGER_DIRTY[path]
+            written.append(path)
+    return written
 
 
+@functools.lru_cache(maxsize=None)
 def _get_pipeline_commit(cwd: Path | None = None) -> str:
     try:
         proc = subprocess.run(
@@ -1373,6 +1482,7 @@ def _get_pipeline_commit(cwd: Path | None = None) -> str:
     return "unknown"
 
 
+@functools.lru_cache(maxsize=None)
 def _get_lean_version(cwd: Path | None = None) -> str:
     try:
         proc = subprocess.run(
@@ -1396,6 +1506,25 @@ def save_ledger(
     entries: list[dict[str, Any]],
     output_root: Path | None = None,
     metadata: dict[str, Any] | None = None,
+) -> Path:
+    path = _ledger_path(paper_id, output_root=output_root)
+    with _LEDGER_LOCK:
+        if _LEDGER_BATCH_DEPTH:
+            _LEDGER_BUFFER[path] = [dict(r) for r in entries]
+            _LEDGER_BUFFER_META[path] = metadata
+            _LEDGER_DIRTY[path] = (paper_id, output_root)
+            if _LEDGER_BATCH_JOURNAL:
+                # A full save supersedes the journal: make it durable now.
+                flush_ledgers()
+            return path
+    return _write_ledger(paper_id, entries, output_root=output_root, metadata=metadata)
+
+
+def _write_ledger(
+    paper_id: str,
+    entries: list[dict[str, Any]],
+    output_root: Path | None = None,
+    metadata: dict[str, Any] | None = None,
 ) -> Path:
     base = output_root if output_root is not None else _LEDGER_DIR
     base.mkdir(parents=True, exist_ok=True)
@@ -1419,7 +1548,10 @@ def save_ledger(
         **merged_meta,
         "entries": entries,
     }
-    path.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    _journal_path(path).unlink(missing_ok=True)
     return path
 
 
@@ -1565,15 +1697,35 @@ def upsert_ledger_entry(
     that fails statement-fidelity (writes TRANSLATION_LIMITED) would silently
     clobber an already-FULLY_PROVEN row from a previous successful run. This
     matters in particular for repeat-prove sweeps over multi-paper corpora.
+
+    Inside `ledger_batch()` the write is deferred to the next flush.
     """
-    entries = load_ledger(paper_id, output_root=output_root)
     entry_dict = entry.to_dict()
-    new_norm = _normalised_theorem_name(entry.theorem_name)
+    path = _ledger_path(paper_id, output_root=output_root)
+    with _LEDGER_LOCK:
+        if not _LEDGER_BATCH_DEPTH:
+            entries = load_ledger(paper_id, output_root=output_root)
+            _merge_ledger_entry(entries, entry_dict)
+            return save_ledger(paper_id, entries, output_root=output_root)
+        load_ledger(paper_id, output_root=output_root)  # prime the buffer
+        _merge_ledger_entry(_LEDGER_BUFFER[path], entry_dict)
+        _LEDGER_DIRTY[path] = (paper_id, output_root)
+        if _LEDGER_BATCH_JOURNAL:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _journal_path(path).open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry_dict, ensure_ascii=False) + "\n")
+    return path
+
+
+def _merge_ledger_entry(entries: list[dict[str, Any]], entry_dict: dict[str, Any]) -> None:
+    """Apply the `upsert_ledger_entry` rules for one entry to ``entries`` in place."""
+    theorem_name = str(entry_dict.get("theorem_name", "") or "")
+    new_norm = _normalised_theorem_name(theorem_name)
     new_rank = _STATUS_RANK.get(str(entry_dict.get("status", "") or ""), -1)
     replaced = False
     for i, existing in enumerate(entries):
         existing_name = existing.get("theorem_name") or ""
-        if existing_name == entry.theorem_name or _normalised_theorem_name(existing_name) == new_norm:
+        if existing_name == theorem_name or _normalised_theorem_name(existing_name) == new_norm:
             existing_rank = _ledger_status_rank(existing)
             if new_rank >= existing_rank:
                 # Preserve the existing theorem_name on overwrite (avoid silently
@@ -1595,8 +1747,7 @@ def upsert_ledger_entry(
             replaced = True
             break
     if not replaced:
-        entries.append(entry_dict)
-    return save_ledger(paper_id, entries, output_root=output_root)
+        entries.append(dict(entry_dict))
 
 
 def aggregate_grounding_status(assumptions: list[Assumption]) -> GroundingStatus:
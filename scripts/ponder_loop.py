@@ -20,6 +20,10 @@ from pathlib import Path
 from typing import Any, Callable
 
 from dotenv import load_dotenv
+
+from llm_response_cache import LLMCacheMiss, cached_response, get_response_cache, request_key
+from llm_scheduler import get_scheduler
+
 try:
     from desol_config import get_config as _get_config
     _CFG = _get_config()
@@ -350,30 +354,60 @@ def _chat_complete(
     api_log_hook: ApiLogHook | None,
 ) -> tuple[Any, str]:
     started = time.time()
-    response = client.chat.complete(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        max_tokens=max_tokens,
+    cache = get_response_cache()
+    key = (
+        cache.key_for(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens)
+        if cache is not None
+        else None
     )
-    text = _response_to_text(response)
+    cached_text = cache.get(key) if key is not None else None
+    if cached_text is not None:
+        response: Any = cached_response(model, cached_text)
+        text = cached_text
+    else:
+        if cache is not None and cache.offline:
+            raise LLMCacheMiss(f"no cached response for {purpose} ({model})")
+        extra = cache.request_kwargs() if cache is not None else {}
+        # Identical deterministic requests in flight at once share one API call.
+        share_key = (
+            request_key(
+                model=model, messages=messages, temperature=temperature,
+                max_tokens=max_tokens, seed=extra.get("random_seed"),
+            )
+            if float(temperature) == 0.0
+            else None
+        )
+        response = get_scheduler().call(
+            lambda: client.chat.complete(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra,
+            ),
+            key=share_key,
+        )
+        text = _response_to_text(response)
+        if key is not None and text:
+            cache.put(key, model=model, purpose=purpose, text=text)
     ended = time.time()
 
     if api_log_hook is not None:
-        api_log_hook(
-            {
-                "timestamp": started,
-                "purpose": purpose,
-                "request": {
-                    "model": model,
-                    "temperature": temperature,
-                    "max_tokens": max_tokens,
-                    "messages": messages,
-                },
-                "response_text": text,
-                "latency_seconds": max(0.0, ended - started),
-            }
-        )
+        record: dict[str, Any] = {
+            "timestamp": started,
+            "purpose": purpose,
+            "request": {
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "messages": messages,
+            },
+            "response_text": text,
+            "latency_seconds": max(0.0, ended - started),
+        }
+        if cache is not None:
+            record["cache"] = {"hit": cached_text is not None, **cache.hit_stats()}
+        api_log_hook(record)
 
     return response, text
 
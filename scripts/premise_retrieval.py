@@ -12,9 +12,12 @@ import argparse
 import hashlib
 import json
 import math
+import mmap
 import os
 import re
+import time
 import urllib.request
+from collections.abc import Iterator, Sequence
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Protocol, runtime_checkable
@@ -51,6 +54,19 @@ _DEFAULT_ST_MODEL = "BAAI/bge-small-en-v1.5"
 # Module-level cache so the model loads once per process.
 _ST_MODEL_CACHE: dict[str, Any] = {}
 
+# Unicode math type symbols used by the query-time symbol-overlap boost.
+_MATH_SYMBOLS = "ℕℤℚℝℂ∀∃→↔⊆⊂∈∉∩∪≤≥≠∑∏⟨⟩⟦⟧"
+_MATH_SYMBOL_SET: frozenset[str] = frozenset(_MATH_SYMBOLS)
+_MATH_SYMBOL_BIT: dict[str, int] = {c: 1 << i for i, c in enumerate(_MATH_SYMBOLS)}
+
+# Namespace hints inferred from goal text (key → goal keywords).
+_NAMESPACE_HINT_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "nat": ("nat", "∀ n", "∀ n :", "n : ℕ", "prime", "divisible"),
+    "real": ("real", "ℝ", "sqrt", "log", "sin", "cos"),
+    "algebra": ("ring", "field", "module", "vector"),
+    "data": ("list", "finset", "multiset", "array"),
+}
+
 
 @runtime_checkable
 class Encoder(Protocol):
@@ -200,12 +216,500 @@ def parse_toon_nodes(path: str | Path) -> list[PremiseEntry]:
     return rows
 
 
+# ---------------------------------------------------------------------------
+# Lazily loaded entries (entries.jsonl + line-offset index)
+# ---------------------------------------------------------------------------
+
+_ENTRIES_FILE = "entries.jsonl"
+_ENTRY_OFFSETS_FILE = "entries.offsets.npy"
+
+
+def _entry_from_row(row: dict[str, Any]) -> PremiseEntry:
+    return PremiseEntry(
+        name=row.get("name", ""),
+        statement=row.get("statement", ""),
+        namespace=row.get("namespace", ""),
+        source_file=row.get("source_file", ""),
+    )
+
+
+def _scan_line_offsets(path: Path) -> Any:
+    """Start offset of every non-empty line, plus the file size as sentinel."""
+    size = path.stat().st_size
+    if size == 0:
+        return np.zeros(1, dtype=np.int64)
+    with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        newlines = np.flatnonzero(buf == 0x0A)
+        del buf
+    starts = np.concatenate(([0], newlines + 1)).astype(np.int64)
+    ends = np.concatenate((newlines, [size])).astype(np.int64)
+    starts = starts[ends > starts]
+    return np.concatenate((starts, [size])).astype(np.int64)
+
+
+def _load_entry_offsets(dir_path: Path) -> Any:
+    """Offsets for ``entries.jsonl``; rebuilt (and re-saved if possible) when stale."""
+    entries_path = dir_path / _ENTRIES_FILE
+    offsets_path = dir_path / _ENTRY_OFFSETS_FILE
+    size = entries_path.stat().st_size
+    if offsets_path.exists():
+        try:
+            offsets = np.load(offsets_path, mmap_mode="r")
+            if offsets.ndim == 1 and offsets.shape[0] >= 1 and int(offsets[-1]) == size:
+                return offsets
+        except (OSError, ValueError):
+            pass
+    offsets = _scan_line_offsets(entries_path)
+    try:
+        _save_npy_atomic(offsets_path, offsets)
+    except OSError:
+        pass  # read-only index directory: keep the in-memory offsets
+    return offsets
+
+
+def _save_npy_atomic(path: Path, arr: Any) -> None:
+    # Write-then-rename so processes that memory-mapped the old file keep a
+    # valid mapping instead of seeing it truncated underneath them.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as fh:
+        np.save(fh, arr)
+    os.replace(tmp, path)
+
+
+_ROW_NAME_RE = re.compile(rb'\{"name":\s*("(?:[^"\\]|\\.)*")')
+
+
+class _LazyEntries(Sequence):
+    """Read-only sequence of PremiseEntry parsed on access from a mapped JSONL file.
+
+    Only the offset array and the OS page cache back it, so every process
+    that loads the same index shares one copy of the entry text.
+    """
+
+    def __init__(self, path: Path, offsets: Any):
+        self._path = Path(path)
+        self._offsets = offsets
+        self._mm: mmap.mmap | None = None
+
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0]) - 1
+
+    def _map(self) -> mmap.mmap:
+        if self._mm is None:
+            with self._path.open("rb") as fh:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def _parse(self, i: int) -> PremiseEntry:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return _entry_from_row(json.loads(self._map()[start:end]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._parse(i) for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("premise entry index out of range")
+        return self._parse(index)
+
+    def __iter__(self) -> Iterator[PremiseEntry]:
+        for i in range(len(self)):
+            yield self._parse(i)
+
+    def names(self) -> list[str]:
+        """Every entry's name, read from the row prefix without parsing the row.
+
+        ``save_np`` writes ``name`` first; rows that do not start with it are
+        parsed in full.
+        """
+        mm = self._map()
+        out: list[str] = []
+        for i in range(len(self)):
+            m = _ROW_NAME_RE.match(mm, int(self._offsets[i]))
+            out.append(json.loads(m.group(1)) if m else self._parse(i).name)
+        return out
+
+    def __getstate__(self) -> dict[str, Any]:
+        # mmap handles do not pickle; worker processes re-map on first access.
+        return {"_path": self._path, "_offsets": np.asarray(self._offsets), "_mm": None}
+
+
+@dataclass
+class _ScoringFeatures:
+    """Per-entry arrays used by the vectorized query path (built once per index).
+
+    Names are read for every entry up front, since an identifier hit can be
+    anywhere in the index; a lazily loaded index supplies them without parsing
+    the rest of each row. Namespace and symbol features are filled the first
+    time a query scores a row, so queries parse only the entries they score.
+    """
+
+    key: tuple[int, int, int, int]
+    entries: Sequence[PremiseEntry]
+    matrix: Any                                   # (n, dims) embeddings, as stored
+    last_segment_index: dict[str, Any]            # lowercased last name segment → row ids
+    name_blob: str                                # lowercased names joined by "\n"
+    name_starts: Any                              # start offset of each name in name_blob
+    namespaces: list[str]                         # lowercased namespace per row ("" until filled)
+    symbol_bits: Any                              # int64 bitmask of _MATH_SYMBOLS per statement
+    filled: Any                                   # bool mask: namespace/symbol_bits are set
+
+    @classmethod
+    def build(cls, entries: Sequence[PremiseEntry], embeddings: Any, key: tuple[int, int, int, int]) -> _ScoringFeatures:
+        n = len(entries)
+        matrix = np.asarray(embeddings).reshape(n, -1)
+
+        raw_names = entries.names() if isinstance(entries, _LazyEntries) else [e.name for e in entries]
+        names = [name.lower() for name in raw_names]
+        last_rows: dict[str, list[int]] = {}
+        for i, name in enumerate(names):
+            last_rows.setdefault(name.split(".")[-1], []).append(i)
+        starts = np.zeros(n, dtype=np.int64)
+        offset = 0
+        for i, name in enumerate(names):
+            starts[i] = offset
+            offset += len(name) + 1
+
+        return cls(
+            key=key,
+            entries=entries,
+            matrix=matrix,
+            last_segment_index={k: np.asarray(v, dtype=np.int64) for k, v in last_rows.items()},
+            name_blob="\n".join(names),
+            name_starts=starts,
+            namespaces=[""] * n,
+            symbol_bits=np.zeros(n, dtype=np.int64),
+            filled=np.zeros(n, dtype=bool),
+        )
+
+    def fill(self, rows: Any) -> None:
+        """Parse the entries behind ``rows`` that have no namespace/symbol features yet."""
+        for i in rows[~self.filled[rows]].tolist():
+            e = self.entries[i]
+            self.namespaces[i] = e.namespace.lower()
+            self.symbol_bits[i] = sum(_MATH_SYMBOL_BIT[c] for c in set(e.statement) & _MATH_SYMBOL_SET)
+        self.filled[rows] = True
+
+    def ident_masks(self, lean_idents: list[str]) -> list[tuple[Any, Any]]:
+        """(exact last-segment match, name substring match) masks per identifier."""
+        n = self.name_starts.shape[0]
+        out: list[tuple[Any, Any]] = []
+        for ident in lean_idents:
+            ident_l = ident.lower()
+            exact = np.zeros(n, dtype=bool)
+            rows = self.last_segment_index.get(ident_l)
+            if rows is not None:
+                exact[rows] = True
+            out.append((exact, self.name_contains(ident_l)))
+        return out
+
+    def name_contains(self, needle: str) -> Any:
+        """Bool mask of entries whose lowercased name contains ``needle``."""
+        n = self.name_starts.shape[0]
+        mask = np.zeros(n, dtype=bool)
+        if not needle or "\n" in needle:
+            return mask
+        blob = self.name_blob
+        pos = blob.find(needle)
+        while pos != -1:
+            row = int(np.searchsorted(self.name_starts, pos, side="right")) - 1
+            mask[row] = True
+            if row + 1 >= n:
+                break
+            pos = blob.find(needle, int(self.name_starts[row + 1]))
+        return mask
+
+
+# Rows upcast to float64 at a time when computing base scores.
+_SCORE_CHUNK_ROWS = 8192
+
+
+def _base_scores(matrix: Any, qmat: Any) -> Any:
+    """``matrix @ qmat.T`` accumulated in float64, as (rows, queries).
+
+    The pure-Python path sums float64 products; a float32 matmul rounds
+    differently and can reorder near-ties. Rows are upcast one chunk at a
+    time so a memory-mapped matrix is never copied whole.
+    """
+    q = np.asarray(qmat, dtype=np.float64)
+    dims = min(q.shape[1], matrix.shape[1])
+    q = q[:, :dims].T
+    out = np.empty((matrix.shape[0], q.shape[1]), dtype=np.float64)
+    for start in range(0, matrix.shape[0], _SCORE_CHUNK_ROWS):
+        block = np.asarray(matrix[start:start + _SCORE_CHUNK_ROWS, :dims], dtype=np.float64)
+        out[start:start + _SCORE_CHUNK_ROWS] = block @ q
+    return out
+
+
+def _top_k_desc(scores: Any, k: int) -> Any:
+    """Indices of the k highest scores, descending, ties by ascending index.
+
+    Matches a stable ``sorted(..., reverse=True)`` over all entries, but only
+    fully sorts the entries at or above the k-th score.
+    """
+    n = scores.shape[0]
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        cand = np.flatnonzero(scores >= kth)
+    else:
+        cand = np.arange(n)
+    order = cand[np.lexsort((cand, -scores[cand]))]
+    return order[:k]
+
+
+# ---------------------------------------------------------------------------
+# Approximate nearest-neighbour backend (IVF, pure NumPy)
+# ---------------------------------------------------------------------------
+#
+# Rows are clustered with spherical k-means; a query scores the centroids,
+# probes the closest ``n_probe`` lists, and only those rows are scored
+# exactly. Files live next to embeddings.npy and are memory-mapped on load.
+
+_ANN_META_FILE = "ann_ivf.json"
+_ANN_CENTROIDS_FILE = "ann_ivf.centroids.npy"
+_ANN_ORDER_FILE = "ann_ivf.order.npy"
+_ANN_OFFSETS_FILE = "ann_ivf.offsets.npy"
+_ANN_CHUNK_ROWS = 65536
+
+
+def _ann_enabled() -> bool:
+    return os.environ.get("DESOL_PREMISE_ANN", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _embeddings_stamp(path: Path) -> dict[str, int]:
+    st = path.stat()
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def _nearest_centroid(rows: Any, centroids: Any) -> Any:
+    out = np.empty(rows.shape[0], dtype=np.int64)
+    for start in range(0, rows.shape[0], _ANN_CHUNK_ROWS):
+        block = np.asarray(rows[start:start + _ANN_CHUNK_ROWS], dtype=np.float32)
+        out[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def _normalize_rows(mat: Any) -> Any:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return mat / np.maximum(norms, 1e-12)
+
+
+@dataclass
+class IVFIndex:
+    """Inverted-file ANN index over unit-norm embedding rows."""
+
+    centroids: Any   # (n_lists, dims) float32
+    order: Any       # (n,) row ids grouped by list
+    offsets: Any     # (n_lists + 1,) start of each list in ``order``
+    n_probe: int
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @classmethod
+    def train(
+        cls,
+        matrix: Any,
+        *,
+        n_lists: int | None = None,
+        n_probe: int | None = None,
+        n_iter: int = 12,
+        sample_size: int = 131072,
+        seed: int = 0,
+    ) -> IVFIndex:
+        """Cluster ``matrix`` rows; defaults scale as ~4·sqrt(n) lists, probing ~3%."""
+        n = int(matrix.shape[0])
+        if n == 0:
+            raise ValueError("cannot build an ANN index over an empty matrix")
+        if n_lists is None:
+            n_lists = int(round(4 * math.sqrt(n)))
+        n_lists = max(1, min(int(n_lists), n))
+        rng = np.random.default_rng(seed)
+        sample_ids = np.sort(rng.choice(n, size=min(n, max(sample_size, n_lists)), replace=False))
+        sample = np.asarray(matrix[sample_ids], dtype=np.float32)
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+        for _ in range(max(1, n_iter)):
+            assign = _nearest_centroid(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=n_lists)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+            centroids = _normalize_rows(sums).astype(np.float32)
+
+        assign = _nearest_centroid(matrix, centroids)
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assign, minlength=n_lists))
+        if n_probe is None:
+            n_probe = max(1, int(math.ceil(n_lists * 0.03)))
+        return cls(centroids=centroids, order=order, offsets=offsets, n_probe=max(1, int(n_probe)))
+
+    def candidates(self, q: Any, n_probe: int | None = None) -> Any:
+        """Sorted row ids in the ``n_probe`` lists nearest to query vector ``q``."""
+        probe = min(self.n_lists, max(1, int(n_probe or self.n_probe)))
+        qv = np.asarray(q, dtype=np.float32)[: self.centroids.shape[1]]
+        cscores = self.centroids[:, : qv.shape[0]] @ qv
+        if probe < self.n_lists:
+            lists = np.argpartition(-cscores, probe - 1)[:probe]
+        else:
+            lists = np.arange(self.n_lists)
+        parts = [self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def search(self, matrix: Any, q: Any, top_k: int, n_probe: int | None = None) -> Any:
+        """Approximate top-k rows of ``matrix @ q`` (embedding score only)."""
+        rows = self.candidates(q, n_probe)
+        if rows.shape[0] == 0:
+            return rows
+        qv = np.asarray(q, dtype=np.float32)
+        scores = np.asarray(matrix[rows], dtype=np.float32) @ qv[: matrix.shape[1]]
+        return rows[_top_k_desc(scores, top_k)]
+
+    def save(self, dir_path: str | Path) -> None:
+        p = Path(dir_path)
+        _save_npy_atomic(p / _ANN_CENTROIDS_FILE, self.centroids)
+        _save_npy_atomic(p / _ANN_ORDER_FILE, self.order)
+        _save_npy_atomic(p / _ANN_OFFSETS_FILE, self.offsets)
+        meta = {
+            "kind": "ivf",
+            "n_lists": self.n_lists,
+            "n_probe": self.n_probe,
+            "count": int(self.order.shape[0]),
+            "embeddings": _embeddings_stamp(p / "embeddings.npy"),
+        }
+        (p / _ANN_META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, dir_path: str | Path) -> IVFIndex | None:
+        """Load a saved index, or None when absent or built for other embeddings."""
+        p = Path(dir_path)
+        meta_path = p / _ANN_META_FILE
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("embeddings") != _embeddings_stamp(p / "embeddings.npy"):
+                print(f"[premise_retrieval] ANN index in {p} is stale; using exact search")
+                return None
+            n_probe = int(os.environ.get("DESOL_PREMISE_ANN_NPROBE", "0") or 0) or int(meta["n_probe"])
+            return cls(
+                centroids=np.load(p / _ANN_CENTROIDS_FILE, mmap_mode="r"),
+                order=np.load(p / _ANN_ORDER_FILE, mmap_mode="r"),
+                offsets=np.load(p / _ANN_OFFSETS_FILE, mmap_mode="r"),
+                n_probe=n_probe,
+            )
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"[premise_retrieval] could not load ANN index from {p}: {exc}")
+            return None
+
+
+def build_ann_index(
+    dir_path: str | Path,
+    *,
+    n_lists: int | None = None,
+    n_probe: int | None = None,
+    seed: int = 0,
+) -> IVFIndex:
+    """Train an IVF index for a save_np directory and store it alongside embeddings.npy."""
+    if not _HAS_NUMPY:
+        raise ImportError("numpy is required: pip install numpy")
+    p = Path(dir_path)
+    matrix = np.load(p / "embeddings.npy", mmap_mode="r")
+    index = IVFIndex.train(matrix, n_lists=n_lists, n_probe=n_probe, seed=seed)
+    index.save(p)
+    return index
+
+
+def benchmark_ann(
+    dir_path: str | Path,
+    *,
+    n_queries: int = 200,
+    top_k: int = 12,
+    n_probes: list[int] | None = None,
+    seed: int = 0,
+) -> list[dict[str, float]]:
+    """Recall@k and mean latency of IVF search against exact search.
+
+    Queries are embeddings of randomly sampled indexed rows, so the benchmark
+    needs no encoder. Only the embedding score is compared (boosts are
+    identical on both paths). The first row (``n_probe == 0``) is exact search.
+    """
+    if not _HAS_NUMPY:
+        raise ImportError("numpy is required: pip install numpy")
+    p = Path(dir_path)
+    matrix = np.load(p / "embeddings.npy", mmap_mode="r")
+    index = IVFIndex.load(p)
+    if index is None:
+        raise FileNotFoundError(f"no up-to-date ANN index in {p}; run build-ann first")
+    rng = np.random.default_rng(seed)
+    qids = rng.choice(matrix.shape[0], size=min(n_queries, matrix.shape[0]), replace=False)
+    queries = np.asarray(matrix[qids], dtype=np.float32)
+    dense = np.asarray(matrix, dtype=np.float32)
+
+    t0 = time.perf_counter()
+    exact = [_top_k_desc(dense @ qv, top_k) for qv in queries]
+    rows: list[dict[str, float]] = [{
+        "n_probe": 0,
+        "recall": 1.0,
+        "mean_ms": (time.perf_counter() - t0) * 1000.0 / len(queries),
+    }]
+    probes = n_probes or sorted({1, index.n_probe, 2 * index.n_probe, 4 * index.n_probe})
+    for probe in probes:
+        probe = min(index.n_lists, max(1, int(probe)))
+        hit = 0
+        t0 = time.perf_counter()
+        approx = [index.search(dense, qv, top_k, probe) for qv in queries]
+        elapsed = time.perf_counter() - t0
+        for got, want in zip(approx, exact):
+            hit += len(set(got.tolist()) & set(want.tolist()))
+        rows.append({
+            "n_probe": probe,
+            "recall": hit / float(sum(len(w) for w in exact) or 1),
+            "mean_ms": elapsed * 1000.0 / len(queries),
+        })
+    return rows
+
+
+# Goals scored per matrix-matrix product in PremiseRetriever.query_many.
+_QUERY_BLOCK = 64
+
+
+def _goal_signals(goal: str) -> tuple[list[str], dict[str, bool], frozenset[str]]:
+    """Identifier, namespace-hint and math-symbol signals used for query boosts."""
+    # Extract camelCase / PascalCase tokens for name-match boost.
+    # A token qualifies if it has at least one uppercase letter and length >= 5.
+    lean_idents: list[str] = [
+        t for t in TOKEN_RE.findall(goal)
+        if len(t) >= 5 and any(c.isupper() for c in t)
+    ]
+
+    # Phase 2 enhancement: Extract namespace hints from goal text
+    goal_lower = goal.lower()
+    namespace_hints = {
+        hint: any(kw in goal_lower for kw in keywords)
+        for hint, keywords in _NAMESPACE_HINT_KEYWORDS.items()
+    }
+
+    # Unicode math type symbols present in the goal. Entries sharing the
+    # same symbols are more likely to operate on the same types.
+    goal_symbols = frozenset(c for c in goal if c in _MATH_SYMBOL_SET)
+    return lean_idents, namespace_hints, goal_symbols
+
+
 class PremiseRetriever:
     def __init__(
         self,
         *,
-        entries: list[PremiseEntry],
-        embeddings: list[list[float]],
+        entries: Sequence[PremiseEntry],
+        embeddings: Any,
         dims: int,
         encoder_name: str = "hash",
     ):
@@ -214,6 +718,9 @@ class PremiseRetriever:
         self.dims = dims
         # Remember which encoder was used so query vectors match index vectors.
         self.encoder_name = encoder_name
+        self._features: _ScoringFeatures | None = None
+        # Optional ANN index (set by load_np when ann_ivf.* files are present).
+        self.ann: IVFIndex | None = None
         self._st_encoder: _STEncoder | None = None
         if encoder_name != "hash":
             try:
@@ -300,21 +807,30 @@ class PremiseRetriever:
             "dims": self.dims,
             "encoder_name": self.encoder_name,
             "entries": [asdict(e) for e in self.entries],
-            "embeddings": self.embeddings,
+            "embeddings": (
+                self.embeddings.tolist() if hasattr(self.embeddings, "tolist") else self.embeddings
+            ),
         }
         path.write_text(json.dumps(payload), encoding="utf-8")
 
     def save_np(self, dir_path: str | Path) -> None:
-        """Save index to a directory using numpy (.npy) + JSONL for large corpora."""
+        """Save index to a directory using numpy (.npy) + JSONL for large corpora.
+
+        Also writes ``entries.offsets.npy`` (line offsets into entries.jsonl)
+        so :meth:`load_np` can map entries lazily instead of parsing them all.
+        """
         if not _HAS_NUMPY:
             raise ImportError("numpy is required: pip install numpy")
         p = Path(dir_path)
         p.mkdir(parents=True, exist_ok=True)
         arr = np.array(self.embeddings, dtype=np.float32)
-        np.save(p / "embeddings.npy", arr)
-        with (p / "entries.jsonl").open("w", encoding="utf-8") as f:
+        _save_npy_atomic(p / "embeddings.npy", arr)
+        tmp_entries = p / f".{_ENTRIES_FILE}.{os.getpid()}.tmp"
+        with tmp_entries.open("w", encoding="utf-8") as f:
             for e in self.entries:
                 f.write(json.dumps(asdict(e)) + "\n")
+        os.replace(tmp_entries, p / _ENTRIES_FILE)
+        _save_npy_atomic(p / _ENTRY_OFFSETS_FILE, _scan_line_offsets(p / _ENTRIES_FILE))
         (p / "meta.json").write_text(
             json.dumps({"dims": self.dims, "count": len(self.entries), "encoder_name": self.encoder_name}),
             encoding="utf-8",
@@ -322,26 +838,24 @@ class PremiseRetriever:
 
     @classmethod
     def load_np(cls, dir_path: str | Path) -> PremiseRetriever:
-        """Load index from a directory produced by save_np."""
+        """Load index from a directory produced by save_np.
+
+        The embedding matrix is memory-mapped read-only and entries are parsed
+        on access, so loading is O(1) in corpus size and concurrent worker
+        processes share the page-cached files. Indexes saved before the
+        offset file existed get one written on first load.
+        """
         if not _HAS_NUMPY:
             raise ImportError("numpy is required: pip install numpy")
         p = Path(dir_path)
-        arr = np.load(p / "embeddings.npy")
-        embeddings: list[list[float]] = arr.tolist()
-        entries: list[PremiseEntry] = []
-        for line in (p / "entries.jsonl").read_text(encoding="utf-8").splitlines():
-            if not line.strip():
-                continue
-            row = json.loads(line)
-            entries.append(PremiseEntry(
-                name=row.get("name", ""),
-                statement=row.get("statement", ""),
-                namespace=row.get("namespace", ""),
-                source_file=row.get("source_file", ""),
-            ))
+        embeddings = np.load(p / "embeddings.npy", mmap_mode="r")
+        entries = _LazyEntries(p / _ENTRIES_FILE, _load_entry_offsets(p))
         meta = json.loads((p / "meta.json").read_text(encoding="utf-8"))
         encoder_name = str(meta.get("encoder_name", "hash"))
-        return cls(entries=entries, embeddings=embeddings, dims=int(meta["dims"]), encoder_name=encoder_name)
+        retriever = cls(entries=entries, embeddings=embeddings, dims=int(meta["dims"]), encoder_name=encoder_name)
+        if _ann_enabled():
+            retriever.ann = IVFIndex.load(p)
+        return retriever
 
     def _encode_query(self, goal: str) -> list[float]:
         """Encode a query string with the same encoder used to build the index."""
@@ -350,6 +864,13 @@ class PremiseRetriever:
             return vecs[0] if vecs else [0.0] * self.dims
         return _embed_hash(goal, self.dims)
 
+    def _encode_queries(self, goals: list[str]) -> list[list[float]]:
+        """Batch form of :meth:`_encode_query` (one encoder call for all goals)."""
+        if self._st_encoder is not None:
+            vecs = self._st_encoder.encode(list(goals)) if goals else []
+            return vecs if len(vecs) == len(goals) else [self._encode_query(g) for g in goals]
+        return [_embed_hash(g, self.dims) for g in goals]
+
     def query(self, goal: str, top_k: int = 12) -> list[RetrievalHit]:
         """Return top-k premises ranked by embedding similarity + name-match boost.
 
@@ -363,29 +884,147 @@ class PremiseRetriever:
         """
         if top_k < 1:
             return []
+        return self.query_many([goal], top_k=top_k)[0]
 
-        # Extract camelCase / PascalCase tokens for name-match boost.
-        # A token qualifies if it has at least one uppercase letter and length >= 5.
-        lean_idents: list[str] = [
-            t for t in TOKEN_RE.findall(goal)
-            if len(t) >= 5 and any(c.isupper() for c in t)
-        ]
-
-        # Phase 2 enhancement: Extract namespace hints from goal text
-        goal_lower = goal.lower()
-        namespace_hints = {
-            "nat": any(kw in goal_lower for kw in ["nat", "∀ n", "∀ n :", "n : ℕ", "prime", "divisible"]),
-            "real": any(kw in goal_lower for kw in ["real", "ℝ", "sqrt", "log", "sin", "cos"]),
-            "algebra": any(kw in goal_lower for kw in ["ring", "field", "module", "vector"]),
-            "data": any(kw in goal_lower for kw in ["list", "finset", "multiset", "array"]),
-        }
+    def query_many(self, goals: list[str], top_k: int = 12) -> list[list[RetrievalHit]]:
+        """:meth:`query` for several goals at once.
+
+        Goals are encoded in one batch and, without an ANN index, base scores
+        for a block of goals come from a single matrix-matrix product.
+        """
+        if top_k < 1:
+            return [[] for _ in goals]
+        qs = self._encode_queries(goals)
+        vectorized = _HAS_NUMPY and 0 < len(self.entries) == len(self.embeddings)
+        feats = self._scoring_features() if vectorized else None
+        results: list[list[RetrievalHit]] = []
+        for start in range(0, len(goals), _QUERY_BLOCK):
+            block_goals = goals[start:start + _QUERY_BLOCK]
+            block_qs = qs[start:start + _QUERY_BLOCK]
+            base_block = None
+            if feats is not None and self.ann is None:
+                base_block = _base_scores(feats.matrix, block_qs)
+            for j, (goal, q) in enumerate(zip(block_goals, block_qs)):
+                lean_idents, namespace_hints, goal_symbols = _goal_signals(goal)
+                if feats is not None:
+                    ident_masks = feats.ident_masks(lean_idents)
+                    rows = None
+                    if self.ann is not None:
+                        # Probed lists plus every name-matched entry, so the ANN
+                        # path never drops an exact-identifier hit.
+                        rows = self.ann.candidates(q)
+                        for exact, contains in ident_masks:
+                            rows = np.union1d(rows, np.flatnonzero(exact | contains))
+                    rows, scores = self._score_all(
+                        q, ident_masks, namespace_hints, goal_symbols, top_k=top_k,
+                        rows=rows, base=None if base_block is None else base_block[:, j],
+                    )
+                    top = _top_k_desc(scores, top_k)
+                    scored = [(int(rows[t]), float(scores[t])) for t in top]
+                else:
+                    scored = self._score_all_py(q, lean_idents, namespace_hints, goal_symbols)
+                    scored.sort(key=lambda x: x[1], reverse=True)
+                results.append(self._hits(scored[:top_k]))
+        return results
+
+    def _hits(self, scored: list[tuple[int, float]]) -> list[RetrievalHit]:
+        hits: list[RetrievalHit] = []
+        for idx, score in scored:
+            e = self.entries[idx]
+            hits.append(
+                RetrievalHit(
+                    name=e.name,
+                    statement=e.statement,
+                    namespace=e.namespace,
+                    score=score,
+                    trust_tier="unknown",  # Will be populated by tier-aware retrieval
+                )
+            )
+        return hits
 
-        # Unicode math type symbols present in the goal. Entries sharing the
-        # same symbols are more likely to operate on the same types.
-        _MATH_SYMBOLS = frozenset("ℕℤℚℝℂ∀∃→↔⊆⊂∈∉∩∪≤≥≠∑∏⟨⟩⟦⟧")
-        goal_symbols = frozenset(c for c in goal if c in _MATH_SYMBOLS)
+    def _scoring_features(self) -> _ScoringFeatures:
+        key = (id(self.entries), len(self.entries), id(self.embeddings), len(self.embeddings))
+        if self._features is None or self._features.key != key:
+            self._features = _ScoringFeatures.build(self.entries, self.embeddings, key)
+        return self._features
 
-        q = self._encode_query(goal)
+    def _score_all(
+        self,
+        q: list[float],
+        ident_masks: list[tuple[Any, Any]],
+        namespace_hints: dict[str, bool],
+        goal_symbols: frozenset[str],
+        *,
+        top_k: int,
+        rows: Any | None = None,
+        base: Any | None = None,
+    ) -> tuple[Any, Any]:
+        """Embedding similarity + boosts as ``(row ids, float64 scores)``.
+
+        Same arithmetic as :meth:`_score_all_py`, vectorized: float64 base
+        scores and boosts accumulated in the same order, so ties break the
+        same way. Namespace and symbol boosts need the parsed entry, so rows
+        whose score cannot reach the top ``top_k`` even with the largest such
+        boost are dropped before they are parsed; the returned rows always
+        contain the exact top ``top_k``.
+        """
+        feats = self._scoring_features()
+        if rows is None:
+            rows = np.arange(feats.matrix.shape[0])
+            if base is None:
+                base = _base_scores(feats.matrix, [q])[:, 0]
+        elif base is None:
+            base = _base_scores(feats.matrix[rows], [q])[:, 0]
+        base = np.asarray(base, dtype=np.float64)
+        boost = np.zeros(base.shape[0], dtype=np.float64)
+
+        # Exact lemma name matches get highest boost
+        for exact, contains in ident_masks:
+            exact, contains = exact[rows], contains[rows]
+            boost[exact] += 1.5
+            boost[contains & ~exact] += 0.5
+
+        hints = [hint for hint, present in namespace_hints.items() if present]
+        if not hints and not goal_symbols:
+            return rows, base + boost
+        if top_k < rows.shape[0]:
+            # Every namespace hint moves a score by -0.1..+0.3 and every goal
+            # symbol by 0..+0.2: a row below kth - lowest by more than the
+            # highest possible boost loses to each of the current top k.
+            partial = base + boost
+            kth = np.partition(partial, partial.shape[0] - top_k)[partial.shape[0] - top_k]
+            keep = partial + (0.3 * len(hints) + 0.2 * len(goal_symbols)) + 1e-9 >= kth - 0.1 * len(hints)
+            rows, base, boost = rows[keep], base[keep], boost[keep]
+        feats.fill(rows)
+
+        # Namespace heuristics: prefer matching namespaces
+        if hints:
+            namespaces = [feats.namespaces[i] for i in rows.tolist()]
+            mathlib = np.fromiter(("mathlib" in ns for ns in namespaces), dtype=bool, count=len(namespaces))
+            for ns_hint in hints:
+                in_ns = np.fromiter((ns_hint in ns for ns in namespaces), dtype=bool, count=len(namespaces))
+                boost[in_ns] += 0.3
+                boost[~in_ns & mathlib] -= 0.1
+
+        # Unicode type symbol overlap
+        if goal_symbols:
+            bits = feats.symbol_bits[rows]
+            overlap = np.zeros(base.shape[0], dtype=np.int64)
+            for c in goal_symbols:
+                overlap += (bits & _MATH_SYMBOL_BIT[c]) != 0
+            has = overlap > 0
+            boost[has] += 0.2 * overlap[has]
+
+        return rows, base + boost
+
+    def _score_all_py(
+        self,
+        q: list[float],
+        lean_idents: list[str],
+        namespace_hints: dict[str, bool],
+        goal_symbols: frozenset[str],
+    ) -> list[tuple[int, float]]:
+        """Pure-Python scoring loop, used when numpy is unavailable."""
         scored: list[tuple[int, float]] = []
         for i, emb in enumerate(self.embeddings):
             base = _dot(q, emb)
@@ -412,27 +1051,13 @@ class PremiseRetriever:
             # the same math symbols as the goal (same type universe / domain).
             if goal_symbols:
                 stmt = self.entries[i].statement
-                entry_symbols = frozenset(c for c in stmt if c in _MATH_SYMBOLS)
+                entry_symbols = frozenset(c for c in stmt if c in _MATH_SYMBOL_SET)
                 overlap = len(goal_symbols & entry_symbols)
                 if overlap:
                     boost += 0.2 * overlap
 
             scored.append((i, base + boost))
-        scored.sort(key=lambda x: x[1], reverse=True)
-
-        hits: list[RetrievalHit] = []
-        for idx, score in scored[:top_k]:
-            e = self.entries[idx]
-            hits.append(
-                RetrievalHit(
-                    name=e.name,
-                    statement=e.statement,
-                    namespace=e.namespace,
-                    score=score,
-                    trust_tier="unknown",  # Will be populated by tier-aware retrieval
-                )
-            )
-        return hits
+        return scored
 
     def query_with_tier_preference(
         self, goal: str, kg_trusted_names: set[str] | None = None,
@@ -745,17 +1370,42 @@ def _cmd_fetch_mathlib(args: argparse.Namespace) -> int:
         hf_dataset=args.dataset,
         encoder_name=getattr(args, "encoder_name", None),
     )
+    if getattr(args, "ann", "none") == "ivf":
+        ann = build_ann_index(args.out)
+        print(f"[fetch-mathlib] built IVF index lists={ann.n_lists} n_probe={ann.n_probe}")
     return 0
 
 
 def _cmd_build(args: argparse.Namespace) -> int:
     entries = parse_toon_nodes(args.toon)
     retriever = PremiseRetriever.build(entries, dims=args.dims)
-    retriever.save(args.out)
+    if args.ann == "ivf":
+        # ANN files live next to embeddings.npy, so --out becomes a directory.
+        retriever.save_np(args.out)
+        ann = build_ann_index(args.out, n_lists=args.ann_lists or None)
+        print(f"[ok] built IVF index lists={ann.n_lists} n_probe={ann.n_probe}")
+    else:
+        retriever.save(args.out)
     print(f"[ok] built index entries={len(entries)} dims={args.dims} -> {args.out}")
     return 0
 
 
+def _cmd_build_ann(args: argparse.Namespace) -> int:
+    ann = build_ann_index(args.index, n_lists=args.lists or None, n_probe=args.n_probe or None)
+    print(f"[ok] built IVF index lists={ann.n_lists} n_probe={ann.n_probe} -> {args.index}")
+    return 0
+
+
+def _cmd_bench_ann(args: argparse.Namespace) -> int:
+    probes = [int(x) for x in args.n_probe.split(",") if x.strip()] if args.n_probe else None
+    rows = benchmark_ann(args.index, n_queries=args.queries, top_k=args.top_k, n_probes=probes)
+    print(f"{'n_probe':>8} {'recall@' + str(args.top_k):>10} {'ms/query':>10}")
+    for row in rows:
+        label = "exact" if row["n_probe"] == 0 else str(int(row["n_probe"]))
+        print(f"{label:>8} {row['recall']:>10.3f} {row['mean_ms']:>10.3f}")
+    return 0
+
+
 def _cmd_query(args: argparse.Namespace) -> int:
     retriever = PremiseRetriever.load(args.index)
     hits = retriever.query(args.goal, top_k=args.top_k)
@@ -803,14 +1453,36 @@ def build_parser() -> argparse.ArgumentParser:
             "Defaults to all-MiniLM-L6-v2 if sentence-transformers is installed."
         ),
     )
+    p_fm.add_argument(
+        "--ann", choices=["none", "ivf"], default="none",
+        help="Also build an approximate nearest-neighbour index alongside embeddings.npy",
+    )
     p_fm.set_defaults(func=_cmd_fetch_mathlib)
 
     p_build = sub.add_parser("build", help="Build retrieval index from TOON inventory")
     p_build.add_argument("--toon", required=True, help="Path to .toon inventory file")
     p_build.add_argument("--out", required=True, help="Output JSON index path")
     p_build.add_argument("--dims", type=int, default=1536, help="Embedding dimension")
+    p_build.add_argument(
+        "--ann", choices=["none", "ivf"], default="none",
+        help="Also build an approximate nearest-neighbour index (writes a numpy index directory)",
+    )
+    p_build.add_argument("--ann-lists", type=int, default=0, help="IVF list count (default: ~4*sqrt(n))")
     p_build.set_defaults(func=_cmd_build)
 
+    p_ann = sub.add_parser("build-ann", help="Build an IVF ANN index for an existing numpy index directory")
+    p_ann.add_argument("--index", required=True, help="Index directory (embeddings.npy)")
+    p_ann.add_argument("--lists", type=int, default=0, help="IVF list count (default: ~4*sqrt(n))")
+    p_ann.add_argument("--n-probe", type=int, default=0, help="Lists probed per query (default: ~3%% of lists)")
+    p_ann.set_defaults(func=_cmd_build_ann)
+
+    p_bench = sub.add_parser("bench-ann", help="Recall vs latency of the ANN index against exact search")
+    p_bench.add_argument("--index", required=True, help="Index directory with an ANN index")
+    p_bench.add_argument("--queries", type=int, default=200)
+    p_bench.add_argument("--top-k", type=int, default=12)
+    p_bench.add_argument("--n-probe", default="", help="Comma-separated n_probe values to sweep")
+    p_bench.set_defaults(func=_cmd_bench_ann)
+
     p_query = sub.add_parser("query", help="Query top-k premises")
     p_query.add_argument("--index", required=True, help="Index JSON path")
     p_query.add_argument("--goal", required=True, help="Lean goal text")
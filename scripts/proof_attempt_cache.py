@@ -19,7 +19,11 @@ The cache stores:
   - method: short tag
   - error_tail: lake error if not validated (≤300 chars)
 
-Cache file: `data/proof_attempt_cache.jsonl` (gitignored).
+Cache file: `data/proof_attempt_cache.jsonl` (gitignored). It is
+append-only; each process indexes it in memory and reads only newly
+appended lines, so lookups are O(1) after the first. `--compact` rewrites
+it down to the latest entry per (statement, method); `--import` merges
+another cache file into it.
 
 Standards-positive: a cached "validated" entry still passes through
 the integrity audit when applied. The cache is an OPTIMIZATION
@@ -29,11 +33,13 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 import re
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 
 DEFAULT_CACHE_PATH = Path("data/proof_attempt_cache.jsonl")
@@ -68,31 +74,43 @@ def statement_hash(lean_statement: str) -> str:
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
 
 
-def lookup_cached_proof(
-    *,
-    lean_statement: str,
-    method: str,
-    cache_path: Path = DEFAULT_CACHE_PATH,
-) -> CacheEntry | None:
-    """Return the most-recent cached entry for (statement, method) if any."""
-    if not cache_path.exists():
-        return None
-    h = statement_hash(lean_statement)
-    best: CacheEntry | None = None
-    for line in cache_path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
+# ── Index ────────────────────────────────────────────────────────────────────
+#
+# The JSONL file stays the append-only source of truth (so concurrent
+# appenders and old history keep working); each process keeps an index of
+# the latest entry per (statement_hash, method) and only parses the bytes
+# appended since its last look. A file that shrank or was replaced (see
+# `compact_cache`) is re-read from the start.
+
+
+@dataclass
+class _CacheIndex:
+    ident: tuple[int, int] = (0, 0)  # (st_dev, st_ino) of the indexed file
+    offset: int = 0
+    latest: dict[tuple[str, str], CacheEntry] = field(default_factory=dict)
+    entries: int = 0
+    validated: int = 0
+    methods: dict[str, int] = field(default_factory=dict)
+    hashes: set[str] = field(default_factory=set)
+
+    def add(self, row: dict[str, Any]) -> None:
+        h = str(row.get("statement_hash", "") or "")
+        method = str(row.get("method", "") or "")
+        self.entries += 1
+        if row.get("validated"):
+            self.validated += 1
+        m = method or "unknown"
+        self.methods[m] = self.methods.get(m, 0) + 1
+        if h:
+            self.hashes.add(h)
         try:
-            row = json.loads(line)
-        except Exception:
-            continue
-        if row.get("statement_hash") != h:
-            continue
-        if str(row.get("method", "")) != method:
-            continue
-        ts = float(row.get("timestamp", 0.0))
+            ts = float(row.get("timestamp", 0.0))
+        except (TypeError, ValueError):
+            ts = 0.0
+        key = (h, method)
+        best = self.latest.get(key)
         if best is None or ts > best.timestamp:
-            best = CacheEntry(
+            self.latest[key] = CacheEntry(
                 statement_hash=h,
                 method=method,
                 proof_body=str(row.get("proof_body", "") or ""),
@@ -100,7 +118,104 @@ def lookup_cached_proof(
                 timestamp=ts,
                 error_tail=str(row.get("error_tail", "") or "")[:300],
             )
-    return best
+
+
+_INDEXES: dict[str, _CacheIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def _iter_rows(data: bytes) -> Iterator[dict[str, Any]]:
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except Exception:
+            continue
+        if isinstance(row, dict):
+            yield row
+
+
+def _index(cache_path: Path) -> _CacheIndex | None:
+    """Return the up-to-date index for ``cache_path`` (None if it is missing).
+
+    Caller must hold ``_INDEX_LOCK``.
+    """
+    try:
+        st = cache_path.stat()
+    except OSError:
+        _INDEXES.pop(str(cache_path), None)
+        return None
+    key = str(cache_path)
+    idx = _INDEXES.get(key)
+    if idx is None or idx.ident != (st.st_dev, st.st_ino) or st.st_size < idx.offset:
+        idx = _INDEXES[key] = _CacheIndex(ident=(st.st_dev, st.st_ino))
+    if st.st_size > idx.offset:
+        with cache_path.open("rb") as f:
+            f.seek(idx.offset)
+            data = f.read(st.st_size - idx.offset)
+        # Leave a half-written trailing line for the next refresh.
+        end = data.rfind(b"\n") + 1
+        for row in _iter_rows(data[:end]):
+            idx.add(row)
+        idx.offset += end
+    return idx
+
+
+def lookup_many(
+    lean_statements: Iterable[str],
+    *,
+    method: str,
+    cache_path: Path = DEFAULT_CACHE_PATH,
+) -> list[CacheEntry | None]:
+    """Batch `lookup_cached_proof`: one index refresh, then O(1) per statement."""
+    statements = list(lean_statements)
+    with _INDEX_LOCK:
+        idx = _index(cache_path)
+        if idx is None:
+            return [None] * len(statements)
+        return [idx.latest.get((statement_hash(s), method)) for s in statements]
+
+
+def lookup_cached_proof(
+    *,
+    lean_statement: str,
+    method: str,
+    cache_path: Path = DEFAULT_CACHE_PATH,
+) -> CacheEntry | None:
+    """Return the most-recent cached entry for (statement, method) if any."""
+    return lookup_many([lean_statement], method=method, cache_path=cache_path)[0]
+
+
+def _attempt_row(
+    *,
+    lean_statement: str,
+    method: str,
+    proof_body: str,
+    validated: bool,
+    error_tail: str = "",
+    timestamp: float | None = None,
+) -> dict[str, Any] | None:
+    if not (lean_statement or "").strip() or not (method or "").strip():
+        return None
+    return {
+        "statement_hash": statement_hash(lean_statement),
+        "method": method,
+        "proof_body": proof_body,
+        "validated": bool(validated),
+        "timestamp": time.time() if timestamp is None else float(timestamp),
+        "error_tail": (error_tail or "")[:300],
+    }
+
+
+def _append_rows(cache_path: Path, rows: list[dict[str, Any]]) -> int:
+    if not rows:
+        return 0
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    with cache_path.open("a", encoding="utf-8") as f:
+        f.write(payload)
+    return len(rows)
 
 
 def record_proof_attempt(
@@ -117,51 +232,108 @@ def record_proof_attempt(
     Never overwrites; later entries supersede earlier ones at lookup time
     via timestamp ordering. Drops empty (statement, method) records.
     """
-    if not lean_statement.strip() or not method.strip():
-        return
+    row = _attempt_row(
+        lean_statement=lean_statement,
+        method=method,
+        proof_body=proof_body,
+        validated=validated,
+        error_tail=error_tail,
+    )
+    _append_rows(cache_path, [row] if row else [])
+
+
+def record_many(
+    attempts: Iterable[dict[str, Any]],
+    *,
+    cache_path: Path = DEFAULT_CACHE_PATH,
+) -> int:
+    """Append many attempts in one write; returns how many were recorded.
+
+    Each attempt is a dict with the keyword arguments of
+    `record_proof_attempt` (``lean_statement``, ``method``, ``proof_body``,
+    ``validated``, optional ``error_tail``).
+    """
+    rows = []
+    for attempt in attempts:
+        row = _attempt_row(
+            lean_statement=str(attempt.get("lean_statement", "") or ""),
+            method=str(attempt.get("method", "") or ""),
+            proof_body=str(attempt.get("proof_body", "") or ""),
+            validated=bool(attempt.get("validated", False)),
+            error_tail=str(attempt.get("error_tail", "") or ""),
+        )
+        if row:
+            rows.append(row)
+    return _append_rows(cache_path, rows)
+
+
+def _rewrite_latest(cache_path: Path, latest: Iterable[CacheEntry]) -> int:
+    rows = sorted(latest, key=lambda e: e.timestamp)
+    tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
     cache_path.parent.mkdir(parents=True, exist_ok=True)
-    row = {
-        "statement_hash": statement_hash(lean_statement),
-        "method": method,
-        "proof_body": proof_body,
-        "validated": bool(validated),
-        "timestamp": time.time(),
-        "error_tail": (error_tail or "")[:300],
-    }
-    with cache_path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    with tmp.open("w", encoding="utf-8") as f:
+        for e in rows:
+            f.write(json.dumps(asdict(e), ensure_ascii=False) + "\n")
+    os.replace(tmp, cache_path)
+    return len(rows)
+
+
+def compact_cache(cache_path: Path = DEFAULT_CACHE_PATH) -> dict[str, int]:
+    """Rewrite the cache keeping only the latest entry per (statement, method).
+
+    Drops superseded and unparseable lines. The rewrite is atomic, but
+    attempts appended by another process while it runs are lost, so run
+    it between sweeps.
+    """
+    with _INDEX_LOCK:
+        idx = _index(cache_path)
+        if idx is None:
+            return {"before": 0, "after": 0}
+        before = idx.entries
+        after = _rewrite_latest(cache_path, list(idx.latest.values()))
+        _INDEXES.pop(str(cache_path), None)
+    return {"before": before, "after": after}
+
+
+def import_jsonl(
+    source: Path,
+    cache_path: Path = DEFAULT_CACHE_PATH,
+) -> dict[str, int]:
+    """Merge another proof-attempt JSONL (e.g. an older cache) into the cache.
+
+    Rows keep their original timestamps, so the newest entry per
+    (statement, method) still wins regardless of which file it came from.
+    Returns how many rows were read and how many were appended.
+    """
+    with _INDEX_LOCK:
+        src = _CacheIndex()
+        if source.exists():
+            for row in _iter_rows(source.read_bytes()):
+                src.add(row)
+        idx = _index(cache_path)
+        known = idx.latest if idx is not None else {}
+        rows = [
+            asdict(e)
+            for key, e in src.latest.items()
+            if key[0] and key[1] and (key not in known or known[key].timestamp < e.timestamp)
+        ]
+        _append_rows(cache_path, sorted(rows, key=lambda r: r["timestamp"]))
+    return {"read": src.entries, "imported": len(rows)}
 
 
 def cache_stats(cache_path: Path = DEFAULT_CACHE_PATH) -> dict[str, Any]:
     """Lightweight stats for telemetry."""
-    if not cache_path.exists():
-        return {"entries": 0, "validated": 0, "rejected": 0, "methods": {}}
-    n = 0
-    n_valid = 0
-    methods: dict[str, int] = {}
-    seen_hashes: set[str] = set()
-    for line in cache_path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            row = json.loads(line)
-        except Exception:
-            continue
-        n += 1
-        if row.get("validated"):
-            n_valid += 1
-        m = str(row.get("method", "") or "unknown")
-        methods[m] = methods.get(m, 0) + 1
-        h = str(row.get("statement_hash", "") or "")
-        if h:
-            seen_hashes.add(h)
-    return {
-        "entries": n,
-        "validated": n_valid,
-        "rejected": n - n_valid,
-        "methods": methods,
-        "unique_statements": len(seen_hashes),
-    }
+    with _INDEX_LOCK:
+        idx = _index(cache_path)
+        if idx is None:
+            return {"entries": 0, "validated": 0, "rejected": 0, "methods": {}}
+        return {
+            "entries": idx.entries,
+            "validated": idx.validated,
+            "rejected": idx.entries - idx.validated,
+            "methods": dict(idx.methods),
+            "unique_statements": len(idx.hashes),
+        }
 
 
 def main() -> int:
@@ -171,8 +343,18 @@ def main() -> int:
     parser.add_argument("--stats", action="store_true", help="Print cache stats and exit")
     parser.add_argument("--lookup", help="Look up a statement (pass the lean_statement)")
     parser.add_argument("--method", default="whole_proof", help="Method tag for --lookup")
+    parser.add_argument("--compact", action="store_true",
+                        help="Keep only the latest entry per (statement, method)")
+    parser.add_argument("--import", dest="import_path", type=Path,
+                        help="Merge another proof-attempt JSONL into the cache")
     args = parser.parse_args()
 
+    if args.import_path:
+        print(json.dumps(import_jsonl(args.import_path, args.cache_path), indent=2))
+        return 0
+    if args.compact:
+        print(json.dumps(compact_cache(args.cache_path), indent=2))
+        return 0
     if args.stats:
         print(json.dumps(cache_stats(args.cache_path), indent=2))
         return 0
@@ -3175,6 +3175,11 @@ def _run_deterministic_micro_prover(
                 file_path=rel_file,
                 theorem_name=nm,
                 timeout=max(30, int(timeout_s)),
+                # Scripts branch from the same states; the REPL backend applies
+                # one tactic per call instead of re-elaborating the file. Its
+                # env stops before the theorem, so `exact?` cannot close the
+                # goal with the theorem itself or a later sorry'd lemma.
+                backend=os.environ.get("DESOL_DOJO_BACKEND", "") or "auto",
             ) as (dojo, state):
                 if not _is_tactic_state_obj(state):
                     last_err = "micro_non_tactic_state"
@@ -3231,6 +3236,7 @@ def _run_isolated_file_check(
     theorem_decl: str,
     timeout_s: int = 45,
     proof_body: Optional[str] = None,
+    backend: Optional[str] = None,
 ) -> tuple[bool, str]:
     """Standalone elaboration probe: build an isolated `.lean` file with the
     source-file prelude + `theorem_decl` (rewritten to `:= by sorry`) and run
@@ -3253,6 +3259,12 @@ def _run_isolated_file_check(
     contaminate the lake output). On success the result has no
     `declaration uses 'sorry'` warning, which is the standards-positive
     accept gate.
+
+    The isolated source is checked through `lake_validation_cache.
+    check_lean_source`, which elaborates it on a warm REPL env for its import
+    header when one is available and otherwise runs `lake env lean` as
+    below. `backend="lake"` forces the cold path (used by differential
+    checks); `None` follows `DESOL_VALIDATION_BACKEND`.
     """
     decl_clean = (theorem_decl or "").strip()
     if not decl_clean:
@@ -3297,59 +3309,73 @@ def _run_isolated_file_check(
         prelude_lines.append("set_option autoImplicit true")
     isolated_src = "\n".join(prelude_lines).rstrip() + "\n\n" + isolated_decl + "\n"
 
-    tmp_path: Path | None = None
-    iso_dir = src.parent if src.exists() else (project_root / "output")
-    iso_dir.mkdir(parents=True, exist_ok=True)
-    try:
-        with tempfile.NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            prefix="repair_candidate_isolated_",
-            suffix=".lean",
-            dir=str(iso_dir),
-            delete=False,
-        ) as tmp:
-            tmp_path = Path(tmp.name)
-            tmp.write(isolated_src)
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(tmp_path)],
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=max(20, int(timeout_s)),
-        )
-        out = ((proc.stdout or "") + "\n" + (proc.stderr or "")).strip()
-        low = out.lower()
-        # When a candidate proof body was supplied, a `declaration uses 'sorry'`
-        # warning means the supplied body still left an open goal (e.g.
-        # `aesop` failed silently) — reject. When NO body was supplied this
-        # is the expected post-state of a signature-only probe (the placeholder
-        # `by sorry` always triggers the warning) and we accept on rc==0.
-        if proof_body is not None:
-            sorry_warning = (
-                ("warning: declaration uses 'sorry'" in low)
-                or ("warning: declaration uses `sorry`" in low)
+    def _cold_check() -> tuple[bool, str]:
+        tmp_path: Path | None = None
+        iso_dir = src.parent if src.exists() else (project_root / "output")
+        iso_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with tempfile.NamedTemporaryFile(
+                mode="w",
+                encoding="utf-8",
+                prefix="repair_candidate_isolated_",
+                suffix=".lean",
+                dir=str(iso_dir),
+                delete=False,
+            ) as tmp:
+                tmp_path = Path(tmp.name)
+                tmp.write(isolated_src)
+            proc = subprocess.run(
+                ["lake", "env", "lean", str(tmp_path)],
+                cwd=project_root,
+                capture_output=True,
+                text=True,
+                timeout=max(20, int(timeout_s)),
             )
-            if proc.returncode == 0 and not sorry_warning:
+            out = ((proc.stdout or "") + "\n" + (proc.stderr or "")).strip()
+            low = out.lower()
+            # When a candidate proof body was supplied, a `declaration uses 'sorry'`
+            # warning means the supplied body still left an open goal (e.g.
+            # `aesop` failed silently) — reject. When NO body was supplied this
+            # is the expected post-state of a signature-only probe (the placeholder
+            # `by sorry` always triggers the warning) and we accept on rc==0.
+            if proof_body is not None:
+                sorry_warning = (
+                    ("warning: declaration uses 'sorry'" in low)
+                    or ("warning: declaration uses `sorry`" in low)
+                )
+                if proc.returncode == 0 and not sorry_warning:
+                    return True, ""
+                if sorry_warning:
+                    return False, "isolated_check_body_emits_sorry_warning"
+                return False, f"file_check_fail:{out[-300:]}"
+            if proc.returncode == 0:
+                return True, ""
+            if ("error:" not in low) and ("warning: declaration uses `sorry`" in low):
                 return True, ""
-            if sorry_warning:
-                return False, "isolated_check_body_emits_sorry_warning"
             return False, f"file_check_fail:{out[-300:]}"
-        if proc.returncode == 0:
-            return True, ""
-        if ("error:" not in low) and ("warning: declaration uses `sorry`" in low):
-            return True, ""
-        return False, f"file_check_fail:{out[-300:]}"
-    except subprocess.TimeoutExpired:
-        return False, f"file_check_timeout:{timeout_s}s"
-    except Exception as exc:
-        return False, f"file_check_exception:{exc}"
-    finally:
-        if tmp_path is not None:
-            try:
-                tmp_path.unlink()
-            except Exception:
-                pass
+        except subprocess.TimeoutExpired:
+            return False, f"file_check_timeout:{timeout_s}s"
+        except Exception as exc:
+            return False, f"file_check_exception:{exc}"
+        finally:
+            if tmp_path is not None:
+                try:
+                    tmp_path.unlink()
+                except Exception:
+                    pass
+
+    from lake_validation_cache import _classify_messages, check_lean_source
+
+    return check_lean_source(
+        isolated_src,
+        project_root=project_root,
+        classify=lambda msgs: _classify_messages(msgs, body_supplied=proof_body is not None),
+        cold_check=_cold_check,
+        timeout_s=timeout_s,
+        timeout_result=(False, f"file_check_timeout:{timeout_s}s"),
+        backend=backend,
+        caller="isolated_file_check",
+    )
 
 
 def _verify_script_via_file_check(
@@ -4072,6 +4098,14 @@ def main() -> int:
     proved_set: set[str] = set()
 
     def _attempt_theorem(name: str) -> ProofResult:
+        # prove_one upserts the ledger many times per theorem; write it once,
+        # when the theorem is done, so the bridge loop below sees it on disk.
+        from pipeline_status import ledger_batch
+
+        with ledger_batch():
+            return _attempt_theorem_unbatched(name)
+
+    def _attempt_theorem_unbatched(name: str) -> ProofResult:
         thm = theorem_by_name[name]
         total_attempts = max(1, int(args.mandatory_retry_rounds) if int(args.mandatory_retry_rounds) > 0 else 1)
         r_inner: ProofResult | None = None
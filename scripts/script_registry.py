@@ -191,7 +191,7 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
     "lake_validation_cache.py": {
         "tier": "official_support",
         "category": "lean_backend",
-        "summary": "Fast equivalent of `prove_arxiv_batch._run_isolated_file_check`. Reuses a persistent `LeanREPLServer` worker per `(project_root, paper_id)` so the Mathlib import cost is paid once per process (~5s) instead of once per candidate (~5-30s). Exposes `validated_isolated_check`, `differential_check` (runs fast + slow validators and asserts agreement, used by sweep wrappers for standards-positivity), and `shutdown_all_workers`. Wired into `sweep_lemma_factor_v2.py` and `sweep_canonical_proof_search.py` behind `--use-fast-validation` (default ON; live test confirms >100× speedup on warm calls).",
+        "summary": "Fast equivalent of `prove_arxiv_batch._run_isolated_file_check`. Reuses a bounded pool of persistent `LeanREPLServer` workers per `(project_root, paper_id)` (least-loaded dispatch, global worker cap, LRU eviction of idle papers) so the Mathlib import cost is paid once per process (~5s) instead of once per candidate (~5-30s). Exposes `validated_isolated_check`, `validate_candidates_batch` (fans candidates over the worker pool, streams results, optional stop-on-first-success), `differential_check` (runs fast + slow validators and asserts agreement, used by sweep wrappers for standards-positivity), and `shutdown_all_workers`. `check_lean_source` is the shared whole-file engine behind `_run_isolated_file_check`, `pipeline_status.independent_lean_verify` and the translator's `_run_lean`: warm env per import header, cold `lake env lean` fallback, sampled cold re-checks (`DESOL_VALIDATION_DIFFERENTIAL_RATE`, logged to `output/validation_differential.jsonl`), backend via `DESOL_VALIDATION_BACKEND`. `run_lean_file` stands in for `lake env lean <paper>.lean` in the in-file patch checks (baseline capture, `_lake_validate_aware`, the whole-proof and canonical patch sweeps): env checkpoints per declaration prefix, keyed by a content hash chain, so a re-check elaborates only the changed declarations up to the patched theorem (`DESOL_DECL_CHECKPOINTS_MAX`). Wired into `sweep_lemma_factor_v2.py` and `sweep_canonical_proof_search.py` behind `--use-fast-validation` (default ON; live test confirms >100× speedup on warm calls).",
     },
     "lemma_factor_v2.py": {
         "tier": "research_experiment",
@@ -378,6 +378,16 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
         "category": "translation",
         "summary": "Re-translates placeholder `theorem foo : False := by sorry` rows by calling Leanstral with explicit recovery hints derived from the BLOCKED reason.",
     },
+    "llm_response_cache.py": {
+        "tier": "official_support",
+        "category": "support",
+        "summary": "Content-addressed SQLite cache in front of `ponder_loop._chat_complete` keyed by (model, messages, temperature, max_tokens, seed). `DESOL_LLM_CACHE=off|on|replay|offline` (default off; `replay` records temperature>0 samples by occurrence, `offline` never calls the API); LRU eviction past `DESOL_LLM_CACHE_MAX_MB`; hit rates reported on `api_log_hook` records.",
+    },
+    "llm_scheduler.py": {
+        "tier": "official_support",
+        "category": "support",
+        "summary": "Process-wide admission control for Leanstral calls (`ponder_loop._chat_complete` and the MCTS value/transition calls): AIMD concurrency window capped by `DESOL_LLM_MAX_CONCURRENCY`, 429/5xx backoff and retry, optional `DESOL_LLM_RATE` ceiling, interactive (/verify) / default / background (sweeps) priority lanes; window, rate bucket, cooldown and lane queue shared across processes through SQLite (`DESOL_LLM_ADMISSION_DB`, `off` for in-process only); retries only on 429/5xx read from the exception's status attribute; coalescing of identical in-flight temperature-0 requests.",
+    },
     "llm_statement_repair.py": {
         "tier": "research_experiment",
         "category": "repair",
@@ -451,7 +461,7 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
     "proof_attempt_cache.py": {
         "tier": "official_support",
         "category": "proof_search",
-        "summary": "Statement-hash cache for proof attempts (statement_hash + method → proof_body + validated + timestamp). Dedupes repeat Mistral calls across sweep rounds. Cache file: `data/proof_attempt_cache.jsonl` (gitignored). Standards-positive: cached entries still pass through the integrity audit; this is an optimization, not a trust layer.",
+        "summary": "Statement-hash cache for proof attempts (statement_hash + method → proof_body + validated + timestamp). Dedupes repeat Mistral calls across sweep rounds. Cache file: `data/proof_attempt_cache.jsonl` (gitignored), indexed in memory per process with incremental tail reads; `--compact` / `--import` maintain it. Standards-positive: cached entries still pass through the integrity audit; this is an optimization, not a trust layer.",
     },
     "audit_paper_theory_olean_health.py": {
         "tier": "ci_gate",
@@ -573,6 +583,16 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
         "category": "ingestion",
         "summary": "Expands LaTeX macros and include trees before extraction.",
     },
+    "lean_diagnostics_store.py": {
+        "tier": "official_support",
+        "category": "lean_backend",
+        "summary": "Content-addressed SQLite store of whole-file Lean diagnostics keyed by (file sha256, lake-manifest sha256, lean-toolchain, transitively imported project modules). Filled only from cold `lake env lean` runs; keeps lake-formatted output plus parsed messages (severity, line, column, declaration). Baseline capture in `sweep_lemma_factor_v2`, the FP-integrity audit's `collect_lake_error_lines` and `ledger_from_closed_lean` read from it instead of re-elaborating unchanged files. Path via `DESOL_LEAN_DIAGNOSTICS_DB`.",
+    },
+    "lean_name_oracle.py": {
+        "tier": "official_support",
+        "category": "lean_backend",
+        "summary": "Batched `#check @name` resolution for grounding and translation: one Lean run per batch (one shared REPL per project with a capped env per normalized import header, `DESOL_NAME_ORACLE_REPL_HEADERS`; lake fallback once the REPL fails for a header), persistent SQLite cache keyed by toolchain pin (incl. project-local imported sources) + imports, LRU-capped process-wide oracles (`DESOL_NAME_ORACLE_MAX`), optional prebuilt declaration-name set (`DESOL_LEAN_DECL_NAMES`).",
+    },
     "lean_repl_dojo.py": {
         "tier": "official_support",
         "category": "lean_backend",
@@ -581,7 +601,7 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
     "lean_repl_server.py": {
         "tier": "official_support",
         "category": "lean_backend",
-        "summary": "Persistent Lean REPL server used by proof search.",
+        "summary": "Persistent Lean REPL server used by proof search, plus an asyncio variant (`AsyncLeanREPLServer`) with pipelined commands (scaffolding: no production caller yet).",
     },
     "lean_sanitize.py": {
         "tier": "internal_support",
@@ -701,7 +721,7 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
     "premise_retrieval.py": {
         "tier": "official_support",
         "category": "proof_search",
-        "summary": "Retrieves Mathlib and KG premises for proof search.",
+        "summary": "Retrieves Mathlib and KG premises for proof search (optional IVF ANN index + recall benchmark).",
     },
     "statement_retrieval.py": {
         "tier": "official_support",
@@ -933,6 +953,11 @@ SCRIPT_REGISTRY: dict[str, dict[str, str]] = {
         "category": "translation",
         "summary": "Auto-repair pass for translator bugs: typeclass-in-existential → top-level binders, LaTeX subscript/superscript braces → Lean-native form. Idempotent.",
     },
+    "theorem_dependency_graph.py": {
+        "tier": "official_support",
+        "category": "ingestion",
+        "summary": "Dependency graph between extracted theorem entries (`\\ref`/`\\eqref`/`\\cref` labels and name mentions in proofs), found with one Aho–Corasick pass per proof. Heap-based topological order, dependents lists and critical-path lengths; used by `arxiv_to_lean` to sort entries and schedule parallel translation.",
+    },
     "theorem_extractor.py": {
         "tier": "official_support",
         "category": "ingestion",
@@ -6,12 +6,13 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import threading
 import time
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
-from premise_retrieval import PremiseEntry, PremiseRetriever
+from premise_retrieval import PremiseEntry, PremiseRetriever, build_ann_index
 from statement_alignment import classify_row_alignment
 
 
@@ -294,6 +295,7 @@ def build_statement_index(
     paper: str = "",
     dims: int = 384,
     encoder_name: str | None = None,
+    ann: bool = False,
 ) -> dict[str, Any]:
     rows = iter_statement_rows(ledger_dir, paper=paper)
     entries = [
@@ -309,6 +311,7 @@ def build_statement_index(
     out.mkdir(parents=True, exist_ok=True)
     retriever = PremiseRetriever.build(entries, dims=dims, encoder_name=encoder_name)
     retriever.save_np(out)
+    ann_index = build_ann_index(out) if (ann and entries) else None
     metadata = [meta for meta, _text in rows]
     _write_metadata(out, metadata)
 
@@ -329,26 +332,60 @@ def build_statement_index(
             "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         }
     )
+    if ann_index is not None:
+        payload["ann"] = {"kind": "ivf", "n_lists": ann_index.n_lists, "n_probe": ann_index.n_probe}
     meta_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
     return payload
 
 
-def query_statement_index(
-    index_dir: str | Path,
-    query: str,
+# ── Process-resident index cache ─────────────────────────────────────────────
+#
+# kg_writer queries once per KG node and kg_api once per request; reloading the
+# retriever and metadata every time dominated both. Entries are keyed by the
+# resolved index path and invalidated when meta.json (written last by
+# build_statement_index) changes.
+
+_INDEX_CACHE: dict[str, tuple[tuple[int, int], PremiseRetriever, dict[str, StatementMetadata]]] = {}
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def _index_stamp(index_dir: Path) -> tuple[int, int]:
+    try:
+        st = (index_dir / "meta.json").stat()
+    except OSError:
+        return (0, 0)
+    return (int(st.st_mtime_ns), int(st.st_size))
+
+
+def load_statement_index(index_dir: str | Path) -> tuple[PremiseRetriever, dict[str, StatementMetadata]]:
+    """Retriever + metadata for ``index_dir``, loaded once per process and build."""
+    path = Path(index_dir).resolve()
+    key = str(path)
+    stamp = _index_stamp(path)
+    with _INDEX_CACHE_LOCK:
+        cached = _INDEX_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1], cached[2]
+    retriever = PremiseRetriever.load(path)
+    metadata = load_statement_metadata(path)
+    with _INDEX_CACHE_LOCK:
+        _INDEX_CACHE[key] = (stamp, retriever, metadata)
+    return retriever, metadata
+
+
+def clear_statement_index_cache() -> None:
+    with _INDEX_CACHE_LOCK:
+        _INDEX_CACHE.clear()
+
+
+def _statement_hit_payloads(
+    hits: list[Any],
+    metadata: dict[str, StatementMetadata],
     *,
-    top_k: int = 10,
-    paper_id: str = "",
-    same_paper_only: bool = False,
-    exclude_statement_id: str = "",
-    overfetch: int = 5,
+    top_k: int,
+    paper_id: str,
+    exclude_statement_id: str,
 ) -> list[dict[str, Any]]:
-    if top_k < 1:
-        return []
-    retriever = PremiseRetriever.load(index_dir)
-    metadata = load_statement_metadata(index_dir)
-    requested = max(top_k, top_k * max(1, overfetch))
-    hits = retriever.query(query, top_k=requested)
     out: list[dict[str, Any]] = []
     for hit in hits:
         sid = hit.name
@@ -374,6 +411,63 @@ def query_statement_index(
     return out
 
 
+def query_statement_index(
+    index_dir: str | Path,
+    query: str,
+    *,
+    top_k: int = 10,
+    paper_id: str = "",
+    same_paper_only: bool = False,
+    exclude_statement_id: str = "",
+    overfetch: int = 5,
+) -> list[dict[str, Any]]:
+    if top_k < 1:
+        return []
+    retriever, metadata = load_statement_index(index_dir)
+    requested = max(top_k, top_k * max(1, overfetch))
+    hits = retriever.query(query, top_k=requested)
+    return _statement_hit_payloads(
+        hits,
+        metadata,
+        top_k=top_k,
+        paper_id=paper_id,
+        exclude_statement_id=exclude_statement_id,
+    )
+
+
+def query_statement_index_many(
+    index_dir: str | Path,
+    queries: list[str],
+    *,
+    top_k: int = 10,
+    paper_id: str = "",
+    exclude_statement_ids: list[str] | None = None,
+    overfetch: int = 5,
+) -> list[list[dict[str, Any]]]:
+    """Batched :func:`query_statement_index`: one result list per query.
+
+    ``exclude_statement_ids`` (parallel to ``queries``) drops each query's own
+    statement from its hits, as kg_writer does for neighbour edges.
+    """
+    if top_k < 1:
+        return [[] for _ in queries]
+    excludes = list(exclude_statement_ids or [])
+    excludes += [""] * (len(queries) - len(excludes))
+    retriever, metadata = load_statement_index(index_dir)
+    requested = max(top_k, top_k * max(1, overfetch))
+    batches = retriever.query_many(list(queries), top_k=requested)
+    return [
+        _statement_hit_payloads(
+            hits,
+            metadata,
+            top_k=top_k,
+            paper_id=paper_id,
+            exclude_statement_id=exclude,
+        )
+        for hits, exclude in zip(batches, excludes)
+    ]
+
+
 def _cmd_build(args: argparse.Namespace) -> int:
     summary = build_statement_index(
         ledger_dir=args.ledger_dir,
@@ -381,6 +475,7 @@ def _cmd_build(args: argparse.Namespace) -> int:
         paper=args.paper,
         dims=args.dims,
         encoder_name=args.encoder,
+        ann=args.ann,
     )
     print(
         f"[ok] built statement index entries={summary.get('count', 0)} "
@@ -417,6 +512,7 @@ def build_parser() -> argparse.ArgumentParser:
     p_build.add_argument("--paper", default="", help="Optional single paper id")
     p_build.add_argument("--dims", type=int, default=384, help="Embedding dimension for hash encoder")
     p_build.add_argument("--encoder", default=None, help="Sentence-transformers model name, or 'hash'")
+    p_build.add_argument("--ann", action="store_true", help="Also build an IVF approximate nearest-neighbour index")
     p_build.set_defaults(func=_cmd_build)
 
     p_query = sub.add_parser("query", help="Query a statement retrieval index")
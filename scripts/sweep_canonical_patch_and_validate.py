@@ -23,6 +23,11 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
 
+try:
+    import lake_validation_cache as _lvc  # type: ignore[import-not-found]
+except Exception:
+    _lvc = None  # type: ignore[assignment]
+
 CANONICAL = [
     "2012.09271",
     "2304.09598",
@@ -78,17 +83,36 @@ def _revert_to_sorry(lean_file: Path, name: str) -> bool:
     return True
 
 
-def _lake_validate(lean_file: Path, timeout_s: int = 240) -> tuple[bool, str]:
+def _run_lean_file(
+    lean_file: Path, *, timeout_s: int, focus: str | None = None
+) -> subprocess.CompletedProcess:
+    """`lake env lean <lean_file>`, through the declaration-checkpoint engine
+    when it is importable: after patching one theorem only the declarations
+    up to `focus` that changed are re-elaborated. Output and returncode read
+    like lake's; raises `subprocess.TimeoutExpired` on timeout either way.
+    """
+    if _lvc is not None:
+        return _lvc.run_lean_file(
+            lean_file, project_root=PROJECT_ROOT, focus=focus, timeout_s=timeout_s,
+            caller="in_file_patch_check",
+        )
+    return subprocess.run(
+        ["lake", "env", "lean", str(lean_file)],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+        timeout=timeout_s,
+    )
+
+
+def _lake_validate(
+    lean_file: Path, timeout_s: int = 240, *, focus: str | None = None
+) -> tuple[bool, str]:
     """Run `lake env lean` on lean_file. Standards-positive: returncode==0
-    AND no `declaration uses 'sorry'` warning on the patched theorem."""
+    AND no `declaration uses 'sorry'` warning on the patched theorem
+    (`focus`, when given, is that theorem's name)."""
     try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(lean_file)],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=timeout_s,
-        )
+        proc = _run_lean_file(lean_file, timeout_s=timeout_s, focus=focus)
     except subprocess.TimeoutExpired:
         return False, f"lake_timeout:{timeout_s}s"
     out = (proc.stdout or "") + "\n" + (proc.stderr or "")
@@ -187,7 +211,7 @@ def main() -> int:
             if not _patch_in_place(lean_file, tn, pt):
                 continue
             line_no = _theorem_line_in_file(lean_file, tn)
-            ok_rc, lake_out = _lake_validate(lean_file, timeout_s=args.per_paper_timeout)
+            ok_rc, lake_out = _lake_validate(lean_file, timeout_s=args.per_paper_timeout, focus=tn)
             if not ok_rc:
                 # Hard elaboration failure — revert.
                 _revert_to_sorry(lean_file, tn)
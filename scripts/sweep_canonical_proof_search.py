@@ -147,6 +147,39 @@ def _elaboration_probe(
     )
 
 
+def _batch_elaboration_probe(
+    rows: list[dict],
+    *,
+    paper_id: str,
+) -> dict[int, tuple[bool, str]]:
+    """Probe many rows of one paper through the fast validator's batch API.
+
+    Returns ``{row_index: (ok, error_tail)}`` for every row the batch API
+    handled. Rows that fail :func:`_elaboration_probe`'s pre-checks, or every
+    row when ``lake_validation_cache`` is unavailable, are omitted so the
+    caller falls back to the per-row probe.
+    """
+    try:
+        import lake_validation_cache as _lvc  # type: ignore
+    except Exception:
+        return {}
+    positions: list[int] = []
+    cands: list[tuple[str, None]] = []
+    for i, r in enumerate(rows):
+        decl = (r.get("lean_statement") or "").strip()
+        if decl and decl.lstrip().startswith(
+            ("theorem", "lemma", "def", "noncomputable", "axiom", "private")
+        ):
+            positions.append(i)
+            cands.append((decl, None))
+    return {
+        positions[idx]: (ok, tail)
+        for idx, ok, tail in _lvc.validate_candidates_batch(
+            paper_id, cands, project_root=PROJECT_ROOT, timeout_s=60,
+        )
+    }
+
+
 def _load_ledger_row(paper_id: str, theorem_name: str) -> dict | None:
     p = PROJECT_ROOT / "output" / "verification_ledgers" / f"{paper_id}.json"
     if not p.exists():
@@ -205,6 +238,11 @@ def _invoke_prove(*, paper_id: str, lean_file: Path, theorem_name: str, timeout_
 
 
 def main() -> int:
+    from llm_scheduler import default_lane
+
+    # Batch work yields the shared LLM quota to interactive /verify runs.
+    default_lane("background")
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--per-row-timeout", type=int, default=480, help="Per-row wall budget in seconds (default 8 min)")
     parser.add_argument("--overall-timeout", type=int, default=180 * 60, help="Overall sweep budget in seconds (default 180 min)")
@@ -222,6 +260,15 @@ def main() -> int:
             "the legacy `lake env lean` path."
         ),
     )
+    parser.add_argument(
+        "--probe-chunk",
+        type=int,
+        default=8,
+        help=(
+            "With --use-fast-validation, probe signatures in batches of this many "
+            "rows, just ahead of the rows being proved (default 8)."
+        ),
+    )
     parser.add_argument(
         "--differential-check-first",
         type=int,
@@ -273,7 +320,13 @@ def main() -> int:
     for pid, rows in by_paper.items():
         lean_file = PROJECT_ROOT / "output" / f"{pid}.lean"
         print(f"\n=== Paper {pid} ({len(rows)} rows) ===")
-        for r in rows:
+        # Signatures are probed in bounded chunks across the paper's warm
+        # worker pool, only once the budget check for the chunk's first row
+        # has passed; rows reserved for the differential check are probed
+        # individually.
+        prefetched: dict[int, tuple[bool, str]] = {}
+        probed_through = 0
+        for row_idx, r in enumerate(rows):
             tn = r["theorem_name"]
             elapsed_overall = time.monotonic() - overall_start
             if elapsed_overall > args.overall_timeout:
@@ -291,14 +344,25 @@ def main() -> int:
                 do_diff = diff_remaining > 0
                 if do_diff:
                     diff_remaining -= 1
-                elab_ok, elab_msg = _elaboration_probe(
-                    lean_statement=r["lean_statement"],
-                    lean_file=lean_file,
-                    theorem_name=tn,
-                    paper_id=pid,
-                    use_fast=bool(args.use_fast_validation),
-                    diff_check=do_diff,
-                )
+                elif args.use_fast_validation and row_idx >= probed_through:
+                    probed_through = row_idx + max(1, args.probe_chunk)
+                    prefetched.update(
+                        (row_idx + i, res)
+                        for i, res in _batch_elaboration_probe(
+                            rows[row_idx:probed_through], paper_id=pid,
+                        ).items()
+                    )
+                if not do_diff and row_idx in prefetched:
+                    elab_ok, elab_msg = prefetched[row_idx]
+                else:
+                    elab_ok, elab_msg = _elaboration_probe(
+                        lean_statement=r["lean_statement"],
+                        lean_file=lean_file,
+                        theorem_name=tn,
+                        paper_id=pid,
+                        use_fast=bool(args.use_fast_validation),
+                        diff_check=do_diff,
+                    )
             r_out = dict(r)
             r_out["in_lean_file"] = in_file
             r_out["elaboration_ok"] = elab_ok
@@ -267,13 +267,7 @@ def _lake_validate_file_clean_for(
     error_tail is the last 1500 chars of stdout+stderr (for retry prompt).
     """
     try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(lean_file)],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=timeout_s,
-        )
+        proc = patcher._run_lean_file(lean_file, timeout_s=timeout_s, focus=theorem_name)
     except subprocess.TimeoutExpired:
         return False, f"lake_timeout:{timeout_s}s"
     out = (proc.stdout or "") + "\n" + (proc.stderr or "")
@@ -654,6 +648,11 @@ def _sweep_paper(
 
 
 def main() -> int:
+    from llm_scheduler import default_lane
+
+    # Batch work yields the shared LLM quota to interactive /verify runs.
+    default_lane("background")
+
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--paper", action="append", default=[])
     parser.add_argument("--max-candidates", type=int, default=20,
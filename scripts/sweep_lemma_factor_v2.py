@@ -53,6 +53,7 @@ if str(SCRIPT_DIR) not in sys.path:
 import lemma_factor_v2 as lfv2  # noqa: E402
 import leanstral_repl_proof_generator as repl_gen  # noqa: E402
 import leanstral_whole_proof_generator as gen  # noqa: E402
+import lean_diagnostics_store as diag_store  # noqa: E402
 import paper_theory_symbol_stubber as pt_stubber  # noqa: E402
 import signature_typeclass_patcher as tc_patcher  # noqa: E402
 import sweep_canonical_patch_and_validate as patcher  # noqa: E402
@@ -333,29 +334,17 @@ def _run_isolated_patch_check(
 # --- Baseline error fingerprinting ----------------------------------------
 
 
-_ERROR_LINE_RX = re.compile(r"^(?P<path>[^:]+):(?P<line>\d+):(?P<col>\d+): error:")
-
-
 def _capture_baseline_errors(lean_file: Path, *, timeout_s: int = 180) -> int:
     """Capture the COUNT of `error:` diagnostics in the file's untouched
     lake-output. Line numbers are not stable across patches (inserting
     aux above a parent shifts subsequent line numbers), so we use count
     as the comparison signal instead of (path, line) tuples.
 
-    Returns 0 on file compiles cleanly or on lake timeout.
+    Returns 0 on file compiles cleanly or on lake timeout. Served from the
+    shared diagnostics store while the file's bytes are unchanged.
     """
-    try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(lean_file)],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=timeout_s,
-        )
-    except subprocess.TimeoutExpired:
-        return 0
-    out = (proc.stdout or "") + "\n" + (proc.stderr or "")
-    return sum(1 for ln in out.splitlines() if _ERROR_LINE_RX.match(ln.strip()))
+    diag = diag_store.file_diagnostics(lean_file, project_root=PROJECT_ROOT, timeout_s=timeout_s)
+    return diag.error_count if diag is not None else 0
 
 
 def _capture_baseline_error_tail(
@@ -366,17 +355,10 @@ def _capture_baseline_error_tail(
     `synthInstanceFailed:` markers attributable to a specific row.
     Returns empty string on lake timeout.
     """
-    try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(lean_file)],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=timeout_s,
-        )
-    except subprocess.TimeoutExpired:
+    diag = diag_store.file_diagnostics(lean_file, project_root=PROJECT_ROOT, timeout_s=timeout_s)
+    if diag is None:
         return ""
-    out = (proc.stdout or "") + "\n" + (proc.stderr or "")
+    out = diag.output
     if len(out) > tail_chars:
         return out[-tail_chars:]
     return out
@@ -398,17 +380,12 @@ def _lake_validate_aware(
     On failure, error_tail contains the last 1500 chars of output.
     """
     try:
-        proc = subprocess.run(
-            ["lake", "env", "lean", str(lean_file)],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=timeout_s,
-        )
+        proc = patcher._run_lean_file(lean_file, timeout_s=timeout_s, focus=theorem_name)
     except subprocess.TimeoutExpired:
         return False, f"lake_timeout:{timeout_s}s"
     out = (proc.stdout or "") + "\n" + (proc.stderr or "")
-    err_count = sum(1 for ln in out.splitlines() if _ERROR_LINE_RX.match(ln.strip()))
+    # Same counter as the stored baseline, so the two numbers compare.
+    err_count = diag_store.count_errors(out)
     if err_count > baseline_errors:
         delta = err_count - baseline_errors
         return False, f"fresh_errors_count={delta} (baseline={baseline_errors}, now={err_count}):\n{out[-1000:]}"
@@ -2278,6 +2255,11 @@ def _build_mistral_client() -> Any | None:
 
 
 def main() -> int:
+    from llm_scheduler import default_lane
+
+    # Batch work yields the shared LLM quota to interactive /verify runs.
+    default_lane("background")
+
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--paper", action="append", default=[])
     parser.add_argument(
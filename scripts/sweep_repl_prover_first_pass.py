@@ -175,6 +175,11 @@ def _attempt_row(
 
 
 def main() -> int:
+    from llm_scheduler import default_lane
+
+    # Batch work yields the shared LLM quota to interactive /verify runs.
+    default_lane("background")
+
     p = argparse.ArgumentParser(description=__doc__)
     p.add_argument("--paper", action="append", default=[], required=True)
     p.add_argument("--max-candidates", type=int, default=4)
@@ -7,6 +7,9 @@ For each environment found, extracts:
   - statement  : the LaTeX source of the statement body
   - proof      : the LaTeX source of the immediately following proof (if any)
 
+`iter_theorems` yields entries as the file is scanned; `extract_theorems`
+collects them. Line/column/byte positions come from a per-file `LineIndex`.
+
 Usage:
     python3 theorem_extractor.py main.tex
     python3 theorem_extractor.py main.tex --json
@@ -16,12 +19,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import bisect
 import hashlib
 import json
 import re
 import sys
 from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Iterator
 
 # Canonical kind name for each environment alias.
 # Keys are lowercase env names as they appear in \begin{...}.
@@ -115,32 +120,57 @@ def _extract_label(body: str) -> str:
     return m.group(1) if m else ""
 
 
-def _line_col(text: str, offset: int) -> tuple[int, int]:
-    """Return 1-indexed line/column for a character offset."""
-    prefix = text[:offset]
-    line = prefix.count("\n") + 1
-    last_newline = prefix.rfind("\n")
-    if last_newline < 0:
-        return line, offset + 1
-    return line, offset - last_newline
-
-
-def _byte_offset(text: str, offset: int) -> int:
-    return len(text[:offset].encode("utf-8"))
-
-
-def _make_span(text: str, source_file: str, start: int, end: int) -> SourceSpan:
-    start_line, start_col = _line_col(text, start)
-    end_line, end_col = _line_col(text, end)
-    return SourceSpan(
-        source_file=source_file,
-        start_byte=_byte_offset(text, start),
-        end_byte=_byte_offset(text, end),
-        start_line=start_line,
-        start_col=start_col,
-        end_line=end_line,
-        end_col=end_col,
-    )
+class LineIndex:
+    """Line-start and byte offsets of a text, built once and queried by bisect.
+
+    Replaces slicing ``text[:offset]`` for every lookup, which made span
+    construction O(environments x file length) on long papers.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.line_starts = [0]
+        self.line_starts.extend(m.end() for m in re.finditer("\n", text))
+        self._ascii = text.isascii()
+        self._line_start_bytes: list[int] = []
+        if not self._ascii:
+            total = 0
+            prev = 0
+            for start in self.line_starts:
+                total += len(text[prev:start].encode("utf-8"))
+                self._line_start_bytes.append(total)
+                prev = start
+
+    def _clamp(self, offset: int) -> int:
+        return min(max(offset, 0), len(self.text))
+
+    def line_col(self, offset: int) -> tuple[int, int]:
+        """Return 1-indexed line/column for a character offset."""
+        offset = self._clamp(offset)
+        line = bisect.bisect_right(self.line_starts, offset) - 1
+        return line + 1, offset - self.line_starts[line] + 1
+
+    def byte_offset(self, offset: int) -> int:
+        """UTF-8 byte offset of a character offset."""
+        offset = self._clamp(offset)
+        if self._ascii:
+            return offset
+        line = bisect.bisect_right(self.line_starts, offset) - 1
+        start = self.line_starts[line]
+        return self._line_start_bytes[line] + len(self.text[start:offset].encode("utf-8"))
+
+    def span(self, source_file: str, start: int, end: int) -> SourceSpan:
+        start_line, start_col = self.line_col(start)
+        end_line, end_col = self.line_col(end)
+        return SourceSpan(
+            source_file=source_file,
+            start_byte=self.byte_offset(start),
+            end_byte=self.byte_offset(end),
+            start_line=start_line,
+            start_col=start_col,
+            end_line=end_line,
+            end_col=end_col,
+        )
 
 
 def _source_span_id(
@@ -201,14 +231,16 @@ def register_environment_aliases(aliases: dict[str, str]) -> None:
         _rebuild_begin_re()
 
 
-def extract_theorems(tex_path: Path) -> list[TheoremEntry]:
+def iter_theorems(tex_path: Path) -> Iterator[TheoremEntry]:
+    """Yield theorem-like environments of ``tex_path`` in document order as they are scanned."""
     try:
         text = tex_path.read_text(encoding="utf-8", errors="replace")
     except OSError as exc:
         print(f"[warn] cannot read {tex_path}: {exc}", file=sys.stderr)
-        return []
+        return
 
-    entries: list[TheoremEntry] = []
+    index = LineIndex(text)
+    source_file = str(tex_path)
     counter = 0
 
     if _BEGIN_RE is None:
@@ -225,22 +257,22 @@ def extract_theorems(tex_path: Path) -> list[TheoremEntry]:
         proof, proof_start, proof_end = _extract_proof_after(text, env_end)
 
         canonical_kind = _ENV_KIND.get(env_name, env_name)
-        entries.append(TheoremEntry(
+        yield TheoremEntry(
             kind=canonical_kind,
             name=name,
             statement=body,
             proof=proof,
-            source_file=str(tex_path),
-            source_span=_make_span(text, str(tex_path), body_trimmed_start, body_trimmed_end),
-            proof_span=_make_span(text, str(tex_path), proof_start, proof_end) if proof_start >= 0 else None,
+            source_file=source_file,
+            source_span=index.span(source_file, body_trimmed_start, body_trimmed_end),
+            proof_span=index.span(source_file, proof_start, proof_end) if proof_start >= 0 else None,
             env_name=env_name,
             label=label,
             span_start=m.start(),
             span_end=env_end,
             body_start=body_trimmed_start,
             body_end=body_trimmed_end,
-            start_line=_line_col(text, m.start())[0],
-            end_line=_line_col(text, env_end)[0],
+            start_line=index.line_col(m.start())[0],
+            end_line=index.line_col(env_end)[0],
             source_span_id=_source_span_id(
                 source_file=tex_path,
                 env_name=env_name,
@@ -249,17 +281,20 @@ def extract_theorems(tex_path: Path) -> list[TheoremEntry]:
                 label=label,
                 statement=body,
             ),
-        ))
+        )
 
-    return entries
 
+def extract_theorems(tex_path: Path) -> list[TheoremEntry]:
+    return list(iter_theorems(tex_path))
 
-def extract_from_files(tex_paths: list[Path]) -> list[TheoremEntry]:
-    all_entries: list[TheoremEntry] = []
+
+def iter_from_files(tex_paths: list[Path]) -> Iterator[TheoremEntry]:
     for p in tex_paths:
-        entries = extract_theorems(p)
-        all_entries.extend(entries)
-    return all_entries
+        yield from iter_theorems(p)
+
+
+def extract_from_files(tex_paths: list[Path]) -> list[TheoremEntry]:
+    return list(iter_from_files(tex_paths))
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -30,6 +30,8 @@ from lean_validation import (  # noqa: E402
     sanitize_unicode_for_lean,
 )
 from lean_sanitize import escape_lean_comment  # noqa: E402
+from lean_name_oracle import resolve_names  # noqa: E402
+from lake_validation_cache import check_lean_source, format_messages  # noqa: E402
 from repair_feedback_dataset import (  # noqa: E402
     append_repair_rows,
     default_run_dataset_path,
@@ -2279,11 +2281,13 @@ def _extract_unknown_idents(
             short = ident.split(".")[-1].lower()
             if ident.lower() in name_index or short in name_index:
                 continue
-            # Final gate: verify it truly doesn't exist in current imports.
-            if imports and project_root and _lean_name_exists(ident, imports, project_root):
-                continue
             found.append(ident)
-    return list(dict.fromkeys(found))
+    found = list(dict.fromkeys(found))
+    # Final gate: verify they truly don't exist in current imports.
+    if found and imports and project_root:
+        exists = _lean_names_exist(found, imports, project_root)
+        found = [ident for ident in found if not exists.get(ident, False)]
+    return found
 
 
 def _signature_has_binder(sig: str, name: str) -> bool:
@@ -2463,18 +2467,17 @@ def _build_stubs(idents: list[str]) -> str:
     return "\n".join(lines)
 
 
-_lean_check_cache: dict[str, bool] = {}
-
-
 def _lean_name_exists(name: str, imports: str, project_root: Path) -> bool:
     """Return True if `name` resolves under the given imports (via #check @name)."""
-    if name in _lean_check_cache:
-        return _lean_check_cache[name]
-    safe = re.sub(r"[^A-Za-z0-9_.]", "_", name)
-    src = f"{imports}\n\n#check @{safe}\n"
-    ok, _ = _run_lean(src, project_root, timeout=20)
-    _lean_check_cache[name] = ok
-    return ok
+    return _lean_names_exist([name], imports, project_root).get(name, False)
+
+
+def _lean_names_exist(names: list[str], imports: str, project_root: Path) -> dict[str, bool]:
+    """Resolve many names under `imports` with at most one Lean run."""
+    try:
+        return resolve_names(names, project_root=project_root, imports=imports)
+    except Exception:
+        return {n: False for n in names}
 
 
 def _extract_unknown_classes(
@@ -2493,11 +2496,11 @@ def _extract_unknown_classes(
         if not class_name or not class_name[0].isupper():
             continue
         candidates.append(class_name)
-    found = []
-    for name in dict.fromkeys(candidates):  # deduplicate
-        if not _lean_name_exists(name, imports, project_root):
-            found.append(name)
-    return found
+    names = list(dict.fromkeys(candidates))  # deduplicate
+    if not names:
+        return []
+    exists = _lean_names_exist(names, imports, project_root)
+    return [name for name in names if not exists.get(name, False)]
 
 
 def _build_class_stubs(class_names: list[str]) -> str:
@@ -3136,28 +3139,45 @@ def _is_irrecoverable(error: str, stubs: str) -> bool:
 
 
 def _run_lean(lean_src: str, project_root: Path, timeout: int) -> tuple[bool, str]:
-    """Write lean_src to a temp file, run lake env lean, return (ok, error)."""
-    import uuid
-    tmp_name = f"_tmp_validate_{uuid.uuid4().hex[:8]}.lean"
-    tmp_path = project_root / "Desol" / tmp_name
-    try:
-        tmp_path.write_text(lean_src, encoding="utf-8")
-        lake_bin = shutil.which("lake") or os.path.expanduser("~/.elan/bin/lake")
-        proc = subprocess.run(
-            [lake_bin, "env", "lean", str(tmp_path)],
-            cwd=project_root,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        combined = (proc.stderr or "") + (proc.stdout or "")
-        if proc.returncode == 0 and "error:" not in combined:
+    """Check lean_src (warm REPL env when available, else lake env lean); return (ok, error)."""
+
+    def _cold_check() -> tuple[bool, str]:
+        import uuid
+        tmp_name = f"_tmp_validate_{uuid.uuid4().hex[:8]}.lean"
+        tmp_path = project_root / "Desol" / tmp_name
+        try:
+            tmp_path.write_text(lean_src, encoding="utf-8")
+            lake_bin = shutil.which("lake") or os.path.expanduser("~/.elan/bin/lake")
+            proc = subprocess.run(
+                [lake_bin, "env", "lean", str(tmp_path)],
+                cwd=project_root,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+            combined = (proc.stderr or "") + (proc.stdout or "")
+            if proc.returncode == 0 and "error:" not in combined:
+                return True, ""
+            return False, combined.strip()
+        except subprocess.TimeoutExpired:
+            return False, f"lake env lean timed out after {timeout}s"
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _classify(messages: list[dict]) -> tuple[bool, str]:
+        if not any(m.get("severity") == "error" for m in messages):
             return True, ""
-        return False, combined.strip()
-    except subprocess.TimeoutExpired:
-        return False, f"lake env lean timed out after {timeout}s"
-    finally:
-        tmp_path.unlink(missing_ok=True)
+        return False, format_messages(messages, "Desol/_tmp_validate.lean")
+
+    return check_lean_source(
+        lean_src,
+        project_root=project_root,
+        classify=_classify,
+        cold_check=_cold_check,
+        timeout_s=timeout,
+        timeout_result=(False, f"lake env lean timed out after {timeout}s"),
+        caller="translator_run_lean",
+    )
 
 
 def _check_vacuous(
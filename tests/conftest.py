@@ -1,6 +1,7 @@
 """Shared pytest fixtures for DESol tests."""
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
@@ -8,3 +9,6 @@ from pathlib import Path
 SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
 if str(SCRIPTS) not in sys.path:
     sys.path.insert(0, str(SCRIPTS))
+
+# Tests never share LLM admission state with real runs on this host.
+os.environ.setdefault("DESOL_LLM_ADMISSION_DB", "off")
@@ -3,10 +3,21 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import pytest
+
 from bridge_proofs import execute_bridge_chain
 from diagnose_grounding_bottlenecks import diagnose
 
 
+@pytest.fixture(autouse=True)
+def _isolated_bridge_outputs(monkeypatch, tmp_path: Path) -> None:
+    """Keep retrieval memory and failure artifacts out of the real ``output/``."""
+    import bridge_proofs
+
+    monkeypatch.setattr(bridge_proofs, "_DEFAULT_MEMORY_PATH", tmp_path / "bridge_memory" / "candidate_stats.json")
+    monkeypatch.setattr(bridge_proofs, "_DEFAULT_ARTIFACT_ROOT", tmp_path / "reports" / "bridge_failures")
+
+
 def test_execute_bridge_chain_collects_failure_reasons(tmp_path: Path) -> None:
     ledger_root = tmp_path / "ledgers"
     ledger_root.mkdir(parents=True)
@@ -18,6 +18,15 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
 
 
+@pytest.fixture(autouse=True)
+def _isolated_bridge_outputs(monkeypatch, tmp_path: Path) -> None:
+    """Keep retrieval memory and failure artifacts out of the real ``output/``."""
+    import bridge_proofs
+
+    monkeypatch.setattr(bridge_proofs, "_DEFAULT_MEMORY_PATH", tmp_path / "bridge_memory" / "candidate_stats.json")
+    monkeypatch.setattr(bridge_proofs, "_DEFAULT_ARTIFACT_ROOT", tmp_path / "reports" / "bridge_failures")
+
+
 def _make_ledger(tmp_path: Path, theorem_name: str, assumptions: list) -> Path:
     """Write a minimal ledger entry to a temp directory."""
     ledger_root = tmp_path / "verification_ledgers"
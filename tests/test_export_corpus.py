@@ -560,3 +560,32 @@ def test_export_corpus_resolves_label_collision_with_source_text(tmp_path: Path)
     assert source_match["selected_candidate"]["name"] == "thm:foo"
     assert rows[0]["source_latex"] == "First statement."
     assert summary["ambiguous_source_match_count"] == 0
+
+
+def test_source_line_index_is_built_once_per_file_and_lru_bounded(tmp_path: Path, monkeypatch) -> None:
+    import export_corpus
+
+    monkeypatch.setattr(export_corpus, "_LINE_INDEXES", export_corpus.OrderedDict())
+    monkeypatch.setattr(export_corpus, "_SOURCE_CACHE_MAX", 2)
+    built: list[str] = []
+    real = export_corpus.LineIndex
+
+    def _counting(text: str):
+        built.append(text)
+        return real(text)
+
+    monkeypatch.setattr(export_corpus, "LineIndex", _counting)
+    files = []
+    for i in range(3):
+        path = tmp_path / f"p{i}.tex"
+        path.write_text(f"intro\n\\begin{{theorem}}claim {i}\\end{{theorem}}\n", encoding="utf-8")
+        files.append(str(path))
+
+    for _ in range(3):
+        span = export_corpus._string_recovered_span_from_evidence({"source_file": files[0], "statement": "claim 0"})
+    assert span["start_line"] == 2 and span["span_confidence"] == "string_recovered_exact"
+    assert len(built) == 1
+    for path in files[1:]:
+        export_corpus._source_line_index(path)
+    assert list(export_corpus._LINE_INDEXES) == files[1:]
+    assert export_corpus._source_line_index(str(tmp_path / "missing.tex")) is None
@@ -85,3 +85,41 @@ def test_build_kg_writes_statement_fields_and_semantic_edges(tmp_path: Path) ->
     )
     assert nodes[0]["semantic_statement"]["retrieval_text_hash"]
     assert nodes[0]["semantic_statement_text"]
+
+
+def test_semantic_edges_fall_back_to_per_node_queries(tmp_path: Path, monkeypatch) -> None:
+    import kg_writer
+
+    ledger_dir = tmp_path / "ledgers"
+    kg_root = tmp_path / "kg"
+    statement_index = tmp_path / "statement_index"
+    _write_semantic_ledger(ledger_dir)
+    build_statement_index(
+        ledger_dir=ledger_dir,
+        out_dir=statement_index,
+        encoder_name="hash",
+        dims=128,
+    )
+    real = kg_writer._query_statement_index_many
+    calls: list[int] = []
+
+    def _flaky(index_dir, queries, **kwargs):
+        calls.append(len(queries))
+        if any("increments" in q for q in queries):
+            raise RuntimeError("encoder failed on one query")
+        return real(index_dir, queries, **kwargs)
+
+    monkeypatch.setattr(kg_writer, "_query_statement_index_many", _flaky)
+    summary = build_kg(
+        ledger_dir=ledger_dir,
+        kg_root=kg_root,
+        statement_index=statement_index,
+        semantic_edge_threshold=0.05,
+        semantic_top_k=2,
+    )
+    edges = query_kg_edges(kg_root / "kg_index.db", edge_type="semantically_similar_to", limit=20)
+
+    assert calls[0] == 3 and calls[1:] == [1, 1, 1]
+    assert summary.semantic_edges > 0
+    assert any(edge["src_theorem"] == "2401.00002|gaussian_integrable" for edge in edges)
+    assert not any(edge["src_theorem"] == "2401.00002|independent_increments" for edge in edges)
@@ -7,6 +7,7 @@ boots a real worker and measures speedup vs ``_run_isolated_file_check``.
 """
 from __future__ import annotations
 
+import json
 import sys
 import threading
 import time
@@ -82,10 +83,10 @@ class _FakeProc:
 # ────────────────────────────────────────────────────────────────────────────
 
 
-def _make_cache_with(monkeypatch, factory) -> lvc.WorkerCache:
+def _make_cache_with(monkeypatch, factory, **cache_kwargs) -> lvc.WorkerCache:
     """Return a fresh WorkerCache whose worker spawn is replaced by ``factory``."""
 
-    cache = lvc.WorkerCache()
+    cache = lvc.WorkerCache(**cache_kwargs)
 
     def _start(self, project_root, paper_id, startup_timeout):  # noqa: ARG001
         server = factory()
@@ -172,6 +173,17 @@ def test_classify_signature_only_rejects_real_error() -> None:
     assert "expected term" in tail
 
 
+def test_classify_signature_only_rejects_error_mentioning_sorry() -> None:
+    # The cold `lake env lean` probe rejects any `error:`; so must the warm one.
+    msgs = [
+        {"severity": "error", "data": "type mismatch\n  sorry\nhas type ℕ"},
+        {"severity": "warning", "data": "declaration uses 'sorry'"},
+    ]
+    ok, tail = lvc._classify_messages(msgs, body_supplied=False)
+    assert not ok
+    assert "type mismatch" in tail
+
+
 # ────────────────────────────────────────────────────────────────────────────
 # Tests — cache reuse + worker lifecycle
 # ────────────────────────────────────────────────────────────────────────────
@@ -405,6 +417,619 @@ def test_dead_worker_is_restarted(monkeypatch, tmp_path) -> None:
     assert spawn_count == 2
 
 
+# ────────────────────────────────────────────────────────────────────────────
+# Tests — multi-worker pool (least-loaded dispatch, global cap, LRU eviction)
+# ────────────────────────────────────────────────────────────────────────────
+
+
+def test_serial_calls_use_single_worker_even_with_large_pool(monkeypatch, tmp_path) -> None:
+    fakes: list[FakeServer] = []
+
+    def _factory() -> FakeServer:
+        f = FakeServer()
+        fakes.append(f)
+        return f
+
+    cache = _make_cache_with(monkeypatch, _factory, workers_per_paper=4)
+    for i in range(3):
+        ok, _ = lvc.validated_isolated_check(
+            project_root=tmp_path, paper_id="P",
+            theorem_decl=f"theorem t{i} : True", proof_body="trivial",
+            cache=cache,
+        )
+        assert ok
+    assert len(fakes) == 1
+
+
+def test_concurrent_calls_fan_out_across_pool(monkeypatch, tmp_path) -> None:
+    """With two workers per paper, two concurrent calls run side by side."""
+    barrier = threading.Barrier(2, timeout=2.0)
+    fakes: list[FakeServer] = []
+
+    class BarrierServer(FakeServer):
+        def _send(self, payload):
+            if "cmd" in payload:
+                # Deadlocks (BrokenBarrierError) if calls were serialized.
+                barrier.wait()
+            return super()._send(payload)
+
+    def _factory() -> FakeServer:
+        f = BarrierServer()
+        fakes.append(f)
+        return f
+
+    cache = _make_cache_with(monkeypatch, _factory, workers_per_paper=2)
+    results = []
+
+    def _one(suffix):
+        results.append(lvc.validated_isolated_check(
+            project_root=tmp_path, paper_id="P",
+            theorem_decl=f"theorem t_{suffix} : True", proof_body="trivial",
+            cache=cache,
+        ))
+
+    threads = [threading.Thread(target=_one, args=(s,)) for s in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5.0)
+    assert len(fakes) == 2
+    assert all(ok for ok, _ in results) and len(results) == 2
+    assert all(len([p for p in f.sent if "cmd" in p]) == 1 for f in fakes)
+
+
+def test_checkout_prefers_idle_worker(monkeypatch, tmp_path) -> None:
+    cache = _make_cache_with(monkeypatch, FakeServer, workers_per_paper=2)
+    first = cache.checkout(tmp_path, "P")
+    second = cache.checkout(tmp_path, "P")
+    assert first is not second
+    cache.release(second)
+    # ``first`` is still busy, so the idle ``second`` is handed out again.
+    third = cache.checkout(tmp_path, "P")
+    assert third is second
+    # Pool is full and both are busy: queue on the least-loaded worker.
+    fourth = cache.checkout(tmp_path, "P")
+    assert fourth.inflight == 2
+    for entry in (first, third, fourth):
+        cache.release(entry)
+    assert first.inflight == 0 and second.inflight == 0
+
+
+def test_global_cap_evicts_least_recently_used_paper(monkeypatch, tmp_path) -> None:
+    fakes: dict[str, FakeServer] = {}
+    order: list[str] = []
+
+    def _start(self, project_root, paper_id, startup_timeout):  # noqa: ARG001
+        f = FakeServer()
+        fakes[paper_id] = f
+        order.append(paper_id)
+        return lvc._WorkerEntry(
+            server=f, env_id=0, anchor_used="Desol/ReplAnchor.lean",
+            lock=threading.Lock(),
+        )
+
+    monkeypatch.setattr(lvc.WorkerCache, "_start_worker", _start)
+    cache = lvc.WorkerCache(workers_per_paper=1, max_total_workers=2)
+    for pid in ("A", "B", "A", "C"):
+        ok, _ = lvc.validated_isolated_check(
+            project_root=tmp_path, paper_id=pid,
+            theorem_decl="theorem t : True", proof_body="trivial",
+            cache=cache,
+        )
+        assert ok
+    # B was the least recently used idle key when C needed a slot.
+    assert fakes["B"].stop_called == 1
+    assert fakes["A"].stop_called == 0
+    assert sorted(pid for _, pid in cache._pools) == ["A", "C"]
+    assert order == ["A", "B", "C"]
+
+
+def test_pool_defaults_scale_with_cores_and_respect_global_cap(monkeypatch) -> None:
+    monkeypatch.delenv("DESOL_LVC_WORKERS_PER_PAPER", raising=False)
+    monkeypatch.delenv("DESOL_LVC_MAX_WORKERS", raising=False)
+    monkeypatch.setattr(lvc.os, "cpu_count", lambda: 16)
+    cache = lvc.WorkerCache()
+    assert (cache.workers_per_paper, cache.max_total_workers) == (8, 16)
+    monkeypatch.setenv("DESOL_LVC_MAX_WORKERS", "3")
+    cache = lvc.WorkerCache()
+    assert (cache.workers_per_paper, cache.max_total_workers) == (3, 3)
+    monkeypatch.setattr(lvc.os, "cpu_count", lambda: 1)
+    monkeypatch.delenv("DESOL_LVC_MAX_WORKERS")
+    assert lvc.WorkerCache().workers_per_paper == 1
+    monkeypatch.setenv("DESOL_LVC_WORKERS_PER_PAPER", "4")
+    assert lvc.WorkerCache().max_total_workers == 4
+
+
+def test_global_cap_never_evicts_busy_paper(monkeypatch, tmp_path) -> None:
+    cache = _make_cache_with(
+        monkeypatch, FakeServer, workers_per_paper=1, max_total_workers=1,
+    )
+    busy = cache.checkout(tmp_path, "A")
+    with pytest.raises(RuntimeError, match="worker_pool_exhausted"):
+        cache.checkout(tmp_path, "B", startup_timeout=0.05)
+    assert busy.server.stop_called == 0
+    cache.release(busy)
+    # Once A is idle it can be evicted for B.
+    entry = cache.checkout(tmp_path, "B", startup_timeout=0.05)
+    assert busy.server.stop_called == 1
+    cache.release(entry)
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Tests — validate_candidates_batch
+# ────────────────────────────────────────────────────────────────────────────
+
+
+class _ScriptedServer(FakeServer):
+    """Fails any candidate whose text contains ``bad``."""
+
+    def _send(self, payload):
+        if "cmd" in payload and "bad" in payload["cmd"]:
+            self.sent.append(payload)
+            return {"env": 1, "messages": [{"severity": "error", "data": "bad tactic"}]}
+        return super()._send(payload)
+
+
+def test_batch_yields_every_candidate_with_its_index(monkeypatch, tmp_path) -> None:
+    cache = _make_cache_with(monkeypatch, _ScriptedServer, workers_per_paper=2)
+    cands = [
+        ("theorem a : True", "trivial"),
+        ("theorem b : True", "exact bad"),
+        ("", "trivial"),
+        ("theorem d : True", None),
+    ]
+    out = list(lvc.validate_candidates_batch(
+        "P", cands, project_root=tmp_path, cache=cache,
+    ))
+    by_idx = {idx: (ok, tail) for idx, ok, tail in out}
+    assert sorted(by_idx) == [0, 1, 2, 3]
+    assert by_idx[0] == (True, "")
+    assert by_idx[1][0] is False and "bad tactic" in by_idx[1][1]
+    assert by_idx[2] == (False, "isolated_check_empty_decl")
+    assert by_idx[3] == (True, "")
+
+
+def test_batch_matches_single_call_results(monkeypatch, tmp_path) -> None:
+    cache = _make_cache_with(monkeypatch, _ScriptedServer)
+    cands = [("theorem a : True", "exact bad"), ("theorem b : True", "trivial")]
+    batch = {idx: (ok, tail) for idx, ok, tail in lvc.validate_candidates_batch(
+        "P", cands, project_root=tmp_path, cache=cache,
+    )}
+    single = {
+        i: lvc.validated_isolated_check(
+            project_root=tmp_path, paper_id="P", theorem_decl=d,
+            proof_body=b, cache=cache,
+        )
+        for i, (d, b) in enumerate(cands)
+    }
+    assert batch == single
+
+
+def test_batch_stops_on_first_success(monkeypatch, tmp_path) -> None:
+    fakes: list[FakeServer] = []
+
+    def _factory() -> FakeServer:
+        f = _ScriptedServer()
+        fakes.append(f)
+        return f
+
+    cache = _make_cache_with(monkeypatch, _factory)
+    cands = [
+        ("theorem a : True", "exact bad"),
+        ("theorem b : True", "trivial"),
+        ("theorem c : True", "trivial"),
+        ("theorem d : True", "trivial"),
+    ]
+    out = list(lvc.validate_candidates_batch(
+        "P", cands, project_root=tmp_path, cache=cache,
+        stop_on_first_success=True, max_parallel=1,
+    ))
+    assert [(i, ok) for i, ok, _ in out] == [(0, False), (1, True)]
+    # Candidates after the first success were never sent to Lean.
+    cmds = [p["cmd"] for f in fakes for p in f.sent if "cmd" in p]
+    assert len(cmds) == 2
+
+
+def test_batch_streams_results_in_completion_order(monkeypatch, tmp_path) -> None:
+    slow_release = threading.Event()
+
+    class _SlowFirst(FakeServer):
+        def _send(self, payload):
+            if "cmd" in payload and "slow" in payload["cmd"]:
+                slow_release.wait(timeout=2.0)
+            return super()._send(payload)
+
+    cache = _make_cache_with(monkeypatch, _SlowFirst, workers_per_paper=2)
+    gen = lvc.validate_candidates_batch(
+        "P",
+        [("theorem slow : True", "trivial"), ("theorem fast : True", "trivial")],
+        project_root=tmp_path, cache=cache,
+    )
+    first = next(gen)
+    assert first[0] == 1
+    slow_release.set()
+    assert next(gen)[0] == 0
+
+
+def test_batch_empty_input_spawns_nothing(monkeypatch, tmp_path) -> None:
+    spawned = []
+    cache = _make_cache_with(monkeypatch, lambda: spawned.append(1) or FakeServer())
+    assert list(lvc.validate_candidates_batch("P", [], project_root=tmp_path, cache=cache)) == []
+    assert spawned == []
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Tests — shared source-validation engine
+# ────────────────────────────────────────────────────────────────────────────
+
+
+def _no_errors(messages: list[dict]) -> tuple[bool, str]:
+    errs = [m for m in messages if m.get("severity") == "error"]
+    return (not errs), lvc.format_messages(errs)
+
+
+def _warm_engine(monkeypatch, tmp_path, factory, rate: str = "0") -> lvc.WorkerCache:
+    monkeypatch.setattr(lvc, "_repl_usable", lambda _root, backend: backend != "lake")
+    monkeypatch.setenv("DESOL_VALIDATION_DIFFERENTIAL_RATE", rate)
+    monkeypatch.setenv("DESOL_VALIDATION_DIFFERENTIAL_LOG", str(tmp_path / "diff.jsonl"))
+    return _make_cache_with(monkeypatch, factory)
+
+
+def test_split_import_header() -> None:
+    src = "import Mathlib\n-- note\nimport Aesop\n\nopen Real\ntheorem t : True := trivial\n"
+    imports, rest, offset = lvc.split_import_header(src)
+    assert imports == ["import Mathlib", "import Aesop"]
+    assert rest == "\nopen Real\ntheorem t : True := trivial\n"
+    assert offset == 3
+    assert lvc.split_import_header("open Real\nimport Mathlib\n") is None
+
+
+def test_engine_lake_backend_uses_cold_path(monkeypatch, tmp_path) -> None:
+    cache = _make_cache_with(monkeypatch, lambda: pytest.fail("no worker expected"))
+    ok, tail = lvc.check_lean_source(
+        "import Mathlib\ntheorem t : True := trivial\n",
+        project_root=tmp_path, classify=_no_errors,
+        cold_check=lambda: (True, "cold"), backend="lake", cache=cache,
+    )
+    assert (ok, tail) == (True, "cold")
+
+
+def test_engine_warm_path_sends_body_and_maps_lines(monkeypatch, tmp_path) -> None:
+    fake = FakeServer(responses=[{
+        "env": 2,
+        "messages": [{"severity": "error", "pos": {"line": 2, "column": 4}, "data": "unknown identifier 'foo'"}],
+    }])
+    cache = _warm_engine(monkeypatch, tmp_path, lambda: fake)
+    ok, tail = lvc.check_lean_source(
+        "import Mathlib\n\ntheorem t : True := by\n  exact foo\n",
+        project_root=tmp_path, classify=_no_errors,
+        cold_check=lambda: pytest.fail("cold path not expected"), cache=cache,
+    )
+    assert not ok
+    assert tail == "<repl>:3:4: error: unknown identifier 'foo'"
+    cmds = [p for p in fake.sent if "cmd" in p]
+    assert cmds == [{"cmd": "\ntheorem t : True := by\n  exact foo\n", "env": 0}]
+    assert list((tmp_path / ".lake" / "desol_anchors").glob("Imports_*.lean"))
+
+
+def test_engine_falls_back_when_worker_unavailable(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(lvc, "_repl_usable", lambda _root, backend: backend != "lake")
+
+    def _bad_start(self, *args, **kwargs):  # noqa: ARG001
+        raise RuntimeError("anchor_load_errors:simulated")
+
+    monkeypatch.setattr(lvc.WorkerCache, "_start_worker", _bad_start)
+    ok, tail = lvc.check_lean_source(
+        "import Mathlib\ntheorem t : True := trivial\n",
+        project_root=tmp_path, classify=_no_errors,
+        cold_check=lambda: (False, "cold_reject"), cache=lvc.WorkerCache(),
+    )
+    assert (ok, tail) == (False, "cold_reject")
+
+
+def test_engine_timeout_returns_timeout_result(monkeypatch, tmp_path) -> None:
+    fake = FakeServer(send_exceptions=[TimeoutError("simulated")])
+    cache = _warm_engine(monkeypatch, tmp_path, lambda: fake)
+    ok, tail = lvc.check_lean_source(
+        "import Mathlib\ntheorem t : True := trivial\n",
+        project_root=tmp_path, classify=_no_errors,
+        cold_check=lambda: pytest.fail("cold path not expected"),
+        timeout_result=(False, "timed_out"), cache=cache,
+    )
+    assert (ok, tail) == (False, "timed_out")
+
+
+def test_engine_differential_divergence_prefers_cold(monkeypatch, tmp_path) -> None:
+    cache = _warm_engine(monkeypatch, tmp_path, lambda: FakeServer(), rate="1")
+    ok, tail = lvc.check_lean_source(
+        "import Mathlib\ntheorem t : True := trivial\n",
+        project_root=tmp_path, classify=_no_errors,
+        cold_check=lambda: (False, "cold_reject"), caller="test", cache=cache,
+    )
+    assert (ok, tail) == (False, "cold_reject")
+    rows = [json.loads(ln) for ln in (tmp_path / "diff.jsonl").read_text().splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["caller"] == "test"
+    assert rows[0]["agreement"] is False
+    assert rows[0]["warm_ok"] is True and rows[0]["cold_ok"] is False
+
+
+def test_isolated_file_check_routes_through_engine(monkeypatch, tmp_path) -> None:
+    from prove_arxiv_batch import _run_isolated_file_check
+
+    fake = FakeServer(responses=[{"env": 1, "messages": []}])
+    cache = _warm_engine(monkeypatch, tmp_path, lambda: fake)
+    monkeypatch.setattr(lvc, "_get_global_cache", lambda: cache)
+    ok, tail = _run_isolated_file_check(
+        project_root=tmp_path, source_file=tmp_path / "missing.lean",
+        theorem_decl="theorem t (p : Prop) (h : p) : p", proof_body="exact h",
+    )
+    assert (ok, tail) == (True, "")
+    (cmd,) = [p["cmd"] for p in fake.sent if "cmd" in p]
+    assert "import Mathlib" not in cmd
+    assert "namespace ArxivPaper" in cmd and "exact h" in cmd
+
+
+# ────────────────────────────────────────────────────────────────────────────
+# Declaration-prefix checkpoints
+# ────────────────────────────────────────────────────────────────────────────
+
+
+_PAPER_SRC = """\
+import Mathlib
+
+namespace ArxivPaper
+
+/-- A documented lemma. -/
+@[simp]
+theorem first (n : ℕ) : n = n := by
+  rfl
+
+theorem broken (n : ℕ) : NotAName n := by
+  sorry
+
+theorem target (n : ℕ) : n + 0 = n := by
+  sorry
+
+theorem after (n : ℕ) : n = n := by
+  sorry
+
+end ArxivPaper
+"""
+
+
+class ChunkServer(FakeServer):
+    """REPL double: every command gets a fresh env; `NotAName` is an error
+    and `sorry` yields the usual warning on the command's first line."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.next_env = 1
+
+    def _send(self, payload: dict) -> dict:
+        self.sent.append(payload)
+        if "path" in payload:
+            return self._anchor_response
+        if self._send_exceptions:
+            raise self._send_exceptions.pop(0)
+        cmd = payload["cmd"]
+        msgs = []
+        for i, ln in enumerate(cmd.splitlines(), start=1):
+            if "NotAName" in ln:
+                msgs.append({"severity": "error", "pos": {"line": i, "column": 0}, "data": "unknown identifier"})
+            if ln.startswith("theorem") and "sorry" in cmd:
+                msgs.append({"severity": "warning", "pos": {"line": i, "column": 8},
+                             "data": "declaration uses 'sorry'"})
+        self.next_env += 1
+        return {"env": self.next_env, "messages": msgs}
+
+    def cmds(self) -> list[str]:
+        return [p["cmd"] for p in self.sent if "cmd" in p]
+
+
+@pytest.fixture
+def checkpoint_engine(monkeypatch, tmp_path):
+    monkeypatch.setattr(lvc, "_CHECKPOINTS", lvc.OrderedDict())
+    monkeypatch.setattr(lvc, "_FILE_RECORDS", lvc.OrderedDict())
+    server = ChunkServer()
+    cache = _warm_engine(monkeypatch, tmp_path, lambda: server)
+    lean_file = tmp_path / "paper.lean"
+    lean_file.write_text(_PAPER_SRC, encoding="utf-8")
+    return server, cache, lean_file
+
+
+def test_split_declarations_keeps_doc_and_attributes_with_decl() -> None:
+    _, rest, offset = lvc.split_import_header(_PAPER_SRC)
+    chunks = lvc.split_declarations(rest, first_line=offset + 1)
+    assert [c.name for c in chunks] == [None, "first", "broken", "target", "after", None]
+    assert chunks[1].text.startswith("/-- A documented lemma. -/\n@[simp]\ntheorem first")
+    assert chunks[1].line == 5
+    assert chunks[3].line == 13
+    assert "".join(c.text for c in chunks) == rest
+
+
+def test_split_declarations_attaches_in_modifiers_to_the_next_command() -> None:
+    body = (
+        "open Real in\ntheorem t : True := trivial\n\n"
+        "set_option maxHeartbeats 400000 in\n@[simp]\ntheorem u : True := trivial\n"
+    )
+    chunks = lvc.split_declarations(body)
+    assert [c.name for c in chunks] == ["t", "u"]
+    assert chunks[1].text.startswith("set_option maxHeartbeats 400000 in\n@[simp]\ntheorem u")
+    assert chunks[1].line == 4
+
+
+def test_split_declarations_keeps_column_zero_comments_inside_proofs() -> None:
+    body = (
+        "theorem t : True := by\n/- a note\n   spanning lines -/\n  trivial\n\n"
+        "/-- Doc for u. -/\ntheorem u : True := trivial\n"
+    )
+    chunks = lvc.split_declarations(body)
+    assert [c.name for c in chunks] == ["t", "u"]
+    assert "spanning lines -/\n  trivial" in chunks[0].text
+    assert chunks[1].text.startswith("/-- Doc for u. -/") and chunks[1].line == 6
+    assert "".join(c.text for c in chunks) == body
+
+
+def test_split_declarations_keeps_mutual_blocks_whole() -> None:
+    body = (
+        "mutual\ndef even : ℕ → Bool\n  | 0 => true\n  | n + 1 => odd n\n"
+        "def odd : ℕ → Bool\n  | 0 => false\n  | n + 1 => even n\nend\n\n"
+        "theorem t : even 0 = true := rfl\n"
+    )
+    chunks = lvc.split_declarations(body)
+    assert [c.name for c in chunks] == ["even", "t"]
+    assert chunks[0].text.rstrip().endswith("end")
+
+
+def test_chunk_that_does_not_parse_falls_back_to_lake(checkpoint_engine, monkeypatch) -> None:
+    server, cache, lean_file = checkpoint_engine
+    plain_send = server._send
+
+    def _send(payload: dict) -> dict:
+        resp = plain_send(payload)
+        if "cmd" in payload and payload["cmd"].startswith("theorem broken"):
+            resp["messages"].append({"severity": "error", "pos": {"line": 1, "column": 0},
+                                     "data": "unexpected token 'theorem'; expected term"})
+        return resp
+
+    monkeypatch.setattr(server, "_send", _send)
+    cold = []
+
+    def _run(cmd, **kwargs):
+        cold.append(cmd)
+        return lvc.subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(lvc.subprocess, "run", _run)
+    proc = lvc.run_lean_file(lean_file, project_root=lean_file.parent, cache=cache)
+    assert cold == [["lake", "env", "lean", str(lean_file)]]
+    assert proc.returncode == 0
+
+
+def test_run_lean_file_reports_lake_style_output(checkpoint_engine) -> None:
+    server, cache, lean_file = checkpoint_engine
+    proc = lvc.run_lean_file(lean_file, project_root=lean_file.parent, cache=cache)
+    assert proc.returncode == 1
+    lines = proc.stdout.splitlines()
+    assert f"{lean_file}:10:0: error: unknown identifier" in lines
+    assert f"{lean_file}:13:8: warning: declaration uses 'sorry'" in lines
+    assert len(server.cmds()) == 6
+
+
+def test_patched_body_elaborates_only_the_target(checkpoint_engine) -> None:
+    server, cache, lean_file = checkpoint_engine
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, cache=cache)
+    sent_before = len(server.cmds())
+    lean_file.write_text(_PAPER_SRC.replace("n + 0 = n := by\n  sorry", "n + 0 = n := by\n  simp"), encoding="utf-8")
+    proc = lvc.run_lean_file(lean_file, project_root=lean_file.parent, focus="ArxivPaper.target", cache=cache)
+    new_cmds = server.cmds()[sent_before:]
+    assert len(new_cmds) == 1 and "simp" in new_cmds[0]
+    # ...against the same env the original target was elaborated on.
+    first_target = next(p for p in server.sent if "theorem target" in p.get("cmd", ""))
+    assert server.sent[-1]["env"] == first_target["env"]
+    # Baseline semantics are preserved: the unrelated error is still
+    # counted, the target no longer warns, the untouched suffix still does.
+    assert f"{lean_file}:10:0: error: unknown identifier" in proc.stdout
+    assert ":13:8: warning" not in proc.stdout
+    assert f"{lean_file}:16:8: warning: declaration uses 'sorry'" in proc.stdout
+
+
+def test_inserted_aux_and_earlier_edits_invalidate_by_content(checkpoint_engine) -> None:
+    server, cache, lean_file = checkpoint_engine
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, cache=cache)
+    aux = "theorem target_aux (n : ℕ) : n + 0 = n := by\n  simp\n\n"
+    patched = _PAPER_SRC.replace("theorem target", aux + "theorem target")
+    lean_file.write_text(patched, encoding="utf-8")
+    sent = len(server.cmds())
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, focus="target", cache=cache)
+    assert [c.split(" ", 2)[1] for c in server.cmds()[sent:]] == ["target_aux", "target"]
+
+    # An edit to an earlier declaration re-elaborates from that point on.
+    lean_file.write_text(patched.replace("rfl", "exact rfl"), encoding="utf-8")
+    sent = len(server.cmds())
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, focus="target", cache=cache)
+    names = [lvc._CHUNK_NAME_RE.search(c).group(1) for c in server.cmds()[sent:]]
+    assert names == ["first", "broken", "target_aux", "target"]
+
+
+def test_suffix_is_reelaborated_when_the_prefix_edit_is_visible_to_it(checkpoint_engine) -> None:
+    server, cache, lean_file = checkpoint_engine
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, cache=cache)
+
+    # An inserted helper named like a later declaration clashes with it.
+    clash = _PAPER_SRC.replace("theorem target", "theorem after (n : ℕ) : n = n := by\n  rfl\n\ntheorem target")
+    lean_file.write_text(clash, encoding="utf-8")
+    sent = len(server.cmds())
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, focus="target", cache=cache)
+    assert sum("theorem after" in c for c in server.cmds()[sent:]) == 2
+
+    # A restated target that the suffix mentions changes what it elaborates against.
+    uses = _PAPER_SRC.replace("theorem after (n : ℕ) : n = n := by\n  sorry",
+                              "theorem after (n : ℕ) : n + 0 = n := by\n  exact target n")
+    lean_file.write_text(uses, encoding="utf-8")
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, cache=cache)
+    lean_file.write_text(uses.replace("n + 0 = n := by\n  sorry", "0 + n = n := by\n  simp"), encoding="utf-8")
+    sent = len(server.cmds())
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, focus="target", cache=cache)
+    assert any("theorem after" in c for c in server.cmds()[sent:])
+
+    # A proof-only edit of that same target keeps the recorded suffix.
+    lean_file.write_text(uses.replace("n + 0 = n := by\n  sorry", "n + 0 = n := by\n  simp"), encoding="utf-8")
+    sent = len(server.cmds())
+    lvc.run_lean_file(lean_file, project_root=lean_file.parent, focus="target", cache=cache)
+    assert len(server.cmds()[sent:]) == 1
+
+
+def test_run_lean_file_timeout_raises_like_subprocess(checkpoint_engine) -> None:
+    server, cache, lean_file = checkpoint_engine
+    server._send_exceptions.append(TimeoutError("simulated"))
+    with pytest.raises(lvc.subprocess.TimeoutExpired):
+        lvc.run_lean_file(lean_file, project_root=lean_file.parent, timeout_s=5, cache=cache)
+
+
+def test_run_lean_file_lake_backend_shells_out(monkeypatch, tmp_path) -> None:
+    calls = []
+
+    def _run(cmd, **kwargs):
+        calls.append((cmd, kwargs))
+        return lvc.subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(lvc.subprocess, "run", _run)
+    lean_file = tmp_path / "paper.lean"
+    lean_file.write_text(_PAPER_SRC, encoding="utf-8")
+    proc = lvc.run_lean_file(lean_file, project_root=tmp_path, backend="lake")
+    assert proc.returncode == 0
+    assert calls[0][0] == ["lake", "env", "lean", str(lean_file)]
+
+
+def test_baseline_aware_validator_uses_checkpoints(checkpoint_engine, monkeypatch) -> None:
+    import sweep_canonical_patch_and_validate as patcher
+    import sweep_lemma_factor_v2 as sweep
+
+    server, cache, lean_file = checkpoint_engine
+    monkeypatch.setattr(patcher, "PROJECT_ROOT", lean_file.parent)
+    monkeypatch.setattr(sweep, "PROJECT_ROOT", lean_file.parent)
+    monkeypatch.setattr(lvc, "_get_global_cache", lambda: cache)
+    monkeypatch.setenv("DESOL_LEAN_DIAGNOSTICS_DB", str(lean_file.parent / "diag.sqlite"))
+
+    def _lake(cmd, **kwargs):
+        # The stored baseline always comes from cold lake.
+        out = f"{lean_file}:10:0: error: unknown identifier\n{lean_file}:13:8: warning: declaration uses 'sorry'"
+        return lvc.subprocess.CompletedProcess(cmd, 1, stdout=out, stderr="")
+
+    monkeypatch.setattr(lvc.subprocess, "run", _lake)
+    baseline = sweep._capture_baseline_errors(lean_file)
+    assert baseline == 1 and server.cmds() == []
+    lean_file.write_text(_PAPER_SRC.replace("n + 0 = n := by\n  sorry", "n + 0 = n := by\n  simp"), encoding="utf-8")
+    assert sweep._lake_validate_aware(lean_file, "target", baseline_errors=baseline) == (True, "")
+    # The next candidate only re-elaborates the target on the warm worker.
+    lean_file.write_text(_PAPER_SRC, encoding="utf-8")
+    sent = len(server.cmds())
+    ok, tail = sweep._lake_validate_aware(lean_file, "target", baseline_errors=baseline)
+    assert (ok, tail) == (False, "patched_body_emits_sorry_warning")
+    assert len(server.cmds()) == sent + 1
+
+
 # ────────────────────────────────────────────────────────────────────────────
 # Live SLOW test — measures real speedup
 # ────────────────────────────────────────────────────────────────────────────
@@ -440,7 +1065,7 @@ def test_live_speedup_vs_slow_path() -> None:
         t0 = time.time()
         ok, _ = _run_isolated_file_check(
             project_root=project_root, source_file=source_file,
-            theorem_decl=decl, proof_body=body, timeout_s=120,
+            theorem_decl=decl, proof_body=body, timeout_s=120, backend="lake",
         )
         slow_times.append(time.time() - t0)
         if not ok:
@@ -0,0 +1,148 @@
+"""Hermetic tests for `scripts/lean_diagnostics_store.py`.
+
+Lean never runs: `run_lean_file` is replaced by a fake that reports one
+error per `NotAName` line, lake-style.
+"""
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import lean_diagnostics_store as lds
+from lean_diagnostics_store import diagnostics_key, file_diagnostics, parse_lean_output
+
+
+_SRC = """\
+import Mathlib
+import Desol.PaperTheory.Paper_1
+
+namespace ArxivPaper
+
+theorem first (n : ℕ) : n = n := by
+  rfl
+
+theorem broken (n : ℕ) : NotAName n := by
+  sorry
+
+end ArxivPaper
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.delenv("DESOL_LEAN_DIAGNOSTICS_DB", raising=False)
+    (tmp_path / "lean-toolchain").write_text("leanprover/lean4:v4.9.0\n", encoding="utf-8")
+    (tmp_path / "lake-manifest.json").write_text("{}", encoding="utf-8")
+    theory = tmp_path / "Desol" / "PaperTheory" / "Paper_1.lean"
+    theory.parent.mkdir(parents=True)
+    theory.write_text("def paperConst : ℕ := 1\n", encoding="utf-8")
+    (tmp_path / "output").mkdir()
+    (tmp_path / "output" / "1.lean").write_text(_SRC, encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def lean_runs(monkeypatch) -> list[Path]:
+    runs: list[Path] = []
+
+    def _fake(lean_file, *, project_root, timeout_s, backend=None, caller=""):
+        assert backend == "lake"  # stored verdicts come from cold lake only
+        runs.append(Path(lean_file))
+        lines = [
+            f"{lean_file}:{i}:25: error: unknown identifier 'NotAName'\n  in the statement"
+            for i, ln in enumerate(Path(lean_file).read_text(encoding="utf-8").splitlines(), start=1)
+            if "NotAName" in ln
+        ]
+        return subprocess.CompletedProcess([], 1 if lines else 0, stdout="\n".join(lines), stderr="")
+
+    monkeypatch.setattr(lds, "run_lean_file", _fake)
+    return runs
+
+
+def test_count_errors_ignores_warnings_and_continuations():
+    out = "f.lean:9:25: error: a\n  error: not a new message\nf.lean:6:8: warning: w"
+    assert lds.count_errors(out) == 1
+
+
+def test_parse_attributes_messages_to_declarations():
+    out = "f.lean:9:25: error: unknown identifier 'NotAName'\n  in the statement\nf.lean:6:8: warning: unused"
+    msgs = parse_lean_output(out, _SRC)
+    assert [(m.severity, m.line, m.decl) for m in msgs] == [("error", 9, "broken"), ("warning", 6, "first")]
+    assert msgs[0].text == "unknown identifier 'NotAName'\n  in the statement"
+
+
+def test_unchanged_file_is_served_from_store(project, lean_runs):
+    lean_file = project / "output" / "1.lean"
+    first = file_diagnostics(lean_file, project_root=project)
+    second = file_diagnostics(lean_file, project_root=project)
+    assert len(lean_runs) == 1
+    assert (first.cached, second.cached) == (False, True)
+    assert second.error_count == 1 and second.error_lines() == {9: "unknown identifier 'NotAName'"}
+    assert second.output == first.output
+    assert (project / "output" / "lean_diagnostics.sqlite").exists()
+
+
+def test_same_bytes_under_another_path_reuse_the_record(project, lean_runs):
+    lean_file = project / "output" / "1.lean"
+    file_diagnostics(lean_file, project_root=project)
+    copy = project / "copy.lean"
+    copy.write_text(_SRC, encoding="utf-8")
+    diag = file_diagnostics(copy, project_root=project)
+    assert diag.cached and len(lean_runs) == 1
+    assert diag.output.startswith(f"{copy}:9:25: error")
+
+
+def test_key_tracks_file_toolchain_manifest_and_imported_modules(project):
+    base = diagnostics_key(_SRC, project)
+    assert diagnostics_key(_SRC + "\n", project) != base
+    (project / "Desol" / "PaperTheory" / "Paper_1.lean").write_text("def paperConst : ℕ := 2\n", encoding="utf-8")
+    after_theory = diagnostics_key(_SRC, project)
+    assert after_theory != base
+    (project / "lake-manifest.json").write_text('{"packages": []}', encoding="utf-8")
+    after_manifest = diagnostics_key(_SRC, project)
+    assert after_manifest != after_theory
+    (project / "lean-toolchain").write_text("leanprover/lean4:v4.10.0\n", encoding="utf-8")
+    assert diagnostics_key(_SRC, project) != after_manifest
+
+
+def test_key_tracks_transitively_imported_project_modules(project):
+    theory = project / "Desol" / "PaperTheory" / "Paper_1.lean"
+    theory.write_text("import Desol.PaperTheory.Common\n" + theory.read_text(encoding="utf-8"), encoding="utf-8")
+    common = project / "Desol" / "PaperTheory" / "Common.lean"
+    common.write_text("def shared : ℕ := 1\n", encoding="utf-8")
+    base = diagnostics_key(_SRC, project)
+    common.write_text("def shared : ℕ := 2\n", encoding="utf-8")
+    assert diagnostics_key(_SRC, project) != base
+
+
+def test_edit_and_refresh_rerun_lean(project, lean_runs):
+    lean_file = project / "output" / "1.lean"
+    file_diagnostics(lean_file, project_root=project)
+    file_diagnostics(lean_file, project_root=project, refresh=True)
+    lean_file.write_text(_SRC.replace("NotAName n", "n = n"), encoding="utf-8")
+    diag = file_diagnostics(lean_file, project_root=project)
+    assert len(lean_runs) == 3
+    assert diag.error_count == 0 and diag.returncode == 0
+
+
+def test_timeouts_are_not_cached(project, monkeypatch):
+    def _timeout(lean_file, **_kw):
+        raise subprocess.TimeoutExpired(["lake"], 1)
+
+    monkeypatch.setattr(lds, "run_lean_file", _timeout)
+    lean_file = project / "output" / "1.lean"
+    assert file_diagnostics(lean_file, project_root=project) is None
+    assert lds.get_diagnostics_store(project).get(
+        diagnostics_key(_SRC, project), str(lean_file)
+    ) is None
+
+
+def test_audit_error_lines_read_from_store(project, lean_runs):
+    from audit_fully_proven_integrity import collect_lake_error_lines
+
+    lean_file = project / "output" / "1.lean"
+    assert collect_lake_error_lines(lean_file, project_root=project) == {9: "unknown identifier 'NotAName'"}
+    assert collect_lake_error_lines(lean_file, project_root=project) == {9: "unknown identifier 'NotAName'"}
+    assert len(lean_runs) == 1
@@ -0,0 +1,246 @@
+"""Hermetic tests for `scripts/lean_name_oracle.py`.
+
+Lean is never invoked: the lake backend is exercised through a patched
+`subprocess.run` and the REPL backend through a fake server.
+"""
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import lean_name_oracle
+from lean_name_oracle import LeanNameOracle, _attribute_errors, load_declaration_names
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "lean-toolchain").write_text("leanprover/lean4:v4.9.0\n", encoding="utf-8")
+    (tmp_path / "lake-manifest.json").write_text("{}", encoding="utf-8")
+    return tmp_path
+
+
+def _fake_lake(missing: set[str], calls: list[str]):
+    """Emulate `lake env lean` on a `#check @name` scratch file."""
+
+    def run(cmd, cwd=None, **_kw):
+        path = Path(cmd[-1])
+        text = path.read_text(encoding="utf-8")
+        calls.append(text)
+        errs = []
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            if line.startswith("#check @") and line[len("#check @"):] in missing:
+                errs.append(f"{path}:{lineno}:7: error: unknown identifier '{line[8:]}'")
+        return subprocess.CompletedProcess(cmd, 1 if errs else 0, stdout="\n".join(errs), stderr="")
+
+    return run
+
+
+def _oracle(project: Path, **kw) -> LeanNameOracle:
+    kw.setdefault("use_repl", False)
+    return LeanNameOracle(project, "import Mathlib", **kw)
+
+
+def test_attribute_errors_maps_lines_to_names():
+    assert _attribute_errors(["a", "b", "c"], [4], first_line=3) == {"a": True, "b": False, "c": True}
+
+
+def test_batch_resolves_in_one_lean_run(project):
+    calls: list[str] = []
+    oracle = _oracle(project)
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake({"Foo.bar"}, calls)):
+        got = oracle.resolve_many(["Nat.succ", "Foo.bar", "Real.sqrt", "Nat.succ"])
+    assert got == {"Nat.succ": True, "Foo.bar": False, "Real.sqrt": True}
+    assert len(calls) == 1
+    assert calls[0].startswith("import Mathlib\n\n#check @Nat.succ\n")
+    assert not list((project / ".lake" / "desol_scratch").glob("*.lean"))
+
+
+def test_answers_persist_across_oracles(project):
+    calls: list[str] = []
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake({"Foo.bar"}, calls)):
+        first = _oracle(project)
+        first.resolve_many(["Nat.succ", "Foo.bar"])
+        first.close()
+        second = _oracle(project)
+        assert second.resolve_many(["Foo.bar", "Nat.succ"]) == {"Foo.bar": False, "Nat.succ": True}
+        assert second.lean_runs == 0
+    assert len(calls) == 1
+
+
+def test_toolchain_change_invalidates_cache(project):
+    calls: list[str] = []
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake(set(), calls)):
+        _oracle(project).resolve_many(["Nat.succ"])
+        (project / "lean-toolchain").write_text("leanprover/lean4:v4.10.0\n", encoding="utf-8")
+        _oracle(project).resolve_many(["Nat.succ"])
+    assert len(calls) == 2
+
+
+def test_import_failure_is_not_cached(project):
+    def broken(cmd, **_kw):
+        return subprocess.CompletedProcess(
+            cmd, 1, stdout=f"{cmd[-1]}:1:0: error: unknown module prefix 'Mathlib'", stderr=""
+        )
+
+    oracle = _oracle(project)
+    with patch.object(lean_name_oracle.subprocess, "run", broken):
+        assert oracle.resolve_many(["Nat.succ"]) == {"Nat.succ": False}
+    calls: list[str] = []
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake(set(), calls)):
+        assert oracle.resolve_many(["Nat.succ"]) == {"Nat.succ": True}
+    assert len(calls) == 1
+
+
+def test_non_identifiers_never_reach_lean(project):
+    oracle = _oracle(project)
+    with patch.object(lean_name_oracle.subprocess, "run", side_effect=AssertionError("no lean")):
+        assert oracle.resolve_many(["Nat succ", "(x : Nat)", ""]) == {"Nat succ": False, "(x : Nat)": False, "": False}
+
+
+def test_declaration_name_set_answers_positively(project, tmp_path):
+    names = tmp_path / "decls.txt"
+    names.write_text("Nat.succ\nReal.sqrt\n", encoding="utf-8")
+    assert "Real.sqrt" in load_declaration_names(names)
+    calls: list[str] = []
+    oracle = _oracle(project, name_set_path=names)
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake({"Foo.bar"}, calls)):
+        assert oracle.resolve_many(["Nat.succ", "Foo.bar"]) == {"Nat.succ": True, "Foo.bar": False}
+    assert calls == ["import Mathlib\n\n#check @Foo.bar\n"]
+
+
+def test_declaration_names_from_premise_index(tmp_path):
+    (tmp_path / "entries.jsonl").write_text('{"name": "Nat.succ"}\nnot json\n{"name": ""}\n', encoding="utf-8")
+    assert load_declaration_names(tmp_path) == frozenset({"Nat.succ"})
+
+
+class _FakeRepl:
+    def __init__(self, missing: set[str], broken: str = "Broken"):
+        self.missing = missing
+        self.broken = broken
+        self.commands: list[tuple[str, int | None]] = []
+        self.next_env = 3
+        self.restarts = 0
+        self.stopped = False
+
+    def elaborate(self, cmd, env=None):
+        self.commands.append((cmd, env))
+        if cmd.startswith("import"):
+            if self.broken in cmd:
+                return {"env": 0, "messages": [{"severity": "error", "pos": {"line": 1, "column": 0}}]}
+            self.next_env += 1
+            return {"env": self.next_env - 1}
+        msgs = [
+            {"severity": "error", "pos": {"line": i, "column": 7}, "data": "unknown"}
+            for i, line in enumerate(cmd.splitlines(), start=1)
+            if line[len("#check @"):] in self.missing
+        ]
+        return {"env": 99, "messages": msgs}
+
+    def restart(self):
+        self.restarts += 1
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def shared_repl(project, monkeypatch) -> _FakeRepl:
+    """Install a fake server as the project's shared REPL."""
+    monkeypatch.setattr(lean_name_oracle, "_REPLS", {})
+    monkeypatch.setattr(lean_name_oracle, "_ORACLES", lean_name_oracle.OrderedDict())
+    fake = _FakeRepl({"Foo.bar"})
+    lean_name_oracle._shared_repl(project, 120).server = fake
+    return fake
+
+
+def test_repl_backend_reuses_import_env(project, shared_repl):
+    oracle = _oracle(project, use_repl=True)
+    with patch.object(lean_name_oracle.subprocess, "run", side_effect=AssertionError("no lake")):
+        assert oracle.resolve_many(["Nat.succ", "Foo.bar"]) == {"Nat.succ": True, "Foo.bar": False}
+        assert oracle.resolve_many(["Real.sqrt"]) == {"Real.sqrt": True}
+    cmds = shared_repl.commands
+    assert [c for c, _ in cmds].count("import Mathlib") == 1
+    assert all(env == 3 for c, env in cmds if c.startswith("#check"))
+
+
+def test_header_variants_share_one_repl_and_reordered_headers_one_oracle(project, shared_repl):
+    first = lean_name_oracle.get_oracle(project, "import Mathlib\nimport Desol.A\n")
+    assert lean_name_oracle.get_oracle(project, "\nimport Desol.A\nimport Mathlib\nimport Mathlib") is first
+    second = lean_name_oracle.get_oracle(project, "import Mathlib\nimport Desol.B")
+    for oracle in (first, second):
+        oracle.use_repl = True
+        oracle.resolve_many(["Nat.succ"])
+    imports = [(c, e) for c, e in shared_repl.commands if c.startswith("import")]
+    assert [c for c, _ in imports] == ["import Desol.A\nimport Mathlib", "import Desol.B\nimport Mathlib"]
+    checks = [e for c, e in shared_repl.commands if c.startswith("#check")]
+    assert checks == [3, 4]
+
+
+def test_repl_header_cap_restarts_the_shared_server(project, shared_repl, monkeypatch):
+    monkeypatch.setattr(lean_name_oracle, "_MAX_REPL_HEADERS", 2)
+    for i in range(3):
+        LeanNameOracle(project, f"import A{i}", use_repl=True).resolve_many(["Nat.succ"])
+    assert shared_repl.restarts == 1
+    assert list(lean_name_oracle._REPLS[str(project.resolve())].envs) == ["import A2"]
+
+
+def test_failed_repl_header_switches_the_oracle_to_lake(project, shared_repl):
+    calls: list[str] = []
+    oracle = LeanNameOracle(project, "import Broken", use_repl=True)
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake(set(), calls)):
+        oracle.resolve_many(["Nat.succ"])
+        oracle.resolve_many(["Real.sqrt"])
+    assert [c for c, _ in shared_repl.commands] == ["import Broken"]
+    assert len(calls) == 2 and not oracle.use_repl
+
+
+def test_repl_exception_stops_server_and_switches_to_lake(project, shared_repl):
+    def boom(cmd, env=None):
+        raise RuntimeError("REPL died")
+
+    shared_repl.elaborate = boom
+    calls: list[str] = []
+    oracle = _oracle(project, use_repl=True)
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake(set(), calls)):
+        oracle.resolve_many(["Nat.succ"])
+        oracle.resolve_many(["Real.sqrt"])
+    assert shared_repl.stopped and not oracle.use_repl
+    assert len(calls) == 2
+
+
+def test_local_import_sources_are_part_of_the_pin(project):
+    (project / "Desol").mkdir()
+    (project / "Desol" / "Paper.lean").write_text("import Desol.Base\n", encoding="utf-8")
+    (project / "Desol" / "Base.lean").write_text("def x := 1\n", encoding="utf-8")
+    imports = "import Mathlib\nimport Desol.Paper"
+    calls: list[str] = []
+    oracle = LeanNameOracle(project, imports, use_repl=False)
+    with patch.object(lean_name_oracle.subprocess, "run", _fake_lake(set(), calls)):
+        oracle.resolve_many(["Desol.x"])
+        oracle.resolve_many(["Desol.x"])
+        assert len(calls) == 1
+        # A transitively imported project module changed: answers are stale.
+        (project / "Desol" / "Base.lean").write_text("def y := 1\n", encoding="utf-8")
+        oracle.resolve_many(["Desol.x"])
+    assert len(calls) == 2
+    assert lean_name_oracle.toolchain_pin(project, imports) != lean_name_oracle.toolchain_pin(project)
+
+
+def test_get_oracle_evicts_least_recently_used_and_close_stops_repl(project, shared_repl, monkeypatch):
+    monkeypatch.setattr(lean_name_oracle, "_MAX_ORACLES", 2)
+    oracles = [lean_name_oracle.get_oracle(project, f"import A{i}") for i in range(2)]
+    for oracle in oracles:
+        oracle.resolve_many(["Nat.succ"])  # opens the cache connection
+    assert lean_name_oracle.get_oracle(project, "import A0") is oracles[0]
+    lean_name_oracle.get_oracle(project, "import A2")
+    assert oracles[1]._con is None and oracles[0]._con is not None
+    assert list(lean_name_oracle._ORACLES) == [
+        (str(project.resolve()), "import A0"),
+        (str(project.resolve()), "import A2"),
+    ]
+    assert not shared_repl.stopped
+    lean_name_oracle.close_oracles()
+    assert shared_repl.stopped and not lean_name_oracle._ORACLES and not lean_name_oracle._REPLS
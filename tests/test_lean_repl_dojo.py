@@ -13,6 +13,8 @@ import pytest
 
 from lean_repl_dojo import (
     BatchExpansionRequest,
+    DojoTacticCache,
+    REPLDojoWorkerPool,
     LeanError,
     ProofFinished,
     REPLDojo,
@@ -22,6 +24,7 @@ from lean_repl_dojo import (
     _extract_unsolved_goals,
     _replace_theorem_body,
     _synthetic_initial_state,
+    _write_prefix_anchor,
     load_tree_checkpoint,
     replay_step_traces,
     save_tree_checkpoint,
@@ -260,6 +263,36 @@ def test_repldojo_restores_file_on_exit(tmp_path):
     assert lean_file.read_text() == _THM_SOURCE
 
 
+def test_repldojo_checks_tactics_in_scratch_copy(tmp_path):
+    lean_file = tmp_path / "Desol" / "Test.lean"
+    dojo = _make_dojo(tmp_path)
+    seen: list[tuple[str, str, str]] = []
+
+    def _fake_run(cmd, **kwargs):
+        if cmd[:3] == ["lake", "env", "lean"]:
+            scratch = tmp_path / cmd[3]
+            seen.append((cmd[3], scratch.read_text(), lean_file.read_text()))
+            r = _error_result()
+            r.stderr = f"error: {cmd[3]}:2:4: unknown tactic 'badtac'\n"
+            return r
+        return _ok_result()
+
+    with patch("subprocess.run", side_effect=_fake_run):
+        with dojo as (d, state):
+            result = d.run_tac(state, "badtac")
+    assert len(seen) == 1
+    scratch_rel, scratch_text, source_during_run = seen[0]
+    assert scratch_rel != "Desol/Test.lean"
+    assert "badtac" in scratch_text
+    assert source_during_run == _THM_SOURCE
+    assert not (tmp_path / scratch_rel).exists()
+    assert isinstance(result, LeanError)
+    assert result.error == "unknown tactic 'badtac'"
+    cached = d._result_from_cache(d._cache_key(["badtac"]))
+    assert cached is not None
+    assert "Desol/Test.lean:2:4" in cached.stderr
+
+
 def test_repldojo_sorry_result_is_lean_error(tmp_path):
     """returncode=0 but 'declaration uses sorry' at the decl line → LeanError."""
     dojo = _make_dojo(tmp_path)
@@ -284,6 +317,252 @@ def test_repldojo_records_step_traces(tmp_path):
     assert traces[0].tactic == "intro"
 
 
+def test_repldojo_runs_lake_update_once_per_project(tmp_path):
+    dojo = _make_dojo(tmp_path)
+    calls: list[list[str]] = []
+    update_ok = [False]
+
+    def _fake_run(cmd, **kwargs):
+        calls.append(list(cmd))
+        if cmd[:2] == ["lake", "update"]:
+            return _ok_result() if update_ok[0] else _error_result()
+        return _unsolved_result()
+
+    with patch("subprocess.run", side_effect=_fake_run):
+        with dojo as (d, state):
+            d.run_tac(state, "intro")  # failed update is retried next time
+            update_ok[0] = True
+            d.run_tac(state, "intros")
+            d.run_tac(state, "skip")
+    assert [c[:2] for c in calls].count(["lake", "update"]) == 2
+    assert [c[:3] for c in calls].count(["lake", "env", "lean"]) == 2
+
+
+class _FakeReplServer:
+    """In-memory stand-in for LeanREPLServer's env/proof-state protocol."""
+
+    def __init__(self) -> None:
+        self.loaded: list[str] = []
+        self.tactics: list[tuple[int, str]] = []
+        self.stopped = False
+        self._goals = {7: ["⊢ True ∧ True"]}
+        self._next = 8
+
+    def load_anchor(self, anchor_file: str) -> dict:
+        self.loaded.append(anchor_file)
+        return {"env": 3}
+
+    def elaborate(self, cmd: str, env: int | None = None) -> dict:
+        assert env == 3 and "sorry" in cmd
+        return {"env": 4, "sorries": [{"proofState": 7, "goal": self._goals[7][0]}]}
+
+    def run_tac(self, proof_state_id: int, tactic: str):
+        import lean_repl_server as rs
+
+        self.tactics.append((proof_state_id, tactic))
+        goals = self._goals[proof_state_id]
+        if tactic == "constructor":
+            new_goals = ["⊢ True", "⊢ True"]
+        elif tactic == "trivial" and len(goals) == 1 and goals[0] == "⊢ True":
+            new_goals = []
+        elif tactic == "trivial":
+            new_goals = goals[1:]
+        elif tactic == "skip":
+            new_goals = goals
+        else:
+            return rs.LeanError(f"unknown tactic '{tactic}'")
+        ps = self._next
+        self._next += 1
+        self._goals[ps] = new_goals
+        if not new_goals:
+            return rs.ProofFinished(proof_state_id=ps)
+        return rs.TacticState(goals=new_goals, proof_state_id=ps)
+
+    def stop(self) -> None:
+        self.stopped = True
+
+
+def _make_repl_dojo(tmp_path: Path, server: _FakeReplServer) -> REPLDojo:
+    lean_file = tmp_path / "Desol" / "Test.lean"
+    lean_file.parent.mkdir(parents=True)
+    lean_file.write_text("theorem my_thm : True ∧ True := by\n  sorry\n")
+    return REPLDojo(
+        project_root=tmp_path,
+        file_path=Path("Desol/Test.lean"),
+        theorem_name="my_thm",
+        timeout=10,
+        backend="repl",
+        repl_server=server,
+    )
+
+
+def test_repldojo_repl_backend_applies_only_new_tactic(tmp_path):
+    server = _FakeReplServer()
+    dojo = _make_repl_dojo(tmp_path, server)
+    with patch("subprocess.run") as run:
+        with dojo as (d, state):
+            assert state.pp == "⊢ True ∧ True"
+            split = d.run_tac(state, "constructor")
+            assert isinstance(split, TacticState)
+            assert split.num_goals == 2
+            one_left = d.run_tac(split, "trivial")
+            assert isinstance(one_left, TacticState)
+            done = d.run_tac(one_left, "trivial")
+            traces = d.get_step_traces()
+    run.assert_not_called()
+    assert isinstance(done, ProofFinished)
+    [anchor] = server.loaded
+    assert anchor.startswith(".lake/desol_scratch/Test-prefix-")
+    assert (tmp_path / anchor).read_text() == ""
+    assert server.tactics == [(7, "constructor"), (8, "trivial"), (9, "trivial")]
+    assert [t.result_kind for t in traces] == ["state_advanced", "state_advanced", "proof_finished"]
+    assert not server.stopped
+
+
+def test_prefix_anchors_are_capped_least_recently_used_first(tmp_path, monkeypatch):
+    import os
+
+    monkeypatch.setenv("DESOL_DOJO_PREFIX_ANCHORS_MAX", "2")
+    monkeypatch.setenv("DESOL_REPL_ENV_SNAPSHOT_DIR", str(tmp_path / "snaps"))
+    from lean_repl_server import repl_env_snapshot_path
+
+    src = Path("Test.lean")
+    a = _write_prefix_anchor(tmp_path, src, "-- a\n")
+    b = _write_prefix_anchor(tmp_path, src, "-- b\n")
+    snap_b = repl_env_snapshot_path(tmp_path, str(b.relative_to(tmp_path)))
+    snap_b.parent.mkdir(parents=True)
+    snap_b.write_bytes(b"env")
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+    assert _write_prefix_anchor(tmp_path, src, "-- a\n") == a  # reuse refreshes a
+    c = _write_prefix_anchor(tmp_path, src, "-- c\n")
+    assert a.exists() and c.exists()
+    assert not b.exists() and not snap_b.exists()
+
+
+def test_repldojo_repl_backend_branches_from_earlier_states(tmp_path):
+    server = _FakeReplServer()
+    dojo = _make_repl_dojo(tmp_path, server)
+    with dojo as (d, state):
+        first = d.run_tac(state, "constructor")
+        second = d.run_tac(state, "constructor")
+        bad = d.run_tac(first, "badtac")
+        stuck = d.run_tac(first, "skip")
+        cheat = d.run_tac(first, "sorry")
+    assert isinstance(first, TacticState) and isinstance(second, TacticState)
+    assert first.id != second.id
+    assert server.tactics[:2] == [(7, "constructor"), (7, "constructor")]
+    assert isinstance(bad, LeanError) and "badtac" in bad.error
+    assert isinstance(stuck, LeanError) and "no progress" in stuck.error
+    assert isinstance(cheat, LeanError)
+    assert "sorry" not in {t for _, t in server.tactics}
+
+
+def test_repldojo_repl_env_excludes_target_and_later_declarations(tmp_path):
+    server = _FakeReplServer()
+    dojo = _make_repl_dojo(tmp_path, server)
+    (tmp_path / "Desol" / "Test.lean").write_text(
+        "import Mathlib\n\n"
+        "theorem helper : True := trivial\n\n"
+        "/-- The target. -/\n@[simp]\n"
+        "theorem my_thm : True ∧ True := by\n  sorry\n\n"
+        "theorem later : True ∧ True := by\n  sorry\n"
+    )
+    with dojo as (d, state):
+        assert state.pp == "⊢ True ∧ True"
+    prefix = (tmp_path / server.loaded[0]).read_text()
+    assert prefix == "import Mathlib\n\ntheorem helper : True := trivial\n\n"
+    assert "my_thm" not in prefix and "later" not in prefix and "The target" not in prefix
+
+
+def test_repldojo_auto_backend_falls_back_to_lake(tmp_path):
+    dojo = _make_dojo(tmp_path)
+    dojo.backend = "auto"
+    with patch("lean_repl_server.repl_server_available", return_value=False):
+        with patch("subprocess.run", return_value=_ok_result()):
+            with dojo as (d, state):
+                result = d.run_tac(state, "trivial")
+    assert isinstance(result, ProofFinished)
+
+
+def test_repldojo_rejects_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        REPLDojo(tmp_path, Path("Desol/Test.lean"), "my_thm", backend="docker")
+
+
+def test_repldojo_reuses_cached_build_output(tmp_path):
+    dojo = _make_dojo(tmp_path)
+    calls: list[list[str]] = []
+
+    def _fake_run(cmd, **kwargs):
+        calls.append(list(cmd))
+        return _ok_result() if cmd[:2] == ["lake", "update"] else _unsolved_result()
+
+    with patch("subprocess.run", side_effect=_fake_run):
+        with dojo as (d, state):
+            first = d.run_tac(state, "intro")
+            again = d.run_tac(state, "intro")
+            stats = d.cache_stats()
+    assert first == again
+    assert [c[:3] for c in calls].count(["lake", "env", "lean"]) == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+    assert (tmp_path / "output" / "dojo_tactic_cache.sqlite").exists()
+
+
+def test_dojo_tactic_cache_roundtrip_and_shared_file(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    writer = DojoTacticCache(path)
+    reader = DojoTacticCache(path)
+    assert reader.get("k") is None
+    writer.put("k", 1, "out" * 1000, "err: ⊢ True")
+    assert reader.get("k") == (1, "out" * 1000, "err: ⊢ True")
+    stats = reader.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] < 3000  # blobs are compressed
+    writer.close()
+    reader.close()
+
+
+def test_dojo_tactic_cache_evicts_least_recently_used(tmp_path):
+    cache = DojoTacticCache(tmp_path / "cache.sqlite", max_entries=2, max_age_days=0)
+    for key in ("a", "b", "c"):
+        cache.put(key, 0, key, "")
+    cache.get("a")
+    cache._evict(cache._connect())
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.get("b") is None
+
+
+def test_dojo_tactic_cache_evicts_stale_rows(tmp_path):
+    cache = DojoTacticCache(tmp_path / "cache.sqlite", max_entries=0, max_age_days=1)
+    cache.put("old", 0, "", "")
+    cache.put("new", 0, "", "")
+    con = cache._connect()
+    con.execute("UPDATE tactic_results SET last_used_at = 0 WHERE key = 'old'")
+    cache._evict(con)
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_dojo_tactic_cache_corrupt_row_is_a_miss(tmp_path):
+    cache = DojoTacticCache(tmp_path / "cache.sqlite")
+    cache.put("k", 0, "ok", "")
+    con = cache._connect()
+    con.execute("UPDATE tactic_results SET stdout = ? WHERE key = 'k'", (b"not zlib",))
+    con.commit()
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_dojo_tactic_cache_imports_legacy_json(tmp_path):
+    legacy = tmp_path / "dojo_tactic_cache.json"
+    legacy.write_text('{"k": {"returncode": 0, "stdout": "ok", "stderr": ""}}', encoding="utf-8")
+    cache = DojoTacticCache(tmp_path / "dojo_tactic_cache.sqlite")
+    assert cache.get("k") == (0, "ok", "")
+    assert not legacy.exists()
+
+
 def test_replay_step_traces(tmp_path):
     dojo = _make_dojo(tmp_path)
     with patch("subprocess.run", return_value=_unsolved_result()):
@@ -318,3 +597,107 @@ def test_batch_request_dataclass():
         tactics=["intro"],
     )
     assert req.timeout == 300
+
+
+# ---------------------------------------------------------------------------
+# Persistent worker pool
+# ---------------------------------------------------------------------------
+
+
+def _repl_worker_state(tmp_path: Path, server: _FakeReplServer):
+    from lean_repl_dojo import _WorkerState
+
+    lean_file = tmp_path / "Desol" / "Test.lean"
+    lean_file.parent.mkdir(parents=True)
+    lean_file.write_text("theorem my_thm : True ∧ True := by\n  sorry\n")
+    state = _WorkerState("repl")
+    state._servers[str(tmp_path)] = server
+    return state, lean_file
+
+
+def _req(tmp_path: Path, tactics: list[str], theorem: str = "my_thm") -> BatchExpansionRequest:
+    return BatchExpansionRequest(
+        project_root=str(tmp_path),
+        file_path="Desol/Test.lean",
+        theorem_name=theorem,
+        tactics=tactics,
+        timeout=10,
+    )
+
+
+def test_worker_state_resumes_from_applied_prefix(tmp_path):
+    server = _FakeReplServer()
+    state, _ = _repl_worker_state(tmp_path, server)
+    first = state.run(_req(tmp_path, ["constructor", "trivial"]))
+    second = state.run(_req(tmp_path, ["constructor", "trivial", "trivial"]))
+    state.close()
+    assert first["result_kind"] == "TacticState"
+    assert second["result_kind"] == "ProofFinished"
+    assert [t for _, t in server.tactics] == ["constructor", "trivial", "trivial"]
+    assert [t["tactic"] for t in second["traces"]] == ["constructor", "trivial", "trivial"]
+    assert len(server.loaded) == 1
+
+
+def test_worker_state_reopens_dojo_when_source_changes(tmp_path):
+    server = _FakeReplServer()
+    state, lean_file = _repl_worker_state(tmp_path, server)
+    state.run(_req(tmp_path, ["constructor"]))
+    lean_file.write_text("-- edited\ntheorem my_thm : True ∧ True := by\n  sorry\n")
+    state.run(_req(tmp_path, ["constructor"]))
+    state.close()
+    assert len(server.loaded) == 2
+    assert [t for _, t in server.tactics] == ["constructor", "constructor"]
+
+
+def test_worker_state_caps_remembered_prefixes(tmp_path, monkeypatch):
+    import lean_repl_dojo
+
+    monkeypatch.setattr(lean_repl_dojo, "_WORKER_MAX_PREFIXES", 2)
+    server = _FakeReplServer()
+    state, _ = _repl_worker_state(tmp_path, server)
+    state.run(_req(tmp_path, ["constructor", "trivial"]))
+    [entry] = state._dojos.values()
+    state.close()
+    assert list(entry.prefixes) == [(), ("constructor", "trivial")]
+
+
+def test_close_shared_pools_stops_and_forgets_pools():
+    import lean_repl_dojo
+
+    pool = MagicMock()
+    lean_repl_dojo._SHARED_POOLS[(99, "lake")] = pool
+    lean_repl_dojo.close_shared_pools()
+    pool.close.assert_called_once()
+    assert (99, "lake") not in lean_repl_dojo._SHARED_POOLS
+
+
+def test_worker_pool_routes_by_file_and_theorem(tmp_path):
+    pool = REPLDojoWorkerPool(max_workers=4)
+    reqs = [_req(tmp_path, [], theorem=f"t{i}") for i in range(16)]
+    assert [pool._worker_index(r) for r in reqs] == [pool._worker_index(r) for r in reqs]
+    assert pool._worker_index(_req(tmp_path, ["a"])) == pool._worker_index(_req(tmp_path, ["b"]))
+    assert len({pool._worker_index(r) for r in reqs}) > 1
+
+
+def test_worker_pool_is_persistent_and_restarts_crashed_workers(tmp_path):
+    lean_file = tmp_path / "Desol" / "Test.lean"
+    lean_file.parent.mkdir(parents=True)
+    lean_file.write_text(_THM_SOURCE)
+    # Forked workers inherit the subprocess.run patch.
+    with patch("subprocess.run", return_value=_ok_result()):
+        with REPLDojoWorkerPool(max_workers=2, backend="lake", mp_context="fork") as pool:
+            first = pool.run_batch([_req(tmp_path, ["trivial"])])
+            pids = [w.process.pid for w in pool._workers]
+            assert pool.health_check() == [True, True]
+            again = pool.run_batch([_req(tmp_path, ["trivial"])])
+            assert [w.process.pid for w in pool._workers] == pids
+
+            crashed = pool._workers[pool._worker_index(_req(tmp_path, []))]
+            crashed.process.kill()
+            crashed.process.join()
+            after = pool.run_batch([_req(tmp_path, ["trivial"])])
+            assert crashed.restarts == 1
+            assert pool.health_check() == [True, True]
+    assert first[0]["result_kind"] == "ProofFinished"
+    assert again[0]["result_kind"] == "ProofFinished"
+    assert after[0]["result_kind"] == "ProofFinished"
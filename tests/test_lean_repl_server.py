@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import sys
 from pathlib import Path
 
+import pytest
+
 _ROOT = Path(__file__).resolve().parents[1]
 if str(_ROOT / "scripts") not in sys.path:
     sys.path.insert(0, str(_ROOT / "scripts"))
 
-from lean_repl_server import _extract_json_message
+from lean_repl_server import (
+    AsyncLeanREPLServer,
+    LeanError,
+    LeanREPLServer,
+    ProofFinished,
+    TacticState,
+    _extract_json_message,
+    _JSONFramer,
+    _tactic_result,
+    repl_env_snapshot_key,
+    repl_env_snapshot_path,
+)
 
 
 def test_extract_json_message_with_clean_payload() -> None:
@@ -31,3 +45,277 @@ def test_extract_json_message_incomplete_keeps_buffer() -> None:
     obj, rest = _extract_json_message(payload)
     assert obj is None
     assert rest == payload
+
+
+# ── _JSONFramer ──────────────────────────────────────────────────────────────
+
+
+def _feed_in_chunks(text: str, size: int) -> list[dict]:
+    framer = _JSONFramer()
+    out: list[dict] = []
+    for i in range(0, len(text), size):
+        out.extend(framer.feed(text[i:i + size]))
+    return out
+
+
+def test_framer_splits_objects_across_arbitrary_chunks() -> None:
+    stream = (
+        '{"env": 1, "messages": [{"severity": "info", "data": "a } b { c"}]}\n\n'
+        '{"proofState": 3, "goals": ["⊢ \\"x\\" = \\"}\\""]}\n\n'
+    )
+    for size in (1, 2, 7, len(stream)):
+        out = _feed_in_chunks(stream, size)
+        assert [o.get("env", o.get("proofState")) for o in out] == [1, 3]
+        assert out[1]["goals"] == ['⊢ "x" = "}"']
+
+
+def test_framer_skips_chatter_and_recovers_from_stray_brace() -> None:
+    stream = 'building {Mathlib\ninfo: done\n{\n "env": 4}\n\n{"env": 5}\n\n'
+    assert [o["env"] for o in _feed_in_chunks(stream, 3)] == [4, 5]
+
+
+def test_framer_holds_incomplete_object() -> None:
+    framer = _JSONFramer()
+    assert framer.feed('{"env": 1, "messages": [') == []
+    assert framer.feed(']}\n\n') == [{"env": 1, "messages": []}]
+
+
+def test_tactic_result_marks_lost_proof_states_transient() -> None:
+    assert _tactic_result({"message": "Unknown proof state."}).transient
+    assert not _tactic_result({"message": "Lean error:\nunknown tactic"}).transient
+    err = _tactic_result({"proofState": 3, "messages": [{"severity": "error", "data": "bad"}]})
+    assert err == LeanError("bad")
+
+
+def test_run_tac_timeout_is_transient(tmp_path: Path) -> None:
+    server = LeanREPLServer(tmp_path)
+
+    def _timeout(_payload):
+        raise TimeoutError("REPL did not respond within 1s")
+
+    server._send = _timeout
+    assert server.run_tac(1, "simp") == LeanError("REPL did not respond within 1s", transient=True)
+
+
+# ── AsyncLeanREPLServer against a scripted fake REPL ─────────────────────────
+
+_FAKE_REPL = r'''
+import json, sys, time
+n = 0
+buf = []
+for line in sys.stdin:
+    if line.strip():
+        buf.append(line)
+        continue
+    if not buf:
+        continue
+    req = json.loads("".join(buf))
+    buf = []
+    n += 1
+    cmd = req.get("cmd", "")
+    if "hang" in cmd:
+        time.sleep(60)
+    if "pickleTo" in req:
+        with open(req["pickleTo"], "w") as fh:
+            json.dump({"env": req["env"]}, fh)
+        resp = {"env": req["env"]}
+    elif "unpickleEnvFrom" in req:
+        with open(req["unpickleEnvFrom"]) as fh:
+            resp = {"env": json.load(fh)["env"], "restored": True}
+    elif "tactic" in req:
+        goals = [] if req["tactic"] == "done" else ["⊢ True"]
+        if req["tactic"] == "bad":
+            resp = {"message": "unknown tactic"}
+        else:
+            resp = {"proofState": req["proofState"] + 1, "goals": goals}
+    elif "sorry" in cmd:
+        resp = {"env": n, "sorries": [{"proofState": 0, "goal": "⊢ True"}],
+                "messages": [{"severity": "warning", "data": "declaration uses 'sorry'"}]}
+    else:
+        resp = {"env": n, "echo": cmd or req.get("path")}
+    if n == 1:
+        sys.stdout.write("noise {\n")
+    sys.stdout.write(json.dumps(resp, indent=1) + "\n\n")
+    sys.stdout.flush()
+'''
+
+
+class _FakeAsyncServer(AsyncLeanREPLServer):
+    def __init__(self, script: Path, **kwargs) -> None:
+        super().__init__(project_root=script.parent, **kwargs)
+        self._script = script
+
+    def _repl_binary(self) -> list[str]:
+        return [sys.executable, str(self._script)]
+
+
+def _fake_server(tmp_path: Path, **kwargs) -> _FakeAsyncServer:
+    script = tmp_path / "fake_repl.py"
+    script.write_text(_FAKE_REPL, encoding="utf-8")
+    return _FakeAsyncServer(script, **kwargs)
+
+
+def test_async_server_pipelines_concurrent_commands(tmp_path: Path) -> None:
+    async def _run() -> list[dict]:
+        async with _fake_server(tmp_path) as server:
+            return await asyncio.gather(
+                *(server.send({"cmd": f"def x{i} := {i}"}) for i in range(20))
+            )
+
+    out = asyncio.run(_run())
+    assert [o["echo"] for o in out] == [f"def x{i} := {i}" for i in range(20)]
+
+
+def test_async_server_proof_api(tmp_path: Path) -> None:
+    async def _run():
+        async with _fake_server(tmp_path) as server:
+            ps = await server.start_proof("theorem t : True := by trivial")
+            step = await server.run_tac(ps, "skip")
+            done = await server.run_tac_sequence(ps, ["skip", "done"])
+            bad = await server.run_tac(ps, "bad")
+            return ps, step, done, bad
+
+    ps, step, done, bad = asyncio.run(_run())
+    assert ps == 0
+    assert isinstance(step, TacticState) and step.goals == ["⊢ True"]
+    assert isinstance(done, ProofFinished)
+    assert isinstance(bad, LeanError) and "unknown tactic" in bad.error
+
+
+def test_async_concurrent_start_proof_loads_anchor_once(tmp_path: Path) -> None:
+    loads: list[str] = []
+
+    class _Counting(_FakeAsyncServer):
+        async def load_anchor(self, anchor_file: str = "Desol/ReplAnchor.lean") -> dict:
+            loads.append(anchor_file)
+            return await super().load_anchor(anchor_file)
+
+    script = tmp_path / "fake_repl.py"
+    script.write_text(_FAKE_REPL, encoding="utf-8")
+
+    async def _run() -> list:
+        async with _Counting(script) as server:
+            return await asyncio.gather(
+                *(server.start_proof(f"theorem t{i} : True := by trivial") for i in range(8))
+            )
+
+    assert asyncio.run(_run()) == [0] * 8
+    assert loads == ["Desol/ReplAnchor.lean"]
+
+
+def test_async_server_timeout_restarts_and_recovers(tmp_path: Path) -> None:
+    async def _run() -> dict:
+        async with _fake_server(tmp_path, timeout=1.0) as server:
+            first_proc = server._proc
+            with pytest.raises(TimeoutError):
+                await server.send({"cmd": "hang"})
+            assert server._proc is not first_proc
+            return await server.send({"cmd": "def ok := 1"})
+
+    assert asyncio.run(_run())["echo"] == "def ok := 1"
+
+
+# ── env snapshots ────────────────────────────────────────────────────────────
+
+
+class _FakeSyncServer(LeanREPLServer):
+    def __init__(self, script: Path, project_root: Path) -> None:
+        super().__init__(project_root=project_root, timeout=10.0)
+        self._script = script
+
+    def _repl_binary(self) -> list[str]:
+        return [sys.executable, str(self._script)]
+
+
+def _snapshot_project(tmp_path: Path) -> Path:
+    root = tmp_path / "proj"
+    (root / "Desol" / "PaperTheory").mkdir(parents=True)
+    (root / "lake-manifest.json").write_text('{"packages": []}', encoding="utf-8")
+    (root / "lean-toolchain").write_text("leanprover/lean4:v4.29.0\n", encoding="utf-8")
+    (root / "Desol" / "PaperTheory" / "Paper_1.lean").write_text("def a := 1\n", encoding="utf-8")
+    (root / "Desol" / "Anchor.lean").write_text(
+        "import Mathlib\nimport Desol.PaperTheory.Paper_1\n", encoding="utf-8"
+    )
+    return root
+
+
+def test_snapshot_key_tracks_manifest_toolchain_and_paper_theory(tmp_path: Path) -> None:
+    root = _snapshot_project(tmp_path)
+    anchor = "Desol/Anchor.lean"
+    base = repl_env_snapshot_key(root, anchor)
+    assert base is not None and base == repl_env_snapshot_key(root, anchor)
+
+    (root / "lake-manifest.json").write_text('{"packages": [1]}', encoding="utf-8")
+    after_manifest = repl_env_snapshot_key(root, anchor)
+    assert after_manifest != base
+
+    (root / "lean-toolchain").write_text("leanprover/lean4:v4.30.0\n", encoding="utf-8")
+    after_toolchain = repl_env_snapshot_key(root, anchor)
+    assert after_toolchain != after_manifest
+
+    olean = root / ".lake" / "build" / "lib" / "lean" / "Desol" / "PaperTheory" / "Paper_1.olean"
+    olean.parent.mkdir(parents=True)
+    olean.write_bytes(b"v1")
+    after_olean = repl_env_snapshot_key(root, anchor)
+    assert after_olean != after_toolchain
+    olean.write_bytes(b"v2")
+    assert repl_env_snapshot_key(root, anchor) != after_olean
+
+    assert repl_env_snapshot_key(root, "Desol/Missing.lean") is None
+
+
+def test_snapshot_path_can_be_disabled(tmp_path: Path, monkeypatch) -> None:
+    root = _snapshot_project(tmp_path)
+    assert repl_env_snapshot_path(root, "Desol/Anchor.lean") is not None
+    monkeypatch.setenv("DESOL_REPL_ENV_SNAPSHOTS", "0")
+    assert repl_env_snapshot_path(root, "Desol/Anchor.lean") is None
+
+
+def test_load_anchor_writes_then_restores_snapshot(tmp_path: Path) -> None:
+    root = _snapshot_project(tmp_path)
+    script = tmp_path / "fake_repl.py"
+    script.write_text(_FAKE_REPL, encoding="utf-8")
+    snapshot = repl_env_snapshot_path(root, "Desol/Anchor.lean")
+    assert snapshot is not None and not snapshot.exists()
+
+    with _FakeSyncServer(script, root) as cold:
+        resp = cold.load_anchor("Desol/Anchor.lean")
+    assert resp.get("echo") == "Desol/Anchor.lean"
+    assert snapshot.exists()
+    assert not list(snapshot.parent.glob("*.tmp"))
+
+    with _FakeSyncServer(script, root) as warm:
+        resp = warm.load_anchor("Desol/Anchor.lean")
+        assert warm.ensure_mathlib_imported("Desol/Anchor.lean") == resp["env"]
+    assert resp.get("restored") is True
+
+
+def test_async_load_anchor_restores_snapshot(tmp_path: Path) -> None:
+    root = _snapshot_project(tmp_path)
+    script = tmp_path / "fake_repl.py"
+    script.write_text(_FAKE_REPL, encoding="utf-8")
+
+    async def _load() -> dict:
+        server = _FakeAsyncServer(script)
+        server.project_root = root
+        async with server:
+            return await server.load_anchor("Desol/Anchor.lean")
+
+    assert asyncio.run(_load()).get("echo") == "Desol/Anchor.lean"
+    assert asyncio.run(_load()).get("restored") is True
+
+
+def test_corrupt_snapshot_falls_back_to_cold_load(tmp_path: Path) -> None:
+    root = _snapshot_project(tmp_path)
+    script = tmp_path / "fake_repl.py"
+    script.write_text(_FAKE_REPL, encoding="utf-8")
+    snapshot = repl_env_snapshot_path(root, "Desol/Anchor.lean")
+    assert snapshot is not None
+    snapshot.parent.mkdir(parents=True)
+    snapshot.write_text("not json", encoding="utf-8")
+
+    with _FakeSyncServer(script, root) as server:
+        resp = server.load_anchor("Desol/Anchor.lean")
+    assert resp.get("echo") == "Desol/Anchor.lean"
+    # The corrupt snapshot was replaced by a fresh one.
+    assert "env" in snapshot.read_text(encoding="utf-8")
@@ -388,6 +388,19 @@ def test_factor_v2_transport_error_returns_empty() -> None:
     assert out == []
 
 
+def test_call_offline_cache_miss_does_not_reach_live_api(tmp_path: Path) -> None:
+    import llm_response_cache as lrc
+
+    client = FakeClient(_factor_response([]))
+    lrc.set_response_cache(lrc.LLMResponseCache(tmp_path / "c.sqlite", mode="offline"))
+    try:
+        with pytest.raises(lrc.LLMCacheMiss):
+            lfv2._call(client=client, model="m", user="factor this")
+    finally:
+        lrc.set_response_cache(None)
+    assert client.chat.calls == []
+
+
 # --- Prompt includes binder block + exports + examples -------------------
 
 
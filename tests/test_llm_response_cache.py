@@ -0,0 +1,137 @@
+"""Hermetic tests for `scripts/llm_response_cache.py` and its hook into
+`ponder_loop._chat_complete`. The Mistral client is a fake that counts calls.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import llm_response_cache as lrc
+from llm_response_cache import LLMCacheMiss, LLMResponseCache, request_key
+from ponder_loop import _chat_complete
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+        self.chat = SimpleNamespace(complete=self._complete)
+
+    def _complete(self, **kwargs):
+        self.calls.append(kwargs)
+        text = f"reply {len(self.calls)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+MSGS = [{"role": "user", "content": "prove it"}]
+
+
+@pytest.fixture(autouse=True)
+def _reset_active_cache():
+    yield
+    lrc.set_response_cache(None)
+
+
+def _call(client, *, temperature=0.0, hook=None):
+    return _chat_complete(
+        client=client, model="m", messages=MSGS, temperature=temperature,
+        max_tokens=64, purpose="t", api_log_hook=hook,
+    )
+
+
+def test_request_key_covers_every_field():
+    base = dict(model="m", messages=MSGS, temperature=0.0, max_tokens=64)
+    k = request_key(**base)
+    assert k == request_key(**base)
+    assert k != request_key(**{**base, "model": "m2"})
+    assert k != request_key(**{**base, "max_tokens": 65})
+    assert k != request_key(**{**base, "temperature": 0.1})
+    assert k != request_key(**base, seed=7)
+    assert k != request_key(**{**base, "messages": [{"role": "user", "content": "other"}]})
+
+
+def test_off_by_default(monkeypatch):
+    monkeypatch.delenv("DESOL_LLM_CACHE", raising=False)
+    client = _FakeClient()
+    _call(client)
+    _call(client)
+    assert len(client.calls) == 2
+
+
+def test_on_mode_serves_deterministic_calls_from_disk(tmp_path):
+    client = _FakeClient()
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="on"))
+    _, first = _call(client)
+    # A fresh cache object on the same file still hits (disk-backed).
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="on"))
+    response, second = _call(client)
+    assert first == second == "reply 1"
+    assert len(client.calls) == 1
+    assert response.choices[0].message.content == "reply 1"
+
+
+def test_on_mode_never_caches_sampled_calls(tmp_path):
+    client = _FakeClient()
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="on"))
+    assert _call(client, temperature=0.7)[1] != _call(client, temperature=0.7)[1]
+    assert len(client.calls) == 2
+
+
+def test_replay_mode_replays_sample_sequence(tmp_path):
+    recorder = _FakeClient()
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="replay"))
+    recorded = [_call(recorder, temperature=0.7)[1] for _ in range(2)]
+    assert recorded == ["reply 1", "reply 2"]
+
+    replayer = _FakeClient()
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="offline"))
+    replayed = [_call(replayer, temperature=0.7)[1] for _ in range(2)]
+    assert replayed == recorded
+    assert replayer.calls == []
+    with pytest.raises(LLMCacheMiss):
+        _call(replayer, temperature=0.7)
+
+
+def test_seed_is_keyed_and_forwarded(tmp_path):
+    client = _FakeClient()
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="on", seed=11))
+    _call(client)
+    assert client.calls[0]["random_seed"] == 11
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="on", seed=12))
+    _call(client)
+    assert len(client.calls) == 2
+
+
+def test_hit_rate_reported_through_api_log_hook(tmp_path):
+    records: list[dict] = []
+    client = _FakeClient()
+    lrc.set_response_cache(LLMResponseCache(tmp_path / "c.sqlite", mode="on"))
+    _call(client, hook=records.append)
+    _call(client, hook=records.append)
+    assert [r["cache"]["hit"] for r in records] == [False, True]
+    assert records[-1]["cache"]["hit_rate"] == 0.5
+    assert records[-1]["response_text"] == "reply 1"
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(tmp_path / "c.sqlite", mode="on", max_bytes=600)
+    for i in range(8):
+        cache.put(f"k{i}", model="m", purpose="t", text=os.urandom(100).hex())
+    cache.get("k0")  # refresh k0 so it survives
+    assert cache.evict() > 0
+    stats = cache.stats()
+    assert stats["bytes"] <= 600
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+
+
+def test_env_selects_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("DESOL_LLM_CACHE", "on")
+    monkeypatch.setenv("DESOL_LLM_CACHE_PATH", str(tmp_path / "env.sqlite"))
+    cache = lrc.get_response_cache()
+    assert cache is not None and cache.mode == "on"
+    assert cache.path == Path(tmp_path / "env.sqlite")
+    monkeypatch.setenv("DESOL_LLM_CACHE", "off")
+    assert lrc.get_response_cache() is None
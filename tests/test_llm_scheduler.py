@@ -0,0 +1,297 @@
+"""Hermetic tests for `scripts/llm_scheduler.py` and its hook into
+`ponder_loop._chat_complete`. No API is contacted; requests are callables.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import (
+    LLMRequestScheduler,
+    SharedAdmission,
+    current_lane,
+    default_lane,
+    is_retryable,
+    priority,
+    retry_after,
+    status_code,
+)
+from ponder_loop import _chat_complete
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, headers: dict | None = None) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+@pytest.fixture(autouse=True)
+def _reset_scheduler():
+    yield
+    llm_scheduler.set_scheduler(None)
+
+
+def test_error_classification():
+    assert status_code(_HTTPError(429)) == 429
+    assert status_code(RuntimeError("Status 503: upstream")) is None
+    assert is_retryable(_HTTPError(502))
+    # Status numbers in free text (e.g. a prompt echoed in an error) don't count.
+    assert not is_retryable(ValueError("expected 429 tokens, got 500"))
+    assert not is_retryable(_HTTPError(400))
+    assert retry_after(_HTTPError(429, {"retry-after": "2.5"})) == 2.5
+    assert retry_after(ValueError("x")) is None
+
+
+def test_lane_from_context_and_env(monkeypatch):
+    monkeypatch.delenv("DESOL_LLM_PRIORITY", raising=False)
+    assert current_lane() == "default"
+    monkeypatch.setenv("DESOL_LLM_PRIORITY", "background")
+    assert current_lane() == "background"
+    with priority("interactive"):
+        assert current_lane() == "interactive"
+    with pytest.raises(ValueError):
+        with priority("urgent"):
+            pass
+
+
+def test_concurrency_cap_is_respected():
+    sched = LLMRequestScheduler(max_concurrency=2, rate=0)
+    active = peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return 1
+
+    threads = [threading.Thread(target=sched.call, args=(work,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == 2
+    assert sched.stats()["completed"] == 8
+
+
+def test_throttle_halves_window_and_retries():
+    sched = LLMRequestScheduler(max_concurrency=8, rate=0, max_retries=2, backoff_base=0.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _HTTPError(429, {"retry-after": "0"})
+        return "ok"
+
+    assert sched.call(flaky) == "ok"
+    stats = sched.stats()
+    assert len(attempts) == 2
+    assert stats["throttled"] == 1 and stats["retries"] == 1
+    assert 4.0 <= stats["window"] < 8.0
+
+
+def test_non_retryable_errors_propagate_immediately():
+    sched = LLMRequestScheduler(max_concurrency=2, rate=0, max_retries=3)
+    calls = []
+
+    def bad():
+        calls.append(1)
+        raise _HTTPError(400)
+
+    with pytest.raises(_HTTPError):
+        sched.call(bad)
+    assert len(calls) == 1
+    assert sched.stats()["failed"] == 1
+
+
+def test_retries_are_bounded():
+    sched = LLMRequestScheduler(max_concurrency=2, rate=0, max_retries=1, backoff_base=0.0)
+    with pytest.raises(_HTTPError):
+        sched.call(lambda: (_ for _ in ()).throw(_HTTPError(503, {"retry-after": "0"})))
+    assert sched.stats()["retries"] == 1
+
+
+def test_interactive_lane_is_admitted_first():
+    sched = LLMRequestScheduler(max_concurrency=1, rate=0)
+    gate = threading.Event()
+    order: list[str] = []
+    blocker = threading.Thread(target=sched.call, args=(gate.wait,))
+    blocker.start()
+    while sched.stats()["inflight"] < 1:
+        time.sleep(0.001)
+
+    def submit(lane: str) -> threading.Thread:
+        t = threading.Thread(target=sched.call, args=(lambda: order.append(lane),), kwargs={"lane": lane})
+        t.start()
+        return t
+
+    waiters = [submit("background"), submit("background")]
+    while sched.stats()["waiting"] < 2:
+        time.sleep(0.001)
+    waiters.append(submit("interactive"))
+    while sched.stats()["waiting"] < 3:
+        time.sleep(0.001)
+    gate.set()
+    for t in [blocker, *waiters]:
+        t.join()
+    assert order == ["interactive", "background", "background"]
+
+
+def test_identical_inflight_requests_are_coalesced():
+    sched = LLMRequestScheduler(max_concurrency=4, rate=0)
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait()
+        return "shared"
+
+    results: list[str] = []
+    threads = [threading.Thread(target=lambda: results.append(sched.call(slow, key="k"))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while sched.stats()["coalesced"] < 2:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == ["shared"] * 3
+    assert len(calls) == 1
+    # Once finished, the key is no longer pending and a new call runs again.
+    assert sched.call(lambda: "fresh", key="k") == "fresh"
+
+
+def test_rate_ceiling_spaces_requests():
+    sched = LLMRequestScheduler(max_concurrency=4, rate=50.0)
+    sched.set_rate(20.0)
+    sched._tokens = 1.0
+    start = time.monotonic()
+    for _ in range(3):
+        sched.call(lambda: None)
+    assert time.monotonic() - start >= 0.08
+
+
+def test_acall_runs_under_scheduler():
+    sched = LLMRequestScheduler(max_concurrency=2, rate=0)
+
+    async def main():
+        return await asyncio.gather(*(sched.acall(lambda i=i: i * 2) for i in range(4)))
+
+    assert asyncio.run(main()) == [0, 2, 4, 6]
+    assert sched.stats()["completed"] == 4
+
+
+def test_chat_complete_goes_through_scheduler(monkeypatch):
+    monkeypatch.delenv("DESOL_LLM_CACHE", raising=False)
+    sched = LLMRequestScheduler(max_concurrency=2, rate=0, max_retries=1, backoff_base=0.0)
+    llm_scheduler.set_scheduler(sched)
+    calls = []
+
+    def complete(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise _HTTPError(429, {"retry-after": "0"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="done"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(complete=complete))
+    _, text = _chat_complete(
+        client=client, model="m", messages=[{"role": "user", "content": "x"}],
+        temperature=0.0, max_tokens=8, purpose="t", api_log_hook=None,
+    )
+    assert text == "done"
+    assert len(calls) == 2
+    assert sched.stats()["throttled"] == 1
+
+
+def test_default_lane_keeps_an_explicit_choice(monkeypatch):
+    monkeypatch.delenv("DESOL_LLM_PRIORITY", raising=False)
+    default_lane("background")
+    assert current_lane() == "background"
+    monkeypatch.setenv("DESOL_LLM_PRIORITY", "interactive")
+    default_lane("background")
+    assert current_lane() == "interactive"
+
+
+def test_shared_admission_caps_concurrency_across_schedulers(tmp_path):
+    # Two schedulers with their own connections stand in for two processes.
+    path = tmp_path / "admission.sqlite"
+    scheds = [LLMRequestScheduler(max_concurrency=1, rate=0, shared=SharedAdmission(path)) for _ in range(2)]
+    active = peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    threads = [threading.Thread(target=scheds[i % 2].call, args=(work,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == 1
+    assert all(s.stats()["completed"] == 3 for s in scheds)
+
+
+def test_shared_admission_orders_lanes_across_schedulers(tmp_path):
+    path = tmp_path / "admission.sqlite"
+    sweep = LLMRequestScheduler(max_concurrency=1, rate=0, shared=SharedAdmission(path))
+    other_sweep = LLMRequestScheduler(max_concurrency=1, rate=0, shared=SharedAdmission(path))
+    verify = LLMRequestScheduler(max_concurrency=1, rate=0, shared=SharedAdmission(path))
+    gate = threading.Event()
+    order: list[str] = []
+
+    def submit(sched, lane):
+        t = threading.Thread(target=sched.call, args=(lambda: order.append(lane),), kwargs={"lane": lane})
+        t.start()
+        time.sleep(0.1)
+        return t
+
+    holder = threading.Thread(target=sweep.call, args=(lambda: gate.wait(5),), kwargs={"lane": "background"})
+    holder.start()
+    time.sleep(0.1)
+    # The background request queues first, in another "process"; /verify still goes first.
+    waiters = [submit(other_sweep, "background"), submit(verify, "interactive")]
+    gate.set()
+    for t in [holder, *waiters]:
+        t.join(5)
+    assert order == ["interactive", "background"]
+
+
+def test_shared_throttle_halves_the_common_window(tmp_path):
+    path = tmp_path / "admission.sqlite"
+    a = LLMRequestScheduler(max_concurrency=4, rate=0, max_retries=0, shared=SharedAdmission(path))
+    b = LLMRequestScheduler(max_concurrency=4, rate=0, shared=SharedAdmission(path))
+    a.backoff_base = b.backoff_base = 0.0
+    with pytest.raises(_HTTPError):
+        a.call(lambda: (_ for _ in ()).throw(_HTTPError(429)))
+    assert b.stats()["window"] == 2.0
+
+
+def test_shared_admission_reaps_dead_processes(tmp_path):
+    import subprocess
+    import sys
+
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    shared = SharedAdmission(tmp_path / "admission.sqlite")
+    with shared._tx() as con:
+        con.execute("INSERT INTO tickets VALUES ('stale', ?, 0, 0, 1)", (proc.pid,))
+    ticket = shared.acquire("default", max_concurrency=1, rate=0)
+    shared.release(ticket, throttled=False)
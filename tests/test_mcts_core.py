@@ -332,3 +332,278 @@ def test_build_compounding_retriever_from_trusted_kg(tmp_path):
         top_k=1,
     )
     assert "my_saved_lemma" in ctx
+
+
+# ---------------------------------------------------------------------------
+# State-MCTS transposition table
+# ---------------------------------------------------------------------------
+
+class _TranspositionServer:
+    """Fake REPL: ``simp`` closes ``⊢ P``, ``intro h`` moves ``⊢ Q → P`` to it."""
+
+    def __init__(self):
+        self.calls: list[tuple[int, str]] = []
+        self._next_id = 10
+
+    def run_tac(self, proof_state_id, tactic):
+        from lean_repl_server import LeanError, ProofFinished, TacticState
+
+        self.calls.append((proof_state_id, tactic))
+        self._next_id += 1
+        if tactic == "intro h":
+            return TacticState(goals=["h : Q\n⊢ P"], proof_state_id=self._next_id)
+        if tactic == "simp":
+            return ProofFinished(proof_state_id=self._next_id)
+        return LeanError(error=f"unknown tactic {tactic}")
+
+
+def _expand_with_table(ms, node, server, table):
+    return ms._expand_state_node(
+        node=node,
+        server=server,
+        client=None,
+        model="m",
+        premise_context="",
+        retrieval_index_path="",
+        retrieval_top_k=1,
+        max_depth=5,
+        n_tactics=3,
+        temperature=0.0,
+        transposition_table=table,
+        env_fingerprint="env",
+    )
+
+
+def _patch_tactic_options(monkeypatch, tactics):
+    import ponder_loop
+
+    calls: list[str] = []
+
+    def fake_generate(**kwargs):
+        calls.append(kwargs["lean_state"])
+        return list(tactics)
+
+    monkeypatch.setattr(ponder_loop, "generate_tactic_options", fake_generate)
+    return calls
+
+
+def test_normalize_goal_text_ignores_whitespace():
+    import mcts_search as ms
+
+    assert ms.normalize_goal_text(["h :  Q\n  ⊢ P "]) == ms.normalize_goal_text(["h : Q\n⊢ P"])
+    assert ms.normalize_goal_text(["⊢ P", "⊢ Q"]) != ms.normalize_goal_text(["⊢ P ⊢ Q"])
+
+
+def test_transposition_reuses_candidates_and_skips_known_failures(monkeypatch):
+    import mcts_search as ms
+
+    llm_calls = _patch_tactic_options(monkeypatch, ["bogus", "intro h"])
+    table = ms.StateTranspositionTable()
+    server = _TranspositionServer()
+
+    first = ms.StateMCTSNode(proof_state_id=1, goals=["⊢ Q → P"], tactic_from_parent=None)
+    _expand_with_table(ms, first, server, table)
+    assert len(llm_calls) == 1
+    assert (1, "bogus") in server.calls
+
+    # Same goal reached elsewhere (different whitespace, different state id).
+    server.calls.clear()
+    second = ms.StateMCTSNode(proof_state_id=2, goals=["⊢  Q → P"], tactic_from_parent=None)
+    children = _expand_with_table(ms, second, server, table)
+    assert len(llm_calls) == 1
+    assert server.calls == [(2, "intro h")]
+    assert [ch.goals for ch, _ in children] == [["h : Q\n⊢ P"]]
+    assert second.tt_entry is first.tt_entry
+    assert table.hits >= 1
+
+
+def test_transposition_failed_state_is_terminal_without_llm(monkeypatch):
+    import mcts_search as ms
+
+    llm_calls = _patch_tactic_options(monkeypatch, ["bogus"])
+    table = ms.StateTranspositionTable()
+    server = _TranspositionServer()
+
+    first = ms.StateMCTSNode(proof_state_id=1, goals=["⊢ R"], tactic_from_parent=None)
+    _expand_with_table(ms, first, server, table)
+    assert table.lookup("env", ["⊢ R"]).status == "failed"
+
+    server.calls.clear()
+    again = ms.StateMCTSNode(proof_state_id=3, goals=["⊢ R"], tactic_from_parent=None)
+    assert _expand_with_table(ms, again, server, table) == []
+    assert again.is_terminal and again.terminal_reason == "transposition-failed"
+    assert server.calls == []
+    assert len(llm_calls) == 1
+
+
+def test_timeouts_and_restarts_are_not_recorded_as_failures(monkeypatch):
+    import mcts_search as ms
+    from lean_repl_server import LeanError
+
+    class _FlakyServer(_TranspositionServer):
+        def __init__(self):
+            super().__init__()
+            self.restarts = 0
+            self.timeouts = {"slow"}
+
+        def run_tac(self, proof_state_id, tactic):
+            if tactic in self.timeouts:
+                self.calls.append((proof_state_id, tactic))
+                return LeanError("REPL did not respond within 1s", transient=True)
+            if tactic == "crash":
+                self.calls.append((proof_state_id, tactic))
+                self.restarts += 1
+                return LeanError("Unknown proof state.", transient=True)
+            return super().run_tac(proof_state_id, tactic)
+
+    _patch_tactic_options(monkeypatch, ["bogus", "slow"])
+    table = ms.StateTranspositionTable()
+    server = _FlakyServer()
+    first = ms.StateMCTSNode(proof_state_id=1, goals=["⊢ R"], tactic_from_parent=None)
+    _expand_with_table(ms, first, server, table)
+    entry = table.lookup("env", ["⊢ R"])
+    assert entry.failed_tactics == {"bogus"} and entry.status != "failed"
+    assert not first.is_terminal
+
+    # The timed-out tactic is tried again on the next visit.
+    server.timeouts.clear()
+    server.calls.clear()
+    again = ms.StateMCTSNode(proof_state_id=2, goals=["⊢ R"], tactic_from_parent=None)
+    _expand_with_table(ms, again, server, table)
+    assert server.calls == [(2, "slow")]
+
+    # A restart mid-expansion stops it: later tactics would hit a dead state.
+    _patch_tactic_options(monkeypatch, ["crash", "bogus2"])
+    server.calls.clear()
+    other = ms.StateMCTSNode(proof_state_id=3, goals=["⊢ S"], tactic_from_parent=None)
+    assert _expand_with_table(ms, other, server, table) == []
+    assert server.calls == [(3, "crash")]
+    assert table.lookup("env", ["⊢ S"]).failed_tactics == set()
+
+
+def test_transposition_replays_recorded_solution(monkeypatch):
+    import mcts_search as ms
+
+    table = ms.StateTranspositionTable()
+    server = _TranspositionServer()
+    root = ms.StateMCTSNode(proof_state_id=1, goals=["⊢ Q → P"], tactic_from_parent=None)
+    root.tt_entry = table.entry("env", root.goals)
+    mid = ms.StateMCTSNode(proof_state_id=2, goals=["h : Q\n⊢ P"], tactic_from_parent="intro h", parent=root)
+    mid.tt_entry = table.entry("env", mid.goals)
+    done = ms.StateMCTSNode(proof_state_id=3, goals=[], tactic_from_parent="simp", parent=mid,
+                            is_terminal=True, terminal_reason="proof-finished")
+    ms._record_state_solution(done)
+    assert root.tt_entry.solution == ["intro h", "simp"]
+
+    llm_calls = _patch_tactic_options(monkeypatch, ["bogus"])
+    fresh = ms.StateMCTSNode(proof_state_id=7, goals=["⊢ Q → P"], tactic_from_parent=None)
+    children = _expand_with_table(ms, fresh, server, table)
+    assert llm_calls == []
+    assert len(children) == 1
+    leaf, value = children[0]
+    assert value == 1.0 and leaf.terminal_reason == "proof-finished"
+    assert ms._best_proof_path(fresh) == ["intro h", "simp"]
+
+
+# ---------------------------------------------------------------------------
+# Parallel state-MCTS (virtual loss)
+# ---------------------------------------------------------------------------
+
+class _GoalGraphServer:
+    """Fake REPL over a tiny goal graph; proof-state ids are local to each server."""
+
+    EDGES = {("⊢ A", "left"): "⊢ B", ("⊢ A", "right"): "⊢ C", ("⊢ B", "done"): None}
+
+    def __init__(self, base: int = 0):
+        self._goals: dict[int, str] = {base: "⊢ A"}
+        self._next = base
+        self.calls: list[tuple[int, str]] = []
+
+    def run_tac(self, proof_state_id, tactic):
+        from lean_repl_server import LeanError, ProofFinished, TacticState
+
+        self.calls.append((proof_state_id, tactic))
+        key = (self._goals.get(proof_state_id), tactic)
+        if key not in self.EDGES:
+            return LeanError(error="no")
+        self._next += 1
+        if self.EDGES[key] is None:
+            return ProofFinished(proof_state_id=self._next)
+        self._goals[self._next] = self.EDGES[key]
+        return TacticState(goals=[self.EDGES[key]], proof_state_id=self._next)
+
+
+def test_state_uct_virtual_loss_discourages_pending_node():
+    import mcts_search as ms
+
+    node = ms.StateMCTSNode(proof_state_id=0, goals=["⊢ A"], tactic_from_parent=None, visits=2, value_sum=1.0)
+    base = ms._state_uct(node, 4, 1.4)
+    assert base == pytest.approx(0.5 + 1.4 * math.sqrt(math.log(5) / 2))
+    node.virtual_loss = 1
+    assert ms._state_uct(node, 4, 1.4) < base
+
+
+def test_select_state_leaf_with_virtual_loss_spreads_selection():
+    import mcts_search as ms
+
+    root = ms.StateMCTSNode(proof_state_id=0, goals=["⊢ A"], tactic_from_parent=None, visits=1)
+    for i in range(2):
+        root.children.append(
+            ms.StateMCTSNode(proof_state_id=i + 1, goals=[f"⊢ {i}"], tactic_from_parent=str(i), parent=root)
+        )
+    first = ms._select_state_leaf(root, 1.4, virtual_loss=1)
+    second = ms._select_state_leaf(root, 1.4, virtual_loss=1)
+    assert first[-1] is not second[-1]
+    assert root.virtual_loss == 2
+    ms._release_virtual_loss(first, 1)
+    ms._release_virtual_loss(second, 1)
+    assert root.virtual_loss == 0 and all(ch.virtual_loss == 0 for ch in root.children)
+
+
+def test_parallel_rounds_generate_concurrently_and_find_proof(monkeypatch):
+    import threading
+    import mcts_search as ms
+    import ponder_loop
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_generate(**kwargs):
+        if kwargs["lean_state"] != "⊢ A":
+            barrier.wait()  # both depth-1 leaves must be generating at once
+        return ["left", "right", "done"]
+
+    monkeypatch.setattr(ponder_loop, "generate_tactic_options", fake_generate)
+    root = ms.StateMCTSNode(proof_state_id=0, goals=["⊢ A"], tactic_from_parent=None)
+    stats = ms.SearchStats()
+    solved = ms._run_parallel_state_rounds(
+        root,
+        server=_GoalGraphServer(),
+        stats=stats,
+        iterations=10,
+        parallel_leaves=2,
+        repl_workers=1,
+        exploration_c=1.4,
+        expand_kwargs=dict(
+            client=None, model="m", premise_context="", retrieval_index_path="",
+            retrieval_top_k=1, max_depth=5, n_tactics=3, temperature=0.0,
+        ),
+    )
+    assert solved is not None and solved.terminal_reason == "proof-finished"
+    assert ms._best_proof_path(root) == ["left", "done"]
+    assert stats.iterations == 3
+    assert root.virtual_loss == 0
+
+
+def test_state_id_on_slot_replays_path_on_pool_repl():
+    import mcts_search as ms
+
+    primary, replica = _GoalGraphServer(), _GoalGraphServer(base=100)
+    root = ms.StateMCTSNode(proof_state_id=0, goals=["⊢ A"], tactic_from_parent=None)
+    root.replica_state_ids[1] = 100
+    child = ms.StateMCTSNode(proof_state_id=5, goals=["⊢ B"], tactic_from_parent="left", parent=root)
+
+    sid = ms._state_id_on_slot(child, 1, [primary, replica])
+    assert replica.calls == [(100, "left")]
+    assert ms._state_id_on_slot(child, 1, [primary, replica]) == sid
+    assert len(replica.calls) == 1
+    assert ms._state_id_on_slot(child, 0, [primary, replica]) == 5
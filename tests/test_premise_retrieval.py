@@ -163,6 +163,201 @@ def test_save_np_load_np_roundtrip(tmp_path):
     assert len(loaded.entries) == len(entries)
 
 
+def test_load_np_maps_embeddings_and_entries_lazily(tmp_path):
+    np = pytest.importorskip("numpy")
+    import pickle
+
+    entries = _make_entries()
+    retriever = PremiseRetriever.build(entries, dims=64, encoder_name="hash")
+    retriever.save_np(tmp_path / "idx")
+    assert (tmp_path / "idx" / "entries.offsets.npy").exists()
+
+    loaded = PremiseRetriever.load(tmp_path / "idx")
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert not isinstance(loaded.entries, list)
+    assert [e.name for e in loaded.entries] == [e.name for e in entries]
+    assert loaded.entries[-1] == entries[-1]
+    assert loaded.entries[1:3] == entries[1:3]
+    with pytest.raises(IndexError):
+        loaded.entries[len(entries)]
+    assert [h.name for h in loaded.query("gaussian", top_k=3)] == [
+        h.name for h in retriever.query("gaussian", top_k=3)
+    ]
+
+    clone = pickle.loads(pickle.dumps(loaded.entries))
+    assert list(clone) == list(loaded.entries)
+
+
+def test_load_np_rebuilds_missing_or_stale_offsets(tmp_path):
+    pytest.importorskip("numpy")
+    entries = _make_entries()
+    PremiseRetriever.build(entries, dims=64, encoder_name="hash").save_np(tmp_path / "idx")
+    idx = tmp_path / "idx"
+
+    # Index written before offsets existed, with a stray blank line.
+    (idx / "entries.offsets.npy").unlink()
+    text = (idx / "entries.jsonl").read_text(encoding="utf-8")
+    (idx / "entries.jsonl").write_text(text.replace("\n", "\n\n", 1), encoding="utf-8")
+    loaded = PremiseRetriever.load(idx)
+    assert [e.name for e in loaded.entries] == [e.name for e in entries]
+    assert (idx / "entries.offsets.npy").exists()
+
+    # Entries rewritten underneath a stale offset file.
+    (idx / "entries.jsonl").write_text(text.splitlines()[0] + "\n", encoding="utf-8")
+    assert [e.name for e in PremiseRetriever.load(idx).entries] == [entries[0].name]
+
+
+def _ranking_corpus() -> list[PremiseEntry]:
+    words = ["gaussian", "measure", "integrable", "finset", "sum", "prime", "real", "sqrt"]
+    namespaces = ["Mathlib.Nat", "Mathlib.Data.Finset", "ProbabilityTheory", "Real", "Mathlib.Algebra"]
+    syms = ["ℕ", "ℝ", "∀", "→", "∑", "≤"]
+    entries = list(_make_entries())
+    for i in range(200):
+        stmt = " ".join(words[(i * j) % len(words)] for j in range(1, 4))
+        stmt += " " + " ".join(syms[(i + j) % len(syms)] for j in range(i % 3))
+        name = f"Lemma{i % 17}.{words[i % len(words)]}_{'Finset' if i % 5 == 0 else 'aux'}"
+        entries.append(PremiseEntry(name=name, statement=stmt, namespace=namespaces[i % len(namespaces)]))
+    entries.append(PremiseEntry(name="Finset.sum_le", statement="∑ ≤ finset sum", namespace="Mathlib.Data"))
+    return entries
+
+
+@pytest.mark.parametrize("goal", [
+    "⊢ ∑ i ∈ Finset.range n, f i ≤ ∑ i ∈ Finset.range n, g i",
+    "∀ n : ℕ, prime n → n ≥ 2",
+    "gaussian integrable measure on ℝ",
+    "",
+])
+def test_vectorized_query_matches_python_ranking(goal, monkeypatch):
+    pytest.importorskip("numpy")
+    import premise_retrieval as pr
+
+    retriever = PremiseRetriever.build(_ranking_corpus(), dims=64, encoder_name="hash")
+    fast = retriever.query(goal, top_k=25)
+    monkeypatch.setattr(pr, "_HAS_NUMPY", False)
+    slow = retriever.query(goal, top_k=25)
+    assert [h.name for h in fast] == [h.name for h in slow]
+    assert [h.score for h in fast] == pytest.approx([h.score for h in slow], abs=1e-6)
+
+
+def test_vectorized_scores_break_float32_near_ties_like_python(monkeypatch):
+    pytest.importorskip("numpy")
+    import premise_retrieval as pr
+
+    # In float32, 1 + 2**-30 rounds to 1, tying the two entries.
+    emb = [[1.0, 0.0], [1.0, 2.0 ** -30]]
+    entries = [PremiseEntry(name="A.first", statement="x"), PremiseEntry(name="B.second", statement="y")]
+    retriever = PremiseRetriever(entries=entries, embeddings=emb, dims=2)
+    monkeypatch.setattr(retriever, "_encode_queries", lambda goals: [[1.0, 1.0] for _ in goals])
+    fast = retriever.query("goal", top_k=2)
+    monkeypatch.setattr(pr, "_HAS_NUMPY", False)
+    slow = retriever.query("goal", top_k=2)
+    assert [h.name for h in fast] == [h.name for h in slow] == ["B.second", "A.first"]
+
+
+def test_lazy_index_parses_only_scored_entries(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    import premise_retrieval as pr
+
+    corpus = _ranking_corpus()
+    reference = PremiseRetriever.build(corpus, dims=64, encoder_name="hash")
+    reference.save_np(tmp_path / "idx")
+    loaded = PremiseRetriever.load(tmp_path / "idx")
+    parsed: list[int] = []
+    parse = pr._LazyEntries._parse
+    monkeypatch.setattr(pr._LazyEntries, "_parse", lambda self, i: parsed.append(i) or parse(self, i))
+
+    # No namespace or symbol signal: only the returned hits are parsed.
+    hits = loaded.query("gaussian integrable measure", top_k=3)
+    assert len(parsed) == 3
+    assert [h.name for h in hits] == [h.name for h in reference.query("gaussian integrable measure", top_k=3)]
+
+    # Namespace hints parse the rows that can still reach the top k, once.
+    goal = "prime sqrt real"
+    first = loaded.query(goal, top_k=3)
+    assert 3 < len(parsed) < 3 + len(corpus)
+    assert [h.name for h in first] == [h.name for h in reference.query(goal, top_k=3)]
+    before = len(parsed)
+    loaded.query(goal, top_k=3)
+    assert len(parsed) == before + 3
+
+
+def test_query_many_matches_query():
+    pytest.importorskip("numpy")
+    import premise_retrieval as pr
+
+    retriever = PremiseRetriever.build(_ranking_corpus(), dims=64, encoder_name="hash")
+    goals = ["⊢ ∑ i ∈ Finset.range n, f i ≤ g", "gaussian integrable measure", "", "∀ n : ℕ, prime n"]
+    many = retriever.query_many(goals, top_k=10)
+    assert [[h.name for h in hits] for hits in many] == [
+        [h.name for h in retriever.query(g, top_k=10)] for g in goals
+    ]
+    assert retriever.query_many(goals, top_k=0) == [[], [], [], []]
+
+
+def test_top_k_desc_breaks_ties_by_index():
+    np = pytest.importorskip("numpy")
+    import premise_retrieval as pr
+
+    scores = np.array([0.5, 1.0, 0.5, 1.0, 0.5, 0.1])
+    assert pr._top_k_desc(scores, 3).tolist() == [1, 3, 0]
+    assert pr._top_k_desc(scores, 10).tolist() == [1, 3, 0, 2, 4, 5]
+
+
+def _clustered_index(tmp_path, n=2000, dims=32, clusters=40):
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(clusters, dims))
+    emb = centers[rng.integers(0, clusters, size=n)] + 0.15 * rng.normal(size=(n, dims))
+    emb = (emb / np.linalg.norm(emb, axis=1, keepdims=True)).astype(np.float32)
+    entries = [PremiseEntry(name=f"Lemma.l{i}", statement=f"s {i}", namespace="Mathlib") for i in range(n)]
+    PremiseRetriever(entries=entries, embeddings=emb, dims=dims).save_np(tmp_path / "idx")
+    return tmp_path / "idx", emb
+
+
+def test_ivf_full_probe_equals_exact_and_default_recall(tmp_path):
+    import premise_retrieval as pr
+
+    idx, emb = _clustered_index(tmp_path)
+    ann = pr.build_ann_index(idx, n_lists=40, n_probe=4)
+    assert int(ann.offsets[-1]) == emb.shape[0]
+    assert sorted(ann.order.tolist()) == list(range(emb.shape[0]))
+
+    q = emb[7]
+    exact = pr._top_k_desc(emb @ q, 10).tolist()
+    assert ann.search(emb, q, 10, n_probe=ann.n_lists).tolist() == exact
+
+    rows = pr.benchmark_ann(idx, n_queries=50, top_k=10, n_probes=[4, 40])
+    assert rows[0]["n_probe"] == 0 and rows[0]["recall"] == 1.0
+    assert rows[1]["recall"] >= 0.9
+    assert rows[2]["recall"] == 1.0
+
+
+def test_load_np_uses_ann_and_keeps_name_hits(tmp_path, monkeypatch):
+    import premise_retrieval as pr
+
+    idx, _emb = _clustered_index(tmp_path)
+    pr.build_ann_index(idx, n_lists=40, n_probe=1)
+    loaded = PremiseRetriever.load(idx)
+    assert loaded.ann is not None
+
+    # Exact identifier hits are scored even when their list is not probed.
+    hits = loaded.query("apply L1234 here", top_k=1)
+    assert hits[0].name == "Lemma.l1234"
+
+    monkeypatch.setenv("DESOL_PREMISE_ANN", "0")
+    assert PremiseRetriever.load(idx).ann is None
+
+
+def test_ann_index_ignored_when_embeddings_change(tmp_path):
+    import premise_retrieval as pr
+
+    idx, emb = _clustered_index(tmp_path)
+    pr.build_ann_index(idx, n_lists=10)
+    entries = list(PremiseRetriever.load(idx).entries)
+    PremiseRetriever(entries=entries[:5], embeddings=emb[:5], dims=emb.shape[1]).save_np(idx)
+    assert pr.IVFIndex.load(idx) is None
+
+
 def test_tier_preference_trusted_ranks_first():
     entries = _make_entries()
     retriever = PremiseRetriever.build(entries, dims=128, encoder_name="hash")
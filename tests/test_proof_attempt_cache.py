@@ -6,6 +6,7 @@ Verifies the (statement_hash, method) cache semantics:
   - Lookup returns the most-recent entry by timestamp.
   - record_proof_attempt is append-only (later entries supersede).
   - Cache survives unparseable lines gracefully.
+  - The in-memory index follows appends, compaction and imports.
 """
 from __future__ import annotations
 
@@ -19,7 +20,11 @@ from proof_attempt_cache import (
     CacheEntry,
     cache_stats,
     canonicalize_statement,
+    compact_cache,
+    import_jsonl,
     lookup_cached_proof,
+    lookup_many,
+    record_many,
     record_proof_attempt,
     statement_hash,
 )
@@ -214,3 +219,100 @@ def test_missing_cache_lookup_returns_none(tmp_path: Path):
         method="whole_proof",
         cache_path=cache,
     ) is None
+
+
+def test_record_many_and_lookup_many(tmp_path: Path):
+    cache = tmp_path / "cache.jsonl"
+    n = record_many(
+        [
+            {"lean_statement": "theorem foo : P", "method": "whole_proof",
+             "proof_body": "aesop", "validated": True},
+            {"lean_statement": "theorem bar : Q", "method": "whole_proof",
+             "proof_body": "simp", "validated": False, "error_tail": "boom"},
+            {"lean_statement": "", "method": "whole_proof", "proof_body": "x"},
+        ],
+        cache_path=cache,
+    )
+    assert n == 2
+    foo, bar, baz = lookup_many(
+        ["theorem foo : P := by sorry", "theorem bar : Q", "theorem baz : R"],
+        method="whole_proof",
+        cache_path=cache,
+    )
+    assert foo is not None and foo.proof_body == "aesop"
+    assert bar is not None and bar.error_tail == "boom" and bar.validated is False
+    assert baz is None
+
+
+def test_index_sees_lines_appended_by_other_writers(tmp_path: Path):
+    cache = tmp_path / "cache.jsonl"
+    record_proof_attempt(
+        lean_statement="theorem foo : P", method="whole_proof",
+        proof_body="aesop", validated=False, cache_path=cache,
+    )
+    assert lookup_cached_proof(
+        lean_statement="theorem foo : P", method="whole_proof", cache_path=cache,
+    ).proof_body == "aesop"
+    newer = {
+        "statement_hash": statement_hash("theorem foo : P"), "method": "whole_proof",
+        "proof_body": "simp_all", "validated": True, "timestamp": time.time() + 10,
+    }
+    with cache.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(newer) + "\n")
+        f.write('{"statement_hash": "half-writ')  # another writer mid-append
+    entry = lookup_cached_proof(
+        lean_statement="theorem foo : P", method="whole_proof", cache_path=cache,
+    )
+    assert entry is not None and entry.proof_body == "simp_all"
+    assert cache_stats(cache)["entries"] == 2
+
+
+def test_compact_keeps_latest_entry_per_key(tmp_path: Path):
+    cache = tmp_path / "cache.jsonl"
+    for body in ("a", "b", "c"):
+        record_proof_attempt(
+            lean_statement="theorem foo : P", method="whole_proof",
+            proof_body=body, validated=False, cache_path=cache,
+        )
+        time.sleep(0.001)
+    record_proof_attempt(
+        lean_statement="theorem foo : P", method="lemma_factor",
+        proof_body="d", validated=True, cache_path=cache,
+    )
+    with cache.open("a") as f:
+        f.write("not-json\n")
+    assert compact_cache(cache) == {"before": 4, "after": 2}
+    assert len(cache.read_text(encoding="utf-8").splitlines()) == 2
+    assert lookup_cached_proof(
+        lean_statement="theorem foo : P", method="whole_proof", cache_path=cache,
+    ).proof_body == "c"
+    assert lookup_cached_proof(
+        lean_statement="theorem foo : P", method="lemma_factor", cache_path=cache,
+    ).proof_body == "d"
+
+
+def test_import_jsonl_keeps_newest_across_files(tmp_path: Path):
+    cache = tmp_path / "cache.jsonl"
+    old = tmp_path / "old.jsonl"
+    h = statement_hash("theorem foo : P")
+    old.write_text(
+        "\n".join(json.dumps(r) for r in [
+            {"statement_hash": h, "method": "whole_proof", "proof_body": "old",
+             "validated": False, "timestamp": 1.0},
+            {"statement_hash": statement_hash("theorem bar : Q"), "method": "whole_proof",
+             "proof_body": "bar", "validated": True, "timestamp": 2.0},
+        ]) + "\nnot-json\n",
+        encoding="utf-8",
+    )
+    record_proof_attempt(
+        lean_statement="theorem foo : P", method="whole_proof",
+        proof_body="new", validated=True, cache_path=cache,
+    )
+    assert import_jsonl(old, cache) == {"read": 2, "imported": 1}
+    assert lookup_cached_proof(
+        lean_statement="theorem foo : P", method="whole_proof", cache_path=cache,
+    ).proof_body == "new"
+    assert lookup_cached_proof(
+        lean_statement="theorem bar : Q", method="whole_proof", cache_path=cache,
+    ).proof_body == "bar"
+    assert import_jsonl(old, cache)["imported"] == 0
@@ -106,6 +106,75 @@ def test_build_and_query_statement_index_hash(tmp_path: Path) -> None:
     assert hits[0]["kg_ref"] == "2401.00001|gaussian_integrable"
 
 
+def test_build_statement_index_with_ann(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    ledger_dir = tmp_path / "ledgers"
+    index_dir = tmp_path / "statement_index"
+    _write_ledger(ledger_dir)
+
+    summary = build_statement_index(
+        ledger_dir=ledger_dir,
+        out_dir=index_dir,
+        encoder_name="hash",
+        dims=128,
+        ann=True,
+    )
+    assert summary["ann"]["kind"] == "ivf"
+    assert (index_dir / "ann_ivf.json").exists()
+    hits = query_statement_index(index_dir, "gaussian variable integrable", top_k=1)
+    assert hits[0]["statement_id"] == "2401.00001|gaussian_integrable"
+
+
+def test_statement_index_is_cached_until_rebuilt(tmp_path: Path, monkeypatch) -> None:
+    import os
+    import statement_retrieval as sr
+
+    ledger_dir = tmp_path / "ledgers"
+    index_dir = tmp_path / "statement_index"
+    _write_ledger(ledger_dir)
+    build_statement_index(ledger_dir=ledger_dir, out_dir=index_dir, encoder_name="hash", dims=128)
+    sr.clear_statement_index_cache()
+
+    loads: list[Path] = []
+    real_load = sr.PremiseRetriever.load
+
+    def counting_load(path):
+        loads.append(Path(path))
+        return real_load(path)
+
+    monkeypatch.setattr(sr.PremiseRetriever, "load", staticmethod(counting_load))
+    for _ in range(3):
+        query_statement_index(index_dir, "gaussian variable integrable", top_k=1)
+    assert len(loads) == 1
+
+    build_statement_index(ledger_dir=ledger_dir, out_dir=index_dir, encoder_name="hash", dims=128)
+    meta = index_dir / "meta.json"
+    os.utime(meta, ns=(meta.stat().st_atime_ns, meta.stat().st_mtime_ns + 1_000_000))
+    query_statement_index(index_dir, "gaussian variable integrable", top_k=1)
+    assert len(loads) == 2
+
+
+def test_query_statement_index_many_matches_single_queries(tmp_path: Path) -> None:
+    from statement_retrieval import query_statement_index_many
+
+    ledger_dir = tmp_path / "ledgers"
+    index_dir = tmp_path / "statement_index"
+    _write_ledger(ledger_dir)
+    build_statement_index(ledger_dir=ledger_dir, out_dir=index_dir, encoder_name="hash", dims=128)
+
+    queries = ["gaussian variable integrable", "independent increments", "gaussian variable integrable"]
+    excludes = ["", "", "2401.00001|gaussian_integrable"]
+    batched = query_statement_index_many(index_dir, queries, top_k=2, exclude_statement_ids=excludes)
+    singles = [
+        query_statement_index(index_dir, q, top_k=2, exclude_statement_id=ex)
+        for q, ex in zip(queries, excludes)
+    ]
+    assert [[h["statement_id"] for h in hits] for hits in batched] == [
+        [h["statement_id"] for h in hits] for hits in singles
+    ]
+    assert all(h["statement_id"] != excludes[2] for h in batched[2])
+
+
 def test_kg_api_semantic_search_endpoint(tmp_path: Path) -> None:
     fastapi = pytest.importorskip("fastapi.testclient")
     ledger_dir = tmp_path / "ledgers"
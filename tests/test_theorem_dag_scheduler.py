@@ -0,0 +1,77 @@
+"""Hermetic tests for the dependency-DAG translation scheduler in
+`scripts/arxiv_to_lean.py`. Work items are plain callables; no LLM runs.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from arxiv_to_lean import _run_dependency_dag
+from theorem_dependency_graph import TheoremDependencyGraph
+
+
+def _run(deps, fn, *, workers):
+    return _run_dependency_dag(TheoremDependencyGraph(deps), fn, workers=workers)
+
+
+def test_dependents_start_after_their_dependencies():
+    deps = [set(), {0}, {0}, {1, 2}]
+    log: list[tuple[str, int]] = []
+    lock = threading.Lock()
+
+    def work(i: int) -> int:
+        with lock:
+            log.append(("start", i))
+        time.sleep(0.01)
+        with lock:
+            log.append(("end", i))
+        return i * 10
+
+    assert _run(deps, work, workers=4) == [0, 10, 20, 30]
+    for i, ds in enumerate(deps):
+        for d in ds:
+            assert log.index(("end", d)) < log.index(("start", i))
+
+
+def test_independent_branches_run_concurrently():
+    active = peak = 0
+    lock = threading.Lock()
+
+    def work(i: int) -> None:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.03)
+        with lock:
+            active -= 1
+
+    _run([set(), set(), set(), {0}], work, workers=3)
+    assert peak == 3
+
+
+def test_critical_path_is_dispatched_first():
+    # Node 2 heads a chain of three; nodes 0 and 1 are leaves and can wait.
+    deps = [set(), set(), set(), {2}, {3}]
+    order: list[int] = []
+    _run(deps, order.append, workers=1)
+    assert order == [2, 3, 0, 1, 4]
+
+
+def test_cycles_are_released_in_document_order():
+    order: list[int] = []
+    results = _run([{1}, {0}, set()], lambda i: order.append(i) or i, workers=2)
+    assert results == [0, 1, 2]
+    assert order[0] == 2 and sorted(order) == [0, 1, 2]
+
+
+def test_worker_exception_propagates():
+    def work(i: int) -> int:
+        if i == 1:
+            raise RuntimeError("boom")
+        return i
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _run([set(), {0}, set()], work, workers=2)
@@ -0,0 +1,81 @@
+"""Tests for `scripts/theorem_dependency_graph.py`."""
+from __future__ import annotations
+
+import random
+
+from arxiv_to_lean import _topological_sort_entries
+from theorem_dependency_graph import MultiPatternMatcher, TheoremDependencyGraph
+from theorem_extractor import TheoremEntry
+
+
+def _entry(name: str, proof: str = "", label: str = "") -> TheoremEntry:
+    return TheoremEntry(kind="lemma", name=name, statement="x = x", proof=proof, source_file="p.tex", label=label)
+
+
+def _naive_deps(entries: list[TheoremEntry]) -> list[set[int]]:
+    """The quadratic scan this module replaced, kept as a reference."""
+    import re
+
+    labels = {e.label: i for i, e in enumerate(entries) if e.label}
+    names = {e.name: i for i, e in enumerate(entries) if e.name}
+    deps: list[set[int]] = [set() for _ in entries]
+    for i, e in enumerate(entries):
+        for group in re.findall(r"\\(?:ref|eqref|cref)\{([^}]+)\}", e.proof or ""):
+            for ref in group.split(","):
+                if ref.strip() in labels and labels[ref.strip()] != i:
+                    deps[i].add(labels[ref.strip()])
+        for name, j in names.items():
+            if j != i and len(name) >= 4 and name in (e.proof or ""):
+                deps[i].add(j)
+    return deps
+
+
+def test_matcher_reports_overlapping_and_nested_patterns():
+    m = MultiPatternMatcher(["he", "she", "his", "hers", ""])
+    assert {m.patterns[k] for k in m.find("ushers")} == {"she", "he", "hers"}
+    assert m.find("xyz") == set()
+    assert MultiPatternMatcher([]).find("anything") == set()
+
+
+def test_dependencies_from_refs_and_names():
+    entries = [
+        _entry("Lemma A", label="lem:a"),
+        _entry("Lemma B", proof="By \\cref{lem:a, lem:zz}."),
+        _entry("Main", proof="Combine Lemma B with Lemma A (see Ex), not with Main itself."),
+        _entry("Ex", proof="Lemma A"),  # too short to be matched by name
+    ]
+    graph = TheoremDependencyGraph.from_entries(entries)
+    assert graph.deps == [set(), {0}, {0, 1}, {0}]
+    assert graph.dependents == [[1, 2, 3], [2], [], []]
+
+
+def test_matches_reference_scan_on_random_papers():
+    rng = random.Random(7)
+    words = ["Lemma", "Theorem", "bound", "Prop", "Lemma 1", "Lemma 12", "Cor"]
+    for _ in range(30):
+        entries = []
+        for i in range(rng.randint(1, 12)):
+            name = rng.choice(words) + (f" {i}" if rng.random() < 0.7 else "")
+            proof = " ".join(rng.choice(words + [f"\\ref{{l{rng.randint(0, 12)}}}"]) for _ in range(8))
+            entries.append(_entry(name, proof=proof, label=f"l{i}"))
+        assert TheoremDependencyGraph.from_entries(entries).deps == _naive_deps(entries)
+
+
+def test_topological_order_keeps_document_order_and_appends_cycles():
+    # 2 -> 0, 3 <-> 4 form a cycle, 1 free.
+    graph = TheoremDependencyGraph([{2}, set(), set(), {4}, {3}])
+    assert graph.topological_order() == [1, 2, 0, 3, 4]
+
+
+def test_sort_entries_uses_graph_order():
+    entries = [
+        _entry("Main", proof="Combine Lemma B with Lemma A."),
+        _entry("Lemma B", proof="By \\ref{lem:a}."),
+        _entry("Lemma A", label="lem:a"),
+    ]
+    assert [e.name for e in _topological_sort_entries(entries)] == ["Lemma A", "Lemma B", "Main"]
+
+
+def test_critical_path_counts_longest_chain_of_dependents():
+    # 0 -> 1 -> 2 and 3 standalone.
+    assert TheoremDependencyGraph([set(), {0}, {1}, set()]).critical_path_lengths() == [3, 2, 1, 1]
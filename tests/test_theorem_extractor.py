@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import types
 from pathlib import Path
 
-from theorem_extractor import extract_theorems, register_environment_aliases
+from theorem_extractor import LineIndex, extract_theorems, iter_theorems, register_environment_aliases
 
 
 def test_extract_theorem_preserves_body_label_and_following_proof(tmp_path: Path) -> None:
@@ -86,3 +87,31 @@ def test_nested_same_name_environment_uses_balanced_span(tmp_path: Path) -> None
     assert len(entries) == 2
     assert "Outer statement ends." in entries[0].statement
     assert entries[0].span_end > entries[1].span_end
+
+
+def test_line_index_matches_prefix_slicing() -> None:
+    text = "ab\n\u03b1 \u2264 \u03b2\n\nlast \U0001d53c line"
+    index = LineIndex(text)
+    for offset in range(len(text) + 1):
+        prefix = text[:offset]
+        line = prefix.count("\n") + 1
+        col = offset - prefix.rfind("\n") if "\n" in prefix else offset + 1
+        assert index.line_col(offset) == (line, col)
+        assert index.byte_offset(offset) == len(prefix.encode("utf-8"))
+    assert LineIndex("plain ascii").byte_offset(5) == 5
+
+
+def test_iter_theorems_streams_the_same_entries(tmp_path: Path) -> None:
+    tex = tmp_path / "stream.tex"
+    prefix = "\\begin{lemma}\u03b1 > 0\\end{lemma}\n\\begin{theorem}"
+    tex.write_text(prefix + "\\label{t}B\\end{theorem}\n", encoding="utf-8")
+
+    stream = iter_theorems(tex)
+
+    assert isinstance(stream, types.GeneratorType)
+    assert next(stream).statement == "\u03b1 > 0"
+    second = next(stream)
+    assert second.name == "t"
+    assert second.source_span.start_line == 2
+    assert second.source_span.start_byte == len(prefix.encode("utf-8"))
+    assert [e.name for e in extract_theorems(tex)] == ["lemma_1", "t"]
@@ -152,3 +152,91 @@ def test_upsert_does_not_demote_higher_rank(tmp_path: Path, monkeypatch) -> None
     assert entries[0]["theorem_name"] == "good_thm"
 
 
+
+
+def _proved_entry(theorem_name: str):
+    from pipeline_status import build_ledger_entry
+    from pipeline_status_models import FailureKind, ProofMethod
+
+    return build_ledger_entry(
+        theorem_name=theorem_name,
+        lean_file="output/0000.99997.lean",
+        lean_statement=f"theorem {theorem_name} : True := by trivial",
+        proved=True,
+        step_records=[],
+        proof_text="trivial",
+        error_message="",
+        proof_mode="state-mcts",
+        proof_method=ProofMethod.LEAN_VERIFIED,
+        rounds_used=1,
+        time_s=1.0,
+        had_exception=False,
+        failure_kind=FailureKind.UNKNOWN,
+    )
+
+
+def test_ledger_batch_coalesces_upserts_into_one_write(tmp_path: Path, monkeypatch) -> None:
+    import pipeline_status as PS
+
+    out = tmp_path / "output"
+    ledger_path = out / "0000.99997.json"
+    writes: list[Path] = []
+    real_write = PS._write_ledger
+    monkeypatch.setattr(
+        PS, "_write_ledger", lambda *a, **k: writes.append(real_write(*a, **k)) or writes[-1]
+    )
+
+    with PS.ledger_batch():
+        PS.upsert_ledger_entry("0000.99997", _proved_entry("a"), output_root=out)
+        PS.upsert_ledger_entry("0000.99997", _proved_entry("b"), output_root=out)
+        # Reads inside the batch see the pending rows; nothing is on disk yet.
+        assert [r["theorem_name"] for r in PS.load_ledger("0000.99997", output_root=out)] == ["a", "b"]
+        assert not ledger_path.exists()
+        PS.upsert_ledger_entry("0000.99997", _proved_entry("ArxivPaper.a"), output_root=out)
+
+    assert writes == [ledger_path]
+    assert [e["theorem_name"] for e in _read_entries(ledger_path)] == ["a", "b"]
+
+
+def test_ledger_journal_replays_upserts_lost_before_flush(tmp_path: Path, monkeypatch) -> None:
+    import pipeline_status as PS
+
+    out = tmp_path / "output"
+    _save_ledger(out / "0000.99996.json", [{"theorem_name": "old", "status": "FULLY_PROVEN"}])
+    # Simulate a crash: the flush at batch exit never happens.
+    monkeypatch.setattr(PS, "flush_ledgers", lambda: [])
+    with PS.ledger_batch(journal=True):
+        PS.upsert_ledger_entry("0000.99996", _proved_entry("new"), output_root=out)
+    journal = out / "0000.99996.journal.jsonl"
+    assert journal.exists()
+    monkeypatch.undo()
+
+    rows = PS.load_ledger("0000.99996", output_root=out)
+    assert [r["theorem_name"] for r in rows] == ["old", "new"]
+    PS.save_ledger("0000.99996", rows, output_root=out)
+    assert not journal.exists()
+    assert [e["theorem_name"] for e in _read_entries(out / "0000.99996.json")] == ["old", "new"]
+
+
+def test_save_ledger_probes_toolchain_once_per_process(tmp_path: Path, monkeypatch) -> None:
+    import subprocess
+
+    import pipeline_status as PS
+
+    PS._get_pipeline_commit.cache_clear()
+    PS._get_lean_version.cache_clear()
+    calls: list[list[str]] = []
+
+    def _fake_run(cmd, **kwargs):
+        calls.append(list(cmd))
+        return subprocess.CompletedProcess(cmd, 0, stdout="abc\n", stderr="")
+
+    monkeypatch.setattr(PS.subprocess, "run", _fake_run)
+    out = tmp_path / "output"
+    for _ in range(3):
+        PS.upsert_ledger_entry("0000.99995", _proved_entry("a"), output_root=out)
+    PS._get_pipeline_commit.cache_clear()
+    PS._get_lean_version.cache_clear()
+    assert sorted(c[0] for c in calls) == ["git", "lean"]
+    doc = json.loads((out / "0000.99995.json").read_text())
+    assert doc["pipeline_commit"] == "abc"